@@ -1,61 +1,76 @@
-import threading
-import time
 from typing import Annotated
 
+import asyncpg
 import duckdb
 from fastapi import Depends, HTTPException
 import psycopg2
-import psycopg2.extras
-
-from app.database.connexion_duckdb import DB_PATH
-from app.database.connexion_postgresql import PG_CONFIG
-
-
-_pg_conn: psycopg2.extensions.connection | None = None
-_pg_lock = threading.Lock()
-
-
-def _ensure_pg_conn() -> psycopg2.extensions.connection:
-    """Crée ou valide la connexion persistante (thread-safe, avec retries)."""
-    global _pg_conn
-    with _pg_lock:
-        for attempt in range(20):
-            try:
-                if _pg_conn is None or _pg_conn.closed:
-                    _pg_conn = psycopg2.connect(
-                        **PG_CONFIG,
-                        cursor_factory=psycopg2.extras.RealDictCursor,
-                    )
-                else:
-                    with _pg_conn.cursor() as cur:
-                        cur.execute("SELECT 1")
-                return _pg_conn
-            except Exception:
-                _pg_conn = None
-                if attempt < 19:
-                    time.sleep(2)
-        raise ConnectionError("PostgreSQL inaccessible après plusieurs tentatives")
-    return _pg_conn
+
+from app.database.connexion_duckdb import (
+    DB_PATH,
+    acquire_shared_duckdb,
+    release_shared_duckdb,
+)
+from app.database.pg_async import acquire_async, get_async_pool
+from app.database.pg_pool import PoolError, get_pg_pool
 
 
 def get_pg():
-    """Connexion PostgreSQL persistante — jamais fermée pour garder le port-forward kubectl ouvert."""
+    """Connexion PostgreSQL empruntée au pool le temps de la requête.
+
+    Commit à la fin de la requête, rollback si elle lève une exception ;
+    503 si aucune connexion n'est disponible (voir PG_POOL_TIMEOUT).
+    """
+    pool = get_pg_pool()
     try:
-        yield _ensure_pg_conn()
-    except ConnectionError as e:
+        conn = pool.acquire()
+    except PoolError as e:
         raise HTTPException(status_code=503, detail=str(e)) from e
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        pool.release(conn)
 
 
-def get_duck():
-    """Connexion DuckDB read-only — fermée après la requête."""
-    if not DB_PATH.exists():
-        raise HTTPException(status_code=503, detail="Base DuckDB introuvable")
-    conn = duckdb.connect(str(DB_PATH), read_only=True)
+async def get_apg():
+    """Connexion asyncpg empruntée au pool async le temps de la requête.
+
+    Pas de transaction englobante : les lectures partent en autocommit, les
+    services async ouvrent une transaction pour chaque écriture. 503 si
+    aucune connexion n'est disponible (voir PG_POOL_TIMEOUT).
+    """
+    try:
+        pool = await get_async_pool()
+        conn = await acquire_async(pool)
+    except PoolError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
     try:
         yield conn
     finally:
-        conn.close()
+        await pool.release(conn)
+
+
+def get_duck():
+    """Curseur sur la base DuckDB partagée du process — fermé après la requête,
+    la connexion étant empruntée jusque-là (voir acquire_shared_duckdb)."""
+    try:
+        conn = acquire_shared_duckdb(DB_PATH)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail="Base DuckDB introuvable") from e
+    try:
+        cursor = conn.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+    finally:
+        release_shared_duckdb(conn)
 
 
 PgDep = Annotated[psycopg2.extensions.connection, Depends(get_pg)]
+AsyncPgDep = Annotated[asyncpg.Connection, Depends(get_apg)]
 DuckDep = Annotated[duckdb.DuckDBPyConnection, Depends(get_duck)]
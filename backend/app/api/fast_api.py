@@ -1,8 +1,17 @@
+from contextlib import asynccontextmanager, suppress
+import os
+
 from fastapi import FastAPI
 import uvicorn
 
+from app.api.response_cache import ResponseCacheMiddleware
 from app.config.app_config import add_cors_middleware
 from app.controller import (
+    async_collection_controller,
+    async_favorites_controller,
+    async_parts_controller,
+    async_user_controller,
+    async_wishlist_controller,
     buildable_controller,
     collection_controller,
     favorites_controller,
@@ -12,19 +21,82 @@ from app.controller import (
     user_controller,
     wishlist_controller,
 )
+from app.database.connexion_duckdb import (
+    close_shared_duckdb,
+    get_shared_duckdb,
+    shutdown_duckdb_executor,
+)
+from app.database.pg_async import close_async_pool, get_async_pool
+from app.database.pg_pool import PoolError, close_pg_pool, get_pg_pool
+from app.service.buildable_engine import BUILDABLE_ENGINE, get_requirement_matrix
+from app.utils.embedding_model import EMBEDDING_WARM_UP, get_embedding_model
+
+
+# sync : toutes les routes sur psycopg2 (threads) ; async : routes des
+# données utilisateur sur asyncpg, DuckDB dans un pool de threads borné.
+# Recherche, sets constructibles et routes système sont les mêmes dans les
+# deux modes.
+API_MODE = os.getenv("API_MODE", "sync")
+USER_DATA_CONTROLLERS = {
+    "sync": (
+        collection_controller,
+        parts_controller,
+        wishlist_controller,
+        favorites_controller,
+        user_controller,
+    ),
+    "async": (
+        async_collection_controller,
+        async_parts_controller,
+        async_wishlist_controller,
+        async_favorites_controller,
+        async_user_controller,
+    ),
+}
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Ouvre et précharge la base DuckDB partagée au démarrage, démarre le
+    pool PostgreSQL (ses premières connexions s'ouvrent en arrière-plan) et,
+    en mode async, le pool asyncpg (ouvert à la première requête si
+    PostgreSQL est injoignable au démarrage). Avec EMBEDDING_WARM_UP, le
+    modèle de la recherche sémantique se charge en arrière-plan : l'API
+    répond aussitôt (recherche LIKE en attendant).
+
+    Sans base (pas encore générée), les routes DuckDB répondent 503 jusqu'à
+    ce qu'elle apparaisse ; elle est alors ouverte à la première requête.
+    """
+    get_pg_pool()
+    if API_MODE == "async":
+        with suppress(PoolError):
+            await get_async_pool()
+    try:
+        conn = get_shared_duckdb()
+    except FileNotFoundError:
+        conn = None
+    if conn is not None and BUILDABLE_ENGINE == "matrix":
+        get_requirement_matrix(conn)
+    if EMBEDDING_WARM_UP:
+        get_embedding_model().ensure_loading()
+    yield
+    await close_async_pool()
+    close_pg_pool()
+    shutdown_duckdb_executor()
+    close_shared_duckdb()
 
 
-app = FastAPI(title="LEGO Finder API")
+app = FastAPI(title="LEGO Finder API", lifespan=lifespan)
 
+# Ajouté avant CORS, donc sous lui : les en-têtes CORS propres à chaque
+# origine ne sont jamais gardés dans les réponses en cache
+app.add_middleware(ResponseCacheMiddleware)
 add_cors_middleware(app)
 
 app.include_router(search_controller.router)
-app.include_router(collection_controller.router)
-app.include_router(parts_controller.router)
-app.include_router(wishlist_controller.router)
-app.include_router(favorites_controller.router)
+for controller in USER_DATA_CONTROLLERS[API_MODE]:
+    app.include_router(controller.router)
 app.include_router(buildable_controller.router)
-app.include_router(user_controller.router)
 app.include_router(system_controller.router)
 
 
@@ -0,0 +1,202 @@
+"""
+Cache HTTP des routes du catalogue (lecture seule) : ETag fort,
+Cache-Control max-age, 304 Not Modified, et réponses gardées en mémoire
+(LRU) par chemin, paramètres et version du catalogue
+"""
+
+from dataclasses import dataclass
+import hashlib
+import os
+import threading
+from urllib.parse import parse_qsl, urlencode
+
+from app.database.connexion_duckdb import DB_PATH, file_version
+from app.utils.lru_cache import LRUCache
+
+
+RESPONSE_CACHE_SIZE = int(
+    os.getenv("RESPONSE_CACHE_SIZE", "512")
+)  # 0 : pas de copie en mémoire (ETag et 304 restent actifs)
+# Total des corps gardés en mémoire (octets) : les plus anciens sont évincés
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 << 20)))
+RESPONSE_CACHE_MAX_AGE = int(os.getenv("RESPONSE_CACHE_MAX_AGE", "300"))
+# Au-delà, une réponse n'est pas gardée en mémoire (taille bornée du cache)
+RESPONSE_CACHE_MAX_BODY = 256 * 1024
+
+
+def cache_response(max_age: int | None = None, vary=None):
+    """Active le cache HTTP d'une route GET (décorateur placé sous
+    @router.get) : sa réponse ne doit dépendre que du catalogue DuckDB et
+    des paramètres de la requête.
+
+    Args:
+        max_age: durée de Cache-Control en secondes (RESPONSE_CACHE_MAX_AGE
+            par défaut).
+        vary: fonction sans argument dont le résultat entre dans la clé du
+            cache, pour un état du process qui change la réponse (modèle de
+            la recherche sémantique chargé ou non...).
+    """
+
+    def decorate(endpoint):
+        endpoint.cache_max_age = RESPONSE_CACHE_MAX_AGE if max_age is None else max_age
+        endpoint.cache_vary = vary
+        return endpoint
+
+    return decorate
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    etag: bytes
+    content_type: bytes | None
+    body: bytes
+
+
+def make_etag(body: bytes) -> bytes:
+    return b'"' + hashlib.blake2b(body, digest_size=16).hexdigest().encode() + b'"'
+
+
+def etag_matches(if_none_match: bytes, etag: bytes) -> bool:
+    """If-None-Match (liste d'ETags ou *) correspond-il à `etag` ?
+    Comparaison faible (préfixe W/ ignoré), comme le veut la RFC 9110."""
+    if if_none_match.strip() == b"*":
+        return True
+    return etag in (
+        tag.strip().removeprefix(b"W/") for tag in if_none_match.split(b",")
+    )
+
+
+def cache_key(scope, version: str, extra=None) -> tuple:
+    """Clé d'une requête : version du catalogue, chemin sans / final,
+    paramètres triés (ordre et encodage de l'URL sans effet)."""
+    path = scope["path"].rstrip("/") or "/"
+    query = parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)
+    return version, extra, path, urlencode(sorted(query))
+
+
+class ResponseCacheMiddleware:
+    """Middleware ASGI des routes marquées par cache_response.
+
+    Réponse 200 : ETag (hash du corps) et Cache-Control public, max-age ;
+    304 sans corps si If-None-Match correspond. Avec un catalogue sur
+    disque, la réponse est gardée en mémoire sous sa clé (voir cache_key),
+    dans la limite en entrées et en octets du LRU : une nouvelle version du
+    catalogue (catalog_meta.version, voir catalog_version) change la clé,
+    les anciennes entrées sortent du LRU d'elles-mêmes. Les autres
+    réponses (erreurs, 503 sans catalogue...) et les autres routes passent
+    telles quelles.
+
+    La route d'une requête n'est connue qu'après le routage (scope
+    "endpoint") : celles des chemins déjà servis sont retenues, ce qui
+    permet de répondre depuis le cache sans passer par l'application.
+    """
+
+    def __init__(self, app, cache: LRUCache | None = None, version=None):
+        """
+        Args:
+            cache: réponses en mémoire (get_response_cache() par défaut,
+                None si RESPONSE_CACHE_SIZE=0 : ETag et 304 seulement).
+            version: fonction qui retourne la version du catalogue
+                (file_version du fichier DuckDB par défaut : celle de
+                catalog_meta une fois le fichier ouvert), None sans
+                catalogue.
+        """
+        self.app = app
+        self.cache = cache if cache is not None else get_response_cache()
+        self.version = version or (lambda: file_version(DB_PATH))
+        self._endpoints = LRUCache(1024)  # chemin -> route marquée
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        endpoint = self._endpoints.get(scope["path"])
+        key = self._key(scope, endpoint) if endpoint is not None else None
+        cached = self.cache.get(key) if key and self.cache is not None else None
+        if cached is None:
+            cached, endpoint = await self._call_app(scope, receive, send)
+            if cached is None:
+                return  # route non marquée ou réponse non cachable, déjà envoyée
+            self._endpoints.put(scope["path"], endpoint)
+            key = key or self._key(scope, endpoint)
+            if (
+                key
+                and self.cache is not None
+                and len(cached.body) <= RESPONSE_CACHE_MAX_BODY
+            ):
+                self.cache.put(key, cached, len(cached.body))
+        await self._send(scope, send, cached, endpoint.cache_max_age)
+
+    def _key(self, scope, endpoint) -> tuple | None:
+        version = self.version()
+        if version is None:
+            return None
+        vary = endpoint.cache_vary
+        return cache_key(scope, version, vary() if vary else None)
+
+    async def _call_app(self, scope, receive, send):
+        """Exécute la requête ; la réponse 200 d'une route marquée est
+        retenue (pas envoyée) et retournée avec sa route, toute autre
+        réponse est transmise telle quelle ((None, None))."""
+        start, body = None, []
+        endpoint = None
+
+        async def capture(message):
+            nonlocal start, endpoint
+            if message["type"] == "http.response.start":
+                start = message
+                endpoint = scope.get("endpoint")
+                if not self._cachable(start, endpoint):
+                    await send(message)
+            elif not self._cachable(start, endpoint):
+                await send(message)
+            else:
+                body.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        if start is None or not self._cachable(start, endpoint):
+            return None, None
+        content = b"".join(body)
+        content_type = dict(start.get("headers", [])).get(b"content-type")
+        return CachedResponse(make_etag(content), content_type, content), endpoint
+
+    @staticmethod
+    def _cachable(start, endpoint) -> bool:
+        return start["status"] == 200 and hasattr(endpoint, "cache_max_age")
+
+    @staticmethod
+    async def _send(scope, send, cached: CachedResponse, max_age: int):
+        """Envoie la réponse, ou 304 si If-None-Match correspond à son ETag."""
+        headers = [
+            (b"etag", cached.etag),
+            (b"cache-control", f"public, max-age={max_age}".encode()),
+        ]
+        if_none_match = dict(scope["headers"]).get(b"if-none-match")
+        if if_none_match and etag_matches(if_none_match, cached.etag):
+            status, body = 304, b""
+        else:
+            status, body = 200, cached.body
+            if cached.content_type is not None:
+                headers.append((b"content-type", cached.content_type))
+            headers.append((b"content-length", str(len(body)).encode()))
+        await send(
+            {"type": "http.response.start", "status": status, "headers": headers}
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+_cache: LRUCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> LRUCache | None:
+    """Cache de réponses du process (RESPONSE_CACHE_SIZE entrées, au plus
+    RESPONSE_CACHE_MAX_BYTES octets de corps), None si désactivé."""
+    global _cache
+    if RESPONSE_CACHE_SIZE <= 0:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LRUCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_MAX_BYTES)
+    return _cache
@@ -19,6 +19,7 @@ from .theme import Theme
 from .user import User
 from .user_owned_set import UserOwnedSet
 from .user_part import UserPart
+from .user_stock import UserStock
 from .wishlist import Wishlist
 from .wishlist_part import WishlistPart
 from .wishlist_set import WishlistSet
@@ -40,4 +41,5 @@ __all__ = [
     # DTOs Matching
     "BuildableSet",
     "MissingPart",
+    "UserStock",
 ]
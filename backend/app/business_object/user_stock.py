@@ -0,0 +1,69 @@
+"""
+DTO pour le stock de pièces d'un utilisateur
+Utilisé par l'algorithme de matching
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class UserStock:
+    """
+    Stock d'un utilisateur en colonnes : un pc_id (clé entière d'un couple
+    part_num/color_id, voir part_color_keys) et une quantité par ligne.
+
+    Les pc_id sont uniques et triés. Les tableaux NumPy sont lus tels quels
+    par DuckDB (vue enregistrée) et par le moteur matriciel, sans passer par
+    des objets Python ligne à ligne.
+    """
+
+    pc_ids: np.ndarray  # int32, triés, uniques
+    quantities: np.ndarray  # int32
+
+    def __len__(self) -> int:
+        return len(self.pc_ids)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32))
+
+    @classmethod
+    def from_arrays(cls, pc_ids, quantities):
+        """Créer depuis des colonnes quelconques : les doublons sont additionnés"""
+        pc_ids = np.asarray(pc_ids, dtype=np.int32)
+        quantities = np.asarray(quantities, dtype=np.int32)
+        unique, inverse = np.unique(pc_ids, return_inverse=True)
+        if len(unique) == len(pc_ids):
+            return cls(unique, quantities[np.argsort(pc_ids, kind="stable")])
+        summed = np.bincount(inverse, weights=quantities, minlength=len(unique))
+        return cls(unique, summed.astype(np.int32))
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Créer depuis un dict {pc_id: quantité}"""
+        return cls.from_arrays(
+            np.fromiter(data.keys(), dtype=np.int32, count=len(data)),
+            np.fromiter(data.values(), dtype=np.int32, count=len(data)),
+        )
+
+    def to_dict(self) -> dict:
+        """{pc_id: quantité}"""
+        return dict(zip(self.pc_ids.tolist(), self.quantities.tolist(), strict=True))
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame (pc_id, qty) sur les mêmes tableaux, à enregistrer dans DuckDB"""
+        return pd.DataFrame({"pc_id": self.pc_ids, "qty": self.quantities}, copy=False)
+
+    def merge(self, other: "UserStock"):
+        """Somme de deux stocks (pièces en propre + sets non construits)"""
+        if not len(other):
+            return self
+        if not len(self):
+            return other
+        return UserStock.from_arrays(
+            np.concatenate([self.pc_ids, other.pc_ids]),
+            np.concatenate([self.quantities, other.quantities]),
+        )
@@ -0,0 +1,59 @@
+"""Routes /collection en async (API_MODE=async) : mêmes chemins et réponses
+que collection_controller."""
+
+from fastapi import APIRouter, HTTPException
+
+from app.api.dependencies import AsyncPgDep, DuckDep
+from app.controller.collection_controller import collection_items
+from app.database.connexion_duckdb import run_duckdb
+from app.database.dao.catalog_dao import CatalogDAO
+from app.database.dao.collection_dao import AsyncCollectionDAO
+from app.dto.collection_dto import AddSetBody, UpdateBuiltBody
+from app.service.collection_service import AsyncCollectionService
+
+
+router = APIRouter(prefix="/users/{user_id}", tags=["collection"])
+
+
+@router.get("/collection")
+async def get_collection(user_id: int, pg: AsyncPgDep, duck: DuckDep):
+    sets = await AsyncCollectionService(AsyncCollectionDAO(pg), pg).get_collection(
+        user_id
+    )
+    if not sets:
+        return []
+    details = await run_duckdb(
+        CatalogDAO(duck).get_set_details, [s.set_num for s in sets]
+    )
+    return collection_items(sets, details)
+
+
+@router.post("/collection", status_code=201)
+async def add_to_collection(user_id: int, body: AddSetBody, pg: AsyncPgDep):
+    result = await AsyncCollectionService(AsyncCollectionDAO(pg), pg).add_set(
+        user_id, body.set_num, body.is_built
+    )
+    if result is None:
+        raise HTTPException(status_code=409, detail="Set déjà dans la collection")
+    return result.to_dict()
+
+
+@router.delete("/collection/{set_num}", status_code=204)
+async def remove_from_collection(user_id: int, set_num: str, pg: AsyncPgDep):
+    removed = await AsyncCollectionService(AsyncCollectionDAO(pg), pg).remove_set(
+        user_id, set_num
+    )
+    if not removed:
+        raise HTTPException(status_code=404, detail="Set non trouvé dans la collection")
+
+
+@router.put("/collection/{set_num}/built")
+async def update_built_status(
+    user_id: int, set_num: str, body: UpdateBuiltBody, pg: AsyncPgDep
+):
+    updated = await AsyncCollectionService(AsyncCollectionDAO(pg), pg).mark_built(
+        user_id, set_num, body.is_built
+    )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Set non trouvé dans la collection")
+    return {"is_built": body.is_built}
@@ -0,0 +1,47 @@
+"""Routes /favorites en async (API_MODE=async) : mêmes chemins et réponses
+que favorites_controller."""
+
+from fastapi import APIRouter, HTTPException
+
+from app.api.dependencies import AsyncPgDep, DuckDep
+from app.controller.favorites_controller import favorite_items
+from app.database.connexion_duckdb import run_duckdb
+from app.database.dao.catalog_dao import CatalogDAO
+from app.database.dao.favorite_dao import AsyncFavoriteDAO
+from app.dto.favorites_dto import AddFavoriteBody
+from app.service.favorite_service import AsyncFavoriteService
+
+
+router = APIRouter(prefix="/users/{user_id}", tags=["favorites"])
+
+
+@router.get("/favorites")
+async def get_favorites(user_id: int, pg: AsyncPgDep, duck: DuckDep):
+    favorites = await AsyncFavoriteService(AsyncFavoriteDAO(pg), pg).get_favorites(
+        user_id
+    )
+    if not favorites:
+        return []
+    details = await run_duckdb(
+        CatalogDAO(duck).get_set_details, [f.set_num for f in favorites]
+    )
+    return favorite_items(favorites, details)
+
+
+@router.post("/favorites", status_code=201)
+async def add_favorite(user_id: int, body: AddFavoriteBody, pg: AsyncPgDep):
+    result = await AsyncFavoriteService(AsyncFavoriteDAO(pg), pg).add_favorite(
+        user_id, body.set_num
+    )
+    if result is None:
+        raise HTTPException(status_code=409, detail="Set déjà dans les favoris")
+    return result.to_dict()
+
+
+@router.delete("/favorites/{set_num}", status_code=204)
+async def remove_favorite(user_id: int, set_num: str, pg: AsyncPgDep):
+    removed = await AsyncFavoriteService(AsyncFavoriteDAO(pg), pg).remove_favorite(
+        user_id, set_num
+    )
+    if not removed:
+        raise HTTPException(status_code=404, detail="Set non trouvé dans les favoris")
@@ -0,0 +1,56 @@
+"""Routes /parts en async (API_MODE=async) : mêmes chemins et réponses
+que parts_controller."""
+
+from fastapi import APIRouter, HTTPException
+
+from app.api.dependencies import AsyncPgDep, DuckDep
+from app.controller.parts_controller import part_pairs, with_part_details
+from app.database.connexion_duckdb import run_duckdb
+from app.database.dao.catalog_dao import CatalogDAO
+from app.database.dao.user_parts_dao import AsyncUserPartsDAO
+from app.dto.parts_dto import AddPartBody, UpdatePartQtyBody
+from app.service.user_parts_service import AsyncUserPartsService
+
+
+router = APIRouter(prefix="/users/{user_id}", tags=["parts"])
+
+
+@router.get("/parts")
+async def get_owned_parts(user_id: int, pg: AsyncPgDep, duck: DuckDep):
+    service = AsyncUserPartsService(AsyncUserPartsDAO(pg), pg)
+    rows = await service.get_owned_parts(user_id)
+    if not rows:
+        return []
+    details = await run_duckdb(
+        CatalogDAO(duck).get_part_color_details, part_pairs(rows)
+    )
+    return with_part_details(rows, details)
+
+
+@router.post("/parts", status_code=201)
+async def add_owned_part(user_id: int, body: AddPartBody, pg: AsyncPgDep):
+    service = AsyncUserPartsService(AsyncUserPartsDAO(pg), pg)
+    return await service.add_part(
+        user_id, body.part_num, body.color_id, body.quantity, is_used=body.is_used
+    )
+
+
+@router.delete("/parts/{part_num}/{color_id}", status_code=204)
+async def remove_owned_part(user_id: int, part_num: str, color_id: int, pg: AsyncPgDep):
+    service = AsyncUserPartsService(AsyncUserPartsDAO(pg), pg)
+    removed = await service.remove_part(user_id, part_num, color_id)
+    if not removed:
+        raise HTTPException(status_code=404, detail="Pièce non trouvée")
+
+
+@router.put("/parts/{part_num}/{color_id}")
+async def update_owned_part_quantity(
+    user_id: int, part_num: str, color_id: int, body: UpdatePartQtyBody, pg: AsyncPgDep
+):
+    service = AsyncUserPartsService(AsyncUserPartsDAO(pg), pg)
+    updated = await service.update_quantity(
+        user_id, part_num, color_id, body.quantity, body.is_used
+    )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Pièce non trouvée")
+    return {"quantity": body.quantity}
@@ -0,0 +1,73 @@
+"""Routes /users en async (API_MODE=async) : mêmes chemins et réponses
+que user_controller."""
+
+from fastapi import APIRouter, HTTPException
+
+from app.api.dependencies import AsyncPgDep
+from app.database.dao.user_dao import AsyncUserDAO
+from app.dto.user_dto import (
+    ChangePasswordBody,
+    ChangeUsernameBody,
+    LoginBody,
+    RegisterBody,
+)
+from app.service.password_service import AsyncPasswordService
+from app.service.user_service import AsyncUserService
+
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+@router.post("", status_code=201)
+async def register(body: RegisterBody, pg: AsyncPgDep):
+    dao = AsyncUserDAO(pg)
+    if await dao.is_username_taken(body.username):
+        raise HTTPException(status_code=409, detail="Username déjà pris")
+    result = await AsyncUserService(dao).create_user(body.username, body.password)
+    if result is None:
+        raise HTTPException(
+            status_code=500, detail="Erreur lors de la création du compte"
+        )
+    return {"id_user": result.id_user, "username": result.username}
+
+
+@router.post("/login")
+async def login(body: LoginBody, pg: AsyncPgDep):
+    dao = AsyncUserDAO(pg)
+    try:
+        user = await AsyncPasswordService(dao).validate_username_password(
+            body.username, body.password
+        )
+    except Exception as e:
+        raise HTTPException(status_code=401, detail=str(e)) from e
+    return {"id_user": user.id_user, "username": user.username}
+
+
+@router.put("/{user_id}/password")
+async def change_password(user_id: int, body: ChangePasswordBody, pg: AsyncPgDep):
+    dao = AsyncUserDAO(pg)
+    user = await dao.get_by_id(user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="Utilisateur introuvable")
+    async with pg.transaction():
+        ok = await AsyncUserService(dao).change_password(
+            user.username, body.old_password, body.new_password
+        )
+    if not ok:
+        raise HTTPException(status_code=400, detail="Ancien mot de passe incorrect")
+    return {"detail": "Mot de passe mis à jour"}
+
+
+@router.put("/{user_id}/username")
+async def change_username(user_id: int, body: ChangeUsernameBody, pg: AsyncPgDep):
+    dao = AsyncUserDAO(pg)
+    user = await dao.get_by_id(user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="Utilisateur introuvable")
+    async with pg.transaction():
+        ok = await AsyncUserService(dao).change_username(
+            user.username, body.new_username
+        )
+    if not ok:
+        raise HTTPException(status_code=409, detail="Username déjà pris")
+    return {"detail": "Username mis à jour"}
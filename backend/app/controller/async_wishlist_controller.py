@@ -0,0 +1,97 @@
+"""Routes /wishlist en async (API_MODE=async) : mêmes chemins et réponses
+que wishlist_controller."""
+
+from fastapi import APIRouter, HTTPException
+
+from app.api.dependencies import AsyncPgDep, DuckDep
+from app.controller.parts_controller import part_pairs, with_part_details
+from app.controller.wishlist_controller import wishlist_set_items
+from app.database.connexion_duckdb import run_duckdb
+from app.database.dao.catalog_dao import CatalogDAO
+from app.database.dao.whishlist_dao import AsyncWishlistDAO
+from app.dto.wishlist_dto import (
+    AddWishlistPartBody,
+    AddWishlistSetBody,
+    UpdateWishlistPartQtyBody,
+)
+from app.service.wishlist_service import AsyncWishlistService
+
+
+router = APIRouter(prefix="/users/{user_id}", tags=["wishlist"])
+
+
+@router.get("/wishlist/sets")
+async def get_wishlist_sets(user_id: int, pg: AsyncPgDep, duck: DuckDep):
+    items = await AsyncWishlistService(AsyncWishlistDAO(pg), pg).get_sets(user_id)
+    if not items:
+        return []
+    details = await run_duckdb(
+        CatalogDAO(duck).get_set_details, [it["set_num"] for it in items]
+    )
+    return wishlist_set_items(items, details)
+
+
+@router.post("/wishlist/sets", status_code=201)
+async def add_wishlist_set(user_id: int, body: AddWishlistSetBody, pg: AsyncPgDep):
+    service = AsyncWishlistService(AsyncWishlistDAO(pg), pg)
+    result = await service.add_set(user_id, body.set_num, body.priority)
+    if result is None:
+        raise HTTPException(status_code=409, detail="Set déjà dans la wishlist")
+    return result
+
+
+@router.delete("/wishlist/sets/{set_num}", status_code=204)
+async def remove_wishlist_set(user_id: int, set_num: str, pg: AsyncPgDep):
+    service = AsyncWishlistService(AsyncWishlistDAO(pg), pg)
+    removed = await service.remove_set(user_id, set_num)
+    if not removed:
+        raise HTTPException(status_code=404, detail="Set non trouvé dans la wishlist")
+
+
+@router.get("/wishlist/parts")
+async def get_wishlist_parts(user_id: int, pg: AsyncPgDep, duck: DuckDep):
+    service = AsyncWishlistService(AsyncWishlistDAO(pg), pg)
+    rows = await service.get_parts(user_id)
+    if not rows:
+        return []
+    details = await run_duckdb(
+        CatalogDAO(duck).get_part_color_details, part_pairs(rows)
+    )
+    return with_part_details(rows, details)
+
+
+@router.post("/wishlist/parts", status_code=201)
+async def add_wishlist_part(user_id: int, body: AddWishlistPartBody, pg: AsyncPgDep):
+    service = AsyncWishlistService(AsyncWishlistDAO(pg), pg)
+    return await service.add_part(user_id, body.part_num, body.color_id, body.quantity)
+
+
+@router.delete("/wishlist/parts/{part_num}/{color_id}", status_code=204)
+async def remove_wishlist_part(
+    user_id: int, part_num: str, color_id: int, pg: AsyncPgDep
+):
+    service = AsyncWishlistService(AsyncWishlistDAO(pg), pg)
+    removed = await service.remove_part(user_id, part_num, color_id)
+    if not removed:
+        raise HTTPException(
+            status_code=404, detail="Pièce non trouvée dans la wishlist"
+        )
+
+
+@router.put("/wishlist/parts/{part_num}/{color_id}")
+async def update_wishlist_part_quantity(
+    user_id: int,
+    part_num: str,
+    color_id: int,
+    body: UpdateWishlistPartQtyBody,
+    pg: AsyncPgDep,
+):
+    service = AsyncWishlistService(AsyncWishlistDAO(pg), pg)
+    updated = await service.update_part_quantity(
+        user_id, part_num, color_id, body.quantity
+    )
+    if not updated:
+        raise HTTPException(
+            status_code=404, detail="Pièce non trouvée dans la wishlist"
+        )
+    return {"quantity": body.quantity}
@@ -1,14 +1,34 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 
 from app.api.dependencies import DuckDep, PgDep
+from app.service.buildable_cache import get_buildable_cache
 from app.service.buildable_service import BuildableService
+from app.service.buildable_state import get_coverage_store
 
 
 router = APIRouter(prefix="/users/{user_id}", tags=["buildable"])
 
 
 @router.get("/buildable")
-def get_buildable_sets(user_id: int, pg: PgDep, duck: DuckDep, limit: int = 50):
-    service = BuildableService(pg, duck)
+def get_buildable_sets(
+    user_id: int,
+    pg: PgDep,
+    duck: DuckDep,
+    limit: int = 50,
+    include_missing: bool = False,
+):
+    service = BuildableService(
+        pg, duck, cache=get_buildable_cache(), states=get_coverage_store()
+    )
     result = service.get_buildable_sets(user_id, limit)
+    if include_missing:
+        result = service.with_missing_parts(user_id, result)
     return {key: [s.to_dict() for s in sets] for key, sets in result.items()}
+
+
+@router.get("/buildable/{set_num}/missing")
+def get_missing_parts(user_id: int, set_num: str, pg: PgDep, duck: DuckDep):
+    missing = BuildableService(pg, duck).get_missing_parts(user_id, set_num)
+    if missing is None:
+        raise HTTPException(status_code=404, detail="Set non trouvé")
+    return {"set_num": set_num, "missing_parts": [m.to_dict() for m in missing]}
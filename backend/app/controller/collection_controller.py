@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 
 from app.api.dependencies import DuckDep, PgDep
+from app.database.dao.catalog_dao import CatalogDAO
 from app.database.dao.collection_dao import CollectionDAO
 from app.dto.collection_dto import AddSetBody, UpdateBuiltBody
 from app.service.collection_service import CollectionService
@@ -9,27 +10,21 @@ from app.service.collection_service import CollectionService
 router = APIRouter(prefix="/users/{user_id}", tags=["collection"])
 
 
+def collection_items(sets, details: dict) -> list[dict]:
+    """Sets de la collection enrichis du catalogue (aussi en API_MODE=async)."""
+    return [
+        {**details.get(s.set_num, {"set_num": s.set_num}), "is_built": s.is_built}
+        for s in sets
+    ]
+
+
 @router.get("/collection")
 def get_collection(user_id: int, pg: PgDep, duck: DuckDep):
     sets = CollectionService(CollectionDAO(pg), pg).get_collection(user_id)
     if not sets:
         return []
-    set_nums = [s.set_num for s in sets]
-    placeholders = ", ".join("?" * len(set_nums))
-    rows = duck.execute(
-        f"SELECT set_num, name, year, num_parts, img_url FROM sets WHERE set_num IN ({placeholders})",
-        set_nums,
-    ).fetchall()
-    details = {
-        r[0]: dict(
-            zip(["set_num", "name", "year", "num_parts", "img_url"], r, strict=False)
-        )
-        for r in rows
-    }
-    return [
-        {**details.get(s.set_num, {"set_num": s.set_num}), "is_built": s.is_built}
-        for s in sets
-    ]
+    details = CatalogDAO(duck).get_set_details([s.set_num for s in sets])
+    return collection_items(sets, details)
 
 
 @router.post("/collection", status_code=201)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 
 from app.api.dependencies import DuckDep, PgDep
+from app.database.dao.catalog_dao import CatalogDAO
 from app.database.dao.favorite_dao import FavoriteDAO
 from app.dto.favorites_dto import AddFavoriteBody
 from app.service.favorite_service import FavoriteService
@@ -9,27 +10,21 @@ from app.service.favorite_service import FavoriteService
 router = APIRouter(prefix="/users/{user_id}", tags=["favorites"])
 
 
+def favorite_items(favorites, details: dict) -> list[dict]:
+    """Favoris enrichis du catalogue (aussi en API_MODE=async)."""
+    return [
+        {**details.get(f.set_num, {"set_num": f.set_num}), "added_at": str(f.added_at)}
+        for f in favorites
+    ]
+
+
 @router.get("/favorites")
 def get_favorites(user_id: int, pg: PgDep, duck: DuckDep):
     favorites = FavoriteService(FavoriteDAO(pg), pg).get_favorites(user_id)
     if not favorites:
         return []
-    set_nums = [f.set_num for f in favorites]
-    placeholders = ", ".join("?" * len(set_nums))
-    rows = duck.execute(
-        f"SELECT set_num, name, year, num_parts, img_url FROM sets WHERE set_num IN ({placeholders})",
-        set_nums,
-    ).fetchall()
-    details = {
-        r[0]: dict(
-            zip(["set_num", "name", "year", "num_parts", "img_url"], r, strict=False)
-        )
-        for r in rows
-    }
-    return [
-        {**details.get(f.set_num, {"set_num": f.set_num}), "added_at": str(f.added_at)}
-        for f in favorites
-    ]
+    details = CatalogDAO(duck).get_set_details([f.set_num for f in favorites])
+    return favorite_items(favorites, details)
 
 
 @router.post("/favorites", status_code=201)
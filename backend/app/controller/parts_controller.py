@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 
 from app.api.dependencies import DuckDep, PgDep
+from app.database.dao.catalog_dao import CatalogDAO
 from app.database.dao.user_parts_dao import UserPartsDAO
 from app.dto.parts_dto import AddPartBody, UpdatePartQtyBody
 from app.service.user_parts_service import UserPartsService
@@ -9,38 +10,36 @@ from app.service.user_parts_service import UserPartsService
 router = APIRouter(prefix="/users/{user_id}", tags=["parts"])
 
 
-@router.get("/parts")
-def get_owned_parts(user_id: int, pg: PgDep, duck: DuckDep):
-    service = UserPartsService(UserPartsDAO(pg), pg)
-    rows = service.get_owned_parts(user_id)
-    if not rows:
-        return []
-    part_nums = list({r["part_num"] for r in rows})
-    placeholders = ", ".join("?" * len(part_nums))
-    detail_rows = duck.execute(
-        f"""
-        SELECT p.part_num, p.name,
-               CASE WHEN e.element_id IS NOT NULL
-                    THEN 'https://cdn.rebrickable.com/media/parts/elements/' || e.element_id || '.jpg'
-                    ELSE 'https://cdn.rebrickable.com/media/parts/photos/' || p.part_num || '.jpg'
-               END AS img_url
-        FROM parts p
-        LEFT JOIN (SELECT part_num, MIN(element_id) AS element_id FROM elements GROUP BY part_num) e
-            ON p.part_num = e.part_num
-        WHERE p.part_num IN ({placeholders})
-        """,
-        part_nums,
-    ).fetchall()
-    details = {r[0]: {"name": r[1], "img_url": r[2]} for r in detail_rows}
+def part_pairs(rows: list[dict]) -> list[tuple[str, int]]:
+    """Couples (part_num, color_id) distincts de lignes de pièces."""
+    return list({(r["part_num"], r["color_id"]) for r in rows})
+
+
+def with_part_details(rows: list[dict], details: dict) -> list[dict]:
+    """Lignes de pièces enrichies du catalogue (voir get_part_color_details),
+    pour /parts et /wishlist/parts, en sync comme en async."""
     return [
         {
             **row,
-            **details.get(row["part_num"], {"name": row["part_num"], "img_url": None}),
+            **details.get(
+                (row["part_num"], row["color_id"]),
+                {"name": row["part_num"], "img_url": None},
+            ),
         }
         for row in rows
     ]
 
 
+@router.get("/parts")
+def get_owned_parts(user_id: int, pg: PgDep, duck: DuckDep):
+    service = UserPartsService(UserPartsDAO(pg), pg)
+    rows = service.get_owned_parts(user_id)
+    if not rows:
+        return []
+    details = CatalogDAO(duck).get_part_color_details(part_pairs(rows))
+    return with_part_details(rows, details)
+
+
 @router.post("/parts", status_code=201)
 def add_owned_part(user_id: int, body: AddPartBody, pg: PgDep):
     service = UserPartsService(UserPartsDAO(pg), pg)
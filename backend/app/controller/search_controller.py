@@ -1,14 +1,25 @@
+from typing import Literal
+
 from fastapi import APIRouter
 
 from app.api.dependencies import DuckDep
+from app.api.response_cache import cache_response
+from app.database.connexion_duckdb import DB_PATH, file_version
 from app.database.dao.search_dao import SearchDAO
 from app.service.search_service import SearchService
+from app.utils.embedding_model import get_embedding_model
 
 
 router = APIRouter(tags=["search"])
 
 
+def _semantic_search_ready() -> bool:
+    """Les résultats changent une fois le modèle chargé (LIKE avant)."""
+    return get_embedding_model().is_ready()
+
+
 @router.get("/sets/search")
+@cache_response(vary=_semantic_search_ready)
 def search_sets(
     duck: DuckDep,
     q: str = "",
@@ -22,6 +33,7 @@ def search_sets(
 
 
 @router.get("/parts/search")
+@cache_response(vary=_semantic_search_ready)
 def search_parts(
     duck: DuckDep,
     q: str = "",
@@ -33,13 +45,28 @@ def search_parts(
     return service.search_parts(q, color_id, category_id, limit)
 
 
+@router.get("/autocomplete")
+def autocomplete(
+    duck: DuckDep,
+    q: str = "",
+    kind: Literal["sets", "parts", "themes"] = "sets",
+    limit: int = 10,
+):
+    """Suggestions de la barre de recherche : mots des noms (ou identifiants)
+    qui commencent par q, les plus populaires d'abord."""
+    service = SearchService(SearchDAO(duck))
+    return service.autocomplete(q, kind, limit, version=file_version(DB_PATH))
+
+
 @router.get("/sets/recent")
+@cache_response()
 def get_recent_sets(duck: DuckDep, limit: int = 12):
     service = SearchService(SearchDAO(duck))
     return service.get_recent_sets(limit)
 
 
 @router.get("/stats")
+@cache_response()
 def get_stats(duck: DuckDep):
     service = SearchService(SearchDAO(duck))
-    return service.get_stats()
+    return service.get_stats(version=file_version(DB_PATH))
@@ -1,9 +1,64 @@
 from fastapi import APIRouter
 
+from app.api.response_cache import get_response_cache
+from app.database.catalog_capabilities import get_catalog_capabilities
+from app.database.connexion_duckdb import (
+    DB_PATH,
+    acquire_shared_duckdb,
+    release_shared_duckdb,
+)
+from app.database.pg_async import async_pool_stats
+from app.database.pg_pool import get_pg_pool
+from app.database.vector_index import vector_index_stats
+from app.utils.embedding_cache import get_embedding_cache
+from app.utils.embedding_model import get_embedding_model
+
 
 router = APIRouter(tags=["system"])
 
 
 @router.get("/health")
 def health():
-    return {"status": "ok"}
+    """État de l'API ; "semantic_search" vaut "ready" une fois le modèle
+    d'embedding chargé (la recherche passe par LIKE avant)."""
+    return {"status": "ok", "semantic_search": get_embedding_model().state}
+
+
+@router.get("/health/search")
+def search_stats():
+    """Modèle d'embedding (état, temps de chargement), cache des requêtes
+    et cache des réponses HTTP (taille, taux de succès ; None si désactivé),
+    capacités du catalogue DuckDB (embeddings, VSS, index HNSW ; None sans
+    base), index NumPy chargés."""
+    cache = get_embedding_cache()
+    responses = get_response_cache()
+    return {
+        "model": get_embedding_model().status(),
+        "query_cache": cache.stats() if cache is not None else None,
+        "response_cache": responses.stats() if responses is not None else None,
+        "catalog": _catalog_capabilities(),
+        "vector_index": vector_index_stats(),
+    }
+
+
+def _catalog_capabilities() -> dict | None:
+    try:
+        conn = acquire_shared_duckdb(DB_PATH)
+    except FileNotFoundError:
+        return None
+    try:
+        with conn.cursor() as cur:
+            return get_catalog_capabilities(cur).as_dict()
+    finally:
+        release_shared_duckdb(conn)
+
+
+@router.get("/health/postgres")
+def postgres_pool_stats():
+    """Métriques du pool PostgreSQL (connexions empruntées, attente), et
+    occupation du pool asyncpg sous "async" s'il est ouvert (API_MODE=async)."""
+    stats = get_pg_pool().stats()
+    async_stats = async_pool_stats()
+    if async_stats is not None:
+        stats["async"] = async_stats
+    return stats
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException
 
 from app.api.dependencies import DuckDep, PgDep
+from app.controller.parts_controller import part_pairs, with_part_details
+from app.database.dao.catalog_dao import CatalogDAO
 from app.database.dao.whishlist_dao import WishlistDAO
 from app.dto.wishlist_dto import (
     AddWishlistPartBody,
@@ -13,23 +15,8 @@ from app.service.wishlist_service import WishlistService
 router = APIRouter(prefix="/users/{user_id}", tags=["wishlist"])
 
 
-@router.get("/wishlist/sets")
-def get_wishlist_sets(user_id: int, pg: PgDep, duck: DuckDep):
-    items = WishlistService(WishlistDAO(pg), pg).get_sets(user_id)
-    if not items:
-        return []
-    set_nums = [it["set_num"] for it in items]
-    placeholders = ", ".join("?" * len(set_nums))
-    rows = duck.execute(
-        f"SELECT set_num, name, year, num_parts, img_url FROM sets WHERE set_num IN ({placeholders})",
-        set_nums,
-    ).fetchall()
-    details = {
-        r[0]: dict(
-            zip(["set_num", "name", "year", "num_parts", "img_url"], r, strict=False)
-        )
-        for r in rows
-    }
+def wishlist_set_items(items: list[dict], details: dict) -> list[dict]:
+    """Sets de la wishlist enrichis du catalogue (aussi en API_MODE=async)."""
     return [
         {
             **details.get(it["set_num"], {"set_num": it["set_num"]}),
@@ -39,6 +26,15 @@ def get_wishlist_sets(user_id: int, pg: PgDep, duck: DuckDep):
     ]
 
 
+@router.get("/wishlist/sets")
+def get_wishlist_sets(user_id: int, pg: PgDep, duck: DuckDep):
+    items = WishlistService(WishlistDAO(pg), pg).get_sets(user_id)
+    if not items:
+        return []
+    details = CatalogDAO(duck).get_set_details([it["set_num"] for it in items])
+    return wishlist_set_items(items, details)
+
+
 @router.post("/wishlist/sets", status_code=201)
 def add_wishlist_set(user_id: int, body: AddWishlistSetBody, pg: PgDep):
     service = WishlistService(WishlistDAO(pg), pg)
@@ -62,30 +58,8 @@ def get_wishlist_parts(user_id: int, pg: PgDep, duck: DuckDep):
     rows = service.get_parts(user_id)
     if not rows:
         return []
-    part_nums = list({r["part_num"] for r in rows})
-    placeholders = ", ".join("?" * len(part_nums))
-    detail_rows = duck.execute(
-        f"""
-        SELECT p.part_num, p.name,
-               CASE WHEN e.element_id IS NOT NULL
-                    THEN 'https://cdn.rebrickable.com/media/parts/elements/' || e.element_id || '.jpg'
-                    ELSE 'https://cdn.rebrickable.com/media/parts/photos/' || p.part_num || '.jpg'
-               END AS img_url
-        FROM parts p
-        LEFT JOIN (SELECT part_num, MIN(element_id) AS element_id FROM elements GROUP BY part_num) e
-            ON p.part_num = e.part_num
-        WHERE p.part_num IN ({placeholders})
-        """,
-        part_nums,
-    ).fetchall()
-    details = {r[0]: {"name": r[1], "img_url": r[2]} for r in detail_rows}
-    return [
-        {
-            **row,
-            **details.get(row["part_num"], {"name": row["part_num"], "img_url": None}),
-        }
-        for row in rows
-    ]
+    details = CatalogDAO(duck).get_part_color_details(part_pairs(rows))
+    return with_part_details(rows, details)
 
 
 @router.post("/wishlist/parts", status_code=201)
@@ -0,0 +1,177 @@
+"""
+Index en mémoire de l'autocomplétion (noms et identifiants de sets, pièces
+et thèmes), chargé une fois par version du catalogue
+"""
+
+from bisect import bisect_left
+import re
+import threading
+
+import numpy as np
+
+from app.database.connexion_duckdb import catalog_version
+
+
+# Type de suggestion -> requête (identifiant, nom, popularité, identifiant
+# cherchable ou NULL). Popularité : nombre de pièces d'un set, nombre de
+# sets qui utilisent une pièce (hors rechanges), nombre de sets d'un thème.
+SOURCES = {
+    "sets": """
+        SELECT set_num, name, COALESCE(num_parts, 0), set_num
+        FROM sets
+    """,
+    "parts": """
+        SELECT p.part_num, p.name, COALESCE(u.uses, 0), p.part_num
+        FROM parts p
+        LEFT JOIN (
+            SELECT k.part_id, COUNT(DISTINCT r.set_num) AS uses
+            FROM set_requirements r
+            JOIN part_color_keys k ON k.pc_id = r.pc_id
+            GROUP BY k.part_id
+        ) u ON p.part_id = u.part_id
+    """,
+    "themes": """
+        SELECT t.id, t.name, COUNT(s.set_num), NULL
+        FROM themes t
+        LEFT JOIN sets s ON s.theme_id = t.id
+        GROUP BY t.id, t.name
+    """,
+}
+
+# Au-delà, une plage de préfixe est réduite par argpartition avant le tri
+_PARTIAL_SORT_MIN = 256
+
+
+def normalize_term(text: str) -> str:
+    """Minuscules, tout ce qui n'est ni lettre ni chiffre réduit à un espace."""
+    return " ".join(re.split(r"[\W_]+", text.lower())).strip()
+
+
+class AutocompleteIndex:
+    """Termes triés (liste Python) pointant vers des suggestions.
+
+    Chaque suggestion a un terme par début de mot de son nom ("millennium
+    falcon", "falcon") et un pour son identifiant : un préfixe tapé
+    correspond à la plage [bisect_left(q), bisect_left(q + U+FFFF)) de la
+    liste, trouvée en O(log n). Les suggestions de la plage sont classées
+    par popularité décroissante (tableau NumPy aligné sur les termes).
+    """
+
+    def __init__(
+        self,
+        terms: list[str],
+        items: np.ndarray,
+        ids: list,
+        names: list[str],
+        popularity: np.ndarray,
+    ):
+        """
+        Args:
+            terms: termes triés.
+            items: indice de la suggestion de chaque terme.
+            ids, names, popularity: suggestions.
+        """
+        self.terms = terms
+        self.items = items
+        self.ids = ids
+        self.names = names
+        self.popularity = popularity
+        self._term_popularity = popularity[items]
+
+    @classmethod
+    def build(cls, rows) -> "AutocompleteIndex":
+        """Index de lignes (identifiant, nom, popularité, identifiant cherchable)."""
+        ids, names, popularity, entries = [], [], [], []
+        for item, (item_id, name, score, searchable) in enumerate(rows):
+            ids.append(item_id)
+            names.append(name or "")
+            popularity.append(score)
+            words = normalize_term(name or "").split()
+            terms = {" ".join(words[i:]) for i in range(len(words))}
+            if searchable:
+                terms.add(normalize_term(str(searchable)))
+            entries.extend((term, item) for term in terms if term)
+        entries.sort()
+        return cls(
+            [term for term, _ in entries],
+            np.array([item for _, item in entries], dtype=np.int64),
+            ids,
+            names,
+            np.array(popularity, dtype=np.int64),
+        )
+
+    @classmethod
+    def load(cls, duckdb_conn, kind: str) -> "AutocompleteIndex":
+        with duckdb_conn.cursor() as cur:
+            return cls.build(cur.execute(SOURCES[kind]).fetchall())
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def complete(self, prefix: str, limit: int = 10) -> list[dict]:
+        """Suggestions dont un mot du nom (ou l'identifiant) commence par
+        `prefix`, les plus populaires d'abord."""
+        prefix = normalize_term(prefix)
+        if not prefix or limit <= 0:
+            return []
+        lo = bisect_left(self.terms, prefix)
+        hi = bisect_left(self.terms, prefix + "\uffff", lo)
+        if lo == hi:
+            return []
+        scores = self._term_popularity[lo:hi]
+        # Un nom peut avoir plusieurs termes dans la plage : les meilleurs
+        # limit × 4 termes suffisent presque toujours, sinon tri complet ;
+        # à popularité égale, ordre alphabétique des termes
+        for keep in (limit * 4, hi - lo):
+            if keep < len(scores) and len(scores) >= _PARTIAL_SORT_MIN:
+                top = np.sort(np.argpartition(-scores, keep - 1)[:keep])
+            else:
+                top = np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            picked = list(dict.fromkeys(self.items[lo + top].tolist()))
+            if len(picked) >= limit or len(top) == len(scores):
+                break
+        return [
+            {
+                "id": self.ids[item],
+                "name": self.names[item],
+                "popularity": int(self.popularity[item]),
+            }
+            for item in picked[:limit]
+        ]
+
+
+_index_cache: dict[tuple[str, str], AutocompleteIndex] = {}
+_index_lock = threading.Lock()
+
+
+def get_autocomplete_index(
+    duckdb_conn, kind: str, version: str | None = None
+) -> AutocompleteIndex:
+    """Index `kind` (voir SOURCES) du catalogue courant, chargé une seule fois
+    par version.
+
+    Une base en mémoire (sans version) est rechargée à chaque appel.
+
+    Args:
+        version: version attendue du catalogue (file_version du fichier),
+            qui évite la requête de catalog_version (plus longue que la
+            recherche elle-même) quand l'index est déjà chargé. Au
+            chargement, l'index est rangé sous la version réelle de
+            `duckdb_conn` : une connexion pas encore rouverte sur un
+            nouveau fichier ne provoque qu'un rechargement de plus.
+    """
+    index = _index_cache.get((version, kind)) if version else None
+    if index is not None:
+        return index
+    version = catalog_version(duckdb_conn)
+    if version is None:
+        return AutocompleteIndex.load(duckdb_conn, kind)
+    with _index_lock:
+        index = _index_cache.get((version, kind))
+        if index is None:
+            for cached in [k for k in _index_cache if k[0] != version]:
+                del _index_cache[cached]  # une seule version du catalogue à la fois
+            index = AutocompleteIndex.load(duckdb_conn, kind)
+            _index_cache[(version, kind)] = index
+        return index
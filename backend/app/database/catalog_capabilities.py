@@ -0,0 +1,191 @@
+"""
+Capacités de recherche du catalogue DuckDB (tables d'embeddings, extension
+VSS, index HNSW, index plein texte et de trigrammes), détectées une fois par version du
+catalogue
+"""
+
+from dataclasses import dataclass, field
+import threading
+import time
+
+import duckdb
+
+from app.database.connexion_duckdb import catalog_version
+from app.database.vector_index import stored_format
+
+
+EMBEDDING_TABLES = ("set_embeddings", "part_embeddings")
+# Tables indexées par build_search_index (extension fts)
+DOCUMENT_TABLES = ("set_documents", "part_documents")
+# Tables remplies par build_trigram_index
+TRIGRAM_TABLES = ("set_trigrams", "part_trigrams")
+
+
+def _has_rows(conn, table: str) -> bool:
+    """Vérifie si une table existe et n'est pas vide."""
+    try:
+        return conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is not None
+    except Exception:
+        return False
+
+
+def _has_embeddings(conn, table: str = "set_embeddings") -> bool:
+    """Vérifie si une table d'embeddings existe et n'est pas vide."""
+    return _has_rows(conn, table)
+
+
+def _has_float32(conn, table: str) -> bool:
+    """Faux si seuls des vecteurs quantifiés ont été gardés (voir generate_embeddings)."""
+    try:
+        return (
+            conn.execute(
+                f"SELECT 1 FROM {table} WHERE embedding IS NOT NULL LIMIT 1"
+            ).fetchone()
+            is not None
+        )
+    except Exception:
+        return False
+
+
+def _count_rows(conn, table: str) -> int:
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    except Exception:
+        return 0
+
+
+def _has_vss(conn) -> bool:
+    """Vérifie si l'extension VSS est disponible et chargée."""
+    try:
+        conn.execute("LOAD vss")
+        return True
+    except Exception:
+        return False
+
+
+def _fts_tables(conn) -> frozenset[str]:
+    """Tables de DOCUMENT_TABLES qui ont un index fts utilisable."""
+    try:
+        conn.execute("LOAD fts")
+        rows = conn.execute(
+            "SELECT schema_name FROM duckdb_schemas() WHERE schema_name LIKE 'fts_main_%'"
+        ).fetchall()
+    except Exception:
+        return frozenset()
+    return frozenset(r[0].removeprefix("fts_main_") for r in rows) & set(
+        DOCUMENT_TABLES
+    )
+
+
+def _hnsw_indexes(conn) -> dict[str, list[str]]:
+    """{table: [index HNSW]} d'après duckdb_indexes()."""
+    try:
+        rows = conn.execute(
+            """
+            SELECT table_name, index_name FROM duckdb_indexes()
+            WHERE sql ILIKE '%USING HNSW%'
+            ORDER BY table_name, index_name
+            """
+        ).fetchall()
+    except duckdb.Error:
+        return {}
+    indexes: dict[str, list[str]] = {}
+    for table, index in rows:
+        indexes.setdefault(table, []).append(index)
+    return indexes
+
+
+@dataclass(frozen=True)
+class CatalogCapabilities:
+    """Ce que la recherche peut utiliser dans une version du catalogue."""
+
+    version: str | None
+    embedding_tables: frozenset[str]
+    vss: bool
+    hnsw_indexes: dict[str, list[str]] = field(default_factory=dict)
+    embedding_rows: dict[str, int] = field(default_factory=dict)
+    # Tables aux vecteurs quantifiés : format, et celles sans vecteurs float32
+    quantized: dict[str, str] = field(default_factory=dict)
+    quantized_only: frozenset[str] = frozenset()
+    fts_tables: frozenset[str] = frozenset()
+    trigram_tables: frozenset[str] = frozenset()
+    probe_ms: float = 0.0
+
+    def can_search_vectors(self, table: str) -> bool:
+        """Recherche vectorielle SQL (VSS) possible sur cette table d'embeddings."""
+        return (
+            self.vss
+            and table in self.embedding_tables
+            and table not in self.quantized_only
+        )
+
+    def has_hnsw(self, table: str) -> bool:
+        return bool(self.hnsw_indexes.get(table))
+
+    def as_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "embedding_tables": sorted(self.embedding_tables),
+            "vss": self.vss,
+            "hnsw_indexes": self.hnsw_indexes,
+            "embedding_rows": self.embedding_rows,
+            "quantized": self.quantized,
+            "quantized_only": sorted(self.quantized_only),
+            "fts_tables": sorted(self.fts_tables),
+            "trigram_tables": sorted(self.trigram_tables),
+            "probe_ms": self.probe_ms,
+        }
+
+
+def probe_capabilities(conn, version: str | None = None) -> CatalogCapabilities:
+    """Détecte les capacités du catalogue ouvert par `conn`.
+
+    Charge les extensions vss et fts au passage : elles appartiennent à la
+    base, tous les curseurs de la connexion partagée en profitent ensuite.
+    """
+    start = time.perf_counter()
+    embedding_tables = frozenset(
+        t for t in EMBEDDING_TABLES if _has_embeddings(conn, t)
+    )
+    vss = bool(embedding_tables) and _has_vss(conn)
+    quantized = {
+        t: fmt for t in embedding_tables if (fmt := stored_format(conn, t)) is not None
+    }
+    return CatalogCapabilities(
+        version=version,
+        embedding_tables=embedding_tables,
+        vss=vss,
+        hnsw_indexes=_hnsw_indexes(conn) if vss else {},
+        embedding_rows={t: _count_rows(conn, t) for t in embedding_tables},
+        quantized=quantized,
+        quantized_only=frozenset(t for t in quantized if not _has_float32(conn, t)),
+        fts_tables=_fts_tables(conn),
+        trigram_tables=frozenset(t for t in TRIGRAM_TABLES if _has_rows(conn, t)),
+        probe_ms=round(1000 * (time.perf_counter() - start), 1),
+    )
+
+
+_registry: dict[str, CatalogCapabilities] = {}
+_registry_lock = threading.Lock()
+
+
+def get_catalog_capabilities(conn) -> CatalogCapabilities:
+    """Capacités du catalogue courant, détectées une seule fois par version.
+
+    Une nouvelle version (catalogue rechargé, voir catalog_version) est
+    détectée à nouveau ; une base en mémoire (sans version) l'est à chaque
+    appel.
+    """
+    version = catalog_version(conn)
+    if version is None:
+        return probe_capabilities(conn)
+    capabilities = _registry.get(version)
+    if capabilities is not None:
+        return capabilities
+    with _registry_lock:
+        capabilities = _registry.get(version)
+        if capabilities is None:
+            _registry.clear()  # une seule version du catalogue à la fois
+            capabilities = probe_capabilities(conn, version)
+            _registry[version] = capabilities
+        return capabilities
@@ -0,0 +1,48 @@
+"""
+Métadonnées du catalogue DuckDB (table catalog_meta écrite par
+init_db_lego.py), gardées en mémoire une fois par version du catalogue
+"""
+
+import json
+import threading
+
+import duckdb
+
+from app.database.connexion_duckdb import catalog_version
+
+
+def read_catalog_meta(conn) -> dict | None:
+    """{clé: valeur} de catalog_meta, None si la table est absente ou vide
+    (catalogue construit avant son ajout)."""
+    try:
+        with conn.cursor() as cur:
+            rows = cur.execute("SELECT key, value FROM catalog_meta").fetchall()
+    except duckdb.Error:
+        return None
+    return {key: json.loads(value) for key, value in rows} or None
+
+
+_meta_cache: dict[str, dict | None] = {}
+_meta_lock = threading.Lock()
+
+
+def get_catalog_meta(conn, version: str | None = None) -> dict | None:
+    """Métadonnées du catalogue courant, lues une seule fois par version.
+
+    Une base en mémoire (sans version) est relue à chaque appel.
+
+    Args:
+        version: version attendue du catalogue (file_version du fichier),
+            qui évite la requête de catalog_version quand les métadonnées
+            sont déjà en mémoire (voir get_autocomplete_index).
+    """
+    if version and version in _meta_cache:
+        return _meta_cache[version]
+    version = catalog_version(conn)
+    if version is None:
+        return read_catalog_meta(conn)
+    with _meta_lock:
+        if version not in _meta_cache:
+            _meta_cache.clear()  # une seule version du catalogue à la fois
+            _meta_cache[version] = read_catalog_meta(conn)
+        return _meta_cache[version]
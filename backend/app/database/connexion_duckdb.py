@@ -2,8 +2,14 @@
 Connexion à DuckDB (données Rebrickable - READ ONLY)
 """
 
-from contextlib import contextmanager
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, suppress
+from functools import partial
+import json
+import os
 from pathlib import Path
+import threading
 
 import duckdb
 
@@ -11,6 +17,27 @@ import duckdb
 DB_PATH = Path(__file__).parent / "duckdb" / "lego.duckdb"
 DB_TEST_PATH = Path(__file__).parent / "duckdb" / "lego_test.duckdb"
 
+# Réglages de la base partagée (vides : valeurs par défaut de DuckDB)
+DUCKDB_THREADS = os.getenv("DUCKDB_THREADS", "")
+DUCKDB_MEMORY_LIMIT = os.getenv("DUCKDB_MEMORY_LIMIT", "")
+DUCKDB_WARM_UP = os.getenv("DUCKDB_WARM_UP", "1") != "0"
+# Threads réservés aux requêtes DuckDB des routes async (voir run_duckdb)
+DUCKDB_WORKERS = int(os.getenv("DUCKDB_WORKERS", "8"))
+
+# Tables lues par les routes les plus fréquentes, chargées au démarrage
+WARM_TABLES = (
+    "sets",
+    "themes",
+    "colors",
+    "parts",
+    "part_keys",
+    "part_color_keys",
+    "set_requirements",
+    "set_requirement_totals",
+    "set_embeddings",
+    "part_embeddings",
+)
+
 
 @contextmanager
 def duckdb_connection(test: bool = False):
@@ -31,6 +58,169 @@ def duckdb_connection(test: bool = False):
         conn.close()
 
 
+def _shared_config() -> dict:
+    config = {}
+    if DUCKDB_THREADS:
+        config["threads"] = int(DUCKDB_THREADS)
+    if DUCKDB_MEMORY_LIMIT:
+        config["memory_limit"] = DUCKDB_MEMORY_LIMIT
+    return config
+
+
+# Attente max des emprunts en cours avant de rouvrir un fichier remplacé ;
+# au-delà (requête bloquée), l'ancienne version reste servie
+DUCKDB_RELOAD_TIMEOUT = float(os.getenv("DUCKDB_RELOAD_TIMEOUT", "30"))
+
+_shared: duckdb.DuckDBPyConnection | None = None
+_shared_key: tuple[str, int] | None = None
+# (_shared_key, catalog_version du fichier ouvert), lus ensemble sans verrou
+_shared_version: tuple[tuple[str, int], str] | None = None
+_shared_users = 0  # emprunts en cours de _shared (acquire_shared_duckdb)
+_shared_lock = threading.Condition(threading.RLock())
+
+
+def get_shared_duckdb(path: Path | None = None) -> duckdb.DuckDBPyConnection:
+    """Connexion DuckDB read-only partagée par tout le process.
+
+    Ouverte une seule fois (puis préchargée, voir warm_up) : les requêtes
+    passent par des curseurs (conn.cursor()), qui partagent le catalogue,
+    les extensions chargées et le cache de blocs. Si le fichier est
+    remplacé (date de modification différente), l'ancienne connexion est
+    fermée puis rouverte sur le nouveau fichier : tant qu'elle reste
+    ouverte, DuckDB rendrait la même base (cache d'instances par chemin).
+    Elle n'est fermée qu'une fois tous ses emprunts (acquire_shared_duckdb)
+    rendus : l'appel attend au plus DUCKDB_RELOAD_TIMEOUT secondes, puis
+    rend l'ancienne connexion, toujours ouverte, si une requête la garde
+    encore. Un seul appel rouvre le fichier, les autres prennent la
+    nouvelle connexion. Les requêtes des routes passent donc par
+    acquire_shared_duckdb.
+
+    Le fichier reste verrouillé en lecture tant que le process tourne : pour
+    régénérer la base, écrire un nouveau fichier puis le renommer.
+
+    Args:
+        path: Fichier à ouvrir (défaut : DB_PATH).
+
+    Raises:
+        FileNotFoundError: si le fichier n'existe pas.
+    """
+    global _shared, _shared_key, _shared_version, _shared_users
+    path = path or DB_PATH
+    try:
+        key = (str(path), os.stat(path).st_mtime_ns)
+    except OSError as e:
+        raise FileNotFoundError(f"Base DuckDB introuvable : {path}") from e
+    conn = _shared
+    if conn is not None and _shared_key == key:
+        return conn
+    with _shared_lock:
+        if _shared is not None and _shared_key != key:
+            _shared_lock.wait_for(
+                lambda: _shared_key == key or _shared_users == 0,
+                timeout=DUCKDB_RELOAD_TIMEOUT,
+            )
+            if _shared_key == key or _shared_users > 0:
+                return _shared  # rouverte par un autre appel, ou encore empruntée
+            if _shared is not None:
+                _shared.close()
+                _shared = None
+        if _shared is None or _shared_key != key:
+            conn = duckdb.connect(str(path), read_only=True, config=_shared_config())
+            if DUCKDB_WARM_UP:
+                warm_up(conn)
+            _shared_version = key, meta_version(conn) or f"{key[0]}@{key[1]}"
+            _shared, _shared_key, _shared_users = conn, key, 0
+        return _shared
+
+
+def acquire_shared_duckdb(path: Path | None = None) -> duckdb.DuckDBPyConnection:
+    """Emprunte la connexion partagée (voir get_shared_duckdb) le temps
+    d'une requête : elle ne sera pas fermée avant release_shared_duckdb."""
+    global _shared_users
+    with _shared_lock:
+        conn = get_shared_duckdb(path)
+        _shared_users += 1
+        return conn
+
+
+def release_shared_duckdb(conn: duckdb.DuckDBPyConnection) -> None:
+    """Rend une connexion obtenue par acquire_shared_duckdb."""
+    global _shared_users
+    with _shared_lock:
+        if conn is _shared:  # sinon fermée par close_shared_duckdb
+            _shared_users -= 1
+            _shared_lock.notify_all()
+
+
+def shared_version(path) -> str | None:
+    """Version (voir catalog_version) du fichier `path` ouvert par la
+    connexion partagée, None si elle n'est pas ouverte sur ce fichier."""
+    shared = _shared_version
+    if shared is None or shared[0][0] != str(path):
+        return None
+    return shared[1]
+
+
+def close_shared_duckdb() -> None:
+    """Ferme la connexion partagée (arrêt de l'application)."""
+    global _shared, _shared_key, _shared_version, _shared_users
+    with _shared_lock:
+        if _shared is not None:
+            _shared.close()
+        _shared, _shared_key, _shared_users = None, None, 0
+        _shared_version = None
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+async def run_duckdb(fn, *args):
+    """Exécute fn(*args) (une requête DuckDB) hors de la boucle d'événements.
+
+    Les routes async n'attendent jamais DuckDB sur la boucle : l'appel part
+    dans un pool de DUCKDB_WORKERS threads, qui borne aussi le nombre de
+    requêtes DuckDB simultanées quelle que soit la concurrence HTTP.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=DUCKDB_WORKERS, thread_name_prefix="duckdb"
+                )
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(fn, *args))
+
+
+def shutdown_duckdb_executor() -> None:
+    """Arrête le pool de threads de run_duckdb (arrêt de l'application)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def warm_up(conn) -> None:
+    """Charge l'extension vss et lit les tables chaudes (WARM_TABLES).
+
+    Les extensions et le cache de blocs appartiennent à la base : ce travail
+    profite ensuite à tous les curseurs.
+    """
+    with conn.cursor() as cur:
+        # Extension absente : la recherche utilise LIKE
+        with suppress(duckdb.Error):
+            cur.execute("LOAD vss")
+        existing = {
+            row[0]
+            for row in cur.execute("SELECT table_name FROM duckdb_tables()").fetchall()
+        }
+        for table in WARM_TABLES:
+            if table in existing:
+                cur.execute(f"SELECT max(COLUMNS(*)) FROM {table}").fetchall()
+
+
 def execute_duckdb_query(query: str, params=None, test: bool = False):
     """Exécute une requête sur DuckDB et retourne les lignes.
 
@@ -55,3 +245,54 @@ def execute_duckdb_query_df(query: str, params=None, test: bool = False):
     with duckdb_connection(test=test) as conn:
         result = conn.execute(query, params) if params else conn.execute(query)
         return result.df()
+
+
+def catalog_version(conn) -> str | None:
+    """Identifiant de la version du catalogue ouvert par une connexion DuckDB.
+
+    Sert de clé à tous les caches dérivés du catalogue (registres du
+    process, cache des sets constructibles, réponses HTTP) : c'est
+    catalog_meta.version, l'empreinte du contenu écrite par init_db_lego.py,
+    qui ne change pas si le catalogue est rechargé avec les mêmes données.
+    Sans catalog_meta (catalogue construit avant), chemin + date de
+    modification du fichier. Pour le fichier de la connexion partagée,
+    c'est la version qu'elle a ouverte : un fichier remplacé mais pas
+    encore rouvert garde l'ancienne.
+
+    Returns:
+        La version, ou None pour une base en mémoire (rien à mettre en cache).
+    """
+    with conn.cursor() as cur:
+        row = cur.execute(
+            "SELECT path FROM duckdb_databases() WHERE database_name = current_database()"
+        ).fetchone()
+    if not row or not row[0]:
+        return None
+    return shared_version(row[0]) or meta_version(conn) or file_version(row[0])
+
+
+def meta_version(conn) -> str | None:
+    """catalog_meta.version (voir init_db_lego.write_catalog_meta), None si
+    la table est absente."""
+    try:
+        with conn.cursor() as cur:
+            row = cur.execute(
+                "SELECT value FROM catalog_meta WHERE key = 'version'"
+            ).fetchone()
+    except duckdb.Error:
+        return None
+    return json.loads(row[0]) if row else None
+
+
+def file_version(path) -> str | None:
+    """Version du fichier catalogue `path` sans requête DuckDB (un stat) :
+    celle de la connexion partagée si elle a ouvert ce fichier tel quel,
+    chemin + date de modification sinon ; None si le fichier n'existe pas."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    shared = _shared_version
+    if shared is not None and shared[0] == (str(path), mtime):
+        return shared[1]
+    return f"{path}@{mtime}"
@@ -0,0 +1,55 @@
+"""Détails catalogue (DuckDB) des sets et pièces affichés dans les listes utilisateur."""
+
+SET_COLUMNS = ["set_num", "name", "year", "num_parts", "img_url"]
+
+
+class CatalogDAO:
+    """DAO de lecture des sets et pièces référencés par les données PostgreSQL
+    (collection, favoris, wishlist, pièces possédées).
+
+    La connexion est le curseur DuckDB de la requête : une seule requête par
+    appel, sans état.
+    """
+
+    def __init__(self, duckdb_conn):
+        self.conn = duckdb_conn
+
+    def get_set_details(self, set_nums: list[str]) -> dict[str, dict]:
+        """{set_num: {set_num, name, year, num_parts, img_url}} des sets connus."""
+        if not set_nums:
+            return {}
+        placeholders = ", ".join("?" * len(set_nums))
+        rows = self.conn.execute(
+            f"SELECT set_num, name, year, num_parts, img_url FROM sets WHERE set_num IN ({placeholders})",
+            set_nums,
+        ).fetchall()
+        return {r[0]: dict(zip(SET_COLUMNS, r, strict=False)) for r in rows}
+
+    def get_part_color_details(
+        self, pairs: list[tuple[str, int]]
+    ) -> dict[tuple[str, int], dict]:
+        """{(part_num, color_id): {name, img_url}} des pièces connues.
+
+        Image de l'élément de cette couleur s'il en existe, sinon image
+        principale de la pièce. Les couples sont traduits en part_id / pc_id
+        à l'entrée (part_keys, part_color_keys), les jointures se font sur
+        ces entiers.
+        """
+        if not pairs:
+            return {}
+        rows = self.conn.execute(
+            """
+            SELECT u.part_num, u.color_id, p.name, COALESCE(i.img_url, p.img_url)
+            FROM (
+                SELECT UNNEST(?::VARCHAR[]) AS part_num,
+                       UNNEST(?::INTEGER[]) AS color_id
+            ) u
+            JOIN part_keys pk ON pk.part_num = u.part_num
+            JOIN parts p ON p.part_id = pk.part_id
+            LEFT JOIN part_color_keys k
+                ON k.part_id = pk.part_id AND k.color_id = u.color_id
+            LEFT JOIN part_color_images i ON i.pc_id = k.pc_id
+            """,
+            [[p for p, _ in pairs], [c for _, c in pairs]],
+        ).fetchall()
+        return {(r[0], r[1]): {"name": r[2], "img_url": r[3]} for r in rows}
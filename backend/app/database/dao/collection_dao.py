@@ -3,6 +3,36 @@
 from datetime import datetime
 
 from app.business_object.user_owned_set import UserOwnedSet
+from app.database.pg_async import affected_rows, numbered
+
+
+# Requêtes communes à CollectionDAO et AsyncCollectionDAO (voir numbered)
+_ADD_SQL = """
+    INSERT INTO user_owned_sets (id_user, set_num, is_built, acquired_date)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (id_user, set_num) DO NOTHING
+    RETURNING id_user, set_num, is_built
+"""
+_SET_BUILT_SQL = """
+    UPDATE user_owned_sets
+    SET is_built = %s
+    WHERE id_user = %s AND set_num = %s
+"""
+_COLLECTION_SQL = """
+    SELECT id_user, set_num, is_built
+    FROM user_owned_sets
+    WHERE id_user = %s
+    ORDER BY acquired_date DESC
+"""
+_REMOVE_SQL = """
+    DELETE FROM user_owned_sets
+    WHERE id_user = %s AND set_num = %s
+"""
+
+
+def _to_owned_set(row) -> UserOwnedSet | None:
+    # RealDictRow (psycopg2) ou Record (asyncpg) : convertis en dict
+    return UserOwnedSet.from_dict(dict(row)) if row else None
 
 
 class CollectionDAO:
@@ -26,16 +56,9 @@ class CollectionDAO:
         Returns:
             Le UserOwnedSet ajouté, ou None si le set était déjà présent.
         """
-        query = """
-            INSERT INTO user_owned_sets (id_user, set_num, is_built, acquired_date)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT (id_user, set_num) DO NOTHING
-            RETURNING id_user, set_num, is_built
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (user_id, set_num, is_built, datetime.now()))
-            result = cur.fetchone()
-            return UserOwnedSet.from_dict(dict(result)) if result else None
+            cur.execute(_ADD_SQL, (user_id, set_num, is_built, datetime.now()))
+            return _to_owned_set(cur.fetchone())
 
     def mark_set_as_built(self, user_id: int, set_num: str) -> bool:
         """
@@ -43,14 +66,7 @@ class CollectionDAO:
         Returns:
             True si mis à jour, False si le set n'existe pas.
         """
-        query = """
-            UPDATE user_owned_sets
-            SET is_built = TRUE
-            WHERE id_user = %s AND set_num = %s
-        """
-        with self.connection.cursor() as cur:
-            cur.execute(query, (user_id, set_num))
-            return cur.rowcount > 0
+        return self._set_built(user_id, set_num, True)
 
     def mark_set_as_unbuilt(self, user_id: int, set_num: str) -> bool:
         """
@@ -58,14 +74,7 @@ class CollectionDAO:
         Returns:
             True si mis à jour, False si le set n'existe pas.
         """
-        query = """
-            UPDATE user_owned_sets
-            SET is_built = FALSE
-            WHERE id_user = %s AND set_num = %s
-        """
-        with self.connection.cursor() as cur:
-            cur.execute(query, (user_id, set_num))
-            return cur.rowcount > 0
+        return self._set_built(user_id, set_num, False)
 
     def get_user_collection(self, user_id: int) -> list[UserOwnedSet]:
         """
@@ -73,17 +82,9 @@ class CollectionDAO:
         Returns:
             Liste de UserOwnedSet triés du plus récent au plus ancien.
         """
-        query = """
-            SELECT id_user, set_num, is_built
-            FROM user_owned_sets
-            WHERE id_user = %s
-            ORDER BY acquired_date DESC
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (user_id,))
-            rows = cur.fetchall()
-            # RealDictCursor retourne des RealDictRow — convertir directement en dict
-            return [UserOwnedSet.from_dict(dict(row)) for row in rows]
+            cur.execute(_COLLECTION_SQL, (user_id,))
+            return [_to_owned_set(row) for row in cur.fetchall()]
 
     def remove_set_from_collection(self, user_id: int, set_num: str) -> bool:
         """
@@ -91,10 +92,50 @@ class CollectionDAO:
         Returns:
             True si supprimé, False si le set n'était pas présent.
         """
-        query = """
-            DELETE FROM user_owned_sets
-            WHERE id_user = %s AND set_num = %s
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (user_id, set_num))
+            cur.execute(_REMOVE_SQL, (user_id, set_num))
+            return cur.rowcount > 0
+
+    def _set_built(self, user_id: int, set_num: str, is_built: bool) -> bool:
+        with self.connection.cursor() as cur:
+            cur.execute(_SET_BUILT_SQL, (is_built, user_id, set_num))
             return cur.rowcount > 0
+
+
+class AsyncCollectionDAO:
+    """Variante asyncpg de CollectionDAO : mêmes requêtes, mêmes retours,
+    seule l'exécution change.
+
+    Comme CollectionDAO, ne gère pas les transactions.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def add_set_to_collection(
+        self, user_id: int, set_num: str, is_built: bool = False
+    ) -> UserOwnedSet | None:
+        row = await self.connection.fetchrow(
+            numbered(_ADD_SQL), user_id, set_num, is_built, datetime.now()
+        )
+        return _to_owned_set(row)
+
+    async def mark_set_as_built(self, user_id: int, set_num: str) -> bool:
+        return await self._set_built(user_id, set_num, True)
+
+    async def mark_set_as_unbuilt(self, user_id: int, set_num: str) -> bool:
+        return await self._set_built(user_id, set_num, False)
+
+    async def get_user_collection(self, user_id: int) -> list[UserOwnedSet]:
+        rows = await self.connection.fetch(numbered(_COLLECTION_SQL), user_id)
+        return [_to_owned_set(row) for row in rows]
+
+    async def remove_set_from_collection(self, user_id: int, set_num: str) -> bool:
+        status = await self.connection.execute(numbered(_REMOVE_SQL), user_id, set_num)
+        return affected_rows(status) > 0
+
+    async def _set_built(self, user_id: int, set_num: str, is_built: bool) -> bool:
+        status = await self.connection.execute(
+            numbered(_SET_BUILT_SQL), is_built, user_id, set_num
+        )
+        return affected_rows(status) > 0
@@ -1,6 +1,30 @@
 """Gère favorite_sets"""
 
 from app.business_object.favorite_set import FavoriteSet
+from app.database.pg_async import affected_rows, numbered
+
+
+# Requêtes communes à FavoriteDAO et AsyncFavoriteDAO (voir numbered)
+_ADD_SQL = """
+    INSERT INTO favorite_sets (id_user, set_num)
+    VALUES (%s, %s)
+    ON CONFLICT (id_user, set_num) DO NOTHING
+    RETURNING id_user, set_num, added_at
+"""
+_REMOVE_SQL = """
+    DELETE FROM favorite_sets
+    WHERE id_user = %s AND set_num = %s
+"""
+_FAVORITES_SQL = """
+    SELECT id_user, set_num, added_at
+    FROM favorite_sets
+    WHERE id_user = %s
+    ORDER BY added_at DESC
+"""
+
+
+def _to_favorite(row) -> FavoriteSet | None:
+    return FavoriteSet.from_dict(dict(row)) if row else None
 
 
 class FavoriteDAO:
@@ -22,16 +46,9 @@ class FavoriteDAO:
         Returns:
             Le FavoriteSet ajouté, ou None si déjà présent.
         """
-        query = """
-            INSERT INTO favorite_sets (id_user, set_num)
-            VALUES (%s, %s)
-            ON CONFLICT (id_user, set_num) DO NOTHING
-            RETURNING id_user, set_num, added_at
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (user_id, set_num))
-            result = cur.fetchone()
-            return FavoriteSet.from_dict(dict(result)) if result else None
+            cur.execute(_ADD_SQL, (user_id, set_num))
+            return _to_favorite(cur.fetchone())
 
     def remove_favorite(self, user_id: int, set_num: str) -> bool:
         """
@@ -39,12 +56,8 @@ class FavoriteDAO:
         Returns:
             True si supprimé, False si le set n'était pas dans les favoris.
         """
-        query = """
-            DELETE FROM favorite_sets
-            WHERE id_user = %s AND set_num = %s
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (user_id, set_num))
+            cur.execute(_REMOVE_SQL, (user_id, set_num))
             return cur.rowcount > 0
 
     def get_user_favorites(self, user_id: int) -> list[FavoriteSet]:
@@ -53,13 +66,26 @@ class FavoriteDAO:
         Returns:
             Liste de FavoriteSet triés du plus récent au plus ancien.
         """
-        query = """
-            SELECT id_user, set_num, added_at
-            FROM favorite_sets
-            WHERE id_user = %s
-            ORDER BY added_at DESC
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (user_id,))
-            rows = cur.fetchall()
-            return [FavoriteSet.from_dict(dict(row)) for row in rows]
+            cur.execute(_FAVORITES_SQL, (user_id,))
+            return [_to_favorite(row) for row in cur.fetchall()]
+
+
+class AsyncFavoriteDAO:
+    """Variante asyncpg de FavoriteDAO : mêmes requêtes, mêmes retours,
+    seule l'exécution change."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def add_favorite(self, user_id: int, set_num: str) -> FavoriteSet | None:
+        row = await self.connection.fetchrow(numbered(_ADD_SQL), user_id, set_num)
+        return _to_favorite(row)
+
+    async def remove_favorite(self, user_id: int, set_num: str) -> bool:
+        status = await self.connection.execute(numbered(_REMOVE_SQL), user_id, set_num)
+        return affected_rows(status) > 0
+
+    async def get_user_favorites(self, user_id: int) -> list[FavoriteSet]:
+        rows = await self.connection.fetch(numbered(_FAVORITES_SQL), user_id)
+        return [_to_favorite(row) for row in rows]
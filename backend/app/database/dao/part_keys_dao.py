@@ -0,0 +1,36 @@
+"""Traduction des identifiants Rebrickable en clés entières du catalogue (DuckDB)."""
+
+
+class PartKeysDAO:
+    """DAO de lecture sur part_keys / part_color_keys.
+
+    Les couples (part_num, color_id) venant de PostgreSQL ou de l'API sont
+    traduits en pc_id une seule fois, à l'entrée ; tous les calculs internes
+    travaillent ensuite sur ces entiers.
+    """
+
+    def __init__(self, duckdb_conn):
+        self.conn = duckdb_conn
+
+    def get_pair_ids(self, pairs: list[tuple[str, int]]) -> dict[tuple[str, int], int]:
+        """Retourne {(part_num, color_id): pc_id} pour les couples connus du catalogue.
+
+        Les couples absents du catalogue (aucun set ni élément) sont omis.
+        """
+        if not pairs:
+            return {}
+        with self.conn.cursor() as cur:
+            rows = cur.execute(
+                """
+                SELECT u.part_num, u.color_id, k.pc_id
+                FROM (
+                    SELECT UNNEST(?::VARCHAR[]) AS part_num,
+                           UNNEST(?::INTEGER[]) AS color_id
+                ) u
+                JOIN part_keys p ON p.part_num = u.part_num
+                JOIN part_color_keys k
+                    ON k.part_id = p.part_id AND k.color_id = u.color_id
+                """,
+                [[p for p, _ in pairs], [c for _, c in pairs]],
+            ).fetchall()
+        return {(part_num, color_id): pc_id for part_num, color_id, pc_id in rows}
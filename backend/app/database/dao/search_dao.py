@@ -1,50 +1,184 @@
-"""Recherche de sets et pièces dans DuckDB (embeddings VSS ou LIKE fallback)."""
-
-try:
-    from fastembed import TextEmbedding
-
-    _st_model = TextEmbedding(model_name="BAAI/bge-small-en-v1.5")
-except ImportError:  # pragma: no cover
-    _st_model = None  # pragma: no cover
+"""Recherche de sets et pièces dans DuckDB (plein texte, embeddings, ou les deux)."""
+
+from functools import partial
+import math
+import os
+import re
+
+import numpy as np
+
+from app.database.catalog_capabilities import (
+    CatalogCapabilities,
+    get_catalog_capabilities,
+)
+from app.database.catalog_meta import get_catalog_meta
+from app.database.vector_index import VECTOR_INDEX, get_vector_index
+from app.utils.embedding_cache import get_embedding_cache
+from app.utils.embedding_model import EmbeddingModel, get_embedding_model
+
+
+# Recherche vectorielle filtrée (voir SearchDAO._vector_search) : scan exact
+# si le filtre garde au plus VSS_EXACT_SCAN_MAX lignes, sinon top-k HNSW
+# suréchantillonné (VSS_OVERSAMPLE fois ce que la sélectivité laisse
+# attendre), k multiplié par VSS_K_GROWTH s'il manque des résultats, sans
+# dépasser VSS_MAX_K
+VSS_EXACT_SCAN_MAX = int(os.getenv("VSS_EXACT_SCAN_MAX", "2000"))
+VSS_OVERSAMPLE = float(os.getenv("VSS_OVERSAMPLE", "2"))
+VSS_K_GROWTH = 4
+VSS_MAX_K = int(os.getenv("VSS_MAX_K", "4000"))
+
+
+# hybrid : classements plein texte et vectoriel fusionnés ; vector : vectoriel
+# seul dès que le modèle est prêt ; text : plein texte seul
+SEARCH_MODE = os.getenv("SEARCH_MODE", "hybrid")
+# Profondeur de chaque classement fusionné, constante k de la fusion (RRF)
+HYBRID_DEPTH = int(os.getenv("HYBRID_DEPTH", "50"))
+RRF_K = 60
+
+# Requêtes qui ressemblent à un numéro de set ("75192", "75192-1") ou de
+# pièce ("3001", "3626cpr0001") : cherchées d'abord telles quelles
+SET_NUM_PATTERN = re.compile(r"^\d{3,7}(?:-\d{1,3})?$")
+PART_NUM_PATTERN = re.compile(r"^\d[0-9a-z]*$")
+
+# Part minimale des trigrammes de la requête qu'un nom doit contenir
+TRIGRAM_MIN_MATCH = float(os.getenv("TRIGRAM_MIN_MATCH", "0.5"))
+
+SET_COLUMNS = "s.set_num, s.name, s.year, s.theme_id, s.num_parts, s.img_url"
+# img_url : image principale matérialisée par build_part_images
+PART_COLUMNS = "p.part_num, p.name, p.part_cat_id, p.img_url"
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[dict]], key: str, k: int = RRF_K
+) -> list[dict]:
+    """Fusionne des classements : chaque ligne marque 1 / (k + rang) par
+    classement où elle apparaît. À score égal, l'ordre des classements
+    départage ; la ligne gardée est celle du premier classement qui la
+    contient."""
+    scores: dict = {}
+    rows: dict = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, start=1):
+            scores[row[key]] = scores.get(row[key], 0.0) + 1.0 / (k + rank)
+            rows.setdefault(row[key], row)
+    return [rows[rid] for rid in sorted(scores, key=lambda rid: -scores[rid])]
+
+
+def name_trigrams(text: str) -> list[str]:
+    """Trigrammes distincts d'un texte, triés (découpage de build_trigram_index)."""
+    grams = set()
+    for word in re.split(r"[^a-z0-9]+", text.lower()):
+        if word:
+            padded = f"  {word} "
+            grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return sorted(grams)
+
+
+def _trigram_matches(table: str, key: str, count: int) -> str:
+    """Sous-requête (clé, shared, n) des noms qui partagent au moins `?`
+    des `count` trigrammes passés en paramètres."""
+    placeholders = ", ".join("?" * count)
+    return f"""
+        SELECT {key}, COUNT(*) AS shared, ANY_VALUE(n) AS n
+        FROM {table}
+        WHERE trigram IN ({placeholders})
+        GROUP BY {key}
+        HAVING COUNT(*) >= ?
+    """
 
 
-def _has_embeddings(conn) -> bool:
-    """Vérifie si les tables d'embeddings existent."""
-    try:
-        conn.execute("SELECT 1 FROM set_embeddings LIMIT 1")
-        return True
-    except Exception:
-        return False
+def _build_filters(
+    *conditions: str,
+    theme_id: int | None = None,
+    year_from: int | None = None,
+    year_to: int | None = None,
+    color_id: int | None = None,
+    category_id: int | None = None,
+) -> tuple[str, list]:
+    """Clause WHERE ("" sans condition) et paramètres des filtres de
+    recherche, communs à tous les chemins (numéro, plein texte, vectoriel).
+    Les `conditions` propres au chemin passent en tête : leurs paramètres
+    précèdent ceux renvoyés."""
+    conditions = list(conditions)
+    params = []
+    if theme_id is not None:
+        conditions.append("s.theme_id = ?")
+        params.append(theme_id)
+    if year_from is not None:
+        conditions.append("s.year >= ?")
+        params.append(year_from)
+    if year_to is not None:
+        conditions.append("s.year <= ?")
+        params.append(year_to)
+    if color_id is not None:
+        # parts n'a pas de color_id direct — on filtre via elements (part↔color)
+        conditions.append(
+            "p.part_id IN (SELECT part_id FROM elements WHERE color_id = ?)"
+        )
+        params.append(color_id)
+    if category_id is not None:
+        conditions.append("p.part_cat_id = ?")
+        params.append(category_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
 
 
-def _has_vss(conn) -> bool:
-    """Vérifie si l'extension VSS est disponible et chargée."""
-    try:
-        conn.execute("LOAD vss")
-        return True
-    except Exception:
-        return False
+def _oversampled_k(limit: int, candidates: int | None, total: int | None) -> int:
+    """k du top-k HNSW pour obtenir `limit` lignes après un filtre qui en
+    garde `candidates` sur `total`."""
+    if not candidates or not total:
+        return min(VSS_MAX_K, math.ceil(limit * VSS_OVERSAMPLE))
+    k = math.ceil(limit * VSS_OVERSAMPLE * total / candidates)
+    return max(limit, min(k, total, VSS_MAX_K))
 
 
 class SearchDAO:
     """DAO de recherche sur DuckDB.
 
-    Utilise les embeddings HNSW si disponibles,
-    sinon tombe sur un LIKE basique.
+    Combine la recherche plein texte (index BM25 de l'extension fts si le
+    catalogue en a un, LIKE sinon) et la recherche vectorielle (embeddings
+    HNSW, ou index NumPy) une fois le modèle d'embedding chargé (le premier
+    appel sémantique lance le chargement en arrière-plan). Les capacités du
+    catalogue viennent du registre du process (voir catalog_capabilities),
+    pas d'une détection par requête.
     """
 
-    def __init__(self, duckdb_conn):
+    def __init__(self, duckdb_conn, model: EmbeddingModel | None = None):
         self.conn = duckdb_conn
-        self._embeddings_ready = _has_embeddings(self.conn)
-        self._vss_ready = (
-            _st_model is not None and self._embeddings_ready and _has_vss(self.conn)
+        self.model = model or get_embedding_model()
+        self._capabilities: CatalogCapabilities | None = None
+        self.last_plan: dict | None = None
+
+    @property
+    def capabilities(self) -> CatalogCapabilities:
+        if self._capabilities is None:
+            self._capabilities = get_catalog_capabilities(self.conn)
+        return self._capabilities
+
+    def _use_vectors(self, query: str, table: str) -> bool:
+        """Recherche vectorielle pour cette requête ? Sinon LIKE, le temps que
+        le modèle se charge (ou sans embeddings, ou sans VSS ni index NumPy)."""
+        return (
+            bool(query)
+            and self.model.available
+            and table in self.capabilities.embedding_tables
+            and (self.capabilities.can_search_vectors(table) or VECTOR_INDEX != "off")
+            and self.model.ensure_loading()
+        )
+
+    def _use_index(self, table: str) -> bool:
+        """Index NumPy en mémoire plutôt que DuckDB (voir VECTOR_INDEX)."""
+        return VECTOR_INDEX == "numpy" or (
+            VECTOR_INDEX == "auto" and not self.capabilities.can_search_vectors(table)
         )
 
     def _encode(self, query: str):
-        """Encode une requête texte en vecteur float[384]."""
-        if _st_model is None:
-            raise RuntimeError("fastembed n'est pas installé")
-        return next(iter(_st_model.embed([query]))).tolist()
+        """Encode une requête texte en vecteur float[384] (via le cache des
+        requêtes, commun aux sets et aux pièces)."""
+        cache = get_embedding_cache()
+        if cache is None:
+            return self.model.embed(query)
+        return cache.get_or_compute(query, self.model.embed)
 
     def search_sets(
         self,
@@ -54,79 +188,160 @@ class SearchDAO:
         year_to: int | None = None,
         limit: int = 20,
     ) -> list[dict]:
-        """Recherche des sets par texte."""
-        if self._vss_ready and query:
-            return self._search_sets_vss(query, theme_id, year_from, year_to, limit)
-        return self._search_sets_like(query, theme_id, year_from, year_to, limit)
+        """Recherche des sets par texte.
+
+        Un numéro de set est d'abord cherché tel quel, avec les mêmes filtres
+        (recherche normale s'il n'en reste aucun). En mode hybride, les
+        classements plein texte et vectoriel sont fusionnés
+        (reciprocal_rank_fusion) ; tant que le modèle n'est pas prêt, plein
+        texte seul.
+        """
+        query = query.strip()
+        args = (theme_id, year_from, year_to)
+        if SET_NUM_PATTERN.match(query):
+            rows = self._find_sets_by_num(query, *args, limit)
+            if rows:
+                return rows
+        if SEARCH_MODE != "text" and self._use_vectors(query, "set_embeddings"):
+            if SEARCH_MODE != "hybrid":
+                return self._search_sets_vss(query, *args, limit)
+            depth = max(limit, HYBRID_DEPTH)
+            rankings = [
+                self._search_sets_vss(query, *args, depth),
+                self._search_sets_text(query, *args, depth),
+            ]
+            return reciprocal_rank_fusion(rankings, "set_num")[:limit]
+        return self._search_sets_text(query, *args, limit)
+
+    def _find_sets_by_num(self, set_num, theme_id, year_from, year_to, limit):
+        """Sets de ce numéro ("75192" : toutes ses versions 75192-1, -2...)."""
+        where, params = _build_filters(
+            "(s.set_num = ? OR s.set_num LIKE ?)",
+            theme_id=theme_id,
+            year_from=year_from,
+            year_to=year_to,
+        )
+        return self._fetch_dicts(
+            f"""
+            SELECT {SET_COLUMNS}
+            FROM sets s
+            {where}
+            ORDER BY s.set_num
+            LIMIT ?
+            """,
+            [set_num, f"{set_num}-%", *params, limit],
+        )
 
-    def _search_sets_vss(self, query, theme_id, year_from, year_to, limit):
-        embedding = self._encode(query)
-        conditions = []
-        params = []
-
-        if theme_id is not None:
-            conditions.append("s.theme_id = ?")
-            params.append(theme_id)
-        if year_from is not None:
-            conditions.append("s.year >= ?")
-            params.append(year_from)
-        if year_to is not None:
-            conditions.append("s.year <= ?")
-            params.append(year_to)
-
-        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
-        params_final = [embedding] + params + [limit]
+    def _search_sets_text(self, query, theme_id, year_from, year_to, limit):
+        """Plein texte : BM25 si set_documents est indexé ; sinon, ou sans
+        résultat (faute de frappe), trigrammes ; LIKE en dernier recours."""
+        args = (query, theme_id, year_from, year_to, limit)
+        if query and "set_documents" in self.capabilities.fts_tables:
+            rows = self._search_sets_fts(*args)
+            if rows:
+                return rows
+        if query and "set_trigrams" in self.capabilities.trigram_tables:
+            rows = self._search_sets_trigram(*args)
+            if rows:
+                return rows
+        return self._search_sets_like(*args)
+
+    def _search_sets_fts(self, query, theme_id, year_from, year_to, limit):
+        where, params = _build_filters(
+            "d.score IS NOT NULL",
+            theme_id=theme_id,
+            year_from=year_from,
+            year_to=year_to,
+        )
+        return self._fetch_dicts(
+            f"""
+            SELECT {SET_COLUMNS}
+            FROM (
+                SELECT set_num, fts_main_set_documents.match_bm25(set_num, ?) AS score
+                FROM set_documents
+            ) d
+            JOIN sets s ON d.set_num = s.set_num
+            {where}
+            ORDER BY d.score DESC
+            LIMIT ?
+            """,
+            [query, *params, limit],
+        )
 
-        rows = self.conn.execute(
+    def _search_sets_trigram(self, query, theme_id, year_from, year_to, limit):
+        """Sets dont le nom partage le plus de trigrammes avec la requête
+        (au moins TRIGRAM_MIN_MATCH d'entre eux), les noms courts d'abord."""
+        grams = name_trigrams(query)
+        if not grams:
+            return []
+        min_match = math.ceil(TRIGRAM_MIN_MATCH * len(grams))
+        where, params = _build_filters(
+            theme_id=theme_id, year_from=year_from, year_to=year_to
+        )
+        return self._fetch_dicts(
             f"""
-            SELECT s.set_num, s.name, s.year, s.theme_id, s.num_parts, s.img_url,
-                   array_distance(se.embedding, ?::FLOAT[384]) AS distance
-            FROM set_embeddings se
-            JOIN sets s ON se.set_num = s.set_num
+            SELECT {SET_COLUMNS}
+            FROM ({_trigram_matches("set_trigrams", "set_num", len(grams))}) t
+            JOIN sets s ON t.set_num = s.set_num
             {where}
-            ORDER BY distance ASC
+            ORDER BY t.shared DESC, t.n, s.year DESC, s.set_num
             LIMIT ?
             """,
-            params_final,
-        ).fetchall()
+            [*grams, min_match, *params, limit],
+        )
 
-        col_names = [d[0] for d in self.conn.description]
-        return [dict(zip(col_names, row, strict=False)) for row in rows]
+    def _search_sets_vss(self, query, theme_id, year_from, year_to, limit):
+        return self.search_sets_by_vector(
+            self._encode(query), theme_id, year_from, year_to, limit
+        )
 
-    def _search_sets_like(self, query, theme_id, year_from, year_to, limit):
-        conditions = []
-        params = []
-
-        if query:
-            conditions.append("(LOWER(s.name) LIKE ? OR s.set_num LIKE ?)")
-            like = f"%{query.lower()}%"
-            params.extend([like, like])
-        if theme_id is not None:
-            conditions.append("s.theme_id = ?")
-            params.append(theme_id)
-        if year_from is not None:
-            conditions.append("s.year >= ?")
-            params.append(year_from)
-        if year_to is not None:
-            conditions.append("s.year <= ?")
-            params.append(year_to)
-
-        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
-        params.append(limit)
+    def search_sets_by_vector(
+        self,
+        embedding: list[float],
+        theme_id: int | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        limit: int = 20,
+        strategy: str | None = None,
+    ) -> list[dict]:
+        """Sets les plus proches d'un vecteur, filtrés (voir _vector_search)."""
+        where, params = _build_filters(
+            theme_id=theme_id, year_from=year_from, year_to=year_to
+        )
+        return self._vector_search(
+            table="set_embeddings",
+            key="set_num",
+            columns=SET_COLUMNS,
+            joins="JOIN sets s ON v.set_num = s.set_num",
+            base="sets s",
+            where=where,
+            params=params,
+            index_filter=lambda: {
+                "theme_id": theme_id,
+                "year__ge": year_from,
+                "year__le": year_to,
+            },
+            embedding=embedding,
+            limit=limit,
+            strategy=strategy,
+        )
 
-        rows = self.conn.execute(
+    def _search_sets_like(self, query, theme_id, year_from, year_to, limit):
+        match = ["(LOWER(s.name) LIKE ? OR s.set_num LIKE ?)"] if query else []
+        like = [f"%{query.lower()}%"] * 2 if query else []
+        where, params = _build_filters(
+            *match, theme_id=theme_id, year_from=year_from, year_to=year_to
+        )
+        return self._fetch_dicts(
             f"""
-            SELECT s.set_num, s.name, s.year, s.theme_id, s.num_parts, s.img_url
+            SELECT {SET_COLUMNS}
             FROM sets s
             {where}
             ORDER BY s.year DESC
             LIMIT ?
             """,
-            params,
-        ).fetchall()
-
-        col_names = [d[0] for d in self.conn.description]
-        return [dict(zip(col_names, row, strict=False)) for row in rows]
+            [*like, *params, limit],
+        )
 
     def search_parts(
         self,
@@ -135,85 +350,268 @@ class SearchDAO:
         category_id: int | None = None,
         limit: int = 20,
     ) -> list[dict]:
-        """Recherche des pièces par texte."""
-        if self._vss_ready and query:
-            return self._search_parts_vss(query, color_id, category_id, limit)
-        return self._search_parts_like(query, color_id, category_id, limit)
+        """Recherche des pièces par texte (même logique que search_sets)."""
+        query = query.strip()
+        args = (color_id, category_id)
+        if PART_NUM_PATTERN.match(query.lower()):
+            rows = self._find_parts_by_num(query.lower(), *args, limit)
+            if rows:
+                return rows
+        if SEARCH_MODE != "text" and self._use_vectors(query, "part_embeddings"):
+            if SEARCH_MODE != "hybrid":
+                return self._search_parts_vss(query, *args, limit)
+            depth = max(limit, HYBRID_DEPTH)
+            rankings = [
+                self._search_parts_vss(query, *args, depth),
+                self._search_parts_text(query, *args, depth),
+            ]
+            return reciprocal_rank_fusion(rankings, "part_num")[:limit]
+        return self._search_parts_text(query, *args, limit)
+
+    def _find_parts_by_num(self, part_num, color_id, category_id, limit):
+        where, params = _build_filters(
+            "p.part_num = ?", color_id=color_id, category_id=category_id
+        )
+        return self._fetch_dicts(
+            f"""
+            SELECT {PART_COLUMNS}
+            FROM parts p
+            {where}
+            LIMIT ?
+            """,
+            [part_num, *params, limit],
+        )
+
+    def _search_parts_text(self, query, color_id, category_id, limit):
+        """Plein texte, même ordre que _search_sets_text."""
+        args = (query, color_id, category_id, limit)
+        if query and "part_documents" in self.capabilities.fts_tables:
+            rows = self._search_parts_fts(*args)
+            if rows:
+                return rows
+        if query and "part_trigrams" in self.capabilities.trigram_tables:
+            rows = self._search_parts_trigram(*args)
+            if rows:
+                return rows
+        return self._search_parts_like(*args)
+
+    def _search_parts_fts(self, query, color_id, category_id, limit):
+        where, params = _build_filters(
+            "d.score IS NOT NULL", color_id=color_id, category_id=category_id
+        )
+        return self._fetch_dicts(
+            f"""
+            SELECT {PART_COLUMNS}
+            FROM (
+                SELECT part_num, fts_main_part_documents.match_bm25(part_num, ?) AS score
+                FROM part_documents
+            ) d
+            JOIN parts p ON d.part_num = p.part_num
+            {where}
+            ORDER BY d.score DESC
+            LIMIT ?
+            """,
+            [query, *params, limit],
+        )
+
+    def _search_parts_trigram(self, query, color_id, category_id, limit):
+        grams = name_trigrams(query)
+        if not grams:
+            return []
+        min_match = math.ceil(TRIGRAM_MIN_MATCH * len(grams))
+        where, params = _build_filters(color_id=color_id, category_id=category_id)
+        return self._fetch_dicts(
+            f"""
+            SELECT {PART_COLUMNS}
+            FROM ({_trigram_matches("part_trigrams", "part_num", len(grams))}) t
+            JOIN parts p ON t.part_num = p.part_num
+            {where}
+            ORDER BY t.shared DESC, t.n, p.name, p.part_num
+            LIMIT ?
+            """,
+            [*grams, min_match, *params, limit],
+        )
 
     def _search_parts_vss(self, query, color_id, category_id, limit):
-        embedding = self._encode(query)
-        conditions = []
-        params = []
-
-        if color_id is not None:
-            # parts n'a pas de color_id direct — on filtre via elements (part↔color)
-            conditions.append(
-                "p.part_num IN (SELECT part_num FROM elements WHERE color_id = ?)"
-            )
-            params.append(color_id)
-        if category_id is not None:
-            conditions.append("p.part_cat_id = ?")
-            params.append(category_id)
+        return self.search_parts_by_vector(
+            self._encode(query), color_id, category_id, limit
+        )
+
+    def search_parts_by_vector(
+        self,
+        embedding: list[float],
+        color_id: int | None = None,
+        category_id: int | None = None,
+        limit: int = 20,
+        strategy: str | None = None,
+    ) -> list[dict]:
+        """Pièces les plus proches d'un vecteur, filtrées (voir _vector_search)."""
+        where, params = _build_filters(color_id=color_id, category_id=category_id)
+        return self._vector_search(
+            table="part_embeddings",
+            key="part_id",
+            columns=PART_COLUMNS,
+            joins="JOIN parts p ON v.part_id = p.part_id",
+            base="parts p",
+            where=where,
+            params=params,
+            index_filter=lambda: {
+                "part_cat_id": category_id,
+                "key__in": self._parts_with_color(color_id),
+            },
+            embedding=embedding,
+            limit=limit,
+            strategy=strategy,
+        )
 
-        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
-        params_final = [embedding] + params + [limit]
+    def _vector_search(
+        self,
+        table,
+        key,
+        columns,
+        joins,
+        base,
+        where,
+        params,
+        index_filter,
+        embedding,
+        limit,
+        strategy=None,
+    ) -> list[dict]:
+        """k plus proches voisins de `embedding` parmi les lignes filtrées.
+
+        Un filtre autour de ORDER BY array_distance(...) LIMIT empêche DuckDB
+        d'utiliser l'index HNSW. Trois stratégies :
+
+        - "hnsw" : top-k sur la table d'embeddings seule (forme servie par
+          l'index), k suréchantillonné d'après la sélectivité du filtre,
+          puis filtre ; k est agrandi tant qu'il manque des résultats ;
+        - "exact" : distance calculée seulement pour les lignes qui passent
+          le filtre (jointure puis tri), sans index ;
+        - "numpy" : index en mémoire (voir VectorIndex), filtré par le
+          masque de index_filter(), seuls les k résultats sont lus dans
+          DuckDB (ainsi que les vecteurs float32 des candidats à reclasser
+          si l'index est quantifié).
+
+        Par défaut, "numpy" sans VSS ou sans vecteurs float32 (voir
+        _use_index), "exact" si la table n'a pas d'index HNSW ou si le filtre
+        garde au plus VSS_EXACT_SCAN_MAX lignes, "hnsw" sinon. La stratégie
+        retenue est notée dans self.last_plan.
+        """
+        total = self.capabilities.embedding_rows.get(table)
+        candidates = None
+        if strategy is None:
+            if self._use_index(table):
+                strategy = "numpy"
+            elif not self.capabilities.has_hnsw(table):
+                strategy = "exact"
+            elif where:
+                candidates = self.conn.execute(
+                    f"SELECT COUNT(*) FROM {base} {where}", params
+                ).fetchone()[0]
+                strategy = "exact" if candidates <= VSS_EXACT_SCAN_MAX else "hnsw"
+            else:
+                strategy = "hnsw"
+        self.last_plan = {"strategy": strategy, "candidates": candidates, "k": None}
+
+        if strategy == "numpy":
+            index = get_vector_index(self.conn, table)
+            exact_vectors = None
+            if table not in self.capabilities.quantized_only:
+                exact_vectors = partial(self._float32_vectors, table, key)
+            hits = index.search(
+                embedding, limit, index.mask(**index_filter()), exact_vectors
+            )
+            if not hits:
+                return []
+            keys, distances = zip(*hits, strict=True)
+            return self._fetch_dicts(
+                f"""
+                SELECT {columns}, v.distance
+                FROM (SELECT unnest(?) AS {key}, unnest(?) AS distance) v
+                {joins}
+                ORDER BY v.distance ASC
+                """,
+                [list(keys), list(distances)],
+            )
 
-        rows = self.conn.execute(
+        if strategy == "hnsw":
+            k = _oversampled_k(limit, candidates, total) if where else limit
+            while True:
+                self.last_plan["k"] = k
+                rows = self._fetch_dicts(
+                    f"""
+                    SELECT {columns}, v.distance
+                    FROM (
+                        SELECT {key}, array_distance(embedding, ?::FLOAT[384]) AS distance
+                        FROM {table}
+                        ORDER BY distance
+                        LIMIT ?
+                    ) v
+                    {joins}
+                    {where}
+                    ORDER BY v.distance ASC
+                    LIMIT ?
+                    """,
+                    [embedding, k, *params, limit],
+                )
+                if len(rows) >= limit or (total is not None and k >= total):
+                    return rows
+                if k >= VSS_MAX_K:
+                    break  # filtre trop sélectif pour l'index : scan exact
+                k = min(VSS_MAX_K, k * VSS_K_GROWTH, total or VSS_MAX_K)
+            self.last_plan["strategy"] = "exact"
+
+        return self._fetch_dicts(
             f"""
-            SELECT p.part_num, p.name, p.part_cat_id,
-                   array_distance(pe.embedding, ?::FLOAT[384]) AS distance,
-                   CASE WHEN e.element_id IS NOT NULL
-                        THEN 'https://cdn.rebrickable.com/media/parts/elements/' || e.element_id || '.jpg'
-                        ELSE 'https://cdn.rebrickable.com/media/parts/photos/' || p.part_num || '.jpg'
-                   END AS img_url
-            FROM part_embeddings pe
-            JOIN parts p ON pe.part_num = p.part_num
-            LEFT JOIN (SELECT part_num, MIN(element_id) AS element_id FROM elements GROUP BY part_num) e
-                ON p.part_num = e.part_num
+            SELECT {columns}, array_distance(v.embedding, ?::FLOAT[384]) AS distance
+            FROM {table} v
+            {joins}
             {where}
             ORDER BY distance ASC
             LIMIT ?
             """,
-            params_final,
+            [embedding, *params, limit],
+        )
+
+    def _float32_vectors(self, table: str, key: str, keys: list) -> dict:
+        """{clé: vecteur float32} stockés, pour reclasser un index quantifié."""
+        rows = self.conn.execute(
+            f"SELECT {key}, embedding FROM {table} "
+            f"WHERE {key} IN (SELECT unnest(?)) AND embedding IS NOT NULL",
+            [keys],
+        ).fetchall()
+        return {r[0]: np.asarray(r[1], dtype=np.float32) for r in rows}
+
+    def _parts_with_color(self, color_id: int | None) -> list[int] | None:
+        if color_id is None:
+            return None
+        rows = self.conn.execute(
+            "SELECT DISTINCT part_id FROM elements WHERE color_id = ?", [color_id]
         ).fetchall()
+        return [r[0] for r in rows]
 
+    def _fetch_dicts(self, sql: str, params: list) -> list[dict]:
+        rows = self.conn.execute(sql, params).fetchall()
         col_names = [d[0] for d in self.conn.description]
         return [dict(zip(col_names, row, strict=False)) for row in rows]
 
-    def _search_parts_like(self, query, _color_id, category_id, limit):
-        conditions = []
-        params = []
-
-        if query:
-            conditions.append("(LOWER(p.name) LIKE ? OR p.part_num LIKE ?)")
-            like = f"%{query.lower()}%"
-            params.extend([like, like])
-        if category_id is not None:
-            conditions.append("p.part_cat_id = ?")
-            params.append(category_id)
-
-        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
-        params.append(limit)
-
-        rows = self.conn.execute(
+    def _search_parts_like(self, query, color_id, category_id, limit):
+        match = ["(LOWER(p.name) LIKE ? OR p.part_num LIKE ?)"] if query else []
+        like = [f"%{query.lower()}%"] * 2 if query else []
+        where, params = _build_filters(
+            *match, color_id=color_id, category_id=category_id
+        )
+        return self._fetch_dicts(
             f"""
-            SELECT p.part_num, p.name, p.part_cat_id,
-                   CASE WHEN e.element_id IS NOT NULL
-                        THEN 'https://cdn.rebrickable.com/media/parts/elements/' || e.element_id || '.jpg'
-                        ELSE 'https://cdn.rebrickable.com/media/parts/photos/' || p.part_num || '.jpg'
-                   END AS img_url
+            SELECT {PART_COLUMNS}
             FROM parts p
-            LEFT JOIN (SELECT part_num, MIN(element_id) AS element_id FROM elements GROUP BY part_num) e
-                ON p.part_num = e.part_num
             {where}
             ORDER BY p.name ASC
             LIMIT ?
             """,
-            params,
-        ).fetchall()
-
-        col_names = [d[0] for d in self.conn.description]
-        return [dict(zip(col_names, row, strict=False)) for row in rows]
+            [*like, *params, limit],
+        )
 
     def get_recent_sets(self, limit: int = 12) -> list[dict]:
         """Retourne les sets les plus récents du catalogue."""
@@ -229,13 +627,21 @@ class SearchDAO:
         col_names = [d[0] for d in self.conn.description]
         return [dict(zip(col_names, row, strict=False)) for row in rows]
 
-    def get_stats(self) -> dict:
-        """Retourne les statistiques globales du catalogue."""
-        sets_count = self.conn.execute("SELECT COUNT(*) FROM sets").fetchone()[0]
-        parts_count = self.conn.execute("SELECT COUNT(*) FROM parts").fetchone()[0]
-        themes_count = self.conn.execute("SELECT COUNT(*) FROM themes").fetchone()[0]
+    def get_stats(self, version: str | None = None) -> dict:
+        """Retourne les statistiques globales du catalogue.
+
+        Nombres de lignes de catalog_meta (en mémoire par version, voir
+        get_catalog_meta) ; COUNT(*) sur un catalogue construit avant.
+        """
+        meta = get_catalog_meta(self.conn, version)
+        counts = meta.get("row_counts") if meta else None
+        if counts is None:
+            counts = {
+                table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("sets", "parts", "themes")
+            }
         return {
-            "totalSets": sets_count,
-            "totalParts": parts_count,
-            "totalThemes": themes_count,
+            "totalSets": counts["sets"],
+            "totalParts": counts["parts"],
+            "totalThemes": counts["themes"],
         }
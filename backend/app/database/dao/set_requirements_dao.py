@@ -0,0 +1,69 @@
+"""Lecture des besoins en pièces des sets (DuckDB, tables set_requirements)."""
+
+from app.business_object.missing_part import MissingPart
+from app.business_object.user_stock import UserStock
+
+
+class SetRequirementsDAO:
+    """DAO de lecture sur set_requirements, enrichi avec parts et colors."""
+
+    def __init__(self, duckdb_conn):
+        self.conn = duckdb_conn
+
+    def get_missing_parts(
+        self, stock: UserStock, set_nums: list[str]
+    ) -> dict[str, list[MissingPart]]:
+        """Pièces manquantes de plusieurs sets pour un stock donné.
+
+        Une seule requête, quel que soit le nombre de sets. Un couple est
+        manquant si la quantité possédée est inférieure au besoin (même règle
+        que le calcul de couverture).
+
+        Returns:
+            {set_num: list[MissingPart]} pour chaque set connu, liste vide si
+            rien ne manque ; les sets absents du catalogue sont omis.
+        """
+        if not set_nums:
+            return {}
+        with self.conn.cursor() as cur:
+            # Vue propre à ce curseur : invisible des appels concurrents
+            cur.register("_missing_stock", stock.to_frame())
+            rows = self._query_missing(cur, set_nums)
+            col_names = [d[0] for d in cur.description]
+
+        result: dict[str, list[MissingPart]] = {}
+        for row in rows:
+            data = dict(zip(col_names, row, strict=False))
+            parts = result.setdefault(data["set_num"], [])
+            if data["part_num"] is not None:
+                parts.append(MissingPart.from_dict(data))
+        return result
+
+    @staticmethod
+    def _query_missing(cur, set_nums: list[str]) -> list[tuple]:
+        return cur.execute(
+            """
+            WITH wanted AS (
+                SELECT DISTINCT UNNEST(?::VARCHAR[]) AS set_num
+            ),
+            missing AS (
+                SELECT r.set_num, r.pc_id, r.needed, COALESCE(st.qty, 0) AS owned
+                FROM set_requirements r
+                JOIN wanted w ON w.set_num = r.set_num
+                LEFT JOIN _missing_stock st ON st.pc_id = r.pc_id
+                WHERE COALESCE(st.qty, 0) < r.needed
+            )
+            SELECT t.set_num, pk.part_num, k.color_id,
+                   m.needed, m.owned, m.needed - m.owned AS missing,
+                   p.name AS part_name, c.name AS color_name, c.rgb AS color_rgb
+            FROM set_requirement_totals t
+            JOIN wanted w ON w.set_num = t.set_num
+            LEFT JOIN missing m ON m.set_num = t.set_num
+            LEFT JOIN part_color_keys k ON k.pc_id = m.pc_id
+            LEFT JOIN part_keys pk ON pk.part_id = k.part_id
+            LEFT JOIN parts p ON p.part_id = k.part_id
+            LEFT JOIN colors c ON c.id = k.color_id
+            ORDER BY t.set_num, missing DESC, pk.part_num, k.color_id
+            """,
+            [set_nums],
+        ).fetchall()
@@ -0,0 +1,77 @@
+"""Assemblage du stock d'un utilisateur en clés entières du catalogue (DuckDB)."""
+
+import numpy as np
+import pandas as pd
+
+from app.business_object.user_stock import UserStock
+
+
+class StockDAO:
+    """Construit un UserStock à partir des pièces possédées et des sets non construits.
+
+    Les colonnes venant de PostgreSQL sont enregistrées dans DuckDB comme une
+    vue sur des tableaux (pas d'INSERT ligne à ligne), sur un curseur propre à
+    l'appel ; traduction en pc_id et
+    agrégation avec les besoins des sets non construits se font dans la même
+    requête.
+    """
+
+    def __init__(self, duckdb_conn):
+        self.conn = duckdb_conn
+
+    def get_user_stock(
+        self, owned: dict[str, list] | None, unbuilt_nums: list[str]
+    ) -> UserStock:
+        """Stock {pc_id: quantité} en colonnes.
+
+        Args:
+            owned: colonnes part_num / color_id / quantity (voir
+                UserPartsDAO.get_owned_columns), None si non voulues. Pour un
+                même couple, la dernière ligne l'emporte.
+            unbuilt_nums: sets non construits dont les pièces s'ajoutent au stock.
+
+        Les couples inconnus du catalogue ne couvrent aucun set et sont ignorés.
+        """
+        part_nums = owned["part_num"] if owned else []
+        if not part_nums and not unbuilt_nums:
+            return UserStock.empty()
+
+        frame = pd.DataFrame(
+            {
+                "part_num": pd.array(part_nums, dtype="string"),
+                "color_id": np.asarray(owned["color_id"] if owned else [], np.int32),
+                "quantity": np.asarray(owned["quantity"] if owned else [], np.int32),
+                "ord": np.arange(len(part_nums), dtype=np.int32),
+            }
+        )
+        with self.conn.cursor() as cur:
+            # Vue propre à ce curseur : invisible des appels concurrents
+            cur.register("_owned_parts", frame)
+            result = cur.execute(
+                """
+                WITH owned AS (
+                    SELECT part_num, color_id, arg_max(quantity, ord) AS qty
+                    FROM _owned_parts
+                    GROUP BY part_num, color_id
+                ),
+                pieces AS (
+                    SELECT k.pc_id, o.qty
+                    FROM owned o
+                    JOIN part_keys p ON p.part_num = o.part_num
+                    JOIN part_color_keys k
+                        ON k.part_id = p.part_id AND k.color_id = o.color_id
+                    UNION ALL
+                    SELECT pc_id, needed AS qty
+                    FROM set_requirements
+                    WHERE set_num IN (SELECT UNNEST(?::VARCHAR[]))
+                )
+                SELECT pc_id, SUM(qty)::INTEGER AS qty
+                FROM pieces
+                GROUP BY pc_id
+                ORDER BY pc_id
+                """,
+                [unbuilt_nums],
+            ).fetchnumpy()
+        return UserStock(
+            result["pc_id"].astype(np.int32), result["qty"].astype(np.int32)
+        )
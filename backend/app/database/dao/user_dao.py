@@ -1,10 +1,46 @@
 import logging
 
 from app.business_object.user import User
+from app.database.pg_async import numbered
 
 
 logger = logging.getLogger(__name__)
 
+# Requêtes communes à UserDAO et AsyncUserDAO (voir numbered)
+_CREATE_SQL = """
+    INSERT INTO users (username, hashed_password, salt)
+    VALUES (%s, %s, %s)
+    RETURNING id_user
+"""
+_BY_USERNAME_SQL = "SELECT * FROM users WHERE username = %s"
+_BY_ID_SQL = "SELECT * FROM users WHERE id_user = %s"
+_DELETE_SQL = "DELETE FROM users WHERE id_user = %s"
+_UPDATE_SQL = {
+    col: f"UPDATE users SET {col} = %s WHERE id_user = %s RETURNING id_user"
+    for col in ("username", "hashed_password")
+}
+_USERNAME_TAKEN_SQL = "SELECT EXISTS (SELECT 1 FROM users WHERE username = %s) AS taken"
+
+
+def _to_user(row) -> User | None:
+    return User.from_dict(dict(row)) if row else None
+
+
+def _with_id(user: User, id_user: int | None) -> User | None:
+    """L'utilisateur créé, avec l'id_user attribué par la base."""
+    if id_user is None:
+        return None
+    return User(
+        username=user.username,
+        hashed_password=user.hashed_password,
+        salt=user.salt,
+        id_user=id_user,
+    )
+
+
+def _update_sql(update_username: bool) -> str:
+    return _UPDATE_SQL["username" if update_username else "hashed_password"]
+
 
 class UserDAO:
     """
@@ -33,22 +69,10 @@ class UserDAO:
         try:
             with self.conn.cursor() as cur:
                 cur.execute(
-                    """
-                    INSERT INTO users (username, hashed_password, salt)
-                    VALUES (%s, %s, %s)
-                    RETURNING id_user
-                    """,
-                    [user.username, user.hashed_password, user.salt],
+                    _CREATE_SQL, [user.username, user.hashed_password, user.salt]
                 )
                 row = cur.fetchone()
-                if row is None:
-                    return None
-                return User(
-                    username=user.username,
-                    hashed_password=user.hashed_password,
-                    salt=user.salt,
-                    id_user=row["id_user"],
-                )
+                return _with_id(user, row["id_user"] if row else None)
         except Exception:
             logger.exception("Erreur création utilisateur")
             return None
@@ -62,9 +86,8 @@ class UserDAO:
         User | None
         """
         with self.conn.cursor() as cur:
-            cur.execute("SELECT * FROM users WHERE username = %s", [username])
-            row = cur.fetchone()
-            return User.from_dict(dict(row)) if row else None
+            cur.execute(_BY_USERNAME_SQL, [username])
+            return _to_user(cur.fetchone())
 
     def get_by_id(self, id_user: int) -> User | None:
         """
@@ -75,9 +98,8 @@ class UserDAO:
         User | None
         """
         with self.conn.cursor() as cur:
-            cur.execute("SELECT * FROM users WHERE id_user = %s", [id_user])
-            row = cur.fetchone()
-            return User.from_dict(dict(row)) if row else None
+            cur.execute(_BY_ID_SQL, [id_user])
+            return _to_user(cur.fetchone())
 
     def delete_user(self, id_user: int) -> bool:
         """
@@ -89,7 +111,7 @@ class UserDAO:
         """
         try:
             with self.conn.cursor() as cur:
-                cur.execute("DELETE FROM users WHERE id_user = %s", [id_user])
+                cur.execute(_DELETE_SQL, [id_user])
                 return True
         except Exception:
             logger.exception("Erreur suppression utilisateur")
@@ -111,12 +133,8 @@ class UserDAO:
         ---------
         bool : True si la ligne a été modifiée
         """
-        col = "username" if update_username else "hashed_password"
         with self.conn.cursor() as cur:
-            cur.execute(
-                f"UPDATE users SET {col} = %s WHERE id_user = %s RETURNING id_user",
-                [new_entry, id_user],
-            )
+            cur.execute(_update_sql(update_username), [new_entry, id_user])
             return cur.fetchone() is not None
 
     def is_username_taken(self, username: str) -> bool:
@@ -128,8 +146,51 @@ class UserDAO:
         bool : True si le nom est pris, False s'il est libre
         """
         with self.conn.cursor() as cur:
-            cur.execute(
-                "SELECT COUNT(*) AS count FROM users WHERE username = %s", [username]
+            cur.execute(_USERNAME_TAKEN_SQL, [username])
+            return cur.fetchone()["taken"]
+
+
+class AsyncUserDAO:
+    """Variante asyncpg de UserDAO : mêmes requêtes, mêmes retours, seule
+    l'exécution change.
+
+    Ne gère pas les transactions.
+    """
+
+    def __init__(self, pg_conn):
+        self.conn = pg_conn
+
+    async def create_user(self, user: User) -> User | None:
+        try:
+            id_user = await self.conn.fetchval(
+                numbered(_CREATE_SQL), user.username, user.hashed_password, user.salt
             )
-            row = cur.fetchone()
-            return row["count"] > 0 if row else False
+        except Exception:
+            logger.exception("Erreur création utilisateur")
+            return None
+        return _with_id(user, id_user)
+
+    async def get_by_username(self, username: str) -> User | None:
+        return _to_user(await self.conn.fetchrow(numbered(_BY_USERNAME_SQL), username))
+
+    async def get_by_id(self, id_user: int) -> User | None:
+        return _to_user(await self.conn.fetchrow(numbered(_BY_ID_SQL), id_user))
+
+    async def delete_user(self, id_user: int) -> bool:
+        try:
+            await self.conn.execute(numbered(_DELETE_SQL), id_user)
+            return True
+        except Exception:
+            logger.exception("Erreur suppression utilisateur")
+            return False
+
+    async def update_user(
+        self, update_username: bool, new_entry: str, id_user: int
+    ) -> bool:
+        updated = await self.conn.fetchval(
+            numbered(_update_sql(update_username)), new_entry, id_user
+        )
+        return updated is not None
+
+    async def is_username_taken(self, username: str) -> bool:
+        return await self.conn.fetchval(numbered(_USERNAME_TAKEN_SQL), username)
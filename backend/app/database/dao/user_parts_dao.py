@@ -1,5 +1,39 @@
 """Gère user_parts (pièces possédées/souhaitées)"""
 
+from app.database.pg_async import affected_rows, numbered
+
+
+# Requêtes communes à UserPartsDAO et AsyncUserPartsDAO (voir numbered)
+_ADD_SQL = """
+    INSERT INTO user_parts (id_user, part_num, color_id, status, quantity, is_used)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON CONFLICT (id_user, part_num, color_id, is_used)
+    DO UPDATE SET
+        quantity = user_parts.quantity + EXCLUDED.quantity
+    RETURNING id_user, part_num, color_id, status, quantity, is_used
+"""
+_REMOVE_SQL = """
+    DELETE FROM user_parts
+    WHERE id_user = %s AND part_num = %s AND color_id = %s
+"""
+_OWNED_SQL = """
+    SELECT id_user, part_num, color_id, quantity, status, is_used
+    FROM user_parts
+    WHERE id_user = %s AND status = 'owned'
+    ORDER BY part_num, color_id, is_used
+"""
+_WISHED_SQL = """
+    SELECT id_user, part_num, color_id, quantity, status
+    FROM user_parts
+    WHERE id_user = %s AND status = 'wished'
+    ORDER BY part_num, color_id
+"""
+_UPDATE_QUANTITY_SQL = """
+    UPDATE user_parts
+    SET quantity = %s
+    WHERE id_user = %s AND part_num = %s AND color_id = %s AND is_used = %s
+"""
+
 
 class UserPartsDAO:
     """DAO pour gérer les pièces possédées ou souhaitées par un utilisateur.
@@ -25,16 +59,10 @@ class UserPartsDAO:
         En cas de conflit (même user/part/color), additionne les quantités
         et met à jour is_used.
         """
-        query = """
-            INSERT INTO user_parts (id_user, part_num, color_id, status, quantity, is_used)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT (id_user, part_num, color_id, is_used)
-            DO UPDATE SET
-                quantity = user_parts.quantity + EXCLUDED.quantity
-            RETURNING id_user, part_num, color_id, status, quantity, is_used
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (user_id, part_num, color_id, status, quantity, is_used))
+            cur.execute(
+                _ADD_SQL, (user_id, part_num, color_id, status, quantity, is_used)
+            )
             result = cur.fetchone()
             return dict(result) if result else None
 
@@ -44,37 +72,67 @@ class UserPartsDAO:
         Returns:
             True si supprimé, False si inexistant.
         """
-        query = """
-            DELETE FROM user_parts
-            WHERE id_user = %s AND part_num = %s AND color_id = %s
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (user_id, part_num, color_id))
+            cur.execute(_REMOVE_SQL, (user_id, part_num, color_id))
             return cur.rowcount > 0
 
     def get_owned_parts(self, user_id: int) -> list[dict]:
         """Récupère toutes les pièces possédées (status='owned')."""
+        with self.connection.cursor() as cur:
+            cur.execute(_OWNED_SQL, (user_id,))
+            rows = cur.fetchall()
+            return [dict(row) for row in rows]
+
+    def get_owned_columns(self, user_id: int) -> dict[str, list]:
+        """Pièces possédées en colonnes (une liste par champ), en une seule ligne.
+
+        Même ordre que get_owned_parts ; évite de construire un dict par ligne
+        quand seules les colonnes sont utiles (calcul des sets constructibles).
+
+        Returns:
+            {"part_num": [...], "color_id": [...], "quantity": [...]}
+        """
         query = """
-            SELECT id_user, part_num, color_id, quantity, status, is_used
+            SELECT
+                COALESCE(array_agg(part_num ORDER BY part_num, color_id, is_used), '{}')
+                    AS part_num,
+                COALESCE(array_agg(color_id ORDER BY part_num, color_id, is_used), '{}')
+                    AS color_id,
+                COALESCE(array_agg(quantity ORDER BY part_num, color_id, is_used), '{}')
+                    AS quantity
             FROM user_parts
             WHERE id_user = %s AND status = 'owned'
-            ORDER BY part_num, color_id, is_used
         """
         with self.connection.cursor() as cur:
             cur.execute(query, (user_id,))
-            rows = cur.fetchall()
-            return [dict(row) for row in rows]
+            return dict(cur.fetchone())
 
-    def get_wished_parts(self, user_id: int) -> list[dict]:
-        """Récupère toutes les pièces souhaitées (status='wished')."""
+    def get_owned_quantities(
+        self, user_id: int, pairs: list[tuple[str, int]]
+    ) -> dict[tuple[str, int], int]:
+        """Quantités possédées pour quelques couples (part_num, color_id).
+
+        Même règle que get_owned_parts lue dans l'ordre : pour un couple, la
+        ligne is_used = TRUE l'emporte. Les couples non possédés sont omis.
+        """
+        if not pairs:
+            return {}
         query = """
-            SELECT id_user, part_num, color_id, quantity, status
+            SELECT part_num, color_id, quantity
             FROM user_parts
-            WHERE id_user = %s AND status = 'wished'
-            ORDER BY part_num, color_id
+            WHERE id_user = %s AND status = 'owned'
+              AND (part_num, color_id) IN %s
+            ORDER BY part_num, color_id, is_used
         """
         with self.connection.cursor() as cur:
-            cur.execute(query, (user_id,))
+            cur.execute(query, (user_id, tuple(pairs)))
+            rows = cur.fetchall()
+            return {(row["part_num"], row["color_id"]): row["quantity"] for row in rows}
+
+    def get_wished_parts(self, user_id: int) -> list[dict]:
+        """Récupère toutes les pièces souhaitées (status='wished')."""
+        with self.connection.cursor() as cur:
+            cur.execute(_WISHED_SQL, (user_id,))
             rows = cur.fetchall()
             return [dict(row) for row in rows]
 
@@ -91,11 +149,64 @@ class UserPartsDAO:
         Returns:
             True si mis à jour, False si la pièce n'existe pas.
         """
-        query = """
-            UPDATE user_parts
-            SET quantity = %s
-            WHERE id_user = %s AND part_num = %s AND color_id = %s AND is_used = %s
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (quantity, user_id, part_num, color_id, is_used))
+            cur.execute(
+                _UPDATE_QUANTITY_SQL, (quantity, user_id, part_num, color_id, is_used)
+            )
             return cur.rowcount > 0
+
+
+class AsyncUserPartsDAO:
+    """Variante asyncpg de UserPartsDAO pour les routes /parts : mêmes
+    requêtes, mêmes retours, seule l'exécution change. Le calcul des sets
+    constructibles garde UserPartsDAO.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def add_part(
+        self,
+        user_id: int,
+        part_num: str,
+        color_id: int,
+        status: str,
+        quantity: int,
+        is_used: bool = False,
+    ):
+        result = await self.connection.fetchrow(
+            numbered(_ADD_SQL), user_id, part_num, color_id, status, quantity, is_used
+        )
+        return dict(result) if result else None
+
+    async def remove_part(self, user_id: int, part_num: str, color_id: int) -> bool:
+        status = await self.connection.execute(
+            numbered(_REMOVE_SQL), user_id, part_num, color_id
+        )
+        return affected_rows(status) > 0
+
+    async def get_owned_parts(self, user_id: int) -> list[dict]:
+        rows = await self.connection.fetch(numbered(_OWNED_SQL), user_id)
+        return [dict(row) for row in rows]
+
+    async def get_wished_parts(self, user_id: int) -> list[dict]:
+        rows = await self.connection.fetch(numbered(_WISHED_SQL), user_id)
+        return [dict(row) for row in rows]
+
+    async def update_quantity(
+        self,
+        user_id: int,
+        part_num: str,
+        color_id: int,
+        quantity: int,
+        is_used: bool = False,
+    ) -> bool:
+        status = await self.connection.execute(
+            numbered(_UPDATE_QUANTITY_SQL),
+            quantity,
+            user_id,
+            part_num,
+            color_id,
+            is_used,
+        )
+        return affected_rows(status) > 0
@@ -1,5 +1,60 @@
 """Gère wishlist, wishlist_sets, wishlist_parts"""
 
+from app.database.pg_async import affected_rows, numbered
+
+
+# Requêtes communes à WishlistDAO et AsyncWishlistDAO (voir numbered)
+_WISHLIST_ID_SQL = "SELECT id_wishlist FROM wishlist WHERE id_user = %s"
+_CREATE_WISHLIST_SQL = (
+    "INSERT INTO wishlist (id_user) VALUES (%s) RETURNING id_wishlist"
+)
+_ADD_SET_SQL = """
+    INSERT INTO wishlist_sets (id_wishlist, set_num, priority)
+    VALUES (%s, %s, %s)
+    ON CONFLICT DO NOTHING
+    RETURNING id_wishlist, set_num, priority
+"""
+_REMOVE_SET_SQL = """
+    DELETE FROM wishlist_sets
+    WHERE id_wishlist IN (
+        SELECT id_wishlist FROM wishlist WHERE id_user = %s
+    ) AND set_num = %s
+"""
+_SETS_SQL = """
+    SELECT ws.set_num, ws.priority, ws.added_at
+    FROM wishlist_sets ws
+    JOIN wishlist w ON ws.id_wishlist = w.id_wishlist
+    WHERE w.id_user = %s
+    ORDER BY ws.priority DESC, ws.added_at DESC
+"""
+_ADD_PART_SQL = """
+    INSERT INTO wishlist_parts (id_wishlist, part_num, color_id, quantity)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (id_wishlist, part_num, color_id)
+    DO UPDATE SET quantity = EXCLUDED.quantity
+    RETURNING id_wishlist, part_num, color_id, quantity
+"""
+_REMOVE_PART_SQL = """
+    DELETE FROM wishlist_parts
+    WHERE id_wishlist IN (
+        SELECT id_wishlist FROM wishlist WHERE id_user = %s
+    ) AND part_num = %s AND color_id = %s
+"""
+_PARTS_SQL = """
+    SELECT wp.part_num, wp.color_id, wp.quantity, wp.added_at
+    FROM wishlist_parts wp
+    JOIN wishlist w ON wp.id_wishlist = w.id_wishlist
+    WHERE w.id_user = %s
+    ORDER BY wp.added_at DESC
+"""
+_UPDATE_PART_QUANTITY_SQL = """
+    UPDATE wishlist_parts
+    SET quantity = %s
+    WHERE id_wishlist IN (
+        SELECT id_wishlist FROM wishlist WHERE id_user = %s
+    ) AND part_num = %s AND color_id = %s
+"""
+
 
 class WishlistDAO:
     """DAO pour gérer la wishlist d'un utilisateur.
@@ -14,17 +69,11 @@ class WishlistDAO:
     def get_or_create_wishlist(self, user_id: int) -> int:
         """Retourne l'id_wishlist existant ou en crée un nouveau."""
         with self.connection.cursor() as cur:
-            cur.execute(
-                "SELECT id_wishlist FROM wishlist WHERE id_user = %s",
-                (user_id,),
-            )
+            cur.execute(_WISHLIST_ID_SQL, (user_id,))
             row = cur.fetchone()
             if row:
                 return row["id_wishlist"]
-            cur.execute(
-                "INSERT INTO wishlist (id_user) VALUES (%s) RETURNING id_wishlist",
-                (user_id,),
-            )
+            cur.execute(_CREATE_WISHLIST_SQL, (user_id,))
             return cur.fetchone()["id_wishlist"]
 
     # --- Sets ---
@@ -32,85 +81,44 @@ class WishlistDAO:
     def add_set(self, user_id: int, set_num: str, priority: int = 0):
         """Ajoute un set à la wishlist. Ignoré si déjà présent."""
         wishlist_id = self.get_or_create_wishlist(user_id)
-        query = """
-            INSERT INTO wishlist_sets (id_wishlist, set_num, priority)
-            VALUES (%s, %s, %s)
-            ON CONFLICT DO NOTHING
-            RETURNING id_wishlist, set_num, priority
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (wishlist_id, set_num, priority))
+            cur.execute(_ADD_SET_SQL, (wishlist_id, set_num, priority))
             result = cur.fetchone()
             return dict(result) if result else None
 
     def remove_set(self, user_id: int, set_num: str) -> bool:
         """Retire un set de la wishlist."""
-        query = """
-            DELETE FROM wishlist_sets
-            WHERE id_wishlist IN (
-                SELECT id_wishlist FROM wishlist WHERE id_user = %s
-            ) AND set_num = %s
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (user_id, set_num))
+            cur.execute(_REMOVE_SET_SQL, (user_id, set_num))
             return cur.rowcount > 0
 
     def get_sets(self, user_id: int) -> list[dict]:
         """Récupère tous les sets de la wishlist."""
-        query = """
-            SELECT ws.set_num, ws.priority, ws.added_at
-            FROM wishlist_sets ws
-            JOIN wishlist w ON ws.id_wishlist = w.id_wishlist
-            WHERE w.id_user = %s
-            ORDER BY ws.priority DESC, ws.added_at DESC
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (user_id,))
-            rows = cur.fetchall()
-            return [dict(row) for row in rows]
+            cur.execute(_SETS_SQL, (user_id,))
+            return [dict(row) for row in cur.fetchall()]
 
     # --- Pièces ---
 
     def add_part(self, user_id: int, part_num: str, color_id: int, quantity: int = 1):
         """Ajoute ou met à jour une pièce dans la wishlist."""
         wishlist_id = self.get_or_create_wishlist(user_id)
-        query = """
-            INSERT INTO wishlist_parts (id_wishlist, part_num, color_id, quantity)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT (id_wishlist, part_num, color_id)
-            DO UPDATE SET quantity = EXCLUDED.quantity
-            RETURNING id_wishlist, part_num, color_id, quantity
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (wishlist_id, part_num, color_id, quantity))
+            cur.execute(_ADD_PART_SQL, (wishlist_id, part_num, color_id, quantity))
             result = cur.fetchone()
             return dict(result) if result else None
 
     def remove_part(self, user_id: int, part_num: str, color_id: int) -> bool:
         """Retire une pièce de la wishlist."""
-        query = """
-            DELETE FROM wishlist_parts
-            WHERE id_wishlist IN (
-                SELECT id_wishlist FROM wishlist WHERE id_user = %s
-            ) AND part_num = %s AND color_id = %s
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (user_id, part_num, color_id))
+            cur.execute(_REMOVE_PART_SQL, (user_id, part_num, color_id))
             return cur.rowcount > 0
 
     def get_parts(self, user_id: int) -> list[dict]:
         """Récupère toutes les pièces de la wishlist."""
-        query = """
-            SELECT wp.part_num, wp.color_id, wp.quantity, wp.added_at
-            FROM wishlist_parts wp
-            JOIN wishlist w ON wp.id_wishlist = w.id_wishlist
-            WHERE w.id_user = %s
-            ORDER BY wp.added_at DESC
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (user_id,))
-            rows = cur.fetchall()
-            return [dict(row) for row in rows]
+            cur.execute(_PARTS_SQL, (user_id,))
+            return [dict(row) for row in cur.fetchall()]
 
     def update_part_quantity(
         self, user_id: int, part_num: str, color_id: int, quantity: int
@@ -120,13 +128,77 @@ class WishlistDAO:
         Returns:
             True si mis à jour, False si la pièce n'est pas dans la wishlist.
         """
-        query = """
-            UPDATE wishlist_parts
-            SET quantity = %s
-            WHERE id_wishlist IN (
-                SELECT id_wishlist FROM wishlist WHERE id_user = %s
-            ) AND part_num = %s AND color_id = %s
-        """
         with self.connection.cursor() as cur:
-            cur.execute(query, (quantity, user_id, part_num, color_id))
+            cur.execute(
+                _UPDATE_PART_QUANTITY_SQL, (quantity, user_id, part_num, color_id)
+            )
             return cur.rowcount > 0
+
+
+class AsyncWishlistDAO:
+    """Variante asyncpg de WishlistDAO : mêmes requêtes, mêmes retours,
+    seule l'exécution change.
+
+    Comme WishlistDAO, ne gère pas les transactions : add_set et add_part
+    font deux requêtes, à appeler dans une transaction.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def get_or_create_wishlist(self, user_id: int) -> int:
+        """Retourne l'id_wishlist existant ou en crée un nouveau."""
+        wishlist_id = await self.connection.fetchval(
+            numbered(_WISHLIST_ID_SQL), user_id
+        )
+        if wishlist_id is not None:
+            return wishlist_id
+        return await self.connection.fetchval(numbered(_CREATE_WISHLIST_SQL), user_id)
+
+    # --- Sets ---
+
+    async def add_set(self, user_id: int, set_num: str, priority: int = 0):
+        wishlist_id = await self.get_or_create_wishlist(user_id)
+        result = await self.connection.fetchrow(
+            numbered(_ADD_SET_SQL), wishlist_id, set_num, priority
+        )
+        return dict(result) if result else None
+
+    async def remove_set(self, user_id: int, set_num: str) -> bool:
+        status = await self.connection.execute(
+            numbered(_REMOVE_SET_SQL), user_id, set_num
+        )
+        return affected_rows(status) > 0
+
+    async def get_sets(self, user_id: int) -> list[dict]:
+        rows = await self.connection.fetch(numbered(_SETS_SQL), user_id)
+        return [dict(row) for row in rows]
+
+    # --- Pièces ---
+
+    async def add_part(
+        self, user_id: int, part_num: str, color_id: int, quantity: int = 1
+    ):
+        wishlist_id = await self.get_or_create_wishlist(user_id)
+        result = await self.connection.fetchrow(
+            numbered(_ADD_PART_SQL), wishlist_id, part_num, color_id, quantity
+        )
+        return dict(result) if result else None
+
+    async def remove_part(self, user_id: int, part_num: str, color_id: int) -> bool:
+        status = await self.connection.execute(
+            numbered(_REMOVE_PART_SQL), user_id, part_num, color_id
+        )
+        return affected_rows(status) > 0
+
+    async def get_parts(self, user_id: int) -> list[dict]:
+        rows = await self.connection.fetch(numbered(_PARTS_SQL), user_id)
+        return [dict(row) for row in rows]
+
+    async def update_part_quantity(
+        self, user_id: int, part_num: str, color_id: int, quantity: int
+    ) -> bool:
+        status = await self.connection.execute(
+            numbered(_UPDATE_PART_QUANTITY_SQL), quantity, user_id, part_num, color_id
+        )
+        return affected_rows(status) > 0
@@ -3,6 +3,7 @@ Génération des embeddings pour la recherche sémantique VSS dans DuckDB.
 
 Peut être appelé de deux façons :
   1. Directement : python app/database/duckdb/generate_embeddings.py
+     [--storage int8|float16] [--drop-float32]
   2. Via init_db_lego.py (appelé automatiquement si fastembed est installé)
 
 Textes encodés :
@@ -11,8 +12,17 @@ Textes encodés :
 
 Modèle : all-MiniLM-L6-v2 (384 dimensions, rapide et léger)
 Index  : HNSW via extension DuckDB VSS
+
+Stockage (--storage, ou EMBEDDING_STORAGE) : float32 seul par défaut ; int8
+(quantification scalaire, une échelle par vecteur) ou float16 ajoutent une
+copie quantifiée (embedding_q, scale) que l'index NumPy charge à la place
+des vecteurs float32, 4 ou 2 fois plus petite en mémoire. Avec
+--drop-float32, seule la copie quantifiée est écrite (fichier plus petit,
+pas d'index HNSW, pas de reclassement en float32).
 """
 
+import argparse
+import os
 from pathlib import Path
 import sys
 
@@ -21,22 +31,39 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
 import duckdb
 from fastembed import TextEmbedding
+import numpy as np
 
 from app.database.connexion_duckdb import DB_PATH
+from app.database.vector_index import QUANTIZED_FORMATS, quantize
+from app.utils.embedding_model import EMBEDDING_MODEL_NAME as MODEL_NAME
 
 
 BATCH_SIZE = 500
-MODEL_NAME = "BAAI/bge-small-en-v1.5"
 DIMS = 384
+EMBEDDING_STORAGE = os.getenv("EMBEDDING_STORAGE", "float32")
 
 
-def generate_embeddings(conn: duckdb.DuckDBPyConnection | None = None) -> None:
+def generate_embeddings(
+    conn: duckdb.DuckDBPyConnection | None = None,
+    storage: str = EMBEDDING_STORAGE,
+    keep_float32: bool = True,
+) -> dict:
     """Génère les embeddings et les indexes HNSW dans la base DuckDB.
 
     Args:
         conn: Connexion DuckDB ouverte en écriture.
               Si None, ouvre DB_PATH en écriture (usage standalone).
+        storage: float32, ou int8 / float16 pour ajouter une copie quantifiée.
+        keep_float32: Si False (storage quantifié seulement), n'écrit pas les
+              vecteurs float32 ni les index HNSW.
+
+    Returns:
+        Modèle et stockage des vecteurs écrits ({name, dims, storage par
+        table}), repris dans catalog_meta par init_db_lego.py.
     """
+    if storage != "float32" and storage not in QUANTIZED_FORMATS:
+        raise ValueError(f"Stockage inconnu : {storage}")
+    keep_float32 = keep_float32 or storage == "float32"
     standalone = conn is None
     if standalone:
         if not DB_PATH.exists():
@@ -46,16 +73,24 @@ def generate_embeddings(conn: duckdb.DuckDBPyConnection | None = None) -> None:
         conn = duckdb.connect(str(DB_PATH), read_only=False)
 
     try:
-        print("Chargement de l'extension VSS...")
-        conn.execute("INSTALL vss")
-        conn.execute("LOAD vss")
-        conn.execute("SET hnsw_enable_experimental_persistence = true")
+        if keep_float32:
+            print("Chargement de l'extension VSS...")
+            conn.execute("INSTALL vss")
+            conn.execute("LOAD vss")
+            conn.execute("SET hnsw_enable_experimental_persistence = true")
+        if storage != "float32":
+            _add_quantized_columns(conn)
 
         print(f"Chargement du modèle {MODEL_NAME}...")
         model = TextEmbedding(model_name=MODEL_NAME)
 
-        _generate_set_embeddings(conn, model)
-        _generate_part_embeddings(conn, model)
+        _generate_set_embeddings(conn, model, storage, keep_float32)
+        _generate_part_embeddings(conn, model, storage, keep_float32)
+        return {
+            "name": MODEL_NAME,
+            "dims": DIMS,
+            "storage": dict.fromkeys(("set_embeddings", "part_embeddings"), storage),
+        }
 
     finally:
         if standalone:
@@ -63,7 +98,39 @@ def generate_embeddings(conn: duckdb.DuckDBPyConnection | None = None) -> None:
             print("Génération des embeddings terminée.")
 
 
-def _generate_set_embeddings(conn, model):
+def _add_quantized_columns(conn) -> None:
+    """Colonnes de la copie quantifiée (bases créées avant leur ajout au schéma)."""
+    for table in ("set_embeddings", "part_embeddings"):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS embedding_q BLOB")
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS scale FLOAT")
+
+
+def vector_columns(embeddings, storage: str, keep_float32: bool = True) -> list[tuple]:
+    """Valeurs des colonnes vecteur de chaque embedding selon le stockage :
+    (embedding,) en float32, sinon (embedding ou None, embedding_q, scale)."""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if storage == "float32":
+        return [(v.tolist(),) for v in matrix]
+    codes, scales = quantize(matrix, storage)
+    return [
+        (
+            matrix[i].tolist() if keep_float32 else None,
+            codes[i].tobytes(),
+            None if scales is None else float(scales[i]),
+        )
+        for i in range(len(matrix))
+    ]
+
+
+def _columns(storage: str) -> str:
+    return "embedding" if storage == "float32" else "embedding, embedding_q, scale"
+
+
+def _placeholders(storage: str) -> str:
+    return "?" if storage == "float32" else "?, ?, ?"
+
+
+def _generate_set_embeddings(conn, model, storage="float32", keep_float32=True):
     """Encode chaque set avec son nom + nom du thème."""
     print("\nGénération des embeddings pour les sets...")
 
@@ -82,26 +149,28 @@ def _generate_set_embeddings(conn, model):
         batch = rows[i : i + BATCH_SIZE]
         set_nums = [r[0] for r in batch]
         texts = [r[1] for r in batch]
-        embeddings = list(model.embed(texts))
+        vectors = vector_columns(list(model.embed(texts)), storage, keep_float32)
         conn.executemany(
-            "INSERT INTO set_embeddings VALUES (?, ?)",
-            [(set_nums[j], embeddings[j].tolist()) for j in range(len(batch))],
+            f"INSERT INTO set_embeddings (set_num, {_columns(storage)}) "
+            f"VALUES (?, {_placeholders(storage)})",
+            [(set_nums[j], *vectors[j]) for j in range(len(batch))],
         )
         print(f"  Sets : {min(i + BATCH_SIZE, len(rows))}/{len(rows)}")
 
-    print("  Création de l'index HNSW pour set_embeddings...")
-    conn.execute(
-        "CREATE INDEX IF NOT EXISTS hnsw_sets ON set_embeddings USING HNSW(embedding)"
-    )
+    if keep_float32:
+        print("  Création de l'index HNSW pour set_embeddings...")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS hnsw_sets ON set_embeddings USING HNSW(embedding)"
+        )
 
 
-def _generate_part_embeddings(conn, model):
+def _generate_part_embeddings(conn, model, storage="float32", keep_float32=True):
     """Encode chaque pièce avec son nom + nom de la catégorie."""
     print("\nGénération des embeddings pour les pièces...")
 
     # JOIN avec part_categories pour enrichir le texte encodé
     rows = conn.execute("""
-        SELECT p.part_num,
+        SELECT p.part_num, p.part_id,
                p.name || COALESCE(' ' || pc.name, '') AS text
         FROM parts p
         LEFT JOIN part_categories pc ON p.part_cat_id = pc.id
@@ -112,20 +181,33 @@ def _generate_part_embeddings(conn, model):
 
     for i in range(0, len(rows), BATCH_SIZE):
         batch = rows[i : i + BATCH_SIZE]
-        part_nums = [r[0] for r in batch]
-        texts = [r[1] for r in batch]
-        embeddings = list(model.embed(texts))
+        texts = [r[2] for r in batch]
+        vectors = vector_columns(list(model.embed(texts)), storage, keep_float32)
         conn.executemany(
-            "INSERT INTO part_embeddings VALUES (?, ?)",
-            [(part_nums[j], embeddings[j].tolist()) for j in range(len(batch))],
+            f"INSERT INTO part_embeddings (part_num, part_id, {_columns(storage)}) "
+            f"VALUES (?, ?, {_placeholders(storage)})",
+            [(r[0], r[1], *vectors[j]) for j, r in enumerate(batch)],
         )
         print(f"  Pièces : {min(i + BATCH_SIZE, len(rows))}/{len(rows)}")
 
-    print("  Création de l'index HNSW pour part_embeddings...")
-    conn.execute(
-        "CREATE INDEX IF NOT EXISTS hnsw_parts ON part_embeddings USING HNSW(embedding)"
-    )
+    if keep_float32:
+        print("  Création de l'index HNSW pour part_embeddings...")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS hnsw_parts ON part_embeddings USING HNSW(embedding)"
+        )
 
 
 if __name__ == "__main__":
-    generate_embeddings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--storage",
+        choices=["float32", *QUANTIZED_FORMATS],
+        default=EMBEDDING_STORAGE,
+    )
+    parser.add_argument(
+        "--drop-float32",
+        action="store_true",
+        help="Ne garder que la copie quantifiée (pas d'index HNSW)",
+    )
+    args = parser.parse_args()
+    generate_embeddings(storage=args.storage, keep_float32=not args.drop_float32)
@@ -1,3 +1,6 @@
+from datetime import UTC, datetime
+import hashlib
+import json
 import os
 from pathlib import Path
 
@@ -12,6 +15,10 @@ _DB_DIR = Path(__file__).resolve().parent
 DB_FILE = str(_DB_DIR / "lego.duckdb")
 TEST_DB_FILE = str(_DB_DIR / "lego_test.duckdb")
 
+# Supprime inventory_parts une fois les tables à clés entières construites
+# (voir compact_catalog)
+CATALOG_COMPACT = os.getenv("CATALOG_COMPACT", "0") == "1"
+
 # URLs des fichiers CSV (gzip)
 URLS = {
     "themes": os.getenv("URL_BDD_THEMES"),
@@ -109,7 +116,7 @@ def load_data(conn):
                 """)
             elif table == "parts":
                 conn.execute(f"""
-                    INSERT INTO {table}
+                    INSERT INTO {table} (part_num, name, part_cat_id)
                     SELECT part_num, name, part_cat_id
                     {read_rebrickable_csv(URLS[table])}
                 """)
@@ -125,7 +132,7 @@ def load_data(conn):
                 """)
             elif table == "elements":
                 conn.execute(f"""
-                    INSERT INTO {table}
+                    INSERT INTO {table} (element_id, part_num, color_id)
                     SELECT element_id, part_num, color_id
                     FROM (
                         {read_rebrickable_csv(URLS[table])}
@@ -266,7 +273,7 @@ def load_test_data(conn):
         print(f"  {'parts':20} ...", end=" ")
         try:
             conn.execute(f"""
-                INSERT INTO parts
+                INSERT INTO parts (part_num, name, part_cat_id)
                 SELECT part_num, name, part_cat_id
                 FROM ({csv("parts")}) p
                 WHERE p.part_num IN (
@@ -297,7 +304,7 @@ def load_test_data(conn):
         print(f"  {'elements':20} ...", end=" ")
         try:
             conn.execute(f"""
-                INSERT INTO elements
+                INSERT INTO elements (element_id, part_num, color_id)
                 SELECT element_id, part_num, color_id
                 FROM ({csv("elements")}) e
                 WHERE e.part_num IN (SELECT part_num FROM parts)
@@ -346,22 +353,341 @@ def load_test_data(conn):
             print(f"❌ {e}")
 
 
-def generate_embeddings_if_available(conn):
+def encode_catalog(conn):
+    """Attribue des identifiants entiers denses aux pièces et aux couples pièce/couleur.
+
+    Remplit part_keys (part_num → part_id) et part_color_keys
+    ((part_id, color_id) → pc_id) à partir de toutes les pièces référencées
+    (parts, inventory_parts, elements), puis renseigne parts.part_id et
+    elements.part_id pour que les jointures se fassent sur des entiers.
+    """
+    print("\n🔢 Encodage entier des pièces...")
+    try:
+        conn.execute("DELETE FROM part_color_keys")
+        conn.execute("DELETE FROM part_keys")
+        conn.execute("""
+            INSERT INTO part_keys
+            SELECT ROW_NUMBER() OVER (ORDER BY part_num) - 1 AS part_id, part_num
+            FROM (
+                SELECT part_num FROM parts
+                UNION SELECT part_num FROM inventory_parts
+                UNION SELECT part_num FROM elements
+            )
+            WHERE part_num IS NOT NULL
+        """)
+        conn.execute("""
+            INSERT INTO part_color_keys
+            SELECT ROW_NUMBER() OVER (ORDER BY k.part_id, pc.color_id) - 1 AS pc_id,
+                   k.part_id, pc.color_id
+            FROM (
+                SELECT part_num, color_id FROM inventory_parts
+                UNION SELECT part_num, color_id FROM elements
+            ) pc
+            JOIN part_keys k ON pc.part_num = k.part_num
+            WHERE pc.color_id IS NOT NULL
+        """)
+        for table in ("parts", "elements"):
+            conn.execute(f"""
+                UPDATE {table} SET part_id = k.part_id
+                FROM part_keys k
+                WHERE {table}.part_num = k.part_num
+            """)
+        for table in ("part_keys", "part_color_keys"):
+            count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            print(f"  {table:20} ✅ {count:,} lignes")
+    except Exception as e:
+        print(f"❌ Erreur: {e}")
+
+
+ELEMENT_IMAGE_URL = "https://cdn.rebrickable.com/media/parts/elements/"
+PART_PHOTO_URL = "https://cdn.rebrickable.com/media/parts/photos/"
+
+
+def build_part_images(conn):
+    """Matérialise les URL d'images des pièces.
+
+    parts.img_url : image d'un élément de la pièce (plus petit element_id)
+    s'il en existe, sinon photo générique de la pièce ; part_color_images :
+    image de l'élément de chaque couple pc_id. Les listes de pièces lisent
+    ces colonnes au lieu d'agréger elements à chaque requête. À appeler
+    après encode_catalog (part_id, pc_id).
+    """
+    print("\n🖼️  Images des pièces...")
+    try:
+        conn.execute(f"""
+            UPDATE parts SET img_url = COALESCE(
+                '{ELEMENT_IMAGE_URL}' || e.element_id || '.jpg',
+                '{PART_PHOTO_URL}' || parts.part_num || '.jpg'
+            )
+            FROM (
+                SELECT p.part_id, MIN(el.element_id) AS element_id
+                FROM parts p
+                LEFT JOIN elements el ON el.part_id = p.part_id
+                GROUP BY p.part_id
+            ) e
+            WHERE parts.part_id = e.part_id
+        """)
+        conn.execute("DELETE FROM part_color_images")
+        conn.execute(f"""
+            INSERT INTO part_color_images
+            SELECT k.pc_id, '{ELEMENT_IMAGE_URL}' || MIN(el.element_id) || '.jpg'
+            FROM elements el
+            JOIN part_color_keys k
+                ON k.part_id = el.part_id AND k.color_id = el.color_id
+            GROUP BY k.pc_id
+            ORDER BY k.pc_id
+        """)
+        for table in ("parts", "part_color_images"):
+            count = conn.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE img_url IS NOT NULL"
+            ).fetchone()[0]
+            print(f"  {table:20} ✅ {count:,} images")
+    except Exception as e:
+        print(f"❌ Erreur: {e}")
+
+
+def build_set_requirements(conn):
+    """Matérialise les besoins en pièces de chaque set.
+
+    Remplit set_requirements (quantité requise par set et couple pc_id, triée
+    sur pc_id : elle sert d'index inversé couple → sets) et
+    set_requirement_totals (nombre de couples distincts par set). Le calcul des sets constructibles lit ces tables au lieu de
+    ré-agréger inventories × inventory_parts à chaque requête.
+    """
+    print("\n🧮 Construction des tables de besoins par set...")
+    try:
+        conn.execute("DELETE FROM set_requirements")
+        conn.execute("DELETE FROM set_requirement_totals")
+        conn.execute("""
+            INSERT INTO set_requirements
+            SELECT i.set_num, k.pc_id, SUM(ip.quantity) AS needed
+            FROM inventories i
+            JOIN inventory_parts ip ON i.id = ip.inventory_id
+            JOIN part_keys pk ON ip.part_num = pk.part_num
+            JOIN part_color_keys k
+                ON k.part_id = pk.part_id AND k.color_id = ip.color_id
+            WHERE ip.is_spare = false
+            GROUP BY i.set_num, k.pc_id
+            ORDER BY k.pc_id, i.set_num
+        """)
+        conn.execute("""
+            INSERT INTO set_requirement_totals
+            SELECT set_num, COUNT(*) AS total
+            FROM set_requirements
+            GROUP BY set_num
+        """)
+        for table in ("set_requirements", "set_requirement_totals"):
+            count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            print(f"  {table:20} ✅ {count:,} lignes")
+    except Exception as e:
+        print(f"❌ Erreur: {e}")
+
+
+def compact_catalog(conn):
+    """Supprime inventory_parts, remplacée par set_requirements.
+
+    L'encodage entier ajoute ses tables à côté des tables Rebrickable : sans
+    ce compactage, le catalogue grossit. Seul build_set_requirements lit
+    inventory_parts (part_num en VARCHAR, une ligne par inventaire et
+    couleur) ; à appeler juste après, pour que les tables construites
+    ensuite (trigrammes, plein texte, embeddings) réutilisent les blocs
+    libérés. Les besoins ne peuvent plus être recalculés sans recharger le
+    catalogue, d'où l'option (CATALOG_COMPACT=1).
+    """
+    print("\n🗜️  Compactage du catalogue...")
+    try:
+        count = conn.execute("SELECT COUNT(*) FROM inventory_parts").fetchone()[0]
+        conn.execute("DROP TABLE inventory_parts")
+        conn.execute("CHECKPOINT")
+        print(f"  inventory_parts      ✅ supprimée ({count:,} lignes)")
+    except Exception as e:
+        print(f"❌ Erreur: {e}")
+
+
+# Table de trigrammes -> (clé, table des noms)
+TRIGRAM_SOURCES = {
+    "set_trigrams": ("set_num", "sets"),
+    "part_trigrams": ("part_num", "parts"),
+}
+
+
+def build_trigram_index(conn):
+    """Construit l'index de trigrammes des noms de sets et de pièces.
+
+    Même découpage que search_dao.name_trigrams : nom en minuscules coupé
+    sur tout ce qui n'est pas [a-z0-9], chaque mot complété de deux espaces
+    devant et d'un derrière ("  lego " -> "  l", " le", "leg", "ego", "go ").
+    """
+    print("\n🔤 Index de trigrammes des noms...")
+    try:
+        for table, (key, source) in TRIGRAM_SOURCES.items():
+            conn.execute(f"DELETE FROM {table}")
+            conn.execute(f"""
+                INSERT INTO {table}
+                WITH words AS (
+                    SELECT {key}, '  ' || word || ' ' AS padded
+                    FROM (
+                        SELECT {key},
+                               unnest(regexp_split_to_array(lower(name), '[^a-z0-9]+')) AS word
+                        FROM {source}
+                    )
+                    WHERE word <> ''
+                ),
+                grams AS (
+                    SELECT DISTINCT {key}, substr(padded, i, 3) AS trigram
+                    FROM (
+                        SELECT {key}, padded, unnest(range(1, length(padded) - 1)) AS i
+                        FROM words
+                    )
+                )
+                SELECT trigram, {key}, COUNT(*) OVER (PARTITION BY {key})
+                FROM grams
+                ORDER BY trigram, {key}
+            """)
+            count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            print(f"  {table:20} ✅ {count:,} lignes")
+    except Exception as e:
+        print(f"❌ Erreur: {e}")
+
+
+def build_search_index(conn):
+    """Construit l'index plein texte (BM25, extension fts) de la recherche.
+
+    Remplit set_documents (nom du set, nom du thème) et part_documents (nom
+    de la pièce, nom de la catégorie), puis les indexe. Ignoré avec un
+    avertissement si l'extension ne peut pas être installée (hors ligne) :
+    la recherche texte passe alors par LIKE.
+    """
+    print("\n🔎 Index plein texte de la recherche...")
+    try:
+        conn.execute("INSTALL fts")
+        conn.execute("LOAD fts")
+    except duckdb.Error as e:
+        print(f"⚠️  Extension fts indisponible, index ignoré ({e})")
+        return
+    try:
+        conn.execute("DELETE FROM set_documents")
+        conn.execute("""
+            INSERT INTO set_documents
+            SELECT s.set_num, s.name, COALESCE(t.name, '')
+            FROM sets s
+            LEFT JOIN themes t ON s.theme_id = t.id
+        """)
+        conn.execute("DELETE FROM part_documents")
+        conn.execute("""
+            INSERT INTO part_documents
+            SELECT p.part_num, p.name, COALESCE(pc.name, '')
+            FROM parts p
+            LEFT JOIN part_categories pc ON p.part_cat_id = pc.id
+        """)
+        conn.execute(
+            "PRAGMA create_fts_index('set_documents', 'set_num', 'name', 'theme', overwrite=1)"
+        )
+        conn.execute(
+            "PRAGMA create_fts_index('part_documents', 'part_num', 'name', 'category', overwrite=1)"
+        )
+        for table in ("set_documents", "part_documents"):
+            count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            print(f"  {table:20} ✅ {count:,} lignes")
+    except Exception as e:
+        print(f"❌ Erreur: {e}")
+
+
+def generate_embeddings_if_available(conn) -> dict | None:
     """Génère les embeddings si fastembed est installé.
 
     Appelé à la fin de l'init — silencieusement ignoré si la dépendance manque.
+    Avec CATALOG_COMPACT et un stockage quantifié (EMBEDDING_STORAGE), la
+    copie quantifiée remplace les vecteurs float32 au lieu de s'y ajouter.
+
+    Returns:
+        Modèle et stockage des vecteurs (voir generate_embeddings), None
+        sans embeddings.
     """
     try:
         from app.database.duckdb.generate_embeddings import generate_embeddings
 
         print("\n📐 Génération des embeddings (fastembed détecté)...")
-        generate_embeddings(conn)
+        return generate_embeddings(conn, keep_float32=not CATALOG_COMPACT)
     except ImportError as e:
         print(
             f"\n⚠️  Embeddings ignorés (ImportError: {e})\n"
             "   Pour les activer : uv add fastembed\n"
             "   puis relancer : python app/database/duckdb/generate_embeddings.py"
         )
+        return None
+
+
+def write_catalog_meta(
+    conn, test_mode: bool = False, embedding_model: dict | None = None
+):
+    """Écrit catalog_meta, une fois le catalogue complet.
+
+    Clés (valeurs JSON) : version (empreinte des tables sources, de la
+    structure du fichier et des embeddings : deux chargements des mêmes
+    données ont la même version ; elle sert de clé à tous les caches du
+    catalogue, voir connexion_duckdb.catalog_version),
+    loaded_at, mode, row_counts (lignes de chaque table), checksums (somme
+    des hash des lignes de chaque table source, et de set_requirements qui
+    la remplace après compact_catalog ; indépendante de l'ordre de
+    chargement) et embedding_model (nom, dimensions, stockage par table,
+    tels que retournés par generate_embeddings ; None sans embeddings).
+    /stats les lit au lieu de compter les lignes.
+    """
+    print("\n🏷️  Métadonnées du catalogue...")
+    try:
+        tables = [
+            r[0]
+            for r in conn.execute("""
+                SELECT table_name FROM duckdb_tables()
+                WHERE schema_name = 'main' AND table_name <> 'catalog_meta'
+                ORDER BY table_name
+            """).fetchall()
+        ]
+        row_counts = {
+            t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in tables
+        }
+        checksums = {
+            t: "{:016x}".format(
+                conn.execute(f"SELECT COALESCE(SUM(hash(r)), 0) FROM {t} r").fetchone()[
+                    0
+                ]
+                % 2**64
+            )
+            for t in [*URLS, "set_requirements"]
+            if t in row_counts
+        }
+        # Tables de tous les schémas (index fts compris) et index (HNSW...) :
+        # les capacités détectées par version en dépendent
+        structure = [
+            r[0]
+            for r in conn.execute("""
+                SELECT schema_name || '.' || table_name FROM duckdb_tables()
+                UNION ALL
+                SELECT schema_name || '.' || index_name FROM duckdb_indexes()
+                ORDER BY 1
+            """).fetchall()
+        ]
+        mode = "test" if test_mode else "production"
+        fingerprint = json.dumps(
+            [mode, checksums, structure, embedding_model], sort_keys=True
+        )
+        meta = {
+            "version": hashlib.sha256(fingerprint.encode()).hexdigest()[:16],
+            "loaded_at": datetime.now(UTC).isoformat(timespec="seconds"),
+            "mode": mode,
+            "row_counts": row_counts,
+            "checksums": checksums,
+            "embedding_model": embedding_model,
+        }
+        conn.execute("DELETE FROM catalog_meta")
+        conn.executemany(
+            "INSERT INTO catalog_meta VALUES (?, ?)",
+            [(key, json.dumps(value)) for key, value in meta.items()],
+        )
+        print(f"  version {meta['version']} ✅ {len(tables)} tables")
+    except Exception as e:
+        print(f"❌ Erreur: {e}")
 
 
 def main(db_file, test_mode: bool = False):
@@ -395,7 +721,15 @@ def main(db_file, test_mode: bool = False):
     else:
         load_data(conn)
 
-    generate_embeddings_if_available(conn)
+    encode_catalog(conn)
+    build_part_images(conn)
+    build_set_requirements(conn)
+    if CATALOG_COMPACT:
+        compact_catalog(conn)
+    build_trigram_index(conn)
+    build_search_index(conn)
+    embedding_model = generate_embeddings_if_available(conn)
+    write_catalog_meta(conn, test_mode, embedding_model)
 
     conn.close()
 
@@ -24,6 +24,8 @@ CREATE TABLE IF NOT EXISTS parts (
     part_num VARCHAR(20) PRIMARY KEY,
     name VARCHAR(250),
     part_cat_id INTEGER,
+    part_id INTEGER, -- clé entière (part_keys), renseignée par encode_catalog
+    img_url VARCHAR, -- image principale, renseignée par build_part_images
     FOREIGN KEY (part_cat_id) REFERENCES part_categories(id)
 );
 
@@ -39,6 +41,7 @@ CREATE TABLE IF NOT EXISTS elements (
     element_id VARCHAR(10) PRIMARY KEY,
     part_num VARCHAR(20),
     color_id INTEGER,
+    part_id INTEGER, -- clé entière (part_keys), renseignée par encode_catalog
     FOREIGN KEY (part_num) REFERENCES parts(part_num),
     FOREIGN KEY (color_id) REFERENCES colors(id)
 );
@@ -98,19 +101,108 @@ CREATE TABLE IF NOT EXISTS inventory_minifigs (
 -- Données dérivées calculées par generate_embeddings.py
 -- Stocke un vecteur FLOAT[384] par set/part (modèle all-MiniLM-L6-v2)
 -- Note : FLOAT[] viole strictement la 1NF mais est requis par l'extension DuckDB VSS.
+-- embedding_q / scale : copie quantifiée optionnelle (int8 + échelle, ou float16),
+-- lue par l'index NumPy ; embedding peut alors être NULL (--drop-float32).
 
 CREATE TABLE IF NOT EXISTS set_embeddings (
     set_num VARCHAR(20) PRIMARY KEY,
     embedding FLOAT[384],
+    embedding_q BLOB,
+    scale FLOAT,
     FOREIGN KEY (set_num) REFERENCES sets(set_num)
 );
 
 CREATE TABLE IF NOT EXISTS part_embeddings (
     part_num VARCHAR(20) PRIMARY KEY,
     embedding FLOAT[384],
+    part_id INTEGER,
+    embedding_q BLOB,
+    scale FLOAT,
     FOREIGN KEY (part_num) REFERENCES parts(part_num)
 );
 
+-- Dictionnaires d'encodage entier des pièces
+-- Données calculées par init_db_lego.py (encode_catalog) après le chargement
+-- Identifiants denses (0..n-1) attribués dans l'ordre de part_num puis color_id :
+-- les jointures internes se font sur ces entiers, les chaînes Rebrickable ne
+-- servent qu'aux entrées/sorties de l'API.
+
+CREATE TABLE IF NOT EXISTS part_keys (
+    part_id INTEGER PRIMARY KEY,
+    part_num VARCHAR(20) UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS part_color_keys (
+    pc_id INTEGER PRIMARY KEY,
+    part_id INTEGER,
+    color_id INTEGER
+);
+
+-- Tables dérivées pour le calcul des sets constructibles
+-- Données calculées par init_db_lego.py (build_set_requirements) après le chargement
+-- Une ligne par (set, couple pièce/couleur) hors pièces de rechange, quantités
+-- agrégées sur toutes les versions d'inventaire. Triée sur pc_id pour que les
+-- jointures avec le stock utilisateur profitent des zone maps DuckDB.
+
+CREATE TABLE IF NOT EXISTS set_requirements (
+    set_num VARCHAR(20),
+    pc_id INTEGER,
+    needed INTEGER
+);
+
+-- Nombre de couples (part_num, color_id) distincts requis par set
+CREATE TABLE IF NOT EXISTS set_requirement_totals (
+    set_num VARCHAR(20) PRIMARY KEY,
+    total INTEGER
+);
+
+-- Documents de la recherche plein texte (index BM25 de l'extension fts)
+-- Données dérivées calculées par init_db_lego.py (build_search_index)
+CREATE TABLE IF NOT EXISTS set_documents (
+    set_num VARCHAR(20) PRIMARY KEY,
+    name VARCHAR,
+    theme VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS part_documents (
+    part_num VARCHAR(20) PRIMARY KEY,
+    name VARCHAR,
+    category VARCHAR
+);
+
+-- Image de chaque couple pièce/couleur qui a un élément (plus petit
+-- element_id de la couleur), calculée par init_db_lego.py (build_part_images)
+CREATE TABLE IF NOT EXISTS part_color_images (
+    pc_id INTEGER PRIMARY KEY, -- couple pièce/couleur (part_color_keys)
+    img_url VARCHAR
+);
+
+-- Index de trigrammes des noms (recherche texte tolérante aux fautes de frappe)
+-- Données dérivées calculées par init_db_lego.py (build_trigram_index)
+-- Une ligne par (trigramme, nom) ; n : nombre de trigrammes distincts du nom.
+-- Triées sur trigram : une recherche ne lit que les row groups de ses
+-- trigrammes (zone maps DuckDB).
+CREATE TABLE IF NOT EXISTS set_trigrams (
+    trigram VARCHAR(3),
+    set_num VARCHAR(20),
+    n INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS part_trigrams (
+    trigram VARCHAR(3),
+    part_num VARCHAR(20),
+    n INTEGER
+);
+
+-- Métadonnées du catalogue, une ligne par clé (valeur JSON) : version,
+-- date de chargement, lignes par table, empreintes des tables sources,
+-- modèle d'embedding. Écrites en dernier par init_db_lego.py
+-- (write_catalog_meta) ; /stats les lit au lieu de compter les lignes.
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key VARCHAR PRIMARY KEY,
+    value VARCHAR
+);
+
 -- Index pour améliorer les performances
 
 CREATE INDEX IF NOT EXISTS idx_parts_cat ON parts(part_cat_id);
@@ -123,4 +215,6 @@ CREATE INDEX IF NOT EXISTS idx_inv_parts_inv ON inventory_parts(inventory_id);
 CREATE INDEX IF NOT EXISTS idx_inv_parts_part ON inventory_parts(part_num);
 CREATE INDEX IF NOT EXISTS idx_inv_parts_color ON inventory_parts(color_id);
 CREATE INDEX IF NOT EXISTS idx_inv_sets_inv ON inventory_sets(inventory_id);
-CREATE INDEX IF NOT EXISTS idx_inv_minifigs_inv ON inventory_minifigs(inventory_id);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_inv_minifigs_inv ON inventory_minifigs(inventory_id);
+CREATE INDEX IF NOT EXISTS idx_part_color_keys ON part_color_keys(part_id, color_id);
+CREATE INDEX IF NOT EXISTS idx_set_req_set ON set_requirements(set_num);
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Pool de connexions PostgreSQL asynchrone (asyncpg) pour les routes async
+de l'API (API_MODE=async)
+"""
+
+import asyncio
+from functools import cache
+
+import asyncpg
+
+from app.database.connexion_postgresql import PG_CONFIG
+from app.database.pg_pool import PG_POOL_MAX, PG_POOL_MIN, PG_POOL_TIMEOUT, PoolError
+
+
+_pool: asyncpg.Pool | None = None
+_pool_lock = asyncio.Lock()
+
+
+async def get_async_pool() -> asyncpg.Pool:
+    """Pool asyncpg du process, mêmes réglages PG_POOL_* que le pool synchrone.
+
+    Créé au premier appel (normalement au démarrage de l'application).
+
+    Raises:
+        PoolError: si PostgreSQL est injoignable.
+    """
+    global _pool
+    async with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = await asyncpg.create_pool(
+                    host=PG_CONFIG["host"],
+                    port=int(PG_CONFIG["port"]),
+                    database=PG_CONFIG["database"],
+                    user=PG_CONFIG["user"],
+                    password=PG_CONFIG["password"],
+                    min_size=PG_POOL_MIN,
+                    max_size=PG_POOL_MAX,
+                    timeout=PG_POOL_TIMEOUT,
+                )
+            except (OSError, asyncpg.PostgresError, TimeoutError) as e:
+                raise PoolError("PostgreSQL inaccessible") from e
+        return _pool
+
+
+async def acquire_async(pool: asyncpg.Pool, timeout: float = PG_POOL_TIMEOUT):
+    """Emprunte une connexion (à rendre avec pool.release).
+
+    Raises:
+        PoolError: si aucune connexion n'est libre après `timeout` secondes,
+            ou si l'ouverture d'une connexion échoue.
+    """
+    try:
+        return await pool.acquire(timeout=timeout)
+    except TimeoutError as e:
+        raise PoolError(
+            f"Aucune connexion PostgreSQL libre après {timeout:g} s "
+            f"({pool.get_max_size()} en cours d'utilisation)"
+        ) from e
+    except (OSError, asyncpg.PostgresError) as e:
+        raise PoolError("PostgreSQL inaccessible") from e
+
+
+async def close_async_pool() -> None:
+    """Ferme le pool asyncpg (arrêt de l'application)."""
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            await _pool.close()
+        _pool = None
+
+
+def async_pool_stats() -> dict | None:
+    """Taille et occupation du pool asyncpg, None s'il n'est pas ouvert."""
+    if _pool is None:
+        return None
+    idle = _pool.get_idle_size()
+    size = _pool.get_size()
+    return {
+        "size": size,
+        "min_size": _pool.get_min_size(),
+        "max_size": _pool.get_max_size(),
+        "idle": idle,
+        "in_use": size - idle,
+    }
+
+
+def affected_rows(status: str) -> int:
+    """Nombre de lignes touchées d'après le statut renvoyé par execute
+    (ex. "DELETE 1", "UPDATE 0", "INSERT 0 1")."""
+    return int(status.rsplit(" ", 1)[-1])
+
+
+@cache
+def numbered(query: str) -> str:
+    """Requête psycopg2 (paramètres %s) au format asyncpg ($1, $2...) : les
+    DAO async exécutent ainsi les requêtes de leur version synchrone."""
+    parts = query.split("%s")
+    return "".join(f"{part}${i}" for i, part in enumerate(parts[:-1], 1)) + parts[-1]
@@ -0,0 +1,285 @@
+"""
+Pool de connexions PostgreSQL partagé par les requêtes de l'API
+"""
+
+from collections import deque
+from contextlib import suppress
+import os
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
+
+from app.database.connexion_postgresql import PG_CONFIG
+
+
+PG_POOL_MIN = int(os.getenv("PG_POOL_MIN", "1"))
+PG_POOL_MAX = int(os.getenv("PG_POOL_MAX", "10"))
+PG_POOL_TIMEOUT = float(os.getenv("PG_POOL_TIMEOUT", "5"))
+PG_POOL_CHECK_INTERVAL = float(os.getenv("PG_POOL_CHECK_INTERVAL", "30"))
+
+
+class PoolError(ConnectionError):
+    """Aucune connexion obtenue (serveur injoignable ou délai dépassé)."""
+
+
+class PgPool:
+    """Pool borné de connexions PostgreSQL, sûr entre threads.
+
+    - acquire / release : emprunt d'une connexion, en attendant au plus
+      `timeout` secondes qu'une connexion se libère quand `max_size` sont
+      déjà ouvertes ;
+    - un thread de fond vérifie les connexions libres (SELECT 1) toutes les
+      `check_interval` secondes et rouvre jusqu'à `min_size` connexions :
+      aucune requête ne paie ce contrôle.
+
+    Une connexion fermée (serveur redémarré, réseau coupé) est écartée au
+    retour dans le pool.
+    """
+
+    def __init__(
+        self,
+        connect,
+        min_size: int = PG_POOL_MIN,
+        max_size: int = PG_POOL_MAX,
+        timeout: float = PG_POOL_TIMEOUT,
+        check_interval: float = PG_POOL_CHECK_INTERVAL,
+    ):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError(
+                f"Taille de pool invalide : min={min_size}, max={max_size}"
+            )
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self._idle: deque = deque()
+        self._size = 0  # connexions ouvertes (libres + empruntées + en contrôle)
+        self._checking = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._checker: threading.Thread | None = None
+        # Métriques
+        self.acquired = 0
+        self.timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # ------------------------------------------------------------------
+    # Emprunt / retour
+    # ------------------------------------------------------------------
+
+    def acquire(self, timeout: float | None = None):
+        """Emprunte une connexion (à rendre avec release).
+
+        Raises:
+            PoolError: si aucune connexion n'est libre après `timeout`
+                secondes, ou si l'ouverture d'une connexion échoue.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._idle:
+                        conn = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        conn = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise PoolError(
+                            f"Aucune connexion PostgreSQL libre après {timeout:g} s "
+                            f"({self.max_size} en cours d'utilisation)"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+        if conn is None:
+            conn = self._open()
+        self._record_wait(time.monotonic() - start)
+        return conn
+
+    def release(self, conn) -> None:
+        """Rend une connexion au pool (annule une transaction restée ouverte)."""
+        if not conn.closed:
+            try:
+                status = conn.get_transaction_status()
+                if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                pass
+        with self._cond:
+            if conn.closed or self._stop.is_set():
+                self._size -= 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+        if self._stop.is_set():
+            self._close(conn)
+
+    # ------------------------------------------------------------------
+    # Contrôle de santé
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Démarre le thread de contrôle (idempotent)."""
+        with self._cond:
+            if self._checker is not None:
+                return
+            self._checker = threading.Thread(
+                target=self._run_checks, name="pg-pool-check", daemon=True
+            )
+        self._checker.start()
+
+    def check(self) -> None:
+        """Vérifie chaque connexion libre puis complète jusqu'à min_size."""
+        with self._cond:
+            to_check = len(self._idle)
+        for _ in range(to_check):
+            with self._cond:
+                if not self._idle:
+                    break
+                # La plus anciennement rendue (acquire reprend la plus récente)
+                conn = self._idle.popleft()
+                self._checking += 1
+            keep = self._ping(conn) and not self._stop.is_set()
+            with self._cond:
+                self._checking -= 1
+                if keep:
+                    self._idle.append(conn)
+                else:
+                    self._size -= 1
+                self._cond.notify()
+            if not keep:
+                self._close(conn)
+
+        while True:
+            with self._cond:
+                if self._size >= self.min_size or self._stop.is_set():
+                    return
+                self._size += 1
+            try:
+                conn = self._open()
+            except PoolError:
+                return  # serveur injoignable : nouvel essai au prochain contrôle
+            self.release(conn)
+
+    def _run_checks(self) -> None:
+        self.check()
+        while not self._stop.wait(self.check_interval):
+            self.check()
+
+    @staticmethod
+    def _ping(conn) -> bool:
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    # ------------------------------------------------------------------
+    # Ouverture / fermeture
+    # ------------------------------------------------------------------
+
+    def _open(self):
+        """Ouvre une connexion ; la place réservée dans _size est libérée en cas d'échec."""
+        try:
+            return self._connect()
+        except Exception as e:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise PoolError("PostgreSQL inaccessible") from e
+
+    @staticmethod
+    def _close(conn) -> None:
+        with suppress(psycopg2.Error):
+            conn.close()
+
+    def close(self) -> None:
+        """Arrête le contrôle et ferme les connexions libres.
+
+        Les connexions encore empruntées sont fermées à leur retour.
+        """
+        self._stop.set()
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._close(conn)
+        if (
+            self._checker is not None
+            and self._checker is not threading.current_thread()
+        ):
+            self._checker.join(timeout=1)
+
+    # ------------------------------------------------------------------
+    # Métriques
+    # ------------------------------------------------------------------
+
+    def _record_wait(self, wait: float) -> None:
+        with self._cond:
+            self.acquired += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+    def stats(self) -> dict:
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self._size,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "idle": idle,
+                "in_use": self._size - idle - self._checking,
+                "waiting": self._waiting,
+                "acquired": self.acquired,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(1000 * self._wait_total / self.acquired, 3)
+                if self.acquired
+                else 0.0,
+                "wait_ms_max": round(1000 * self._wait_max, 3),
+            }
+
+
+def _connect():
+    return psycopg2.connect(**PG_CONFIG, cursor_factory=psycopg2.extras.RealDictCursor)
+
+
+_pool: PgPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pg_pool() -> PgPool:
+    """Pool process-wide configuré par PG_POOL_* (créé et démarré au premier appel)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PgPool(_connect)
+            _pool.start()
+        return _pool
+
+
+def close_pg_pool() -> None:
+    """Ferme le pool process-wide (arrêt de l'application)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = None
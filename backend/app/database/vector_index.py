@@ -0,0 +1,291 @@
+"""
+Index vectoriel exact en mémoire (NumPy) sur les tables d'embeddings, pour la
+recherche sémantique sans l'extension DuckDB VSS
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from app.database.connexion_duckdb import catalog_version
+
+
+# auto : index NumPy si VSS ne se charge pas ; numpy : toujours ; off : jamais
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "auto")
+# int8 et float16 divisent la mémoire par quatre et par deux (voir quantize)
+VECTOR_INDEX_DTYPE = os.getenv("VECTOR_INDEX_DTYPE", "float32")
+# Index quantifié : k × VECTOR_RERANK candidats relus en float32 puis reclassés
+VECTOR_RERANK = int(os.getenv("VECTOR_RERANK", "4"))
+# Lignes converties en float32 à la fois lors d'un parcours quantifié
+SCORE_CHUNK = 8192
+
+DIMS = 384
+
+QUANTIZED_FORMATS = {"int8": np.int8, "float16": np.float16}
+
+# Table d'embeddings -> (clé, requête de chargement : clé, attributs filtrables,
+# vecteur ; {vector} vaut embedding, ou embedding_q et scale)
+SOURCES = {
+    "set_embeddings": (
+        "set_num",
+        """
+        SELECT v.set_num, s.theme_id, s.year, {vector}
+        FROM set_embeddings v JOIN sets s ON v.set_num = s.set_num
+        """,
+    ),
+    "part_embeddings": (
+        "part_id",
+        """
+        SELECT v.part_id, p.part_cat_id, {vector}
+        FROM part_embeddings v JOIN parts p ON v.part_id = p.part_id
+        """,
+    ),
+}
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    """Lignes ramenées à une norme 1 (les lignes nulles restent nulles)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1)
+
+
+def quantize(matrix: np.ndarray, fmt: str) -> tuple[np.ndarray, np.ndarray | None]:
+    """Normalise puis quantifie des vecteurs.
+
+    int8 : quantification scalaire symétrique, une échelle par vecteur
+    (max |x| / 127) ; float16 : simple conversion, sans échelle.
+
+    Returns:
+        (codes, échelles) ; vecteur ≈ codes * échelle.
+    """
+    unit = normalize(matrix)
+    if fmt == "float16":
+        return unit.astype(np.float16), None
+    if fmt != "int8":
+        raise ValueError(f"Format de quantification inconnu : {fmt}")
+    scales = np.abs(unit).max(axis=1) / 127
+    scales[scales == 0] = 1
+    codes = np.round(unit / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize(codes: np.ndarray, scales: np.ndarray | None) -> np.ndarray:
+    vectors = codes.astype(np.float32)
+    return vectors if scales is None else vectors * scales[:, None]
+
+
+def stored_format(conn, table: str) -> str | None:
+    """Format des vecteurs quantifiés de `table` (colonne embedding_q, voir
+    generate_embeddings), None s'il n'y en a pas."""
+    try:
+        row = conn.execute(
+            f"SELECT octet_length(embedding_q) FROM {table} "
+            "WHERE embedding_q IS NOT NULL LIMIT 1"
+        ).fetchone()
+    except Exception:
+        return None
+    if row is None:
+        return None
+    for fmt, dtype in QUANTIZED_FORMATS.items():
+        if row[0] == DIMS * np.dtype(dtype).itemsize:
+            return fmt
+    return None
+
+
+class VectorIndex:
+    """Vecteurs d'une table d'embeddings dans une matrice contiguë normalisée.
+
+    La recherche est exacte en float32 : un produit matrice-vecteur donne la
+    similarité cosinus de toutes les lignes (ou des seules lignes d'un
+    masque de filtre), argpartition garde les k meilleures. Les distances
+    renvoyées sont des distances L2 entre vecteurs normalisés, comparables
+    à array_distance pour les embeddings normalisés du modèle.
+
+    Quantifiée (int8 avec une échelle par ligne, ou float16), la matrice est
+    parcourue par blocs convertis en float32 ; les k × VECTOR_RERANK
+    meilleurs candidats sont ensuite reclassés sur leurs vecteurs float32
+    si on les fournit (exact_vectors).
+    """
+
+    def __init__(
+        self,
+        keys: np.ndarray,
+        matrix: np.ndarray,
+        attrs: dict[str, np.ndarray],
+        scales: np.ndarray | None = None,
+    ):
+        self.keys = keys
+        self.matrix = matrix
+        self.attrs = attrs
+        self.scales = scales
+
+    @classmethod
+    def load(
+        cls, duckdb_conn, table: str, dtype: str = VECTOR_INDEX_DTYPE
+    ) -> "VectorIndex":
+        """Charge `table` (voir SOURCES) depuis DuckDB.
+
+        Des vecteurs stockés quantifiés sont chargés tels quels ; sinon les
+        vecteurs float32 sont normalisés puis convertis en `dtype`.
+        """
+        key, sql = SOURCES[table]
+        with duckdb_conn.cursor() as cur:
+            fmt = stored_format(cur, table)
+            vector = "v.embedding_q, v.scale" if fmt else "v.embedding"
+            columns = cur.execute(sql.format(vector=vector)).fetchnumpy()
+        keys = np.asarray(columns.pop(key))
+        if fmt:
+            blobs = columns.pop("embedding_q")
+            scales = columns.pop("scale")
+            scales = np.asarray(scales, np.float32) if fmt == "int8" else None
+            matrix = np.frombuffer(b"".join(blobs), dtype=QUANTIZED_FORMATS[fmt])
+            matrix = matrix.reshape(len(keys), -1)
+        else:
+            vectors = columns.pop("embedding")
+            matrix = (
+                np.stack(vectors) if len(vectors) else np.empty((0, DIMS), np.float32)
+            )
+            if dtype in QUANTIZED_FORMATS:
+                matrix, scales = quantize(matrix, dtype)
+            else:
+                matrix, scales = normalize(matrix).astype(dtype), None
+        attrs = {name: np.asarray(values) for name, values in columns.items()}
+        return cls(keys, np.ascontiguousarray(matrix), attrs, scales)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + (0 if self.scales is None else self.scales.nbytes)
+
+    @property
+    def exact(self) -> bool:
+        """Scores exacts (float32), sans reclassement nécessaire."""
+        return self.matrix.dtype == np.float32 and self.scales is None
+
+    def mask(self, **conditions) -> np.ndarray | None:
+        """Masque des lignes qui vérifient toutes les conditions, None sans condition.
+
+        Chaque condition est nom_attribut=valeur (égalité), nom_attribut__ge
+        ou nom_attribut__le (bornes incluses), ou nom_attribut__in=clés.
+        """
+        mask = None
+        for name, value in conditions.items():
+            if value is None:
+                continue
+            attr, _, op = name.partition("__")
+            column = self.keys if attr == "key" else self.attrs[attr]
+            if op == "ge":
+                cond = column >= value
+            elif op == "le":
+                cond = column <= value
+            elif op == "in":
+                cond = np.isin(column, np.asarray(value))
+            else:
+                cond = column == value
+            mask = cond if mask is None else mask & cond
+        return mask
+
+    def search(
+        self,
+        vector,
+        k: int,
+        mask: np.ndarray | None = None,
+        exact_vectors=None,
+    ) -> list[tuple[object, float]]:
+        """[(clé, distance)] des k lignes les plus proches de `vector`, par distance croissante.
+
+        Args:
+            exact_vectors: fonction clés -> {clé: vecteur float32} utilisée
+                pour reclasser les candidats d'un index quantifié.
+        """
+        if len(self) == 0 or k <= 0:
+            return []
+        query = normalize(vector)
+        rows = None if mask is None else np.flatnonzero(mask)
+        scores = self._scores(query, rows)
+        if len(scores) == 0:
+            return []
+        rerank = exact_vectors is not None and not self.exact
+        top = _top(scores, k * VECTOR_RERANK if rerank else k)
+        picked = top if rows is None else rows[top]
+        keys = self.keys[picked].tolist()
+        if rerank:
+            vectors = exact_vectors(keys)
+            exact = np.array(
+                [
+                    normalize(vectors[key]) @ query if key in vectors else score
+                    for key, score in zip(keys, scores[top].tolist(), strict=True)
+                ],
+                dtype=np.float32,
+            )
+            order = _top(exact, k)
+            keys, similarities = [keys[i] for i in order], exact[order]
+        else:
+            similarities = scores[top]
+        distances = np.sqrt(np.maximum(0.0, 2.0 - 2.0 * similarities))
+        return list(zip(keys, distances.tolist(), strict=True))
+
+    def _scores(self, query: np.ndarray, rows: np.ndarray | None) -> np.ndarray:
+        """Similarité de `query` avec chaque ligne (ou les lignes `rows`)."""
+        if self.exact:
+            candidates = self.matrix if rows is None else self.matrix[rows]
+            return candidates @ query
+        n = len(self) if rows is None else len(rows)
+        scores = np.empty(n, dtype=np.float32)
+        for start in range(0, n, SCORE_CHUNK):
+            stop = min(n, start + SCORE_CHUNK)
+            block = (
+                self.matrix[start:stop]
+                if rows is None
+                else self.matrix[rows[start:stop]]
+            )
+            scores[start:stop] = block.astype(np.float32) @ query
+        if self.scales is not None:
+            scores *= self.scales if rows is None else self.scales[rows]
+        return scores
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices des k plus grands scores, du meilleur au moins bon."""
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+_index_cache: dict[tuple[str, str], VectorIndex] = {}
+_index_lock = threading.Lock()
+
+
+def get_vector_index(duckdb_conn, table: str) -> VectorIndex:
+    """Index de `table` pour le catalogue courant, chargé une seule fois par version.
+
+    Une base en mémoire (sans version) est rechargée à chaque appel.
+    """
+    version = catalog_version(duckdb_conn)
+    if version is None:
+        return VectorIndex.load(duckdb_conn, table)
+    with _index_lock:
+        index = _index_cache.get((version, table))
+        if index is None:
+            for cached in [k for k in _index_cache if k[0] != version]:
+                del _index_cache[cached]  # une seule version du catalogue à la fois
+            index = VectorIndex.load(duckdb_conn, table)
+            _index_cache[(version, table)] = index
+        return index
+
+
+def vector_index_stats() -> list[dict]:
+    """Index chargés (table, lignes, format, mémoire) pour les diagnostics."""
+    return [
+        {
+            "table": table,
+            "rows": len(index),
+            "dtype": str(index.matrix.dtype),
+            "mb": round(index.nbytes / 1e6, 1),
+        }
+        for (_, table), index in list(_index_cache.items())
+    ]
@@ -0,0 +1,280 @@
+"""Cache des résultats de BuildableService.get_buildable_sets.
+
+Une entrée est identifiée par (user_id, limit, version du stock, version du
+catalogue). La version du catalogue est catalog_meta.version (voir
+catalog_version) : un catalogue rechargé avec les mêmes données garde les
+entrées du backend file. La version du stock d'un utilisateur est incrémentée par chaque
+écriture de UserPartsService et de CollectionService (add_set, remove_set,
+mark_built) : les anciennes entrées ne sont plus jamais lues et finissent
+évincées par le LRU.
+
+Backend choisi par la variable d'environnement BUILDABLE_CACHE :
+
+- memory : dans le process (défaut avec un seul worker) ; refusé si
+           WEB_CONCURRENCY > 1, les versions de stock d'un worker étant
+           invisibles des autres ;
+- file   : base SQLite locale (BUILDABLE_CACHE_PATH, sous app/cache par
+           défaut) partagée par tous les workers de la machine (défaut si
+           WEB_CONCURRENCY > 1) ; la placer dans un dossier de
+           l'application sous /dev/shm pour la garder en mémoire partagée ;
+- off    : pas de cache.
+"""
+
+from dataclasses import asdict
+import json
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+from app.business_object.buildable_set import BuildableSet
+from app.utils.lru_cache import LRUCache
+
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))  # workers uvicorn
+BUILDABLE_CACHE = os.getenv(
+    "BUILDABLE_CACHE", "file" if WEB_CONCURRENCY > 1 else "memory"
+)
+BUILDABLE_CACHE_SIZE = int(os.getenv("BUILDABLE_CACHE_SIZE", "1024"))
+BUILDABLE_CACHE_PATH = os.getenv(
+    "BUILDABLE_CACHE_PATH",
+    str(Path(__file__).parents[1] / "cache" / "buildable_cache.sqlite"),
+)
+
+
+def dump_result(result: dict[str, list[BuildableSet]]) -> str:
+    """Résultat de get_buildable_sets (palier → BuildableSet) en JSON."""
+    return json.dumps(
+        {bucket: [asdict(s) for s in sets] for bucket, sets in result.items()}
+    )
+
+
+def load_result(data: str) -> dict[str, list[BuildableSet]]:
+    """Inverse de dump_result."""
+    return {
+        bucket: [BuildableSet.from_dict(s) for s in sets]
+        for bucket, sets in json.loads(data).items()
+    }
+
+
+class MemoryCacheBackend:
+    """Backend dans le process : LRU en mémoire et versions dans un dict."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = BUILDABLE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = LRUCache(max_entries)
+        self._versions: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        return self._entries.get(key)
+
+    def put(self, key: str, value) -> None:
+        self._entries.put(key, value)
+
+    def stock_version(self, user_id: int) -> int:
+        return self._versions.get(user_id, 0)
+
+    def bump(self, user_id: int) -> None:
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteCacheBackend:
+    """Backend fichier : entrées et versions dans une base SQLite locale.
+
+    Tous les workers qui ouvrent le même fichier partagent le cache et les
+    versions de stock. Les valeurs (résultats de get_buildable_sets) sont
+    écrites en JSON (voir dump_result) : le fichier ne contient que des
+    données, jamais du code exécuté à la lecture. L'éviction LRU se fait
+    sur la date du dernier accès.
+    """
+
+    name = "file"
+
+    def __init__(
+        self, path: str = BUILDABLE_CACHE_PATH, max_entries: int = BUILDABLE_CACHE_SIZE
+    ):
+        self.path = str(path)
+        self.max_entries = max_entries
+        Path(self.path).parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key       TEXT PRIMARY KEY,
+                value     TEXT NOT NULL,
+                last_used INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries (last_used)"
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS stock_versions (
+                user_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+            """
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        """Connexion SQLite propre au thread courant (autocommit)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        conn = self._conn()
+        row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE entries SET last_used = ? WHERE key = ?", (time.time_ns(), key)
+        )
+        return load_result(row[0])
+
+    def put(self, key: str, value) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+            (key, dump_result(value), time.time_ns()),
+        )
+        conn.execute(
+            """
+            DELETE FROM entries WHERE key IN (
+                SELECT key FROM entries ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+
+    def stock_version(self, user_id: int) -> int:
+        row = (
+            self._conn()
+            .execute("SELECT version FROM stock_versions WHERE user_id = ?", (user_id,))
+            .fetchone()
+        )
+        return row[0] if row else 0
+
+    def bump(self, user_id: int) -> None:
+        self._conn().execute(
+            """
+            INSERT INTO stock_versions VALUES (?, 1)
+            ON CONFLICT (user_id) DO UPDATE SET version = version + 1
+            """,
+            (user_id,),
+        )
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM entries")
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+class BuildableCache:
+    """Cache des sets constructibles par utilisateur, au-dessus d'un backend.
+
+    Les compteurs de succès/échecs sont propres au process.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, user_id: int, limit: int, catalog: str) -> str:
+        stock = self.backend.stock_version(user_id)
+        return f"{user_id}:{limit}:{stock}:{catalog}"
+
+    def get_or_compute(self, user_id: int, limit: int, catalog: str, compute):
+        """Retourne le résultat en cache, ou l'obtient via `compute()` et le stocke."""
+        key = self.key(user_id, limit, catalog)
+        result = self.backend.get(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if result is None:
+            result = compute()
+            self.backend.put(key, result)
+        return result
+
+    def stock_version(self, user_id: int) -> int:
+        return self.backend.stock_version(user_id)
+
+    def bump_stock_version(self, user_id: int) -> None:
+        """Invalide les résultats en cache de l'utilisateur."""
+        self.backend.bump(user_id)
+
+    def clear(self) -> None:
+        self.backend.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "size": len(self.backend),
+            "max_entries": self.backend.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+BACKENDS = {
+    "memory": MemoryCacheBackend,
+    "file": SqliteCacheBackend,
+}
+
+_cache: BuildableCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_buildable_cache() -> BuildableCache | None:
+    """Cache process-wide configuré par BUILDABLE_CACHE (None si désactivé)."""
+    global _cache
+    if BUILDABLE_CACHE == "off":
+        return None
+    if BUILDABLE_CACHE not in BACKENDS:
+        raise ValueError(
+            f"Backend de cache inconnu : {BUILDABLE_CACHE!r} "
+            f"(attendu : {', '.join(BACKENDS)} ou off)"
+        )
+    if BUILDABLE_CACHE == "memory" and WEB_CONCURRENCY > 1:
+        raise ValueError(
+            f"BUILDABLE_CACHE=memory avec WEB_CONCURRENCY={WEB_CONCURRENCY} : "
+            "chaque worker garderait ses propres versions de stock "
+            "(utiliser file ou off)"
+        )
+    with _cache_lock:
+        if _cache is None:
+            _cache = BuildableCache(BACKENDS[BUILDABLE_CACHE]())
+        return _cache
+
+
+def bump_stock_version(user_id: int) -> None:
+    """À appeler après toute écriture qui modifie le stock d'un utilisateur."""
+    cache = get_buildable_cache()
+    if cache is not None:
+        cache.bump_stock_version(user_id)
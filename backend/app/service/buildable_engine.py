@@ -0,0 +1,434 @@
+"""Moteurs de calcul de couverture pour les sets constructibles.
+
+Deux implémentations interchangeables, choisies par la variable
+d'environnement BUILDABLE_ENGINE (ou le paramètre `engine` du service) :
+
+- sql    : le stock est enregistré dans DuckDB comme vue sur ses tableaux
+           NumPy et le classement est fait en SQL sur set_requirements.
+- matrix : la matrice creuse set × pc_id est chargée une fois par catalogue
+           en mémoire (format CSC NumPy, c'est-à-dire un index inversé
+           pc_id → sets) et seules les colonnes des couples possédés sont
+           lues : le coût suit la taille du stock, pas celle du catalogue.
+
+Le stock est un UserStock : colonnes pc_id (clés entières de part_color_keys)
+et quantité.
+Les deux moteurs renvoient le même résultat : un dict palier → list[BuildableSet].
+"""
+
+from dataclasses import dataclass
+import os
+import threading
+
+import numpy as np
+
+from app.business_object.buildable_set import BuildableSet
+from app.business_object.user_stock import UserStock
+from app.database.connexion_duckdb import catalog_version
+
+
+BUILDABLE_ENGINE = os.getenv("BUILDABLE_ENGINE", "sql")
+
+# Nombre minimum de couples pièce/couleur pour qu'un set soit proposé
+MIN_TOTAL = 5
+
+# Paliers de complétion, du plus exigeant au moins exigeant. Un set est classé
+# dans le premier palier dont il atteint le seuil ; 100 % signifie que tous les
+# couples (part_num, color_id) sont couverts. Ajouter un palier ne coûte pas de
+# requête supplémentaire.
+BUCKETS: tuple[tuple[str, float], ...] = (
+    ("buildable", 100.0),
+    ("partial", 80.0),
+)
+
+_SET_COLS = ["set_num", "name", "year", "theme_id", "num_parts", "img_url"]
+
+
+# ----------------------------------------------------------------------
+# Moteur SQL (DuckDB)
+# ----------------------------------------------------------------------
+
+# Colonnes SQL aliasées pour coller aux champs de BuildableSet
+_SELECT_COLS = """
+    c.set_num, s.name, s.year, s.theme_id, s.num_parts, s.img_url,
+    c.covered                                          AS parts_owned,
+    c.total                                            AS total_parts_needed,
+    ROUND(100.0 * c.covered / c.total, 1)              AS completion_percentage,
+    (c.total - c.covered)                              AS missing_parts_count
+"""
+
+# Seuil du palier le moins exigeant : un set dont les couples en commun avec le
+# stock ne peuvent pas atteindre ce seuil n'apparaîtra dans aucun palier.
+MIN_PCT = min(threshold for _, threshold in BUCKETS)
+
+# set_requirements est triée par pc_id (index inversé pc_id → sets) : seules les
+# lignes des couples présents dans le stock sont lues. Les sets sans aucun couple
+# en commun sont absents de `hits` (0 % < MIN_PCT, ils ne seraient jamais
+# classés) et la borne `matched` écarte, avant la jointure avec sets, ceux qui
+# ne peuvent pas atteindre MIN_PCT même si tous les couples communs étaient
+# couverts (covered <= matched).
+_STRICT_CTE = f"""
+    WITH hits AS (
+        SELECT r.set_num,
+               COUNT(*)                                    AS matched,
+               COUNT(*) FILTER (WHERE up.qty >= r.needed)  AS covered
+        FROM _user_parts up
+        JOIN set_requirements r ON r.pc_id = up.pc_id
+        GROUP BY r.set_num
+    ),
+    coverage AS (
+        SELECT h.set_num, t.total, h.covered
+        FROM hits h
+        JOIN set_requirement_totals t ON t.set_num = h.set_num
+        WHERE ROUND(100.0 * h.matched / t.total, 1) >= {MIN_PCT}
+    )
+"""
+
+
+class SqlBuildableEngine:
+    """Classement des sets en une seule requête DuckDB.
+
+    Le stock est enregistré comme vue _user_parts, puis chaque set
+    est classé dans un palier (BUCKETS) et seuls les meilleurs de chaque
+    palier sont gardés (ROW_NUMBER par palier).
+
+    Chaque appel travaille sur son propre curseur : la vue n'est visible que
+    de cet appel, et plusieurs threads peuvent partager la même connexion.
+    """
+
+    def __init__(self, duckdb_conn):
+        self.duck = duckdb_conn
+
+    def rank(
+        self, stock: UserStock, exclude_nums: list[str], limit: int
+    ) -> dict[str, list[BuildableSet]]:
+        with self.duck.cursor() as cur:
+            # Vue sur les tableaux du stock : ni copie ni INSERT ligne à ligne
+            cur.register("_user_parts", stock.to_frame())
+            return self._query_buckets(cur, exclude_nums, limit)
+
+    def _make_exclude(self, nums: list[str]) -> tuple[str, list]:
+        """Retourne (clause_sql, params) excluant les sets déjà possédés.
+
+        Clause vide si la collection est vide : un NOT IN (NULL) ne serait
+        jamais vrai et masquerait tous les sets.
+        """
+        if not nums:
+            return "", []
+        return f"AND c.set_num NOT IN ({', '.join(['?'] * len(nums))})", nums
+
+    def _bucket_case(self) -> str:
+        """Expression SQL CASE qui associe chaque set à son palier."""
+        whens = []
+        for name, threshold in BUCKETS:
+            if threshold >= 100:
+                condition = "c.covered = c.total"
+            else:
+                condition = f"ROUND(100.0 * c.covered / c.total, 1) >= {threshold}"
+            whens.append(f"WHEN {condition} THEN '{name}'")
+        return f"CASE {' '.join(whens)} END"
+
+    def _query_buckets(self, cur, exclude_nums: list[str], limit: int) -> dict:
+        """Classe tous les sets en une seule passe et garde le top `limit` par palier."""
+        exclude_sql, ex_params = self._make_exclude(exclude_nums)
+        rows = cur.execute(
+            f"""
+            {_STRICT_CTE},
+            classified AS (
+                SELECT {_SELECT_COLS}, {self._bucket_case()} AS bucket
+                FROM coverage c
+                JOIN sets s ON c.set_num = s.set_num
+                WHERE c.total >= {MIN_TOTAL}
+                  {exclude_sql}
+            ),
+            ranked AS (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY bucket
+                    ORDER BY completion_percentage DESC, num_parts DESC, set_num
+                ) AS bucket_rank
+                FROM classified
+                WHERE bucket IS NOT NULL
+            )
+            SELECT * FROM ranked
+            WHERE bucket_rank <= ?
+            ORDER BY bucket, bucket_rank
+            """,
+            ex_params + [limit],
+        ).fetchall()
+
+        col_names = [d[0] for d in cur.description]
+        result: dict[str, list[BuildableSet]] = {name: [] for name, _ in BUCKETS}
+        for row in rows:
+            data = dict(zip(col_names, row, strict=False))
+            result[data["bucket"]].append(BuildableSet.from_dict(data))
+        return result
+
+
+# ----------------------------------------------------------------------
+# Moteur matriciel (NumPy, en mémoire)
+# ----------------------------------------------------------------------
+
+
+@dataclass
+class RequirementMatrix:
+    """Matrice creuse set × pc_id au format CSC : index inversé pc_id → sets.
+
+    Les lignes sont les sets (triés par set_num, les sets absents de la table
+    sets sont ignorés comme dans la jointure SQL) ; la colonne j décrit les
+    sets qui requièrent le couple pc_id = j : set_rows[col_ptr[j]:col_ptr[j + 1]]
+    sont leurs indices de ligne et needed[...] les quantités requises.
+    Seules les colonnes des couples possédés sont lues pour un stock donné.
+    """
+
+    set_nums: list[str]
+    set_index: dict[str, int]
+    num_parts: np.ndarray  # int32, une valeur par set
+    totals: np.ndarray  # int32, nombre de couples distincts par set
+    n_pairs: int
+    col_ptr: np.ndarray  # int64, n_pairs + 1
+    set_rows: np.ndarray  # int32, nnz
+    needed: np.ndarray  # int32, nnz
+
+    @classmethod
+    def load(cls, duckdb_conn) -> "RequirementMatrix":
+        """Construit l'index depuis set_requirements (une requête par tableau)."""
+        with duckdb_conn.cursor() as cur:
+            n_pairs = cur.execute("SELECT COUNT(*) FROM part_color_keys").fetchone()[0]
+
+            sets = cur.execute(
+                """
+                SELECT t.set_num, t.total, COALESCE(s.num_parts, 0) AS num_parts
+                FROM set_requirement_totals t
+                JOIN sets s ON t.set_num = s.set_num
+                ORDER BY t.set_num
+                """
+            ).fetchnumpy()
+            set_nums = sets["set_num"].tolist()
+
+            cells = cur.execute(
+                """
+                WITH rows AS (
+                    SELECT t.set_num, ROW_NUMBER() OVER (ORDER BY t.set_num) - 1 AS set_row
+                    FROM set_requirement_totals t
+                    JOIN sets s ON t.set_num = s.set_num
+                )
+                SELECT r.pc_id, rows.set_row, r.needed
+                FROM set_requirements r
+                JOIN rows ON r.set_num = rows.set_num
+                ORDER BY r.pc_id, rows.set_row
+                """
+            ).fetchnumpy()
+        col_ptr = np.zeros(n_pairs + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells["pc_id"], minlength=n_pairs), out=col_ptr[1:])
+
+        return cls(
+            set_nums=set_nums,
+            set_index={s: i for i, s in enumerate(set_nums)},
+            num_parts=sets["num_parts"].astype(np.int32),
+            totals=sets["total"].astype(np.int32),
+            n_pairs=n_pairs,
+            col_ptr=col_ptr,
+            set_rows=cells["set_row"].astype(np.int32),
+            needed=cells["needed"].astype(np.int32),
+        )
+
+    def postings(self, pc_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Positions des entrées des colonnes `pc_ids` et longueur de chaque colonne."""
+        starts = self.col_ptr[pc_ids]
+        lengths = self.col_ptr[pc_ids + 1] - starts
+        # Concatène les intervalles [start, start + length) sans boucle Python
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return offsets + np.arange(offsets.size), lengths
+
+    def coverage(
+        self, stock: UserStock, min_pct: float = 0.0
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Sets partageant au moins un couple avec le stock, et couples couverts.
+
+        Retourne (lignes, couverts) triés par ligne. Le coût ne dépend que du
+        nombre d'entrées des colonnes possédées, pas de la taille du catalogue.
+        Les sets dont le nombre de couples en commun ne permet pas d'atteindre
+        `min_pct` sont écartés (couverts <= en commun).
+        """
+        if not len(stock):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)
+        pc_ids = stock.pc_ids.astype(np.int64)
+        qtys = stock.quantities
+        known = (pc_ids >= 0) & (pc_ids < self.n_pairs)
+        pc_ids, qtys = pc_ids[known], qtys[known]
+
+        positions, lengths = self.postings(pc_ids)
+        ok = np.repeat(qtys, lengths) >= self.needed[positions]
+        rows, inverse, matched = np.unique(
+            self.set_rows[positions], return_inverse=True, return_counts=True
+        )
+        covered = np.bincount(inverse, weights=ok, minlength=rows.size)
+
+        reachable = _round_pct(matched, self.totals[rows]) >= min_pct
+        return rows[reachable], covered[reachable].astype(np.int32)
+
+    def apply_delta(
+        self, covered: np.ndarray, pc_id: int, old_qty: int, new_qty: int
+    ) -> np.ndarray:
+        """Met à jour `covered` (un compteur par set) quand la quantité d'un couple change.
+
+        Seule la colonne pc_id est lue. Retourne les lignes dont le compteur a changé.
+        """
+        col = slice(self.col_ptr[pc_id], self.col_ptr[pc_id + 1])
+        needed = self.needed[col]
+        diff = (new_qty >= needed).astype(np.int32) - (old_qty >= needed)
+        changed = diff != 0
+        rows = self.set_rows[col][changed]
+        covered[rows] += diff[changed]
+        return rows
+
+    def reachable(self, rows: np.ndarray, covered: np.ndarray) -> np.ndarray:
+        """Masque des lignes qui peuvent entrer dans un palier (voir BUCKETS)."""
+        totals = self.totals[rows]
+        return (totals >= MIN_TOTAL) & (_round_pct(covered, totals) >= MIN_PCT)
+
+
+_matrix_cache: dict[str, RequirementMatrix] = {}
+_matrix_lock = threading.Lock()
+
+
+def get_requirement_matrix(duckdb_conn) -> RequirementMatrix:
+    """Matrice du catalogue courant, chargée une seule fois par version.
+
+    Une base en mémoire (sans version) est rechargée à chaque appel.
+    """
+    version = catalog_version(duckdb_conn)
+    if version is None:
+        return RequirementMatrix.load(duckdb_conn)
+    with _matrix_lock:
+        matrix = _matrix_cache.get(version)
+        if matrix is None:
+            _matrix_cache.clear()  # une seule version du catalogue à la fois
+            matrix = RequirementMatrix.load(duckdb_conn)
+            _matrix_cache[version] = matrix
+        return matrix
+
+
+def _round_pct(covered: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    """Pourcentage arrondi à 0,1 près, arrondi "half away" comme ROUND DuckDB."""
+    return np.floor(1000.0 * covered / totals + 0.5) / 10.0
+
+
+class MatrixBuildableEngine:
+    """Classement des sets à partir de l'index inversé en mémoire.
+
+    Seuls les sets qui partagent un couple avec le stock sont évalués ; la
+    lecture des métadonnées (nom, année, image) des sets retenus passe par
+    DuckDB, en une requête.
+    """
+
+    def __init__(self, duckdb_conn, matrix: RequirementMatrix | None = None):
+        self.duck = duckdb_conn
+        self.matrix = matrix or get_requirement_matrix(duckdb_conn)
+
+    def rank(
+        self, stock: UserStock, exclude_nums: list[str], limit: int
+    ) -> dict[str, list[BuildableSet]]:
+        rows, covered = self.matrix.coverage(stock, MIN_PCT)
+        return self._rank_coverage(rows, covered, exclude_nums, limit)
+
+    def rank_state(self, state, limit: int) -> dict[str, list[BuildableSet]]:
+        """Classe les sets depuis un état de couverture maintenu (CoverageState).
+
+        Seuls les candidats de l'état sont lus : le coût suit la taille du résultat.
+        """
+        rows = np.fromiter(
+            state.candidates, dtype=np.int64, count=len(state.candidates)
+        )
+        return self._rank_coverage(rows, state.covered[rows], state.exclude_nums, limit)
+
+    def _rank_coverage(
+        self,
+        rows: np.ndarray,
+        covered: np.ndarray,
+        exclude_nums: list[str],
+        limit: int,
+    ) -> dict[str, list[BuildableSet]]:
+        """Classe les sets candidats et garde le top `limit` par palier.
+
+        `rows` sont les indices de ligne des candidats, `covered` leur nombre
+        de couples couverts ; les autres sets ne peuvent atteindre aucun palier.
+        """
+        m = self.matrix
+        totals = m.totals[rows]
+        pct = _round_pct(covered, totals)
+
+        eligible = totals >= MIN_TOTAL
+        excluded = [m.set_index[num] for num in exclude_nums if num in m.set_index]
+        if excluded:
+            eligible &= ~np.isin(rows, excluded)
+
+        selected: dict[str, np.ndarray] = {}
+        scores: dict[int, tuple[int, float]] = {}
+        remaining = eligible
+        for name, threshold in BUCKETS:
+            if threshold >= 100:
+                in_bucket = remaining & (covered == totals)
+            else:
+                in_bucket = remaining & (pct >= threshold)
+            remaining = remaining & ~in_bucket
+            picked = np.flatnonzero(in_bucket)
+            # Tri : complétion desc, num_parts desc, set_num asc (= index de ligne)
+            order = np.lexsort((rows[picked], -m.num_parts[rows[picked]], -pct[picked]))
+            picked = picked[order[:limit]]
+            selected[name] = rows[picked]
+            scores.update(
+                (int(rows[i]), (int(covered[i]), float(pct[i]))) for i in picked
+            )
+
+        return self._to_buildable_sets(selected, scores)
+
+    def _to_buildable_sets(self, selected: dict, scores: dict) -> dict:
+        """Assemble les BuildableSet avec les métadonnées DuckDB des sets retenus.
+
+        `scores` associe à chaque ligne retenue (couverts, pourcentage).
+        """
+        m = self.matrix
+        wanted = [m.set_nums[i] for rows in selected.values() for i in rows]
+        details = {}
+        if wanted:
+            placeholders = ", ".join(["?"] * len(wanted))
+            with self.duck.cursor() as cur:
+                rows = cur.execute(
+                    f"SELECT {', '.join(_SET_COLS)} FROM sets WHERE set_num IN ({placeholders})",
+                    wanted,
+                ).fetchall()
+            details = {r[0]: dict(zip(_SET_COLS, r, strict=False)) for r in rows}
+
+        result = {}
+        for name, rows in selected.items():
+            result[name] = []
+            for i in rows:
+                covered, pct = scores[int(i)]
+                result[name].append(
+                    BuildableSet.from_dict(
+                        {
+                            **details[m.set_nums[i]],
+                            "parts_owned": covered,
+                            "total_parts_needed": int(m.totals[i]),
+                            "completion_percentage": pct,
+                            "missing_parts_count": int(m.totals[i]) - covered,
+                        }
+                    )
+                )
+        return result
+
+
+ENGINES = {
+    "sql": SqlBuildableEngine,
+    "matrix": MatrixBuildableEngine,
+}
+
+
+def get_buildable_engine(duckdb_conn, name: str | None = None):
+    """Instancie le moteur demandé (défaut : BUILDABLE_ENGINE)."""
+    name = name or BUILDABLE_ENGINE
+    if name not in ENGINES:
+        raise ValueError(
+            f"Moteur de calcul inconnu : {name!r} (attendu : {', '.join(ENGINES)})"
+        )
+    return ENGINES[name](duckdb_conn)
@@ -1,37 +1,18 @@
 """Algorithme de matching cross-DB pour trouver les sets constructibles."""
 
-from app.business_object.buildable_set import BuildableSet
+from dataclasses import replace
+
+from app.business_object.missing_part import MissingPart
+from app.business_object.user_stock import UserStock
+from app.database.connexion_duckdb import catalog_version
 from app.database.dao.collection_dao import CollectionDAO
+from app.database.dao.part_keys_dao import PartKeysDAO
+from app.database.dao.set_requirements_dao import SetRequirementsDAO
+from app.database.dao.stock_dao import StockDAO
 from app.database.dao.user_parts_dao import UserPartsDAO
-
-
-# Colonnes SQL communes aux 3 requêtes, aliasées pour coller aux champs de BuildableSet
-_SELECT_COLS = """
-    c.set_num, s.name, s.year, s.theme_id, s.num_parts, s.img_url,
-    c.covered                                          AS parts_owned,
-    c.total                                            AS total_parts_needed,
-    ROUND(100.0 * c.covered / c.total, 1)              AS completion_percentage,
-    (c.total - c.covered)                              AS missing_parts_count
-"""
-
-_STRICT_CTE = """
-    WITH req AS (
-        SELECT i.set_num, ip.part_num, ip.color_id, SUM(ip.quantity) AS needed
-        FROM inventories i
-        JOIN inventory_parts ip ON i.id = ip.inventory_id
-        WHERE ip.is_spare = false
-        GROUP BY i.set_num, ip.part_num, ip.color_id
-    ),
-    coverage AS (
-        SELECT r.set_num,
-            COUNT(*) AS total,
-            SUM(CASE WHEN COALESCE(up.qty, 0) >= r.needed THEN 1 ELSE 0 END) AS covered
-        FROM req r
-        LEFT JOIN _user_parts up
-            ON r.part_num = up.part_num AND r.color_id = up.color_id
-        GROUP BY r.set_num
-    )
-"""
+from app.service.buildable_cache import BuildableCache
+from app.service.buildable_engine import MatrixBuildableEngine, get_buildable_engine
+from app.service.buildable_state import CoverageState, CoverageStateStore
 
 
 class BuildableService:
@@ -41,23 +22,50 @@ class BuildableService:
     1. Récupère les pièces possédées depuis PostgreSQL.
     2. Pour chaque set non-construit de la collection, ajoute ses pièces
        au stock (car l'utilisateur les possède via le set).
-    3. Charge le stock dans une table temporaire DuckDB.
-    4. Deux requêtes DuckDB :
+    3. Confie le stock au moteur de calcul (voir buildable_engine), qui classe
+       chaque set dans un palier et garde les meilleurs de chaque palier :
        - buildable : 100 % des (part_num, color_id) couverts
        - partial   : 80–99 % des (part_num, color_id) couverts
+
+    Si un cache est fourni (voir buildable_cache), le résultat est réutilisé
+    tant que ni le stock de l'utilisateur ni le catalogue n'ont changé.
+    Avec le moteur matrix et un cache, un store d'états (voir buildable_state)
+    permet de ne recalculer que les sets touchés par les pièces modifiées :
+    la version du stock du cache, partagée entre workers, dit si un état
+    est à jour.
     """
 
-    def __init__(self, pg_conn, duckdb_conn):
+    def __init__(
+        self,
+        pg_conn,
+        duckdb_conn,
+        engine: str | None = None,
+        cache: BuildableCache | None = None,
+        states: CoverageStateStore | None = None,
+    ):
         self.user_parts_dao = UserPartsDAO(pg_conn)
         self.collection_dao = CollectionDAO(pg_conn)
+        self.part_keys_dao = PartKeysDAO(duckdb_conn)
+        self.requirements_dao = SetRequirementsDAO(duckdb_conn)
+        self.stock_dao = StockDAO(duckdb_conn)
         self.duck = duckdb_conn
+        self.engine = get_buildable_engine(duckdb_conn, engine)
+        self.cache = cache
+        # Les états reposent sur l'index inversé en mémoire du moteur matrix,
+        # et sur la version du stock du cache pour voir les écritures des
+        # autres workers
+        self.states = (
+            states
+            if isinstance(self.engine, MatrixBuildableEngine) and cache is not None
+            else None
+        )
 
     # ------------------------------------------------------------------
     # API publique
     # ------------------------------------------------------------------
 
     def get_buildable_sets(self, user_id: int, limit: int = 50) -> dict:
-        """Retourne deux listes de BuildableSet.
+        """Retourne une liste de BuildableSet par palier (voir BUCKETS).
 
         Returns:
             {
@@ -65,112 +73,149 @@ class BuildableService:
               "partial":   list[BuildableSet],  # 80–99 %, couleur exacte
             }
         """
-        self._load_user_stock(user_id)
+        if self.cache is None and self.states is None:
+            return self._compute(user_id, limit)
+
+        # Base en mémoire : pas de version, donc rien à mettre en cache
+        version = catalog_version(self.duck)
+        if version is None:
+            return self._compute(user_id, limit)
+        if self.states is not None:
 
+            def compute():
+                return self._rank_from_state(user_id, limit, version)
+
+        else:
+
+            def compute():
+                return self._compute(user_id, limit)
+
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(user_id, limit, version, compute)
+
+    def get_missing_parts(self, user_id: int, set_num: str) -> list[MissingPart] | None:
+        """Pièces manquantes d'un set pour l'utilisateur (None si set inconnu)."""
         collection = self.collection_dao.get_user_collection(user_id)
-        collection_nums = [s.set_num for s in collection]
+        stock = self._load_user_stock(user_id, collection)
+        return self.requirements_dao.get_missing_parts(stock, [set_num]).get(set_num)
 
-        buildable = self._query_buildable(collection_nums, limit)
-        partial = self._query_partial(collection_nums, limit)
+    def with_missing_parts(
+        self, user_id: int, result: dict, buckets: tuple[str, ...] = ("partial",)
+    ) -> dict:
+        """Copie de `result` où les sets des paliers `buckets` ont leurs pièces manquantes.
 
+        Toutes les pièces manquantes sont lues en une requête DuckDB, quel que
+        soit le nombre de sets. `result` (éventuellement en cache) n'est pas modifié.
+        """
+        set_nums = [s.set_num for b in buckets for s in result.get(b, [])]
+        if not set_nums:
+            return result
+        collection = self.collection_dao.get_user_collection(user_id)
+        stock = self._load_user_stock(user_id, collection)
+        missing = self.requirements_dao.get_missing_parts(stock, set_nums)
         return {
-            "buildable": buildable,
-            "partial": partial,
+            bucket: [
+                replace(
+                    s,
+                    missing_parts=[m.to_dict() for m in missing.get(s.set_num, [])],
+                )
+                if bucket in buckets
+                else s
+                for s in sets
+            ]
+            for bucket, sets in result.items()
         }
 
     # ------------------------------------------------------------------
     # Méthodes privées
     # ------------------------------------------------------------------
 
-    def _load_user_stock(self, user_id: int) -> None:
-        """Construit et charge la table temporaire _user_parts dans DuckDB."""
-        # Pièces possédées en propre
-        owned_rows = self.user_parts_dao.get_owned_parts(user_id)
-        owned_parts: dict[tuple, int] = {
-            (row["part_num"], row["color_id"]): row["quantity"] for row in owned_rows
-        }
+    def _compute(self, user_id: int, limit: int) -> dict:
+        """Calcule les paliers depuis zéro."""
+        collection = self.collection_dao.get_user_collection(user_id)
+        stock = self._load_user_stock(user_id, collection)
+        collection_nums = [s.set_num for s in collection]
+
+        return self.engine.rank(stock, collection_nums, limit)
 
-        # Pièces des sets non construits (l'utilisateur possède les pièces)
+    def _rank_from_state(self, user_id: int, limit: int, version: str) -> dict:
+        """Classe depuis l'état maintenu de l'utilisateur, mis à jour ou reconstruit.
+
+        L'état est réutilisé si le catalogue n'a pas changé et si toutes les
+        écritures sur le stock depuis sa construction sont connues de ce
+        process (changements en attente) ; sinon il est reconstruit.
+        """
+        current = self.cache.stock_version(user_id) if self.cache else None
+        state = self.states.get(user_id)
+        if state is not None:
+            with state.lock:
+                pending = self.states.take_pending(user_id)
+                if pending is not None and self._in_sync(
+                    state, version, current, pending
+                ):
+                    self._apply_part_changes(user_id, state, pending)
+                    return self.engine.rank_state(state, limit)
+
+        state = self._build_state(user_id, version, current)
+        with state.lock:
+            return self.engine.rank_state(state, limit)
+
+    @staticmethod
+    def _in_sync(state, version: str, current: int | None, pending: list) -> bool:
+        """Vrai si l'état plus les changements en attente reflètent le stock actuel.
+
+        Sans version du stock (current None), rien ne garantit qu'un autre
+        worker n'a pas écrit : l'état est reconstruit.
+        """
+        if state.catalog != version:
+            return False
+        if current is None or state.stock_version is None:
+            return False
+        return current == state.stock_version + len(pending)
+
+    def _build_state(
+        self, user_id: int, version: str, current: int | None
+    ) -> CoverageState:
+        """Reconstruit l'état complet de l'utilisateur et l'enregistre."""
+        self.states.start(user_id)
         collection = self.collection_dao.get_user_collection(user_id)
-        unbuilt_nums = [s.set_num for s in collection if not s.is_built]
-        if unbuilt_nums:
-            placeholders = ", ".join(["?"] * len(unbuilt_nums))
-            rows = self.duck.execute(
-                f"""
-                SELECT ip.part_num, ip.color_id, SUM(ip.quantity) AS qty
-                FROM inventories i
-                JOIN inventory_parts ip ON i.id = ip.inventory_id
-                WHERE i.set_num IN ({placeholders}) AND ip.is_spare = false
-                GROUP BY ip.part_num, ip.color_id
-                """,
-                unbuilt_nums,
-            ).fetchall()
-            col_names = [d[0] for d in self.duck.description]
-            for row in rows:
-                r = dict(zip(col_names, row, strict=False))
-                key = (r["part_num"], r["color_id"])
-                owned_parts[key] = owned_parts.get(key, 0) + r["qty"]
-
-        # Charger dans la table temporaire
-        self.duck.execute(
-            "CREATE TEMP TABLE IF NOT EXISTS _user_parts "
-            "(part_num VARCHAR, color_id INTEGER, qty INTEGER)"
+        state = CoverageState.build(
+            self.engine.matrix,
+            version,
+            current,
+            owned=self.stock_dao.get_user_stock(
+                self.user_parts_dao.get_owned_columns(user_id), []
+            ),
+            unbuilt=self.stock_dao.get_user_stock(
+                None, [s.set_num for s in collection if not s.is_built]
+            ),
+            exclude_nums=[s.set_num for s in collection],
+        )
+        self.states.put(user_id, state)
+        return state
+
+    def _apply_part_changes(
+        self, user_id: int, state: CoverageState, pairs: list[tuple[str, int]]
+    ) -> None:
+        """Relit la quantité possédée des couples modifiés et l'applique à l'état."""
+        if state.stock_version is not None:
+            state.stock_version += len(pairs)
+        pairs = list(dict.fromkeys(pairs))
+        if not pairs:
+            return
+        quantities = self.user_parts_dao.get_owned_quantities(user_id, pairs)
+        pair_ids = self.part_keys_dao.get_pair_ids(pairs)
+        for pair, pc_id in pair_ids.items():
+            state.set_owned(pc_id, quantities.get(pair, 0))
+
+    def _load_user_stock(self, user_id: int, collection: list) -> UserStock:
+        """Construit le stock de l'utilisateur (pièces en propre + sets non construits).
+
+        Une requête PostgreSQL (colonnes) puis une requête DuckDB qui traduit les
+        couples en pc_id et ajoute les pièces des sets non construits.
+        """
+        return self.stock_dao.get_user_stock(
+            self.user_parts_dao.get_owned_columns(user_id),
+            [s.set_num for s in collection if not s.is_built],
         )
-        self.duck.execute("DELETE FROM _user_parts")
-        if owned_parts:
-            self.duck.executemany(
-                "INSERT INTO _user_parts VALUES (?, ?, ?)",
-                [(k[0], k[1], v) for k, v in owned_parts.items()],
-            )
-
-    def _rows_to_buildable_sets(self, rows: list) -> list[BuildableSet]:
-        col_names = [d[0] for d in self.duck.description]
-        return [
-            BuildableSet.from_dict(dict(zip(col_names, row, strict=False)))
-            for row in rows
-        ]
-
-    def _make_exclude(self, nums: list[str]) -> tuple[str, list]:
-        """Retourne (placeholder_sql, params) pour une clause NOT IN."""
-        if not nums:
-            return "NULL", []
-        return ", ".join(["?"] * len(nums)), nums
-
-    def _query_buildable(
-        self, exclude_nums: list[str], limit: int
-    ) -> list[BuildableSet]:
-        ph, ex_params = self._make_exclude(exclude_nums)
-        rows = self.duck.execute(
-            f"""
-            {_STRICT_CTE}
-            SELECT {_SELECT_COLS}
-            FROM coverage c
-            JOIN sets s ON c.set_num = s.set_num
-            WHERE c.covered = c.total
-              AND c.total >= 5
-              AND c.set_num NOT IN ({ph})
-            ORDER BY s.num_parts DESC
-            LIMIT ?
-            """,
-            ex_params + [limit],
-        ).fetchall()
-        return self._rows_to_buildable_sets(rows)
-
-    def _query_partial(self, exclude_nums: list[str], limit: int) -> list[BuildableSet]:
-        ph, ex_params = self._make_exclude(exclude_nums)
-        rows = self.duck.execute(
-            f"""
-            {_STRICT_CTE}
-            SELECT {_SELECT_COLS}
-            FROM coverage c
-            JOIN sets s ON c.set_num = s.set_num
-            WHERE c.covered < c.total
-              AND ROUND(100.0 * c.covered / c.total, 1) >= 80
-              AND c.total >= 5
-              AND c.set_num NOT IN ({ph})
-            ORDER BY completion_percentage DESC, s.num_parts DESC
-            LIMIT ?
-            """,
-            ex_params + [limit],
-        ).fetchall()
-        return self._rows_to_buildable_sets(rows)
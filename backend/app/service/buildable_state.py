@@ -0,0 +1,165 @@
+"""États de couverture maintenus par utilisateur (calcul incrémental).
+
+Un CoverageState garde, pour un utilisateur, le nombre de couples couverts
+de chaque set du catalogue et l'ensemble des sets qui atteignent un palier.
+Une écriture sur une pièce (UserPartsService) est notée comme changement en
+attente ; à la lecture suivante, seule la colonne de l'index inversé de ce
+couple est relue (voir RequirementMatrix.apply_delta) et le classement ne
+parcourt que les candidats.
+
+Une écriture sur la collection (sets non construits) supprime l'état : il
+est reconstruit en entier à la lecture suivante, comme après un changement
+de version du catalogue ou une écriture faite par un autre worker (détectée
+grâce à la version du stock, voir buildable_cache).
+"""
+
+from dataclasses import dataclass, field
+import os
+import threading
+
+import numpy as np
+
+from app.business_object.user_stock import UserStock
+from app.service.buildable_engine import RequirementMatrix
+from app.utils.lru_cache import LRUCache
+
+
+BUILDABLE_STATE_SIZE = int(os.getenv("BUILDABLE_STATE_SIZE", "256"))
+
+# Au-delà, les changements en attente sont abandonnés au profit d'une reconstruction
+MAX_PENDING = 256
+
+
+@dataclass(eq=False)
+class CoverageState:
+    """Couverture du stock d'un utilisateur, pour une version du catalogue."""
+
+    matrix: RequirementMatrix
+    catalog: str
+    stock_version: int | None  # version du stock reflétée (None : non suivie)
+    owned: dict[int, int]  # pc_id → quantité possédée en propre
+    unbuilt: dict[int, int]  # pc_id → quantité apportée par les sets non construits
+    exclude_nums: list[str]  # sets de la collection
+    covered: np.ndarray  # int32, couples couverts par set
+    candidates: set[int]  # lignes qui atteignent un palier
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @classmethod
+    def build(
+        cls,
+        matrix: RequirementMatrix,
+        catalog: str,
+        stock_version: int | None,
+        owned: UserStock,
+        unbuilt: UserStock,
+        exclude_nums: list[str],
+    ) -> "CoverageState":
+        """Calcule l'état complet (même coût qu'un calcul non incrémental)."""
+        rows, covered = matrix.coverage(owned.merge(unbuilt))
+        dense = np.zeros(len(matrix.set_nums), dtype=np.int32)
+        dense[rows] = covered
+        return cls(
+            matrix=matrix,
+            catalog=catalog,
+            stock_version=stock_version,
+            owned=owned.to_dict(),
+            unbuilt=unbuilt.to_dict(),
+            exclude_nums=exclude_nums,
+            covered=dense,
+            candidates=set(rows[matrix.reachable(rows, covered)].tolist()),
+        )
+
+    def set_owned(self, pc_id: int, quantity: int) -> None:
+        """Applique la nouvelle quantité possédée d'un couple."""
+        old = self.owned.get(pc_id, 0)
+        if quantity == old:
+            return
+        if quantity:
+            self.owned[pc_id] = quantity
+        else:
+            self.owned.pop(pc_id, None)
+        base = self.unbuilt.get(pc_id, 0)
+        rows = self.matrix.apply_delta(self.covered, pc_id, old + base, quantity + base)
+        reachable = self.matrix.reachable(rows, self.covered[rows])
+        self.candidates.update(rows[reachable].tolist())
+        self.candidates.difference_update(rows[~reachable].tolist())
+
+
+class CoverageStateStore:
+    """États de couverture en mémoire, bornés (LRU) par nombre d'utilisateurs.
+
+    Les changements de pièces sont notés pour les utilisateurs suivis (état
+    présent ou en construction) et consommés à la lecture suivante.
+    """
+
+    def __init__(self, max_users: int = BUILDABLE_STATE_SIZE):
+        self._states = LRUCache(max_users)
+        self._pending: dict[int, list | None] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> CoverageState | None:
+        return self._states.get(user_id)
+
+    def start(self, user_id: int) -> None:
+        """Début d'une reconstruction : les changements suivants seront rejoués."""
+        with self._lock:
+            self._pending[user_id] = []
+
+    def put(self, user_id: int, state: CoverageState) -> None:
+        self._states.put(user_id, state)
+
+    def take_pending(self, user_id: int) -> list[tuple[str, int]] | None:
+        """Retire les changements en attente (None : trop nombreux, reconstruire)."""
+        with self._lock:
+            pending = self._pending.get(user_id)
+            if pending is None:
+                return None
+            self._pending[user_id] = []
+            return pending
+
+    def record_part_change(self, user_id: int, pair: tuple[str, int]) -> None:
+        with self._lock:
+            pending = self._pending.get(user_id)
+            if pending is None:
+                return
+            if len(pending) >= MAX_PENDING:
+                self._pending[user_id] = None
+            else:
+                pending.append(pair)
+
+    def discard(self, user_id: int) -> None:
+        with self._lock:
+            self._states.pop(user_id)
+            self._pending.pop(user_id, None)
+
+    def stats(self) -> dict:
+        return self._states.stats()
+
+
+_store: CoverageStateStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_coverage_store() -> CoverageStateStore | None:
+    """Store process-wide (None si BUILDABLE_STATE_SIZE vaut 0)."""
+    global _store
+    if BUILDABLE_STATE_SIZE <= 0:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = CoverageStateStore(BUILDABLE_STATE_SIZE)
+        return _store
+
+
+def record_part_change(user_id: int, part_num: str, color_id: int) -> None:
+    """À appeler après une écriture sur une pièce de l'utilisateur."""
+    store = get_coverage_store()
+    if store is not None:
+        store.record_part_change(user_id, (part_num, color_id))
+
+
+def discard_coverage_state(user_id: int) -> None:
+    """À appeler après une écriture sur la collection de l'utilisateur."""
+    store = get_coverage_store()
+    if store is not None:
+        store.discard(user_id)
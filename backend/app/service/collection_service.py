@@ -1,12 +1,21 @@
 """Service de gestion de la collection de sets d'un utilisateur."""
 
-from app.database.dao.collection_dao import CollectionDAO
+from app.database.dao.collection_dao import AsyncCollectionDAO, CollectionDAO
+from app.service.buildable_cache import bump_stock_version
+from app.service.buildable_state import discard_coverage_state
+
+
+def _collection_written(user_id: int) -> None:
+    """Après une écriture validée : invalide les sets constructibles en cache."""
+    bump_stock_version(user_id)
+    discard_coverage_state(user_id)
 
 
 class CollectionService:
     """Service pour gérer la collection de sets d'un utilisateur.
 
-    Gère les transactions (commit) après chaque opération d'écriture.
+    Gère les transactions (commit) après chaque opération d'écriture, puis
+    invalide les sets constructibles en cache de l'utilisateur.
     """
 
     def __init__(self, dao: CollectionDAO, pg_conn):
@@ -20,11 +29,13 @@ class CollectionService:
         result = self.dao.add_set_to_collection(user_id, set_num, is_built)
         if result:
             self.conn.commit()
+            _collection_written(user_id)
         return result  # None si doublon
 
     def remove_set(self, user_id: int, set_num: str) -> bool:
         removed = self.dao.remove_set_from_collection(user_id, set_num)
         self.conn.commit()
+        _collection_written(user_id)
         return removed
 
     def mark_built(self, user_id: int, set_num: str, is_built: bool) -> bool:
@@ -34,4 +45,43 @@ class CollectionService:
             updated = self.dao.mark_set_as_unbuilt(user_id, set_num)
         if updated:
             self.conn.commit()
+            _collection_written(user_id)
+        return updated
+
+
+class AsyncCollectionService:
+    """Variante async de CollectionService (connexion asyncpg).
+
+    Chaque écriture est faite dans une transaction ; le cache n'est invalidé
+    qu'une fois la transaction validée.
+    """
+
+    def __init__(self, dao: AsyncCollectionDAO, pg_conn):
+        self.dao = dao
+        self.conn = pg_conn
+
+    async def get_collection(self, user_id: int):
+        return await self.dao.get_user_collection(user_id)
+
+    async def add_set(self, user_id: int, set_num: str, is_built: bool = False):
+        async with self.conn.transaction():
+            result = await self.dao.add_set_to_collection(user_id, set_num, is_built)
+        if result:
+            _collection_written(user_id)
+        return result  # None si doublon
+
+    async def remove_set(self, user_id: int, set_num: str) -> bool:
+        async with self.conn.transaction():
+            removed = await self.dao.remove_set_from_collection(user_id, set_num)
+        _collection_written(user_id)
+        return removed
+
+    async def mark_built(self, user_id: int, set_num: str, is_built: bool) -> bool:
+        async with self.conn.transaction():
+            if is_built:
+                updated = await self.dao.mark_set_as_built(user_id, set_num)
+            else:
+                updated = await self.dao.mark_set_as_unbuilt(user_id, set_num)
+        if updated:
+            _collection_written(user_id)
         return updated
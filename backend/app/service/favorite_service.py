@@ -1,6 +1,6 @@
 """Service de gestion des sets favoris d'un utilisateur."""
 
-from app.database.dao.favorite_dao import FavoriteDAO
+from app.database.dao.favorite_dao import AsyncFavoriteDAO, FavoriteDAO
 
 
 class FavoriteService:
@@ -26,3 +26,25 @@ class FavoriteService:
         removed = self.dao.remove_favorite(user_id, set_num)
         self.conn.commit()
         return removed
+
+
+class AsyncFavoriteService:
+    """Variante async de FavoriteService (connexion asyncpg).
+
+    Chaque écriture est faite dans une transaction.
+    """
+
+    def __init__(self, dao: AsyncFavoriteDAO, pg_conn):
+        self.dao = dao
+        self.conn = pg_conn
+
+    async def get_favorites(self, user_id: int):
+        return await self.dao.get_user_favorites(user_id)
+
+    async def add_favorite(self, user_id: int, set_num: str):
+        async with self.conn.transaction():
+            return await self.dao.add_favorite(user_id, set_num)  # None si doublon
+
+    async def remove_favorite(self, user_id: int, set_num: str) -> bool:
+        async with self.conn.transaction():
+            return await self.dao.remove_favorite(user_id, set_num)
@@ -1,17 +1,41 @@
 import secrets
 
 from app.business_object.user import User
-from app.database.dao.user_dao import UserDAO
+from app.database.dao.user_dao import AsyncUserDAO, UserDAO
 from app.utils.securite import hash_password
 
 
+def new_salt() -> str:
+    """Génère un sel aléatoire de 256 caractères hexadécimaux."""
+    return secrets.token_hex(128)
+
+
+def check_password(user: User | None, username: str, password: str) -> User:
+    """
+    Vérifie le mot de passe de `user` (lu par get_by_username) et le renvoie.
+
+    Lève :
+    ------
+    Exception si l'utilisateur est introuvable ou le mot de passe incorrect
+    """
+    if user is None:
+        raise Exception(f"Utilisateur '{username}' introuvable")
+
+    computed_hash = hash_password(password, user.salt)
+
+    if computed_hash != user.hashed_password:
+        raise Exception("Mot de passe incorrect")
+
+    return user
+
+
 class PasswordService:
     def __init__(self, user_dao: UserDAO):
         self.dao = user_dao
 
     def create_salt(self) -> str:
         """Génère un sel aléatoire de 256 caractères hexadécimaux."""
-        return secrets.token_hex(128)
+        return new_salt()
 
     def validate_username_password(self, username: str, password: str) -> User:
         """
@@ -25,16 +49,18 @@ class PasswordService:
         ------
         Exception si l'utilisateur est introuvable ou le mot de passe incorrect
         """
-        user_with_username = self.dao.get_by_username(username)
-        if user_with_username is None:
-            raise Exception(f"Utilisateur '{username}' introuvable")
+        user = self.dao.get_by_username(username)
+        return check_password(user, username, password)
 
-        salt = user_with_username.salt
-        stored_hash = user_with_username.hashed_password
 
-        computed_hash = hash_password(password, salt)
+class AsyncPasswordService:
+    """Variante async de PasswordService (AsyncUserDAO) : même vérification
+    (check_password), seule la lecture de l'utilisateur est attendue."""
 
-        if computed_hash != stored_hash:
-            raise Exception("Mot de passe incorrect")
+    def __init__(self, user_dao: AsyncUserDAO):
+        self.dao = user_dao
 
-        return user_with_username
+    async def validate_username_password(self, username: str, password: str) -> User:
+        """Voir PasswordService.validate_username_password."""
+        user = await self.dao.get_by_username(username)
+        return check_password(user, username, password)
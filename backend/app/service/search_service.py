@@ -1,5 +1,6 @@
 """Service de recherche dans le catalogue LEGO (DuckDB, read-only)."""
 
+from app.database.autocomplete_index import get_autocomplete_index
 from app.database.dao.search_dao import SearchDAO
 
 
@@ -28,8 +29,20 @@ class SearchService:
     ) -> list[dict]:
         return self.dao.search_parts(query, color_id, category_id, limit)
 
+    def autocomplete(
+        self,
+        query: str,
+        kind: str = "sets",
+        limit: int = 10,
+        version: str | None = None,
+    ) -> list[dict]:
+        """Suggestions de l'index en mémoire (voir get_autocomplete_index),
+        sans requête sur le catalogue une fois l'index chargé."""
+        index = get_autocomplete_index(self.dao.conn, kind, version)
+        return index.complete(query, limit)
+
     def get_recent_sets(self, limit: int = 12) -> list[dict]:
         return self.dao.get_recent_sets(limit)
 
-    def get_stats(self) -> dict:
-        return self.dao.get_stats()
+    def get_stats(self, version: str | None = None) -> dict:
+        return self.dao.get_stats(version)
@@ -1,12 +1,21 @@
 """Service de gestion des pièces possédées/souhaitées d'un utilisateur."""
 
-from app.database.dao.user_parts_dao import UserPartsDAO
+from app.database.dao.user_parts_dao import AsyncUserPartsDAO, UserPartsDAO
+from app.service.buildable_cache import bump_stock_version
+from app.service.buildable_state import record_part_change
+
+
+def _part_written(user_id: int, part_num: str, color_id: int) -> None:
+    """Après une écriture validée : invalide les sets constructibles en cache."""
+    bump_stock_version(user_id)
+    record_part_change(user_id, part_num, color_id)
 
 
 class UserPartsService:
     """Service pour gérer les pièces d'un utilisateur.
 
-    Gère les transactions (commit) après chaque opération d'écriture.
+    Gère les transactions (commit) après chaque opération d'écriture, puis
+    invalide les sets constructibles en cache de l'utilisateur.
     """
 
     def __init__(self, dao: UserPartsDAO, pg_conn):
@@ -26,11 +35,13 @@ class UserPartsService:
             user_id, part_num, color_id, status, quantity, is_used
         )
         self.conn.commit()
+        _part_written(user_id, part_num, color_id)
         return result
 
     def remove_part(self, user_id: int, part_num: str, color_id: int) -> bool:
         result = self.dao.remove_part(user_id, part_num, color_id)
         self.conn.commit()
+        _part_written(user_id, part_num, color_id)
         return result
 
     def update_quantity(
@@ -45,6 +56,7 @@ class UserPartsService:
             user_id, part_num, color_id, quantity, is_used
         )
         self.conn.commit()
+        _part_written(user_id, part_num, color_id)
         return result
 
     def get_owned_parts(self, user_id: int) -> list[dict]:
@@ -52,3 +64,58 @@ class UserPartsService:
 
     def get_wished_parts(self, user_id: int) -> list[dict]:
         return self.dao.get_wished_parts(user_id)
+
+
+class AsyncUserPartsService:
+    """Variante async de UserPartsService (connexion asyncpg).
+
+    Chaque écriture est faite dans une transaction ; le cache n'est invalidé
+    qu'une fois la transaction validée.
+    """
+
+    def __init__(self, dao: AsyncUserPartsDAO, pg_conn):
+        self.dao = dao
+        self.conn = pg_conn
+
+    async def add_part(
+        self,
+        user_id: int,
+        part_num: str,
+        color_id: int,
+        quantity: int,
+        status: str = "owned",
+        is_used: bool = False,
+    ):
+        async with self.conn.transaction():
+            result = await self.dao.add_part(
+                user_id, part_num, color_id, status, quantity, is_used
+            )
+        _part_written(user_id, part_num, color_id)
+        return result
+
+    async def remove_part(self, user_id: int, part_num: str, color_id: int) -> bool:
+        async with self.conn.transaction():
+            result = await self.dao.remove_part(user_id, part_num, color_id)
+        _part_written(user_id, part_num, color_id)
+        return result
+
+    async def update_quantity(
+        self,
+        user_id: int,
+        part_num: str,
+        color_id: int,
+        quantity: int,
+        is_used: bool = False,
+    ) -> bool:
+        async with self.conn.transaction():
+            result = await self.dao.update_quantity(
+                user_id, part_num, color_id, quantity, is_used
+            )
+        _part_written(user_id, part_num, color_id)
+        return result
+
+    async def get_owned_parts(self, user_id: int) -> list[dict]:
+        return await self.dao.get_owned_parts(user_id)
+
+    async def get_wished_parts(self, user_id: int) -> list[dict]:
+        return await self.dao.get_wished_parts(user_id)
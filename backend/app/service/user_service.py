@@ -1,6 +1,10 @@
 from app.business_object.user import User
-from app.database.dao.user_dao import UserDAO
-from app.service.password_service import PasswordService
+from app.database.dao.user_dao import AsyncUserDAO, UserDAO
+from app.service.password_service import (
+    AsyncPasswordService,
+    PasswordService,
+    new_salt,
+)
 from app.utils.securite import hash_password
 
 
@@ -62,3 +66,44 @@ class UserService:
         return self.user_dao.update_user(
             update_username=True, new_entry=new_username, id_user=user.id_user
         )
+
+
+class AsyncUserService:
+    """Variante async de UserService (AsyncUserDAO)."""
+
+    def __init__(self, user_dao: AsyncUserDAO):
+        self.user_dao = user_dao
+
+    async def create_user(self, username: str, password: str) -> User | None:
+        """Voir UserService.create_user."""
+        new_user = User(
+            username=username,
+            hashed_password=hash_password(password),
+            salt=new_salt(),
+        )
+        return await self.user_dao.create_user(new_user)
+
+    async def change_password(self, username, old_password, new_password) -> bool:
+        """Voir UserService.change_password."""
+        password_service = AsyncPasswordService(user_dao=self.user_dao)
+        try:
+            user = await password_service.validate_username_password(
+                username, old_password
+            )
+        except Exception:
+            return False
+        hashed = hash_password(new_password, user.salt)
+        return await self.user_dao.update_user(
+            update_username=False, new_entry=hashed, id_user=user.id_user
+        )
+
+    async def change_username(self, username: str, new_username: str) -> bool:
+        """Voir UserService.change_username."""
+        if await self.user_dao.is_username_taken(new_username):
+            return False
+        user = await self.user_dao.get_by_username(username)
+        if user is None:
+            return False
+        return await self.user_dao.update_user(
+            update_username=True, new_entry=new_username, id_user=user.id_user
+        )
@@ -1,6 +1,6 @@
 """Service de gestion de la wishlist d'un utilisateur."""
 
-from app.database.dao.whishlist_dao import WishlistDAO
+from app.database.dao.whishlist_dao import AsyncWishlistDAO, WishlistDAO
 
 
 class WishlistService:
@@ -49,3 +49,50 @@ class WishlistService:
         result = self.dao.update_part_quantity(user_id, part_num, color_id, quantity)
         self.conn.commit()
         return result
+
+
+class AsyncWishlistService:
+    """Variante async de WishlistService (connexion asyncpg).
+
+    Chaque écriture est faite dans une transaction.
+    """
+
+    def __init__(self, dao: AsyncWishlistDAO, pg_conn):
+        self.dao = dao
+        self.conn = pg_conn
+
+    # --- Sets ---
+
+    async def add_set(self, user_id: int, set_num: str, priority: int = 0):
+        async with self.conn.transaction():
+            return await self.dao.add_set(user_id, set_num, priority)
+
+    async def remove_set(self, user_id: int, set_num: str) -> bool:
+        async with self.conn.transaction():
+            return await self.dao.remove_set(user_id, set_num)
+
+    async def get_sets(self, user_id: int) -> list[dict]:
+        return await self.dao.get_sets(user_id)
+
+    # --- Pièces ---
+
+    async def add_part(
+        self, user_id: int, part_num: str, color_id: int, quantity: int = 1
+    ):
+        async with self.conn.transaction():
+            return await self.dao.add_part(user_id, part_num, color_id, quantity)
+
+    async def remove_part(self, user_id: int, part_num: str, color_id: int) -> bool:
+        async with self.conn.transaction():
+            return await self.dao.remove_part(user_id, part_num, color_id)
+
+    async def get_parts(self, user_id: int) -> list[dict]:
+        return await self.dao.get_parts(user_id)
+
+    async def update_part_quantity(
+        self, user_id: int, part_num: str, color_id: int, quantity: int
+    ) -> bool:
+        async with self.conn.transaction():
+            return await self.dao.update_part_quantity(
+                user_id, part_num, color_id, quantity
+            )
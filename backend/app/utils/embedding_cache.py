@@ -0,0 +1,149 @@
+"""Cache des embeddings de requêtes de la recherche sémantique.
+
+Le trafic de recherche est dominé par quelques requêtes répétées ("star
+wars", "technic"...) : leur vecteur est gardé dans un LRU en mémoire, clé =
+texte normalisé (minuscules, espaces réduits ; le modèle par défaut ignore
+déjà la casse). Avec EMBEDDING_CACHE_PATH, les vecteurs sont aussi écrits
+dans une petite base SQLite et survivent aux redémarrages.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from app.utils.embedding_model import EMBEDDING_MODEL_NAME
+from app.utils.lru_cache import LRUCache
+
+
+EMBEDDING_CACHE_SIZE = int(
+    os.getenv("EMBEDDING_CACHE_SIZE", "2048")
+)  # 0 : pas de cache
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")  # vide : mémoire seule
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class EmbeddingCache:
+    """LRU {requête normalisée: vecteur}, avec copie optionnelle sur disque.
+
+    Sur disque, les vecteurs sont stockés en float32 par (modèle, requête) :
+    changer de modèle n'en relit aucun. Le fichier est borné à la même
+    taille que le LRU (éviction sur la date du dernier accès).
+    """
+
+    def __init__(
+        self,
+        max_size: int = EMBEDDING_CACHE_SIZE,
+        path: str | None = None,
+        model_name: str = EMBEDDING_MODEL_NAME,
+    ):
+        self._memory = LRUCache(max_size)
+        self.path = str(path) if path else None
+        self.model_name = model_name
+        self.disk_hits = 0
+        self._local = threading.local()
+        if self.path:
+            self._conn().execute(
+                """
+                CREATE TABLE IF NOT EXISTS query_embeddings (
+                    model     TEXT NOT NULL,
+                    query     TEXT NOT NULL,
+                    vector    BLOB NOT NULL,
+                    last_used INTEGER NOT NULL,
+                    PRIMARY KEY (model, query)
+                )
+                """
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        """Connexion SQLite propre au thread courant (autocommit)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get_or_compute(self, text: str, compute) -> list[float]:
+        """Vecteur de `text` : mémoire, puis disque, sinon compute(text)."""
+        key = normalize_query(text)
+        vector = self._memory.get(key)
+        if vector is not None:
+            return vector
+        vector = self._read(key) if self.path else None
+        if vector is not None:
+            self.disk_hits += 1
+        else:
+            vector = compute(key)
+            if self.path:
+                self._write(key, vector)
+        self._memory.put(key, vector)
+        return vector
+
+    def _read(self, key: str) -> list[float] | None:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT vector FROM query_embeddings WHERE model = ? AND query = ?",
+            (self.model_name, key),
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE query_embeddings SET last_used = ? WHERE model = ? AND query = ?",
+            (time.time_ns(), self.model_name, key),
+        )
+        return np.frombuffer(row[0], dtype=np.float32).tolist()
+
+    def _write(self, key: str, vector: list[float]) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO query_embeddings VALUES (?, ?, ?, ?)",
+            (
+                self.model_name,
+                key,
+                np.asarray(vector, dtype=np.float32).tobytes(),
+                time.time_ns(),
+            ),
+        )
+        conn.execute(
+            """
+            DELETE FROM query_embeddings WHERE rowid IN (
+                SELECT rowid FROM query_embeddings
+                ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self._memory.max_size,),
+        )
+
+    def stats(self) -> dict:
+        """Compteurs du LRU ; "hit_rate_with_disk" compte aussi les relectures disque."""
+        stats = self._memory.stats()
+        lookups = stats["hits"] + stats["misses"]
+        stats["disk_hits"] = self.disk_hits
+        stats["hit_rate_with_disk"] = (
+            round((stats["hits"] + self.disk_hits) / lookups, 3) if lookups else 0.0
+        )
+        stats["persistent"] = self.path is not None
+        return stats
+
+
+_cache: EmbeddingCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache | None:
+    """Cache du process configuré par EMBEDDING_CACHE_*, None si désactivé."""
+    global _cache
+    if EMBEDDING_CACHE_SIZE <= 0:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(
+                    EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_PATH or None
+                )
+    return _cache
@@ -0,0 +1,138 @@
+"""Modèle fastembed de la recherche sémantique, chargé à la demande."""
+
+import logging
+import os
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = "BAAI/bge-small-en-v1.5"
+# Chargement du modèle en arrière-plan dès le démarrage de l'API (sinon à la
+# première recherche sémantique)
+EMBEDDING_WARM_UP = os.getenv("EMBEDDING_WARM_UP", "0") != "0"
+# Délai avant une nouvelle tentative après un échec de chargement (s)
+EMBEDDING_RETRY_AFTER = float(os.getenv("EMBEDDING_RETRY_AFTER", "60"))
+
+UNAVAILABLE = "unavailable"  # fastembed non installé
+IDLE = "idle"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+def _fastembed_loader(model_name: str):
+    """Constructeur du modèle, None si fastembed n'est pas installé."""
+    try:
+        from fastembed import TextEmbedding
+    except ImportError:
+        return None
+    return lambda: TextEmbedding(model_name=model_name)
+
+
+class EmbeddingModel:
+    """Modèle d'embedding partagé par le process, chargé une seule fois.
+
+    Le chargement (plusieurs secondes, plus de 100 Mo) ne bloque jamais une
+    requête : ensure_loading le lance dans un thread et répond tout de suite
+    si le modèle est prêt ; tant qu'il ne l'est pas, la recherche passe par
+    LIKE. Un process qui ne fait jamais de recherche sémantique ne charge
+    pas le modèle.
+    """
+
+    def __init__(self, loader, retry_after: float = EMBEDDING_RETRY_AFTER):
+        """
+        Args:
+            loader: fonction sans argument qui construit le modèle, None si
+                le modèle n'est pas disponible (fastembed absent).
+        """
+        self._loader = loader
+        self.retry_after = retry_after
+        self.state = UNAVAILABLE if loader is None else IDLE
+        self._model = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._failed_at = 0.0
+        self.load_ms: float | None = None
+        self.error: str | None = None
+
+    @property
+    def available(self) -> bool:
+        return self.state != UNAVAILABLE
+
+    def is_ready(self) -> bool:
+        return self.state == READY
+
+    def ensure_loading(self) -> bool:
+        """Lance le chargement en arrière-plan s'il n'a pas eu lieu.
+
+        Returns:
+            True si le modèle est prêt à encoder.
+        """
+        if self.state == READY:
+            return True
+        with self._lock:
+            if self.state == FAILED and (
+                time.monotonic() - self._failed_at >= self.retry_after
+            ):
+                self.state = IDLE
+            if self.state == IDLE:
+                self.state = LOADING
+                self._thread = threading.Thread(
+                    target=self._load, name="embedding-model", daemon=True
+                )
+                self._thread.start()
+        return False
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Attend la fin d'un chargement en cours (tests, scripts)."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.is_ready()
+
+    def _load(self) -> None:
+        start = time.perf_counter()
+        try:
+            model = self._loader()
+        except Exception as e:
+            logger.exception("Chargement du modèle d'embedding impossible")
+            with self._lock:
+                self.state, self.error = FAILED, str(e)
+                self._failed_at = time.monotonic()
+            return
+        with self._lock:
+            self._model = model
+            self.load_ms = round(1000 * (time.perf_counter() - start), 1)
+            self.state, self.error = READY, None
+
+    def embed(self, text: str) -> list[float]:
+        """Encode un texte en vecteur (float[384] pour le modèle par défaut).
+
+        Raises:
+            RuntimeError: si fastembed n'est pas installé ou si le modèle
+                n'est pas encore chargé.
+        """
+        if self.state == UNAVAILABLE:
+            raise RuntimeError("fastembed n'est pas installé")
+        if self._model is None:
+            raise RuntimeError(f"Modèle d'embedding non chargé ({self.state})")
+        return next(iter(self._model.embed([text]))).tolist()
+
+    def status(self) -> dict:
+        return {"state": self.state, "load_ms": self.load_ms, "error": self.error}
+
+
+_model: EmbeddingModel | None = None
+_model_lock = threading.Lock()
+
+
+def get_embedding_model() -> EmbeddingModel:
+    """Modèle du process (EMBEDDING_MODEL_NAME), créé sans être chargé."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = EmbeddingModel(_fastembed_loader(EMBEDDING_MODEL_NAME))
+    return _model
@@ -0,0 +1,97 @@
+"""Cache LRU borné, thread-safe, avec compteurs de succès/échecs."""
+
+from collections import OrderedDict
+import threading
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Dictionnaire borné : au-delà de `max_size` entrées, ou de `max_bytes`
+    octets (taille donnée à put), la moins récemment utilisée est évincée.
+
+    Toutes les opérations sont protégées par un verrou : une instance peut
+    être partagée entre les threads du serveur.
+    """
+
+    def __init__(self, max_size: int, max_bytes: int | None = None):
+        if max_size < 1:
+            raise ValueError("max_size doit être >= 1")
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._data: OrderedDict = OrderedDict()
+        self._sizes: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Retourne la valeur associée à `key` (et la marque comme récente)."""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, nbytes: int = 0) -> None:
+        """Ajoute ou remplace une entrée (de `nbytes` octets), en évinçant les
+        plus anciennes si besoin ; plus grosse que max_bytes, elle n'est pas
+        gardée."""
+        with self._lock:
+            self.nbytes -= self._sizes.pop(key, 0)
+            self._data.pop(key, None)
+            if self.max_bytes is not None and nbytes > self.max_bytes:
+                return
+            self._data[key] = value
+            if nbytes:
+                self._sizes[key] = nbytes
+                self.nbytes += nbytes
+            while len(self._data) > self.max_size or (
+                self.max_bytes is not None and self.nbytes > self.max_bytes
+            ):
+                oldest, _ = self._data.popitem(last=False)
+                self.nbytes -= self._sizes.pop(oldest, 0)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            self.nbytes -= self._sizes.pop(key, 0)
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        """Vide le cache et remet les compteurs à zéro."""
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def stats(self) -> dict:
+        """Compteurs du cache (taille, succès, échecs, taux de succès, évictions ;
+        octets occupés si le cache est borné en octets)."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+            if self.max_bytes is not None:
+                stats["bytes"] = self.nbytes
+                stats["max_bytes"] = self.max_bytes
+            return stats
@@ -0,0 +1,170 @@
+"""
+Latence de l'autocomplétion (AutocompleteIndex.complete) face au LIKE.
+
+Usage, depuis backend/ :
+    python benchmarks/bench_autocomplete.py [--db chemin.duckdb] [--kind parts]
+
+Charge l'index --kind depuis le catalogue (ou, sans catalogue, depuis
+--synthetic noms générés), puis mesure pour des préfixes de 1 à 6
+caractères tirés des noms : latence moyenne et p95 de complete(), et
+de la même recherche en SQL (LIKE sur les mots du nom, tri par
+popularité) sur le catalogue s'il existe. La ligne "+ version" compte
+aussi get_autocomplete_index avec la version du fichier (un stat), soit
+le coût d'un appel à /autocomplete hors HTTP.
+"""
+
+import argparse
+from pathlib import Path
+import random
+import statistics
+import sys
+import time
+
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import duckdb
+
+from app.database.autocomplete_index import (
+    SOURCES,
+    AutocompleteIndex,
+    get_autocomplete_index,
+)
+from app.database.connexion_duckdb import DB_PATH, file_version
+
+
+WORDS = [
+    "brick",
+    "plate",
+    "tile",
+    "slope",
+    "technic",
+    "beam",
+    "axle",
+    "pin",
+    "round",
+    "wedge",
+    "panel",
+    "arch",
+    "bracket",
+    "hinge",
+    "clip",
+    "bar",
+    "minifig",
+    "torso",
+    "legs",
+    "head",
+    "hair",
+    "printed",
+    "pattern",
+    "modified",
+    "curved",
+    "inverted",
+    "double",
+    "triple",
+    "corner",
+    "black",
+    "white",
+    "red",
+    "blue",
+]
+
+
+def synthetic_rows(n: int, rng: random.Random) -> list[tuple]:
+    return [
+        (
+            f"{i}",
+            " ".join(rng.choices(WORDS, k=rng.randint(2, 6)))
+            + f" {rng.randint(1, 8)} x {rng.randint(1, 16)}",
+            rng.randint(0, 5000),
+            f"{i}",
+        )
+        for i in range(n)
+    ]
+
+
+def timed(fn, prefixes) -> list[float]:
+    latencies = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        fn(prefix)
+        latencies.append(1000 * (time.perf_counter() - start))
+    return sorted(latencies)
+
+
+def report(label: str, latencies: list[float]) -> None:
+    print(
+        f"{label:>12} {statistics.mean(latencies):>9.3f}ms "
+        f"{latencies[int(0.95 * (len(latencies) - 1))]:>9.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--kind", choices=sorted(SOURCES), default="parts")
+    parser.add_argument("--synthetic", type=int, default=60_000)
+    parser.add_argument("--prefixes", type=int, default=300)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    conn = None
+    if args.db.exists():
+        conn = duckdb.connect(str(args.db), read_only=True)
+        rows = conn.execute(SOURCES[args.kind]).fetchall()
+        source = f"{args.db.name}:{args.kind}"
+    else:
+        rows = synthetic_rows(args.synthetic, rng)
+        source = "synthétiques"
+
+    start = time.perf_counter()
+    index = AutocompleteIndex.build(rows)
+    print(
+        f"{len(index)} noms ({source}), {len(index.terms)} termes, "
+        f"construit en {time.perf_counter() - start:.2f} s\n"
+    )
+
+    names = [row[1] for row in rows if row[1]]
+    sql = f"""
+        SELECT * FROM ({SOURCES[args.kind]}) r(id, name, popularity, searchable)
+        WHERE lower(name) LIKE ? OR lower(name) LIKE ?
+        ORDER BY popularity DESC LIMIT ?
+    """
+    print(f"{'préfixe':>12} {'moyenne':>11} {'p95':>11}")
+    for length in range(1, 7):
+        prefixes = []
+        while len(prefixes) < args.prefixes:
+            word = rng.choice(rng.choice(names).split())
+            if len(word) >= length:
+                prefixes.append(word[:length].lower())
+        report(
+            f"{length} car.",
+            timed(lambda p: index.complete(p, args.limit), prefixes),
+        )
+        if conn is not None:
+            report(
+                "LIKE",
+                timed(
+                    lambda p: conn.execute(
+                        sql, [f"{p}%", f"% {p}%", args.limit]
+                    ).fetchall(),
+                    prefixes[:30],
+                ),
+            )
+            report(
+                "+ version",
+                timed(
+                    lambda p: get_autocomplete_index(
+                        conn, args.kind, file_version(args.db)
+                    ).complete(p, args.limit),
+                    prefixes,
+                ),
+            )
+    if conn is not None:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark des moteurs de calcul des sets constructibles (sql vs matrix).
+
+Usage, depuis backend/ :
+    python benchmarks/bench_buildable.py [--db chemin.duckdb] [--users 20]
+
+Simule des utilisateurs dont le stock est formé des pièces de quelques sets
+tirés au hasard (avec des manques), puis mesure pour chaque moteur le temps
+de BuildableEngine.rank() et vérifie que les résultats sont identiques.
+Le temps de chargement de la matrice (une fois par catalogue) est affiché
+à part. Faire varier --sets-per-user montre l'effet de la taille du stock.
+"""
+
+import argparse
+from pathlib import Path
+import random
+import statistics
+import sys
+import time
+
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import duckdb
+
+from app.business_object.user_stock import UserStock
+from app.database.connexion_duckdb import DB_PATH
+from app.service.buildable_engine import ENGINES, RequirementMatrix
+
+
+def make_stocks(conn, n_users: int, sets_per_user: int, seed: int) -> list[UserStock]:
+    """Stocks synthétiques : pièces de `sets_per_user` sets, ~10 % manquantes."""
+    rnd = random.Random(seed)
+    set_nums = [
+        r[0]
+        for r in conn.execute("SELECT set_num FROM set_requirement_totals").fetchall()
+    ]
+    stocks = []
+    for _ in range(n_users):
+        picked = rnd.sample(set_nums, min(sets_per_user, len(set_nums)))
+        placeholders = ", ".join(["?"] * len(picked))
+        rows = conn.execute(
+            f"""
+            SELECT pc_id, SUM(needed)
+            FROM set_requirements
+            WHERE set_num IN ({placeholders})
+            GROUP BY pc_id
+            """,
+            picked,
+        ).fetchall()
+        stocks.append(
+            UserStock.from_dict(
+                {pc_id: int(q) for pc_id, q in rows if rnd.random() > 0.1}
+            )
+        )
+    return stocks
+
+
+def summarize(result: dict) -> dict:
+    return {
+        bucket: [(s.set_num, s.parts_owned) for s in sets]
+        for bucket, sets in result.items()
+    }
+
+
+def bench(conn, stocks: list[dict], limit: int) -> None:
+    start = time.perf_counter()
+    RequirementMatrix.load(conn)
+    print(f"Chargement de la matrice : {1000 * (time.perf_counter() - start):.1f} ms\n")
+
+    reference = None
+    for name, engine_cls in ENGINES.items():
+        engine = engine_cls(conn)
+        engine.rank(stocks[0], [], limit)  # échauffement
+        timings, results = [], []
+        for stock in stocks:
+            start = time.perf_counter()
+            results.append(summarize(engine.rank(stock, [], limit)))
+            timings.append(1000 * (time.perf_counter() - start))
+
+        same = "—" if reference is None else ("oui" if results == reference else "NON")
+        reference = reference or results
+        timings.sort()
+        print(
+            f"  {name:8} moyenne {statistics.mean(timings):8.2f} ms   "
+            f"p50 {timings[len(timings) // 2]:8.2f} ms   "
+            f"p95 {timings[int(0.95 * (len(timings) - 1))]:8.2f} ms   "
+            f"identique : {same}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default=str(DB_PATH), help="Base DuckDB à utiliser")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--sets-per-user", type=int, default=30)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"Erreur : base DuckDB introuvable : {args.db}")
+        sys.exit(1)
+
+    conn = duckdb.connect(args.db, read_only=True)
+    try:
+        stocks = make_stocks(conn, args.users, args.sets_per_user, args.seed)
+        sizes = sorted(len(s) for s in stocks)
+        print(
+            f"{len(stocks)} utilisateurs, médiane {sizes[len(sizes) // 2]} "
+            f"couples pièce/couleur en stock"
+        )
+        bench(conn, stocks, args.limit)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark de la recherche vectorielle filtrée (SearchDAO.search_sets_by_vector).
+
+Usage, depuis backend/ :
+    python benchmarks/bench_filtered_knn.py [--sets 50000] [--queries 50]
+
+Construit un catalogue synthétique (vecteurs aléatoires float[384]) dont les
+thèmes gardent 50 %, 10 %, 1 % et 0,1 % des sets, crée l'index HNSW si
+l'extension vss peut être chargée (INSTALL vss, accès réseau la première
+fois), puis mesure pour chaque sélectivité les stratégies "exact" (scan des
+lignes filtrées), "hnsw" (top-k suréchantillonné puis filtre), "numpy"
+(index exact en mémoire, chargé avant la mesure) et "auto" (choix de
+SearchDAO) : latence et rappel par rapport au scan exact.
+Sans vss, "hnsw" parcourt toute la table et le rappel vaut 1.
+"""
+
+import argparse
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import duckdb
+import numpy as np
+
+from app.database.catalog_capabilities import probe_capabilities
+from app.database.dao.search_dao import SearchDAO
+from app.database.vector_index import get_vector_index
+from app.utils.embedding_model import EmbeddingModel
+
+
+# theme_id -> part du catalogue (le reste est dans le thème 0)
+THEME_SHARES = {1: 0.5, 2: 0.1, 3: 0.01, 4: 0.001}
+
+
+def build_catalog(path: Path, n_sets: int, seed: int) -> tuple[np.ndarray, bool]:
+    """Écrit le catalogue synthétique ; renvoie les vecteurs et si l'index
+    HNSW a pu être créé."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n_sets, 384), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    draws = rng.random(n_sets)
+    themes = np.zeros(n_sets, dtype=np.int32)
+    low = 0.0
+    for theme_id, share in THEME_SHARES.items():
+        themes[(draws >= low) & (draws < low + share)] = theme_id
+        low += share
+
+    conn = duckdb.connect(str(path))
+    conn.execute(
+        "CREATE TABLE sets (set_num VARCHAR, name VARCHAR, year INTEGER, "
+        "theme_id INTEGER, num_parts INTEGER, img_url VARCHAR)"
+    )
+    conn.execute("CREATE TABLE set_embeddings (set_num VARCHAR, embedding FLOAT[384])")
+    set_nums = [f"{i}-1" for i in range(n_sets)]
+    conn.executemany(
+        "INSERT INTO sets VALUES (?, ?, 2020, ?, 100, NULL)",
+        [(num, f"Set {num}", int(t)) for num, t in zip(set_nums, themes, strict=True)],
+    )
+    conn.executemany(
+        "INSERT INTO set_embeddings VALUES (?, ?)",
+        [(num, v.tolist()) for num, v in zip(set_nums, vectors, strict=True)],
+    )
+    try:
+        conn.execute("INSTALL vss")
+        conn.execute("LOAD vss")
+        conn.execute("SET hnsw_enable_experimental_persistence = true")
+        conn.execute("CREATE INDEX hnsw_sets ON set_embeddings USING HNSW(embedding)")
+        indexed = True
+    except duckdb.Error as e:
+        print(f"Index HNSW indisponible ({e.__class__.__name__}) : scans complets")
+        indexed = False
+    conn.close()
+    return vectors, indexed
+
+
+def measure(dao, queries, theme_id, limit, strategy) -> tuple[list[float], list]:
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        rows = dao.search_sets_by_vector(
+            query, theme_id=theme_id, limit=limit, strategy=strategy
+        )
+        latencies.append(1000 * (time.perf_counter() - start))
+        results.append([r["set_num"] for r in rows])
+    return latencies, results
+
+
+def recall(results, reference) -> float:
+    hits = sum(
+        len(set(r) & set(ref)) for r, ref in zip(results, reference, strict=True)
+    )
+    total = sum(len(ref) for ref in reference)
+    return hits / total if total else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sets", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.duckdb"
+        t0 = time.perf_counter()
+        vectors, indexed = build_catalog(path, args.sets, args.seed)
+        print(
+            f"Catalogue : {args.sets} sets, index HNSW {'oui' if indexed else 'non'} "
+            f"({time.perf_counter() - t0:.1f} s)\n"
+        )
+
+        conn = duckdb.connect(str(path), read_only=True)
+        if indexed:
+            conn.execute("LOAD vss")
+        dao = SearchDAO(conn, model=EmbeddingModel(None))
+        dao._capabilities = probe_capabilities(conn)
+        t0 = time.perf_counter()
+        index = get_vector_index(conn, "set_embeddings")
+        print(
+            f"Index NumPy : {index.nbytes / 1e6:.0f} Mo "
+            f"({time.perf_counter() - t0:.1f} s)\n"
+        )
+        rng = np.random.default_rng(args.seed + 1)
+        queries = [
+            vectors[i].tolist()
+            for i in rng.choice(len(vectors), args.queries, replace=False)
+        ]
+
+        print(
+            f"{'sélectivité':>12} {'stratégie':>10} {'moyenne':>10} "
+            f"{'p95':>10} {'rappel':>8}  plan auto"
+        )
+        for theme_id, share in THEME_SHARES.items():
+            _, reference = measure(dao, queries, theme_id, args.limit, "exact")
+            for strategy in ("exact", "hnsw", "numpy", None):
+                latencies, results = measure(
+                    dao, queries, theme_id, args.limit, strategy
+                )
+                latencies.sort()
+                plan = dao.last_plan if strategy is None else ""
+                print(
+                    f"{100 * share:>11g}% {strategy or 'auto':>10} "
+                    f"{statistics.mean(latencies):>8.2f}ms "
+                    f"{latencies[int(0.95 * (len(latencies) - 1))]:>8.2f}ms "
+                    f"{recall(results, reference):>8.3f}  {plan}"
+                )
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Rappel et coût des embeddings quantifiés (int8, float16) face au float32.
+
+Usage, depuis backend/ :
+    python benchmarks/bench_quantization.py [--db chemin.duckdb] [--k 20]
+
+Lit les vecteurs de --table dans le catalogue (ou, sans embeddings, génère
+--synthetic vecteurs groupés en thèmes), puis pour chaque format construit
+l'index NumPy et mesure sur --queries requêtes (vecteurs du catalogue
+bruités) : mémoire de l'index, latence et rappel@K par rapport au float32
+exact, sans puis avec reclassement en float32 des k × rerank meilleurs
+candidats. Affiche aussi la taille d'un fichier DuckDB ne contenant que les
+vecteurs dans chaque stockage (voir generate_embeddings --storage).
+"""
+
+import argparse
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import duckdb
+import numpy as np
+
+from app.database.connexion_duckdb import DB_PATH
+import app.database.vector_index as vector_index
+from app.database.vector_index import DIMS, VectorIndex, normalize, quantize
+
+
+def load_vectors(db: Path, table: str) -> np.ndarray | None:
+    if not db.exists():
+        return None
+    with duckdb.connect(str(db), read_only=True) as conn:
+        try:
+            rows = conn.execute(
+                f"SELECT embedding FROM {table} WHERE embedding IS NOT NULL"
+            ).fetchnumpy()["embedding"]
+        except duckdb.Error:
+            return None
+    return np.stack(rows).astype(np.float32) if len(rows) else None
+
+
+def synthetic_vectors(n: int, seed: int) -> np.ndarray:
+    """Vecteurs groupés autour de 300 centres, comme des noms proches."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((300, DIMS), dtype=np.float32)
+    vectors = centers[rng.integers(0, len(centers), n)]
+    return vectors + 0.6 * rng.standard_normal((n, DIMS), dtype=np.float32)
+
+
+def file_size(vectors: np.ndarray, storage: str) -> int:
+    """Taille d'une base DuckDB ne contenant que ces vecteurs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "vectors.duckdb"
+        with duckdb.connect(str(path)) as conn:
+            if storage == "float32":
+                conn.execute(f"CREATE TABLE v (id INTEGER, embedding FLOAT[{DIMS}])")
+                conn.executemany(
+                    "INSERT INTO v VALUES (?, ?)",
+                    [(i, row.tolist()) for i, row in enumerate(vectors)],
+                )
+            else:
+                codes, scales = quantize(vectors, storage)
+                conn.execute(
+                    "CREATE TABLE v (id INTEGER, embedding_q BLOB, scale FLOAT)"
+                )
+                conn.executemany(
+                    "INSERT INTO v VALUES (?, ?, ?)",
+                    [
+                        (
+                            i,
+                            codes[i].tobytes(),
+                            None if scales is None else float(scales[i]),
+                        )
+                        for i in range(len(codes))
+                    ],
+                )
+            conn.execute("CHECKPOINT")
+        return path.stat().st_size
+
+
+def make_index(vectors: np.ndarray, fmt: str) -> VectorIndex:
+    keys = np.arange(len(vectors))
+    if fmt == "float32":
+        return VectorIndex(keys, normalize(vectors), {})
+    codes, scales = quantize(vectors, fmt)
+    return VectorIndex(keys, codes, {}, scales)
+
+
+def run(index, queries, k, exact_vectors) -> tuple[list[float], list[list]]:
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = index.search(query, k, exact_vectors=exact_vectors)
+        latencies.append(1000 * (time.perf_counter() - start))
+        results.append([key for key, _ in hits])
+    return latencies, results
+
+
+def recall(results, reference) -> float:
+    hits = sum(
+        len(set(r) & set(ref)) for r, ref in zip(results, reference, strict=True)
+    )
+    return hits / sum(len(ref) for ref in reference)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--table", default="part_embeddings")
+    parser.add_argument("--synthetic", type=int, default=60_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--rerank", default="2,4,8")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vectors = load_vectors(args.db, args.table)
+    source = f"{args.db.name}:{args.table}"
+    if vectors is None:
+        vectors = synthetic_vectors(args.synthetic, args.seed)
+        source = "synthétiques"
+    rng = np.random.default_rng(args.seed + 1)
+    picked = rng.choice(len(vectors), args.queries, replace=False)
+    queries = vectors[picked] + 0.05 * rng.standard_normal(
+        (args.queries, DIMS), dtype=np.float32
+    )
+    print(f"{len(vectors)} vecteurs ({source}), {args.queries} requêtes, K={args.k}\n")
+
+    unit = normalize(vectors)
+
+    def exact_vectors(keys):
+        return {key: unit[key] for key in keys}
+
+    baseline = make_index(vectors, "float32")
+    _, reference = run(baseline, queries, args.k, None)
+
+    print(
+        f"{'format':>8} {'reclass.':>8} {'mémoire':>10} {'moyenne':>10} {'rappel@K':>9}"
+    )
+    for fmt in ("float32", "float16", "int8"):
+        index = make_index(vectors, fmt)
+        factors = (
+            [None] if fmt == "float32" else [None, *map(int, args.rerank.split(","))]
+        )
+        for factor in factors:
+            if factor is not None:
+                vector_index.VECTOR_RERANK = factor
+            latencies, results = run(
+                index, queries, args.k, exact_vectors if factor else None
+            )
+            print(
+                f"{fmt:>8} {('×' + str(factor)) if factor else '-':>8} "
+                f"{index.nbytes / 1e6:>8.1f}Mo {statistics.mean(latencies):>8.2f}ms "
+                f"{recall(results, reference):>9.3f}"
+            )
+
+    sample = vectors[: min(len(vectors), 20_000)]
+    print(f"\nTaille DuckDB pour {len(sample)} vecteurs :")
+    for storage in ("float32", "float16", "int8"):
+        print(f"  {storage:>8} {file_size(sample, storage) / 1e6:8.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
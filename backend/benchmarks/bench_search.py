@@ -0,0 +1,131 @@
+"""
+Pertinence et latence des modes de recherche (SearchDAO.search_sets).
+
+Usage, depuis backend/ :
+    python benchmarks/bench_search.py [--db chemin.duckdb] [--queries 200] [--typos]
+
+Nécessite le catalogue DuckDB (init_db_lego.py). Les requêtes sont tirées
+du catalogue : pour un set au hasard, quelques mots de son nom (sans le
+premier), en minuscules, avec parfois le nom du thème ; le set d'origine
+est la bonne réponse ; --typos retire une lettre d'un mot de chaque requête.
+Pour chaque mode ("like", "trigram" si build_trigram_index a rempli
+set_trigrams, "fts" si build_search_index a pu indexer le catalogue,
+"vector" et "hybrid" si fastembed et les embeddings sont présents) :
+latence moyenne et p95, hit@10 et MRR@10.
+Les requêtes sont encodées avant la mesure (cache des requêtes), la
+latence ne compte donc pas le modèle.
+"""
+
+import argparse
+from dataclasses import replace
+from pathlib import Path
+import random
+import statistics
+import sys
+import time
+
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import duckdb
+
+from app.database.catalog_capabilities import probe_capabilities
+from app.database.connexion_duckdb import DB_PATH
+import app.database.dao.search_dao as search_module
+from app.database.dao.search_dao import SearchDAO
+from app.utils.embedding_model import get_embedding_model
+
+
+def make_queries(conn, n: int, seed: int, typos: bool) -> list[tuple[str, str]]:
+    """[(requête, set_num attendu)] tirés des noms de sets."""
+    rows = conn.execute(
+        """
+        SELECT s.set_num, s.name, COALESCE(t.name, '')
+        FROM sets s LEFT JOIN themes t ON s.theme_id = t.id
+        WHERE length(s.name) > 12
+        """
+    ).fetchall()
+    rng = random.Random(seed)
+    queries = []
+    for set_num, name, theme in rng.sample(rows, min(n, len(rows))):
+        words = name.lower().split()
+        kept = words[1:] if len(words) > 2 else words
+        if theme and rng.random() < 0.3:
+            kept = [*kept, theme.lower()]
+        if typos:
+            i = max(range(len(kept)), key=lambda j: len(kept[j]))
+            cut = rng.randrange(len(kept[i]))
+            kept[i] = kept[i][:cut] + kept[i][cut + 1 :]
+        queries.append((" ".join(kept), set_num))
+    return queries
+
+
+def evaluate(dao, queries) -> tuple[list[float], float, float]:
+    latencies, hits, reciprocal = [], 0, 0.0
+    for query, expected in queries:
+        start = time.perf_counter()
+        rows = dao.search_sets(query, limit=10)
+        latencies.append(1000 * (time.perf_counter() - start))
+        found = [r["set_num"] for r in rows]
+        if expected in found:
+            hits += 1
+            reciprocal += 1 / (found.index(expected) + 1)
+    return latencies, hits / len(queries), reciprocal / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--typos", action="store_true")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        sys.exit(f"Catalogue introuvable : {args.db} (lancer init_db_lego.py)")
+    conn = duckdb.connect(str(args.db), read_only=True)
+    capabilities = probe_capabilities(conn)
+    queries = make_queries(conn, args.queries, args.seed, args.typos)
+
+    model = get_embedding_model()
+    vectors = model.ensure_loading() or model.wait(120)
+    dao = SearchDAO(conn, model=model)
+    dao._capabilities = capabilities
+    none = frozenset()
+    # mode -> (SEARCH_MODE, tables fts, tables de trigrammes)
+    modes = {"like": ("text", none, none)}
+    if "set_trigrams" in capabilities.trigram_tables:
+        modes["trigram"] = ("text", none, capabilities.trigram_tables)
+    if "set_documents" in capabilities.fts_tables:
+        modes["fts"] = ("text", capabilities.fts_tables, none)
+    if vectors and "set_embeddings" in capabilities.embedding_tables:
+        for query, _ in queries:
+            dao._encode(query)
+        modes["vector"] = ("vector", none, none)
+        modes["hybrid"] = (
+            "hybrid",
+            capabilities.fts_tables,
+            capabilities.trigram_tables,
+        )
+    else:
+        print("Modèle ou embeddings indisponibles : modes vectoriels ignorés")
+
+    print(f"{len(queries)} requêtes sur {args.db.name}\n")
+    print(f"{'mode':>8} {'moyenne':>10} {'p95':>10} {'hit@10':>8} {'MRR@10':>8}")
+    for label, (mode, fts_tables, trigram_tables) in modes.items():
+        dao._capabilities = replace(
+            capabilities, fts_tables=fts_tables, trigram_tables=trigram_tables
+        )
+        search_module.SEARCH_MODE = mode
+        latencies, hit_rate, mrr = evaluate(dao, queries)
+        latencies.sort()
+        print(
+            f"{label:>8} {statistics.mean(latencies):>8.2f}ms "
+            f"{latencies[int(0.95 * (len(latencies) - 1))]:>8.2f}ms "
+            f"{hit_rate:>8.3f} {mrr:>8.3f}"
+        )
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Test de charge des routes utilisateur : API_MODE=sync (psycopg2) vs async (asyncpg).
+
+Usage, depuis backend/ (PostgreSQL joignable, voir .env ; base DuckDB générée) :
+    python benchmarks/load_test.py [--concurrency 200] [--duration 20]
+    python benchmarks/load_test.py --url http://localhost:8000   # serveur déjà lancé
+
+Sans --url, lance successivement un serveur uvicorn (un worker) par mode sur
+le même port, crée un utilisateur de test avec quelques sets et pièces, puis
+envoie pendant --duration secondes des requêtes depuis --concurrency clients
+simultanés : lectures de la collection, des pièces et des favoris (PostgreSQL
+puis détails DuckDB) et, pour --write-ratio d'entre elles, ajout/retrait d'un
+favori. Affiche débit, latences et erreurs par mode.
+
+Mesure de référence (PostgreSQL 16 local, petit catalogue DuckDB, un seul
+CPU partagé par le serveur, PostgreSQL et ce script, --duration 15) :
+
+    clients  mode    req/s   p50 ms   p95 ms   p99 ms
+         50  sync     98.6      347     1411     2104
+         50  async   110.0      327     1270     1868
+        200  sync     94.2     1514     5764     9276
+        200  async    90.7     1483     5790     8593
+
+Sur une machine à un cœur, le CPU sature avant PostgreSQL : async gagne
+~10 % à 50 clients, et rien à 200. L'écart est à mesurer à nouveau sur le
+matériel cible.
+"""
+
+import argparse
+import asyncio
+import os
+from pathlib import Path
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+SEED_SETS = ["10300-1", "42115-1", "75192-1", "21318-1", "10294-1"]
+SEED_PARTS = [("3001", 4), ("3003", 1), ("3020", 15), ("3710", 0), ("3023", 5)]
+
+
+def start_server(mode: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, "API_MODE": mode}
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.api.fast_api:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Le serveur n'a pas démarré")
+
+
+async def seed_user(client: httpx.AsyncClient) -> int:
+    """Utilisateur de test avec une collection, des pièces et des favoris."""
+    resp = await client.post(
+        "/users",
+        json={"username": f"load_{uuid.uuid4().hex[:12]}", "password": "load-test"},
+    )
+    resp.raise_for_status()
+    user_id = resp.json()["id_user"]
+    for set_num in SEED_SETS:
+        await client.post(f"/users/{user_id}/collection", json={"set_num": set_num})
+        await client.post(f"/users/{user_id}/favorites", json={"set_num": set_num})
+    for part_num, color_id in SEED_PARTS:
+        await client.post(
+            f"/users/{user_id}/parts",
+            json={"part_num": part_num, "color_id": color_id, "quantity": 3},
+        )
+    return user_id
+
+
+async def client_loop(
+    client: httpx.AsyncClient,
+    user_id: int,
+    deadline: float,
+    write_ratio: float,
+    rnd: random.Random,
+    latencies: list[float],
+    errors: list[str],
+) -> None:
+    reads = [
+        f"/users/{user_id}/collection",
+        f"/users/{user_id}/parts",
+        f"/users/{user_id}/favorites",
+    ]
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            if rnd.random() < write_ratio:
+                set_num = f"{rnd.randint(1, 99999)}-1"
+                resp = await client.post(
+                    f"/users/{user_id}/favorites", json={"set_num": set_num}
+                )
+                if resp.status_code < 400:
+                    resp = await client.delete(f"/users/{user_id}/favorites/{set_num}")
+            else:
+                resp = await client.get(rnd.choice(reads))
+            if resp.status_code >= 400:
+                errors.append(str(resp.status_code))
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(1000 * (time.perf_counter() - start))
+
+
+async def run_load(url: str, args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        await wait_ready(client)
+        user_id = await seed_user(client)
+        latencies: list[float] = []
+        errors: list[str] = []
+        # Échauffement (connexions des pools, cache de blocs DuckDB)
+        await asyncio.gather(
+            *(client.get(f"/users/{user_id}/collection") for _ in range(20))
+        )
+        start = time.monotonic()
+        deadline = start + args.duration
+        await asyncio.gather(
+            *(
+                client_loop(
+                    client,
+                    user_id,
+                    deadline,
+                    args.write_ratio,
+                    random.Random(args.seed + i),
+                    latencies,
+                    errors,
+                )
+                for i in range(args.concurrency)
+            )
+        )
+        elapsed = time.monotonic() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "mean": statistics.mean(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[int(0.95 * (len(latencies) - 1))],
+        "p99": latencies[int(0.99 * (len(latencies) - 1))],
+        "errors": len(errors),
+        "error_kinds": sorted(set(errors)),
+    }
+
+
+def report(mode: str, result: dict) -> None:
+    print(
+        f"  {mode:6} {result['rps']:8.1f} req/s   "
+        f"moyenne {result['mean']:7.1f} ms   p50 {result['p50']:7.1f} ms   "
+        f"p95 {result['p95']:7.1f} ms   p99 {result['p99']:7.1f} ms   "
+        f"erreurs {result['errors']} {' '.join(result['error_kinds'])}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="Serveur déjà lancé (un seul mode mesuré)")
+    parser.add_argument("--modes", default="sync,async")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{args.concurrency} clients simultanés, {args.duration:g} s par mode, "
+        f"{100 * args.write_ratio:g} % d'écritures\n"
+    )
+    if args.url:
+        report("url", asyncio.run(run_load(args.url, args)))
+        return
+
+    for mode in args.modes.split(","):
+        server = start_server(mode, args.port)
+        try:
+            result = asyncio.run(run_load(f"http://127.0.0.1:{args.port}", args))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+        report(mode, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,13 @@ from app.database.dao.collection_dao import CollectionDAO
 from app.database.dao.favorite_dao import FavoriteDAO
 from app.database.dao.user_parts_dao import UserPartsDAO
 from app.database.dao.whishlist_dao import WishlistDAO
+from app.database.duckdb import init_db_lego
+
+
+@pytest.fixture()
+def anyio_backend():
+    """Tests async (pytest.mark.anyio) exécutés sur asyncio, comme l'API."""
+    return "asyncio"
 
 
 # ---------------------------------------------------------------------------
@@ -123,3 +130,88 @@ def duckdb_conn():
     conn = duckdb.connect(str(DB_TEST_PATH), read_only=True)
     yield conn
     conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Catalogue DuckDB minimal en mémoire (schéma réel + tables dérivées)
+# ---------------------------------------------------------------------------
+
+_lego_schema_path = (
+    Path(__file__).parent.parent / "app" / "database" / "duckdb" / "schema_lego.sql"
+)
+
+# set_num -> [(part_num, color_id, quantity)] (hors pièces de rechange)
+CATALOG_REQUIREMENTS = {
+    "100-1": [
+        ("3001", 1, 2),
+        ("3002", 1, 1),
+        ("3003", 2, 4),
+        ("3004", 1, 1),
+        ("3005", 3, 1),
+    ],
+    "200-1": [
+        ("3001", 1, 1),
+        ("3002", 1, 1),
+        ("3003", 2, 1),
+        ("3004", 1, 1),
+        ("3006", 1, 1),
+    ],
+    "300-1": [
+        ("3001", 1, 1),
+        ("3007", 1, 1),
+        ("3008", 1, 1),
+        ("3009", 1, 1),
+        ("3010", 1, 1),
+    ],
+    "400-1": [("3001", 1, 1), ("3002", 1, 1)],  # moins de 5 couples
+}
+
+
+def build_lego_catalog(conn) -> None:
+    """Crée le schéma LEGO et un petit catalogue cohérent, puis les tables dérivées."""
+    conn.execute(_lego_schema_path.read_text())
+    conn.execute("INSERT INTO themes VALUES (1, 'Town', NULL)")
+    conn.executemany(
+        "INSERT INTO colors VALUES (?, ?, ?, false)",
+        [(1, "Red", "C91A09"), (2, "Blue", "0055BF"), (3, "Black", "05131D")],
+    )
+    conn.execute("INSERT INTO part_categories VALUES (1, 'Bricks')")
+    part_nums = sorted(
+        {p for reqs in CATALOG_REQUIREMENTS.values() for p, _, _ in reqs}
+    )
+    conn.executemany(
+        "INSERT INTO parts (part_num, name, part_cat_id) VALUES (?, ?, 1)",
+        [(p, f"Brick {p}") for p in part_nums],
+    )
+    conn.executemany(
+        "INSERT INTO elements (element_id, part_num, color_id) VALUES (?, ?, 1)",
+        [(f"{i + 1}00", p) for i, p in enumerate(part_nums)],
+    )
+    for i, (set_num, reqs) in enumerate(CATALOG_REQUIREMENTS.items()):
+        conn.execute(
+            "INSERT INTO sets VALUES (?, ?, 2020, 1, ?, NULL)",
+            [set_num, f"Set {set_num}", 100 - i],
+        )
+        conn.execute("INSERT INTO inventories VALUES (?, 1, ?)", [i + 1, set_num])
+        conn.executemany(
+            "INSERT INTO inventory_parts VALUES (?, ?, ?, ?, false)",
+            [(i + 1, *r) for r in reqs],
+        )
+        # Une pièce de rechange ne compte jamais dans les besoins
+        conn.execute(
+            "INSERT INTO inventory_parts VALUES (?, '3010', 2, 1, true)", [i + 1]
+        )
+    init_db_lego.encode_catalog(conn)
+    init_db_lego.build_part_images(conn)
+    init_db_lego.build_set_requirements(conn)
+    init_db_lego.build_trigram_index(conn)
+    init_db_lego.write_catalog_meta(conn, test_mode=True)
+
+
+@pytest.fixture()
+def lego_catalog():
+    """Connexion DuckDB en mémoire sur un catalogue minimal (voir CATALOG_REQUIREMENTS)."""
+    conn = duckdb.connect()
+    build_lego_catalog(conn)
+    yield conn
+    conn.close()
@@ -0,0 +1,40 @@
+import numpy as np
+
+from app.business_object.user_stock import UserStock
+
+
+def test_empty():
+    stock = UserStock.empty()
+    assert len(stock) == 0
+    assert stock.to_dict() == {}
+
+
+def test_from_dict_sorts_pc_ids():
+    stock = UserStock.from_dict({7: 1, 3: 2})
+    assert stock.pc_ids.tolist() == [3, 7]
+    assert stock.quantities.tolist() == [2, 1]
+    assert stock.pc_ids.dtype == np.int32
+
+
+def test_from_arrays_sums_duplicates():
+    stock = UserStock.from_arrays([5, 2, 5], [1, 4, 3])
+    assert stock.to_dict() == {2: 4, 5: 4}
+
+
+def test_merge():
+    merged = UserStock.from_dict({1: 2, 3: 1}).merge(UserStock.from_dict({3: 2, 4: 1}))
+    assert merged.to_dict() == {1: 2, 3: 3, 4: 1}
+
+
+def test_merge_with_empty_returns_same_stock():
+    stock = UserStock.from_dict({1: 2})
+    assert stock.merge(UserStock.empty()) is stock
+    assert UserStock.empty().merge(stock) is stock
+
+
+def test_to_frame_shares_arrays():
+    stock = UserStock.from_dict({1: 2, 3: 1})
+    frame = stock.to_frame()
+    assert list(frame.columns) == ["pc_id", "qty"]
+    assert frame["pc_id"].tolist() == [1, 3]
+    assert np.shares_memory(frame["qty"].to_numpy(), stock.quantities)
@@ -0,0 +1,116 @@
+"""Tests pour l'index d'autocomplétion en mémoire."""
+
+import os
+from unittest.mock import patch
+
+import duckdb
+import pytest
+
+import app.database.autocomplete_index as index_module
+from app.database.autocomplete_index import (
+    AutocompleteIndex,
+    get_autocomplete_index,
+    normalize_term,
+)
+from app.database.connexion_duckdb import file_version
+from app.database.duckdb import init_db_lego
+
+
+@pytest.fixture
+def index():
+    return AutocompleteIndex.build(
+        [
+            ("7965-1", "Millennium Falcon", 1254, "7965-1"),
+            ("75030-1", "Millennium Falcon Microfighter", 92, "75030-1"),
+            ("75192-1", "Millennium Falcon UCS", 7541, "75192-1"),
+            ("6086-1", "Black Knight's Castle", 588, "6086-1"),
+            ("10001-1", "Star Wars Star Destroyer", 500, "10001-1"),
+        ]
+    )
+
+
+def ids(suggestions):
+    return [s["id"] for s in suggestions]
+
+
+def test_normalize_term():
+    assert normalize_term("  Black Knight's-Castle ") == "black knight s castle"
+
+
+def test_prefix_of_any_word_most_popular_first(index):
+    assert ids(index.complete("mill")) == ["75192-1", "7965-1", "75030-1"]
+    assert ids(index.complete("FALC", limit=2)) == ["75192-1", "7965-1"]
+    assert ids(index.complete("knight's c")) == ["6086-1"]
+
+
+def test_identifier_prefix(index):
+    assert ids(index.complete("7519")) == ["75192-1"]
+    assert index.complete("7965-1")[0] == {
+        "id": "7965-1",
+        "name": "Millennium Falcon",
+        "popularity": 1254,
+    }
+
+
+def test_name_listed_once(index):
+    assert ids(index.complete("star")) == ["10001-1"]
+
+
+def test_no_match(index):
+    assert index.complete("zz") == []
+    assert index.complete("") == []
+    assert index.complete("mill", limit=0) == []
+
+
+def test_large_range_matches_full_sort():
+    rows = [(i, f"Brick {i % 7} x {i}", (i * 37) % 101, None) for i in range(2000)]
+    index = AutocompleteIndex.build(rows)
+    top = index.complete("brick", limit=15)
+    expected = sorted((score for *_, score, _ in rows), reverse=True)[:15]
+    assert [s["popularity"] for s in top] == expected
+    assert len(set(ids(top))) == 15
+
+
+def test_load_sets_parts_and_themes(lego_catalog):
+    sets = AutocompleteIndex.load(lego_catalog, "sets")
+    assert ids(sets.complete("set 1")) == ["100-1"]
+    parts = AutocompleteIndex.load(lego_catalog, "parts")
+    assert ids(parts.complete("3001")) == ["3001"]
+    assert parts.complete("3001")[0]["popularity"] == 4  # 4 sets
+    themes = AutocompleteIndex.load(lego_catalog, "themes")
+    assert themes.complete("to") == [{"id": 1, "name": "Town", "popularity": 4}]
+
+
+def test_load_parts_from_compacted_catalog(lego_catalog):
+    init_db_lego.compact_catalog(lego_catalog)
+    parts = AutocompleteIndex.load(lego_catalog, "parts")
+    assert parts.complete("3001")[0]["popularity"] == 4
+
+
+def test_index_loaded_once_per_version(tmp_path):
+    path = tmp_path / "lego.duckdb"
+    with duckdb.connect(str(path)) as conn:
+        conn.execute("CREATE TABLE sets (set_num VARCHAR, name VARCHAR, num_parts INT)")
+        conn.execute("INSERT INTO sets VALUES ('1-1', 'Castle', 10)")
+    index_module._index_cache.clear()
+    with duckdb.connect(str(path), read_only=True) as conn:
+        first = get_autocomplete_index(conn, "sets")
+        assert get_autocomplete_index(conn, "sets") is first
+    os.utime(path, ns=(0, 0))  # fichier régénéré
+    with duckdb.connect(str(path), read_only=True) as conn:
+        assert get_autocomplete_index(conn, "sets") is not first
+    assert len(index_module._index_cache) == 1
+    index_module._index_cache.clear()
+
+
+def test_known_version_skips_catalog_query(tmp_path):
+    path = tmp_path / "lego.duckdb"
+    with duckdb.connect(str(path)) as conn:
+        conn.execute("CREATE TABLE sets (set_num VARCHAR, name VARCHAR, num_parts INT)")
+    index_module._index_cache.clear()
+    with duckdb.connect(str(path), read_only=True) as conn:
+        first = get_autocomplete_index(conn, "sets", file_version(path))
+        with patch.object(index_module, "catalog_version") as version:
+            assert get_autocomplete_index(conn, "sets", file_version(path)) is first
+            version.assert_not_called()
+    index_module._index_cache.clear()
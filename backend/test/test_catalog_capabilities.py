@@ -0,0 +1,155 @@
+"""Tests pour le registre des capacités du catalogue DuckDB."""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import duckdb
+import pytest
+
+import app.database.catalog_capabilities as caps_module
+from app.database.catalog_capabilities import (
+    _fts_tables,
+    _has_embeddings,
+    _has_vss,
+    get_catalog_capabilities,
+    probe_capabilities,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    caps_module._registry.clear()
+    yield
+    caps_module._registry.clear()
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """Catalogue avec des embeddings de sets seulement."""
+    db_path = tmp_path / "lego.duckdb"
+    conn = duckdb.connect(str(db_path))
+    conn.execute("CREATE TABLE set_embeddings (set_num VARCHAR, embedding FLOAT[3])")
+    conn.execute("INSERT INTO set_embeddings VALUES ('1-1', [0.1, 0.2, 0.3])")
+    conn.execute("CREATE TABLE part_embeddings (part_id INTEGER, embedding FLOAT[3])")
+    conn.close()
+    return db_path
+
+
+class TestHasEmbeddings:
+    def test_returns_true_when_execute_succeeds(self):
+        mock_conn = MagicMock()
+        assert _has_embeddings(mock_conn) is True
+
+    def test_returns_false_when_execute_raises(self):
+        mock_conn = MagicMock()
+        mock_conn.execute.side_effect = Exception("table not found")
+        assert _has_embeddings(mock_conn) is False
+
+    def test_returns_false_for_empty_table(self, catalog):
+        with duckdb.connect(str(catalog), read_only=True) as conn:
+            assert _has_embeddings(conn, "part_embeddings") is False
+
+
+class TestHasVss:
+    def test_returns_true_when_load_succeeds(self):
+        mock_conn = MagicMock()
+        assert _has_vss(mock_conn) is True
+
+    def test_returns_false_when_load_raises(self):
+        mock_conn = MagicMock()
+        mock_conn.execute.side_effect = Exception("vss not available")
+        assert _has_vss(mock_conn) is False
+
+
+class TestFtsTables:
+    def test_keeps_indexed_document_tables(self):
+        mock_conn = MagicMock()
+        mock_conn.execute.return_value.fetchall.return_value = [
+            ("fts_main_set_documents",),
+            ("fts_main_other",),
+        ]
+        assert _fts_tables(mock_conn) == {"set_documents"}
+
+    def test_empty_when_fts_cannot_load(self):
+        mock_conn = MagicMock()
+        mock_conn.execute.side_effect = Exception("fts not available")
+        assert _fts_tables(mock_conn) == frozenset()
+
+
+def test_probe_lists_usable_tables(catalog):
+    with (
+        duckdb.connect(str(catalog), read_only=True) as conn,
+        patch.object(caps_module, "_has_vss", return_value=True),
+    ):
+        caps = probe_capabilities(conn)
+    assert caps.embedding_tables == {"set_embeddings"}
+    assert caps.can_search_vectors("set_embeddings")
+    assert not caps.can_search_vectors("part_embeddings")
+    assert caps.hnsw_indexes == {}  # pas d'index HNSW
+
+
+def test_probe_without_vss(catalog):
+    with (
+        duckdb.connect(str(catalog), read_only=True) as conn,
+        patch.object(caps_module, "_has_vss", return_value=False),
+    ):
+        caps = probe_capabilities(conn)
+    assert not caps.can_search_vectors("set_embeddings")
+    assert caps.as_dict()["embedding_tables"] == ["set_embeddings"]
+
+
+def test_registry_probes_once_per_version(catalog):
+    with patch.object(
+        caps_module, "probe_capabilities", wraps=probe_capabilities
+    ) as probe:
+        with duckdb.connect(str(catalog), read_only=True) as conn:
+            first = get_catalog_capabilities(conn)
+            with conn.cursor() as cur:
+                assert get_catalog_capabilities(cur) is first
+        assert probe.call_count == 1
+
+        os.utime(catalog, ns=(0, 0))  # fichier régénéré
+        with duckdb.connect(str(catalog), read_only=True) as conn:
+            second = get_catalog_capabilities(conn)
+        assert probe.call_count == 2
+    assert second.version != first.version
+    assert list(caps_module._registry) == [second.version]
+
+
+def test_in_memory_database_is_not_cached():
+    with duckdb.connect() as conn:
+        get_catalog_capabilities(conn)
+    assert caps_module._registry == {}
+
+
+def test_probe_reports_quantized_only_tables(catalog):
+    with duckdb.connect(str(catalog)) as conn:
+        conn.execute("ALTER TABLE set_embeddings ADD COLUMN embedding_q BLOB")
+        conn.execute("ALTER TABLE set_embeddings ADD COLUMN scale FLOAT")
+        conn.execute(
+            "UPDATE set_embeddings SET embedding = NULL, "
+            "embedding_q = ?::BLOB, scale = 0.01",
+            [bytes(384)],
+        )
+    with (
+        duckdb.connect(str(catalog), read_only=True) as conn,
+        patch.object(caps_module, "_has_vss", return_value=True),
+    ):
+        caps = probe_capabilities(conn)
+    assert caps.quantized == {"set_embeddings": "int8"}
+    assert caps.quantized_only == {"set_embeddings"}
+    assert not caps.can_search_vectors("set_embeddings")  # index NumPy seulement
+
+
+def test_probe_reports_filled_trigram_tables(catalog):
+    with duckdb.connect(str(catalog)) as conn:
+        conn.execute(
+            "CREATE TABLE set_trigrams (trigram VARCHAR, set_num VARCHAR, n INTEGER)"
+        )
+        conn.execute(
+            "CREATE TABLE part_trigrams (trigram VARCHAR, part_num VARCHAR, n INTEGER)"
+        )
+        conn.execute("INSERT INTO set_trigrams VALUES ('  a', '1-1', 1)")
+        caps = probe_capabilities(conn)
+    assert caps.trigram_tables == {"set_trigrams"}
+    assert caps.as_dict()["trigram_tables"] == ["set_trigrams"]
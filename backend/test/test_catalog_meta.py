@@ -0,0 +1,75 @@
+"""Tests pour les métadonnées du catalogue (catalog_meta)."""
+
+import os
+from unittest.mock import patch
+
+import duckdb
+
+import app.database.catalog_meta as meta_module
+from app.database.catalog_meta import get_catalog_meta, read_catalog_meta
+from app.database.connexion_duckdb import file_version
+from app.database.duckdb import init_db_lego
+
+
+def test_read_catalog_meta(lego_catalog):
+    meta = read_catalog_meta(lego_catalog)
+    assert meta["mode"] == "test"
+    assert meta["row_counts"]["sets"] == 4
+    assert len(meta["version"]) == 16
+    assert meta["embedding_model"] is None
+
+
+def test_embedding_model_changes_version(lego_catalog):
+    before = read_catalog_meta(lego_catalog)["version"]
+    model = {"name": "m", "dims": 384, "storage": {"set_embeddings": "int8"}}
+    init_db_lego.write_catalog_meta(lego_catalog, test_mode=True, embedding_model=model)
+    meta = read_catalog_meta(lego_catalog)
+    assert meta["embedding_model"] == model
+    assert meta["version"] != before
+
+
+def test_index_changes_version(lego_catalog):
+    before = read_catalog_meta(lego_catalog)["version"]
+    init_db_lego.write_catalog_meta(lego_catalog, test_mode=True)
+    assert read_catalog_meta(lego_catalog)["version"] == before
+    lego_catalog.execute("CREATE INDEX idx_sets_name ON sets(name)")
+    init_db_lego.write_catalog_meta(lego_catalog, test_mode=True)
+    assert read_catalog_meta(lego_catalog)["version"] != before
+
+
+def test_compacted_catalog_keeps_requirements_in_version(lego_catalog):
+    requirements = lego_catalog.execute("SELECT * FROM set_requirements").fetchall()
+    init_db_lego.compact_catalog(lego_catalog)
+    init_db_lego.write_catalog_meta(lego_catalog, test_mode=True)
+    meta = read_catalog_meta(lego_catalog)
+    assert "inventory_parts" not in meta["row_counts"]
+    assert "set_requirements" in meta["checksums"]
+    assert (
+        lego_catalog.execute("SELECT * FROM set_requirements").fetchall()
+        == requirements
+    )
+
+
+def test_read_without_table():
+    with duckdb.connect() as conn:
+        assert read_catalog_meta(conn) is None
+        assert get_catalog_meta(conn) is None
+
+
+def test_meta_read_once_per_version(tmp_path):
+    path = tmp_path / "lego.duckdb"
+    with duckdb.connect(str(path)) as conn:
+        conn.execute("CREATE TABLE catalog_meta (key VARCHAR, value VARCHAR)")
+        conn.execute("""INSERT INTO catalog_meta VALUES ('mode', '"test"')""")
+    meta_module._meta_cache.clear()
+    with duckdb.connect(str(path), read_only=True) as conn:
+        first = get_catalog_meta(conn, file_version(path))
+        assert first == {"mode": "test"}
+        with patch.object(meta_module, "catalog_version") as version:
+            assert get_catalog_meta(conn, file_version(path)) is first
+            version.assert_not_called()
+    os.utime(path, ns=(0, 0))  # fichier régénéré
+    with duckdb.connect(str(path), read_only=True) as conn:
+        assert get_catalog_meta(conn, file_version(path)) is not first
+    assert len(meta_module._meta_cache) == 1
+    meta_module._meta_cache.clear()
@@ -1,17 +1,45 @@
 """Tests pour les utilitaires de connexion DuckDB."""
 
+import json
+import os
+import threading
 from unittest.mock import patch
 
 import duckdb
 import pytest
 
+import app.database.connexion_duckdb as duck_module
 from app.database.connexion_duckdb import (
+    acquire_shared_duckdb,
+    catalog_version,
+    close_shared_duckdb,
     duckdb_connection,
     execute_duckdb_query,
     execute_duckdb_query_df,
+    file_version,
+    get_shared_duckdb,
+    release_shared_duckdb,
+    run_duckdb,
+    shutdown_duckdb_executor,
+    warm_up,
 )
 
 
+def replace_catalog(path, rows: int, mtime_ns: int, version=None) -> None:
+    """Régénère `path` comme init_db_lego : nouveau fichier puis renommage
+    (avec catalog_meta si `version` est donnée)."""
+    new = path.with_suffix(".new")
+    with duckdb.connect(str(new)) as conn:
+        conn.execute("CREATE TABLE items AS SELECT range AS id FROM range(?)", [rows])
+        if version is not None:
+            conn.execute("CREATE TABLE catalog_meta (key VARCHAR, value VARCHAR)")
+            conn.execute(
+                "INSERT INTO catalog_meta VALUES ('version', ?)", [json.dumps(version)]
+            )
+    os.replace(new, path)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
 @pytest.fixture
 def temp_db(tmp_path):
     """Base DuckDB temporaire avec une table simple."""
@@ -74,3 +102,174 @@ class TestExecuteDuckdbQueryDf:
             df = execute_duckdb_query_df("SELECT * FROM items WHERE id = ?", [1])
         assert len(df) == 1
         assert df["name"][0] == "brick"
+
+
+class TestCatalogVersion:
+    def test_none_for_in_memory_database(self):
+        conn = duckdb.connect()
+        assert catalog_version(conn) is None
+        conn.close()
+
+    def test_catalog_meta_version(self, temp_db):
+        replace_catalog(temp_db, 2, 10**9, version="abc")
+        conn = duckdb.connect(str(temp_db), read_only=True)
+        assert catalog_version(conn) == "abc"
+        conn.close()
+
+    def test_changes_when_file_is_rewritten(self, temp_db):
+        conn = duckdb.connect(str(temp_db), read_only=True)
+        before = catalog_version(conn)
+        conn.close()
+        assert before.startswith(str(temp_db))
+
+        os.utime(temp_db, ns=(0, 0))
+        conn = duckdb.connect(str(temp_db), read_only=True)
+        after = catalog_version(conn)
+        conn.close()
+        assert after != before
+
+
+class TestSharedDuckdb:
+    @pytest.fixture(autouse=True)
+    def reset(self):
+        yield
+        close_shared_duckdb()
+
+    def test_same_connection_for_every_call(self, temp_db):
+        conn = get_shared_duckdb(temp_db)
+        assert get_shared_duckdb(temp_db) is conn
+        with conn.cursor() as cur:
+            assert cur.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 2
+
+    def test_reopened_when_file_changes(self, temp_db):
+        before = get_shared_duckdb(temp_db)
+        os.utime(temp_db, ns=(0, 0))
+        assert get_shared_duckdb(temp_db) is not before
+
+    def test_raises_file_not_found_when_db_missing(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            get_shared_duckdb(tmp_path / "missing.duckdb")
+
+    def test_replaced_file_serves_new_rows(self, temp_db):
+        conn = acquire_shared_duckdb(temp_db)
+        release_shared_duckdb(conn)
+        replace_catalog(temp_db, 5, 10**9)
+        conn = acquire_shared_duckdb(temp_db)
+        with conn.cursor() as cur:
+            assert cur.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 5
+            assert catalog_version(cur) == f"{temp_db}@{10**9}"
+        release_shared_duckdb(conn)
+
+    def test_reload_waits_for_borrowed_connection(self, temp_db):
+        old = acquire_shared_duckdb(temp_db)
+        cursor = old.cursor()
+        replace_catalog(temp_db, 5, 10**9)
+        # Pas encore rouverte : l'ancienne version reste celle du catalogue lu
+        assert catalog_version(cursor) != f"{temp_db}@{10**9}"
+        reloaded = []
+        thread = threading.Thread(
+            target=lambda: reloaded.append(acquire_shared_duckdb(temp_db))
+        )
+        thread.start()
+        thread.join(0.2)
+        assert not reloaded  # attend que la requête en cours rende la connexion
+        assert cursor.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 2
+        cursor.close()
+        release_shared_duckdb(old)
+        thread.join(5)
+        with reloaded[0].cursor() as cur:
+            assert cur.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 5
+        release_shared_duckdb(reloaded[0])
+
+    def test_reloaded_once_by_concurrent_callers(self, temp_db):
+        old = acquire_shared_duckdb(temp_db)
+        replace_catalog(temp_db, 5, 10**9)
+        reloaded = []
+        threads = [
+            threading.Thread(
+                target=lambda: reloaded.append(acquire_shared_duckdb(temp_db))
+            )
+            for _ in range(3)
+        ]
+        with patch.object(
+            duck_module.duckdb, "connect", wraps=duckdb.connect
+        ) as connect:
+            for thread in threads:
+                thread.start()
+            release_shared_duckdb(old)
+            for thread in threads:
+                thread.join(5)
+        assert connect.call_count == 1
+        assert len({id(conn) for conn in reloaded}) == 1
+        for conn in reloaded:
+            release_shared_duckdb(conn)
+
+    def test_borrowed_connection_kept_open_after_timeout(self, temp_db, monkeypatch):
+        monkeypatch.setattr(duck_module, "DUCKDB_RELOAD_TIMEOUT", 0.1)
+        old = acquire_shared_duckdb(temp_db)
+        cursor = old.cursor()
+        replace_catalog(temp_db, 5, 10**9)
+        # Requête bloquée : l'ancienne connexion reste servie, sans être fermée
+        assert acquire_shared_duckdb(temp_db) is old
+        assert cursor.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 2
+        cursor.close()
+        release_shared_duckdb(old)
+        release_shared_duckdb(old)
+        conn = acquire_shared_duckdb(temp_db)
+        assert conn is not old
+        with conn.cursor() as cur:
+            assert cur.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 5
+        release_shared_duckdb(conn)
+
+    def test_version_follows_catalog_meta_across_reloads(self, temp_db):
+        replace_catalog(temp_db, 2, 10**9, version="abc")
+        assert file_version(temp_db) == f"{temp_db}@{10**9}"  # pas encore ouvert
+        conn = get_shared_duckdb(temp_db)
+        assert catalog_version(conn) == file_version(temp_db) == "abc"
+        # Mêmes données rechargées : même version, les caches restent valides
+        replace_catalog(temp_db, 2, 2 * 10**9, version="abc")
+        assert catalog_version(get_shared_duckdb(temp_db)) == "abc"
+        replace_catalog(temp_db, 5, 3 * 10**9, version="def")
+        assert file_version(temp_db) == f"{temp_db}@{3 * 10**9}"
+        assert catalog_version(get_shared_duckdb(temp_db)) == "def"
+        assert file_version(temp_db) == "def"
+
+    def test_settings_from_environment(self, temp_db, monkeypatch):
+        monkeypatch.setattr(duck_module, "DUCKDB_THREADS", "2")
+        monkeypatch.setattr(duck_module, "DUCKDB_MEMORY_LIMIT", "256MB")
+        conn = get_shared_duckdb(temp_db)
+        threads, memory = conn.execute(
+            "SELECT current_setting('threads'), current_setting('memory_limit')"
+        ).fetchone()
+        assert threads == 2
+        assert memory.endswith("MiB")
+
+    def test_close(self, temp_db):
+        conn = get_shared_duckdb(temp_db)
+        close_shared_duckdb()
+        assert get_shared_duckdb(temp_db) is not conn
+
+    def test_warm_up_reads_existing_tables_only(self, temp_db, monkeypatch):
+        monkeypatch.setattr(duck_module, "WARM_TABLES", ("items", "missing"))
+        conn = duckdb.connect(str(temp_db), read_only=True)
+        warm_up(conn)  # ni table absente ni extension vss manquante ne bloquent
+        conn.close()
+
+
+class TestRunDuckdb:
+    @pytest.fixture(autouse=True)
+    def reset(self):
+        yield
+        shutdown_duckdb_executor()
+        close_shared_duckdb()
+
+    @pytest.mark.anyio
+    async def test_runs_query_outside_event_loop_thread(self, temp_db):
+        def query(path):
+            with get_shared_duckdb(path).cursor() as cur:
+                count = cur.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+            return count, threading.current_thread().name
+
+        count, thread_name = await run_duckdb(query, temp_db)
+        assert count == 2
+        assert thread_name.startswith("duckdb")
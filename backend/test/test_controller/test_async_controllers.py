@@ -0,0 +1,116 @@
+"""Routes async (API_MODE=async) : mêmes chemins et réponses que les routes
+sync, services async mockés, détails DuckDB lus via run_duckdb."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from app.api.dependencies import get_apg, get_duck
+from app.api.fast_api import USER_DATA_CONTROLLERS
+from app.business_object.user import User
+from app.business_object.user_owned_set import UserOwnedSet
+
+
+@pytest.fixture()
+def mock_apg():
+    return MagicMock()
+
+
+@pytest.fixture()
+def async_client(mock_apg, mock_duck):
+    app = FastAPI()
+    for controller in USER_DATA_CONTROLLERS["async"]:
+        app.include_router(controller.router)
+    app.dependency_overrides[get_apg] = lambda: mock_apg
+    app.dependency_overrides[get_duck] = lambda: mock_duck
+    return TestClient(app)
+
+
+def test_get_collection_with_details(async_client, mock_duck):
+    mock_duck.execute.return_value.fetchall.return_value = [
+        ("1234-1", "Château", 2023, 100, "http://img.jpg")
+    ]
+    with patch(
+        "app.controller.async_collection_controller.AsyncCollectionService"
+    ) as mock_svc:
+        mock_svc.return_value.get_collection = AsyncMock(
+            return_value=[UserOwnedSet(1, "1234-1", is_built=True)]
+        )
+        resp = async_client.get("/users/1/collection")
+
+    assert resp.status_code == 200
+    assert resp.json() == [
+        {
+            "set_num": "1234-1",
+            "name": "Château",
+            "year": 2023,
+            "num_parts": 100,
+            "img_url": "http://img.jpg",
+            "is_built": True,
+        }
+    ]
+
+
+def test_get_parts_empty_skips_duckdb(async_client, mock_duck):
+    with patch("app.controller.async_parts_controller.AsyncUserPartsService") as svc:
+        svc.return_value.get_owned_parts = AsyncMock(return_value=[])
+        resp = async_client.get("/users/1/parts")
+
+    assert resp.status_code == 200
+    assert resp.json() == []
+    mock_duck.execute.assert_not_called()
+
+
+def test_get_wishlist_parts_unknown_part(async_client):
+    row = {"part_num": "9999", "color_id": 1, "quantity": 2}
+    with patch("app.controller.async_wishlist_controller.AsyncWishlistService") as svc:
+        svc.return_value.get_parts = AsyncMock(return_value=[row])
+        resp = async_client.get("/users/1/wishlist/parts")
+
+    assert resp.json() == [{**row, "name": "9999", "img_url": None}]
+
+
+def test_add_favorite_duplicate(async_client):
+    with patch("app.controller.async_favorites_controller.AsyncFavoriteService") as svc:
+        svc.return_value.add_favorite = AsyncMock(return_value=None)
+        resp = async_client.post("/users/1/favorites", json={"set_num": "1234-1"})
+
+    assert resp.status_code == 409
+
+
+def test_remove_part_not_found(async_client):
+    with patch("app.controller.async_parts_controller.AsyncUserPartsService") as svc:
+        svc.return_value.remove_part = AsyncMock(return_value=False)
+        resp = async_client.delete("/users/1/parts/3001/4")
+
+    assert resp.status_code == 404
+
+
+def test_login_invalid_credentials(async_client):
+    with patch("app.controller.async_user_controller.AsyncPasswordService") as svc:
+        svc.return_value.validate_username_password = AsyncMock(
+            side_effect=Exception("Mot de passe incorrect")
+        )
+        resp = async_client.post(
+            "/users/login", json={"username": "john", "password": "x"}
+        )
+
+    assert resp.status_code == 401
+
+
+def test_change_username_in_transaction(async_client, mock_apg):
+    with (
+        patch("app.controller.async_user_controller.AsyncUserDAO") as mock_dao,
+        patch("app.controller.async_user_controller.AsyncUserService") as svc,
+    ):
+        mock_dao.return_value.get_by_id = AsyncMock(
+            return_value=User(username="john", hashed_password="h", salt="s", id_user=1)
+        )
+        svc.return_value.change_username = AsyncMock(return_value=True)
+        resp = async_client.put("/users/1/username", json={"new_username": "johnny"})
+
+    assert resp.status_code == 200
+    svc.return_value.change_username.assert_awaited_once_with("john", "johnny")
+    mock_apg.transaction.assert_called_once()
@@ -46,3 +46,53 @@ def test_get_buildable_sets_with_limit(client):
         client.get("/users/1/buildable?limit=10")
 
         mock_svc.return_value.get_buildable_sets.assert_called_once_with(1, 10)
+
+
+def test_get_buildable_sets_include_missing(client):
+    with patch("app.controller.buildable_controller.BuildableService") as mock_svc:
+        result = {"buildable": [], "partial": []}
+        mock_svc.return_value.get_buildable_sets.return_value = result
+        mock_svc.return_value.with_missing_parts.return_value = result
+
+        resp = client.get("/users/1/buildable?include_missing=true")
+
+    assert resp.status_code == 200
+    mock_svc.return_value.with_missing_parts.assert_called_once_with(1, result)
+
+
+def test_get_buildable_sets_without_missing_by_default(client):
+    with patch("app.controller.buildable_controller.BuildableService") as mock_svc:
+        mock_svc.return_value.get_buildable_sets.return_value = {
+            "buildable": [],
+            "partial": [],
+        }
+
+        client.get("/users/1/buildable")
+
+    mock_svc.return_value.with_missing_parts.assert_not_called()
+
+
+def test_get_missing_parts(client):
+    missing = MagicMock()
+    missing.to_dict.return_value = {"part_num": "3001", "color_id": 1}
+
+    with patch("app.controller.buildable_controller.BuildableService") as mock_svc:
+        mock_svc.return_value.get_missing_parts.return_value = [missing]
+
+        resp = client.get("/users/1/buildable/1234-1/missing")
+
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "set_num": "1234-1",
+        "missing_parts": [{"part_num": "3001", "color_id": 1}],
+    }
+    mock_svc.return_value.get_missing_parts.assert_called_once_with(1, "1234-1")
+
+
+def test_get_missing_parts_unknown_set(client):
+    with patch("app.controller.buildable_controller.BuildableService") as mock_svc:
+        mock_svc.return_value.get_missing_parts.return_value = None
+
+        resp = client.get("/users/1/buildable/nope/missing")
+
+    assert resp.status_code == 404
@@ -1,4 +1,4 @@
-from unittest.mock import patch
+from unittest.mock import ANY, patch
 
 
 # -------------------------
@@ -72,3 +72,47 @@ def test_get_stats(client):
 
     assert resp.status_code == 200
     assert resp.json()["total_sets"] == 1000
+    assert resp.headers["etag"].startswith('"')
+    assert resp.headers["cache-control"] == "public, max-age=300"
+
+
+def test_get_stats_not_modified(client):
+    with patch("app.controller.search_controller.SearchService") as mock_svc:
+        mock_svc.return_value.get_stats.return_value = {"total_sets": 1000}
+        etag = client.get("/stats").headers["etag"]
+
+        resp = client.get("/stats", headers={"If-None-Match": etag})
+        mock_svc.return_value.get_stats.return_value = {"total_sets": 1001}
+        changed = client.get("/stats", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["etag"] == etag
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+# -------------------------
+# GET /autocomplete
+# -------------------------
+
+
+def test_autocomplete(client):
+    with patch("app.controller.search_controller.SearchService") as mock_svc:
+        mock_svc.return_value.autocomplete.return_value = [
+            {"id": "75192-1", "name": "Millennium Falcon", "popularity": 7541}
+        ]
+
+        resp = client.get("/autocomplete?q=mill&kind=sets&limit=5")
+
+    assert resp.status_code == 200
+    assert resp.json()[0]["id"] == "75192-1"
+    mock_svc.return_value.autocomplete.assert_called_once_with(
+        "mill", "sets", 5, version=ANY
+    )
+
+
+def test_autocomplete_rejects_unknown_kind(client):
+    resp = client.get("/autocomplete?q=mill&kind=minifigs")
+
+    assert resp.status_code == 422
@@ -1,4 +1,105 @@
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from app.api.fast_api import app
+
+
 def test_health(client):
-    resp = client.get("/health")
+    with patch("app.controller.system_controller.get_embedding_model") as mock_model:
+        mock_model.return_value.state = "loading"
+        resp = client.get("/health")
     assert resp.status_code == 200
-    assert resp.json() == {"status": "ok"}
+    assert resp.json() == {"status": "ok", "semantic_search": "loading"}
+
+
+def test_search_health(client):
+    with (
+        patch("app.controller.system_controller.get_embedding_model") as mock_model,
+        patch("app.controller.system_controller.get_embedding_cache") as mock_cache,
+        patch("app.controller.system_controller.get_response_cache", return_value=None),
+        patch(
+            "app.controller.system_controller.acquire_shared_duckdb",
+            side_effect=FileNotFoundError,
+        ),
+        patch(
+            "app.controller.system_controller.vector_index_stats",
+            return_value=[{"table": "set_embeddings", "rows": 10}],
+        ),
+    ):
+        mock_model.return_value.status.return_value = {"state": "ready"}
+        mock_cache.return_value.stats.return_value = {"hits": 3, "misses": 1}
+        resp = client.get("/health/search")
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "model": {"state": "ready"},
+        "query_cache": {"hits": 3, "misses": 1},
+        "response_cache": None,
+        "catalog": None,
+        "vector_index": [{"table": "set_embeddings", "rows": 10}],
+    }
+
+
+def test_search_health_reports_catalog_capabilities(client):
+    conn = MagicMock()
+    with (
+        patch(
+            "app.controller.system_controller.acquire_shared_duckdb", return_value=conn
+        ),
+        patch("app.controller.system_controller.get_catalog_capabilities") as caps,
+    ):
+        caps.return_value.as_dict.return_value = {"vss": True}
+        resp = client.get("/health/search")
+    assert resp.json()["catalog"] == {"vss": True}
+    caps.assert_called_once_with(conn.cursor.return_value.__enter__.return_value)
+
+
+def test_postgres_pool_stats(client):
+    with patch("app.controller.system_controller.get_pg_pool") as mock_pool:
+        mock_pool.return_value.stats.return_value = {"in_use": 1, "waiting": 0}
+        resp = client.get("/health/postgres")
+    assert resp.status_code == 200
+    assert resp.json() == {"in_use": 1, "waiting": 0}
+
+
+def test_startup_opens_shared_duckdb():
+    conn = MagicMock()
+    with (
+        patch("app.api.fast_api.get_pg_pool") as mock_pool,
+        patch("app.api.fast_api.close_pg_pool") as mock_close_pool,
+        patch("app.api.fast_api.get_shared_duckdb", return_value=conn),
+        patch("app.api.fast_api.BUILDABLE_ENGINE", "matrix"),
+        patch("app.api.fast_api.get_requirement_matrix") as mock_matrix,
+        patch("app.api.fast_api.close_shared_duckdb") as mock_close,
+        TestClient(app),
+    ):
+        mock_matrix.assert_called_once_with(conn)
+        mock_pool.assert_called_once()
+    mock_close.assert_called_once()
+    mock_close_pool.assert_called_once()
+
+
+def test_startup_without_duckdb_file():
+    with (
+        patch("app.api.fast_api.get_pg_pool"),
+        patch("app.api.fast_api.close_pg_pool"),
+        patch("app.api.fast_api.get_shared_duckdb", side_effect=FileNotFoundError),
+        patch("app.api.fast_api.get_requirement_matrix") as mock_matrix,
+        patch("app.api.fast_api.close_shared_duckdb"),
+        TestClient(app) as client,
+    ):
+        assert client.get("/health").status_code == 200
+    mock_matrix.assert_not_called()
+
+
+def test_startup_warms_embedding_model_when_enabled():
+    with (
+        patch("app.api.fast_api.get_pg_pool"),
+        patch("app.api.fast_api.close_pg_pool"),
+        patch("app.api.fast_api.get_shared_duckdb", side_effect=FileNotFoundError),
+        patch("app.api.fast_api.close_shared_duckdb"),
+        patch("app.api.fast_api.EMBEDDING_WARM_UP", True),
+        patch("app.api.fast_api.get_embedding_model") as mock_model,
+        TestClient(app),
+    ):
+        mock_model.return_value.ensure_loading.assert_called_once()
@@ -98,7 +98,7 @@ def test_get_wishlist_parts_empty(client):
 
 def test_get_wishlist_parts_with_items(client, mock_duck):
     mock_duck.execute.return_value.fetchall.return_value = [
-        ("3001", "Brique", "http://img.jpg")
+        ("3001", 4, "Brique", "http://img.jpg")
     ]
 
     with patch("app.controller.wishlist_controller.WishlistService") as mock_svc:
@@ -110,6 +110,7 @@ def test_get_wishlist_parts_with_items(client, mock_duck):
 
     assert resp.status_code == 200
     assert len(resp.json()) == 1
+    assert resp.json()[0]["img_url"] == "http://img.jpg"  # couple (3001, 4)
 
 
 # -------------------------
@@ -0,0 +1,129 @@
+"""
+Tests d'intégration pour les DAO asyncpg (PostgreSQL).
+
+Chaque test travaille sur une connexion asyncpg du schéma de test (créé par
+la fixture pg_conn), dans une transaction annulée à la fin.
+
+Lancement :
+    pytest test/test_dao/test_async_dao.py -v
+"""
+
+import asyncpg
+import pytest
+
+from app.business_object.user import User
+from app.database.connexion_postgresql import PG_CONFIG, SCHEMA_TEST
+from app.database.dao.collection_dao import AsyncCollectionDAO
+from app.database.dao.favorite_dao import AsyncFavoriteDAO
+from app.database.dao.user_dao import AsyncUserDAO
+from app.database.dao.user_parts_dao import AsyncUserPartsDAO
+from app.database.dao.whishlist_dao import AsyncWishlistDAO
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+async def apg(pg_conn):  # noqa: ARG001 (crée le schéma de test)
+    conn = await asyncpg.connect(
+        host=PG_CONFIG["host"],
+        port=int(PG_CONFIG["port"]),
+        database=PG_CONFIG["database"],
+        user=PG_CONFIG["user"],
+        password=PG_CONFIG["password"],
+        server_settings={"search_path": SCHEMA_TEST},
+    )
+    transaction = conn.transaction()
+    await transaction.start()
+    yield conn
+    await transaction.rollback()
+    await conn.close()
+
+
+@pytest.fixture()
+async def async_user(apg):
+    user = await AsyncUserDAO(apg).create_user(
+        User(username="async_user", hashed_password="hashed_pw", salt="salt")
+    )
+    return user.id_user
+
+
+class TestAsyncCollectionDAO:
+    async def test_add_mark_and_remove(self, apg, async_user):
+        dao = AsyncCollectionDAO(apg)
+        added = await dao.add_set_to_collection(async_user, "42115-1")
+        assert added.set_num == "42115-1"
+        assert added.is_built is False
+        assert await dao.add_set_to_collection(async_user, "42115-1") is None
+
+        assert await dao.mark_set_as_built(async_user, "42115-1") is True
+        assert (await dao.get_user_collection(async_user))[0].is_built is True
+        assert await dao.mark_set_as_unbuilt(async_user, "9999-1") is False
+
+        assert await dao.remove_set_from_collection(async_user, "42115-1") is True
+        assert await dao.get_user_collection(async_user) == []
+
+
+class TestAsyncFavoriteDAO:
+    async def test_add_and_remove(self, apg, async_user):
+        dao = AsyncFavoriteDAO(apg)
+        added = await dao.add_favorite(async_user, "10300-1")
+        assert added.set_num == "10300-1"
+        assert await dao.add_favorite(async_user, "10300-1") is None
+        assert [f.set_num for f in await dao.get_user_favorites(async_user)] == [
+            "10300-1"
+        ]
+        assert await dao.remove_favorite(async_user, "10300-1") is True
+        assert await dao.remove_favorite(async_user, "10300-1") is False
+
+
+class TestAsyncWishlistDAO:
+    async def test_sets_and_parts(self, apg, async_user):
+        dao = AsyncWishlistDAO(apg)
+        wishlist_id = await dao.get_or_create_wishlist(async_user)
+        assert await dao.get_or_create_wishlist(async_user) == wishlist_id
+
+        assert (await dao.add_set(async_user, "10300-1", 2))["priority"] == 2
+        assert await dao.add_set(async_user, "10300-1") is None
+        assert [s["set_num"] for s in await dao.get_sets(async_user)] == ["10300-1"]
+
+        await dao.add_part(async_user, "3001", 4, 2)
+        await dao.add_part(async_user, "3001", 4, 5)  # remplace la quantité
+        assert await dao.update_part_quantity(async_user, "3001", 4, 7) is True
+        parts = await dao.get_parts(async_user)
+        assert [(p["part_num"], p["quantity"]) for p in parts] == [("3001", 7)]
+
+        assert await dao.remove_part(async_user, "3001", 4) is True
+        assert await dao.remove_set(async_user, "10300-1") is True
+
+
+class TestAsyncUserPartsDAO:
+    async def test_add_update_and_remove(self, apg, async_user):
+        dao = AsyncUserPartsDAO(apg)
+        await dao.add_part(async_user, "3001", 4, "owned", 2)
+        added = await dao.add_part(async_user, "3001", 4, "owned", 3)
+        assert added["quantity"] == 5  # quantités additionnées
+
+        assert await dao.update_quantity(async_user, "3001", 4, 1) is True
+        assert await dao.update_quantity(async_user, "3001", 4, 1, True) is False
+        owned = await dao.get_owned_parts(async_user)
+        assert [(p["part_num"], p["quantity"]) for p in owned] == [("3001", 1)]
+        assert await dao.get_wished_parts(async_user) == []
+
+        assert await dao.remove_part(async_user, "3001", 4) is True
+        assert await dao.remove_part(async_user, "3001", 4) is False
+
+
+class TestAsyncUserDAO:
+    async def test_lookup_update_and_delete(self, apg, async_user):
+        dao = AsyncUserDAO(apg)
+        assert await dao.is_username_taken("async_user") is True
+        assert await dao.is_username_taken("personne") is False
+        assert (await dao.get_by_username("async_user")).id_user == async_user
+
+        assert await dao.update_user(True, "async_renamed", async_user) is True
+        assert (await dao.get_by_id(async_user)).username == "async_renamed"
+        assert await dao.update_user(True, "x", 999_999) is False
+
+        assert await dao.delete_user(async_user) is True
+        assert await dao.get_by_id(async_user) is None
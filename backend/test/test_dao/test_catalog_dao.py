@@ -0,0 +1,48 @@
+"""Tests pour CatalogDAO sur le catalogue DuckDB minimal (fixture lego_catalog)."""
+
+from app.database.dao.catalog_dao import CatalogDAO
+from app.database.duckdb import init_db_lego
+
+
+def test_set_details_of_known_sets(lego_catalog):
+    details = CatalogDAO(lego_catalog).get_set_details(["100-1", "inconnu-1"])
+    assert details == {
+        "100-1": {
+            "set_num": "100-1",
+            "name": "Set 100-1",
+            "year": 2020,
+            "num_parts": 100,
+            "img_url": None,
+        }
+    }
+
+
+def test_part_details_use_element_image_of_the_color(lego_catalog):
+    lego_catalog.execute("INSERT INTO elements VALUES ('999', '3001', 2, NULL)")
+    lego_catalog.execute(
+        "INSERT INTO parts (part_num, name, part_cat_id) VALUES ('x1', 'Tile', 1)"
+    )
+    init_db_lego.encode_catalog(lego_catalog)
+    init_db_lego.build_part_images(lego_catalog)
+
+    details = CatalogDAO(lego_catalog).get_part_color_details(
+        [("3001", 1), ("3001", 2), ("3001", 3), ("x1", 1), ("inconnue", 1)]
+    )
+
+    elements = "https://cdn.rebrickable.com/media/parts/elements/"
+    assert details == {
+        ("3001", 1): {"name": "Brick 3001", "img_url": f"{elements}100.jpg"},
+        ("3001", 2): {"name": "Brick 3001", "img_url": f"{elements}999.jpg"},
+        # Couleur sans élément : image principale de la pièce
+        ("3001", 3): {"name": "Brick 3001", "img_url": f"{elements}100.jpg"},
+        ("x1", 1): {
+            "name": "Tile",
+            "img_url": "https://cdn.rebrickable.com/media/parts/photos/x1.jpg",
+        },
+    }
+
+
+def test_empty_lists_skip_the_query(lego_catalog):
+    dao = CatalogDAO(lego_catalog)
+    assert dao.get_set_details([]) == {}
+    assert dao.get_part_color_details([]) == {}
@@ -0,0 +1,41 @@
+"""Tests pour PartKeysDAO (traduction part_num/color_id → pc_id, DuckDB)."""
+
+from app.database.dao.part_keys_dao import PartKeysDAO
+
+
+class TestGetPairIds:
+    def test_empty_input_does_not_query(self, lego_catalog):
+        assert PartKeysDAO(lego_catalog).get_pair_ids([]) == {}
+
+    def test_known_pairs_are_translated(self, lego_catalog):
+        result = PartKeysDAO(lego_catalog).get_pair_ids([("3001", 1), ("3003", 2)])
+        assert set(result) == {("3001", 1), ("3003", 2)}
+        assert all(isinstance(v, int) for v in result.values())
+
+    def test_unknown_pairs_are_omitted(self, lego_catalog):
+        result = PartKeysDAO(lego_catalog).get_pair_ids([("3001", 3), ("nope", 1)])
+        assert result == {}
+
+    def test_ids_follow_part_num_then_color_order(self, lego_catalog):
+        result = PartKeysDAO(lego_catalog).get_pair_ids(
+            [("3001", 1), ("3002", 1), ("3010", 1), ("3010", 2)]
+        )
+        assert result[("3001", 1)] < result[("3002", 1)] < result[("3010", 1)]
+        assert result[("3010", 2)] == result[("3010", 1)] + 1
+
+
+class TestEncodeCatalog:
+    def test_parts_and_elements_carry_part_id(self, lego_catalog):
+        missing = lego_catalog.execute(
+            """
+            SELECT (SELECT COUNT(*) FROM parts WHERE part_id IS NULL)
+                 + (SELECT COUNT(*) FROM elements WHERE part_id IS NULL)
+            """
+        ).fetchone()[0]
+        assert missing == 0
+
+    def test_part_ids_are_dense(self, lego_catalog):
+        row = lego_catalog.execute(
+            "SELECT MIN(pc_id), MAX(pc_id), COUNT(*) FROM part_color_keys"
+        ).fetchone()
+        assert row == (0, row[2] - 1, row[2])
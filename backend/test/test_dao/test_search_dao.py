@@ -1,11 +1,27 @@
 """Tests pour SearchDAO (DuckDB, LIKE fallback et chemins VSS)."""
 
+import threading
 from unittest.mock import MagicMock, patch
 
+import duckdb
+import numpy as np
 import pytest
 
+from app.database.catalog_capabilities import (
+    EMBEDDING_TABLES,
+    TRIGRAM_TABLES,
+    CatalogCapabilities,
+)
 import app.database.dao.search_dao as search_module
-from app.database.dao.search_dao import SearchDAO, _has_embeddings, _has_vss
+from app.database.dao.search_dao import (
+    SearchDAO,
+    _build_filters,
+    name_trigrams,
+    reciprocal_rank_fusion,
+)
+from app.database.duckdb import init_db_lego
+from app.utils.embedding_cache import EmbeddingCache
+from app.utils.embedding_model import EmbeddingModel
 
 
 # ---------------------------------------------------------------------------
@@ -23,6 +39,31 @@ SET_COLS = [
 PART_COLS = [("part_num",), ("name",), ("part_cat_id",), ("img_url",)]
 
 
+@pytest.fixture(autouse=True)
+def no_query_cache():
+    """Pas de cache des requêtes partagé entre les tests (voir test dédié)."""
+    with patch.object(search_module, "get_embedding_cache", return_value=None):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def full_catalog():
+    """Catalogue avec embeddings et VSS (le registre n'est pas interrogé)."""
+    capabilities = CatalogCapabilities(None, frozenset(EMBEDDING_TABLES), vss=True)
+    with patch.object(
+        search_module, "get_catalog_capabilities", return_value=capabilities
+    ) as mock_registry:
+        yield mock_registry
+
+
+def ready_model(mock_model) -> EmbeddingModel:
+    """Modèle d'embedding déjà chargé (mock_model à la place de fastembed)."""
+    model = EmbeddingModel(lambda: mock_model)
+    model.ensure_loading()
+    model.wait()
+    return model
+
+
 def make_mock_conn(cols=SET_COLS, rows=None):
     """Crée un mock DuckDB qui ne lève pas et renvoie les lignes demandées."""
     mock_conn = MagicMock()
@@ -33,40 +74,15 @@ def make_mock_conn(cols=SET_COLS, rows=None):
 
 
 # ---------------------------------------------------------------------------
-# Tests fonctions module-level
-# ---------------------------------------------------------------------------
-
-
-class TestHasEmbeddings:
-    def test_returns_true_when_execute_succeeds(self):
-        mock_conn = MagicMock()
-        assert _has_embeddings(mock_conn) is True
-
-    def test_returns_false_when_execute_raises(self):
-        mock_conn = MagicMock()
-        mock_conn.execute.side_effect = Exception("table not found")
-        assert _has_embeddings(mock_conn) is False
-
-
-class TestHasVss:
-    def test_returns_true_when_load_succeeds(self):
-        mock_conn = MagicMock()
-        assert _has_vss(mock_conn) is True
-
-    def test_returns_false_when_load_raises(self):
-        mock_conn = MagicMock()
-        mock_conn.execute.side_effect = Exception("vss not available")
-        assert _has_vss(mock_conn) is False
-
-
-# ---------------------------------------------------------------------------
-# Tests SearchDAO — chemin LIKE (_st_model = None)
+# Tests SearchDAO — chemin LIKE (fastembed absent)
 # ---------------------------------------------------------------------------
 
 
 class TestSearchSetsLike:
     def setup_method(self):
-        self.patcher = patch.object(search_module, "_st_model", None)
+        self.patcher = patch.object(
+            search_module, "get_embedding_model", return_value=EmbeddingModel(None)
+        )
         self.patcher.start()
 
     def teardown_method(self):
@@ -106,7 +122,9 @@ class TestSearchSetsLike:
 
 class TestSearchPartsLike:
     def setup_method(self):
-        self.patcher = patch.object(search_module, "_st_model", None)
+        self.patcher = patch.object(
+            search_module, "get_embedding_model", return_value=EmbeddingModel(None)
+        )
         self.patcher.start()
 
     def teardown_method(self):
@@ -134,7 +152,9 @@ class TestSearchPartsLike:
 
 class TestGetRecentSetsAndStats:
     def setup_method(self):
-        self.patcher = patch.object(search_module, "_st_model", None)
+        self.patcher = patch.object(
+            search_module, "get_embedding_model", return_value=EmbeddingModel(None)
+        )
         self.patcher.start()
 
     def teardown_method(self):
@@ -148,7 +168,8 @@ class TestGetRecentSetsAndStats:
         result = dao.get_recent_sets()
         assert len(result) == 1
 
-    def test_get_stats(self):
+    @patch.object(search_module, "get_catalog_meta", return_value=None)
+    def test_get_stats(self, _meta):
         mock_conn = MagicMock()
         mock_conn.execute.return_value.fetchone.side_effect = [(100,), (200,), (50,)]
         dao = SearchDAO(mock_conn)
@@ -157,9 +178,14 @@ class TestGetRecentSetsAndStats:
         assert stats["totalParts"] == 200
         assert stats["totalThemes"] == 50
 
+    def test_get_stats_from_catalog_meta(self, lego_catalog):
+        lego_catalog.execute("DELETE FROM sets")  # comptes lus dans catalog_meta
+        stats = SearchDAO(lego_catalog).get_stats()
+        assert stats == {"totalSets": 4, "totalParts": 10, "totalThemes": 1}
+
 
 # ---------------------------------------------------------------------------
-# Tests SearchDAO — chemin VSS (_st_model mocké)
+# Tests SearchDAO — chemin VSS (modèle mocké)
 # ---------------------------------------------------------------------------
 
 
@@ -170,7 +196,9 @@ class TestSearchSetsVss:
         mock_vec.tolist.return_value = [0.1] * 384
         mock_model.embed.return_value = iter([mock_vec])
 
-        with patch.object(search_module, "_st_model", mock_model):
+        with patch.object(
+            search_module, "get_embedding_model", return_value=ready_model(mock_model)
+        ):
             vss_cols = SET_COLS + [("distance",)]
             mock_conn = make_mock_conn(
                 vss_cols, [("1234-1", "Castle", 2023, 1, 100, "img", 0.1)]
@@ -184,7 +212,9 @@ class TestSearchSetsVss:
     def test_search_sets_vss_with_filters(self):
         mock_model = MagicMock()
 
-        with patch.object(search_module, "_st_model", mock_model):
+        with patch.object(
+            search_module, "get_embedding_model", return_value=ready_model(mock_model)
+        ):
             vss_cols = SET_COLS + [("distance",)]
             mock_conn = make_mock_conn(vss_cols, [])
             dao = SearchDAO(mock_conn)
@@ -198,7 +228,9 @@ class TestSearchPartsVss:
     def test_search_parts_vss_path(self):
         mock_model = MagicMock()
 
-        with patch.object(search_module, "_st_model", mock_model):
+        with patch.object(
+            search_module, "get_embedding_model", return_value=ready_model(mock_model)
+        ):
             vss_cols = PART_COLS + [("distance",)]
             mock_conn = make_mock_conn(vss_cols, [("3001", "Brick", 1, "img", 0.1)])
             dao = SearchDAO(mock_conn)
@@ -210,7 +242,9 @@ class TestSearchPartsVss:
     def test_search_parts_vss_with_color_and_category(self):
         mock_model = MagicMock()
 
-        with patch.object(search_module, "_st_model", mock_model):
+        with patch.object(
+            search_module, "get_embedding_model", return_value=ready_model(mock_model)
+        ):
             vss_cols = PART_COLS + [("distance",)]
             mock_conn = make_mock_conn(vss_cols, [])
             dao = SearchDAO(mock_conn)
@@ -221,12 +255,14 @@ class TestSearchPartsVss:
 
 
 # ---------------------------------------------------------------------------
-# Test _encode — RuntimeError si _st_model est None
+# Test _encode — RuntimeError sans fastembed
 # ---------------------------------------------------------------------------
 
 
 def test_encode_raises_when_no_model():
-    with patch.object(search_module, "_st_model", None):
+    with patch.object(
+        search_module, "get_embedding_model", return_value=EmbeddingModel(None)
+    ):
         mock_conn = make_mock_conn()
         dao = SearchDAO(mock_conn)
 
@@ -240,9 +276,358 @@ def test_encode_returns_vector_with_model():
     mock_vec.tolist.return_value = [0.1] * 384
     mock_model.embed.return_value = iter([mock_vec])
 
-    with patch.object(search_module, "_st_model", mock_model):
+    with patch.object(
+        search_module, "get_embedding_model", return_value=ready_model(mock_model)
+    ):
         mock_conn = make_mock_conn()
         dao = SearchDAO(mock_conn)
         result = dao._encode("test query")
 
     assert len(result) == 384
+
+
+# ---------------------------------------------------------------------------
+# Modèle pas encore chargé : LIKE, chargement lancé en arrière-plan
+# ---------------------------------------------------------------------------
+
+
+@patch.object(search_module, "SEARCH_MODE", "vector")
+def test_search_falls_back_to_like_until_model_ready():
+    loaded = MagicMock()
+    release = threading.Event()
+
+    def slow_loader():
+        release.wait(5)
+        return loaded
+
+    model = EmbeddingModel(slow_loader)
+    mock_conn = make_mock_conn(SET_COLS, [])
+    dao = SearchDAO(mock_conn, model=model)
+    dao._search_sets_vss = MagicMock(return_value=["vss"])
+
+    assert dao.search_sets("castle") == []  # LIKE
+    assert model.state == "loading"
+
+    release.set()
+    assert model.wait(5)
+    assert dao.search_sets("castle") == ["vss"]
+
+
+@patch.object(search_module, "SEARCH_MODE", "vector")
+def test_encode_uses_query_cache_shared_by_sets_and_parts():
+    mock_model = MagicMock()
+    mock_model.embed.side_effect = lambda _texts: iter(
+        [MagicMock(**{"tolist.return_value": [0.5] * 384})]
+    )
+    cache = EmbeddingCache(8)
+    dao = SearchDAO(make_mock_conn(), model=ready_model(mock_model))
+    dao._search_sets_vss = lambda query, *_: dao._encode(query)
+    dao._search_parts_vss = lambda query, *_: dao._encode(query)
+
+    with patch.object(search_module, "get_embedding_cache", return_value=cache):
+        dao.search_sets("Star  Wars")
+        dao.search_parts("star wars")
+
+    mock_model.embed.assert_called_once_with(["star wars"])
+    assert cache.stats()["hits"] == 1
+
+
+@patch.object(search_module, "SEARCH_MODE", "vector")
+def test_parts_use_like_without_part_embeddings(full_catalog):
+    full_catalog.return_value = CatalogCapabilities(
+        None, frozenset({"set_embeddings"}), vss=True
+    )
+    dao = SearchDAO(make_mock_conn(PART_COLS, []), model=ready_model(MagicMock()))
+    dao._search_sets_vss = MagicMock(return_value=["vss"])
+    dao._search_parts_vss = MagicMock(return_value=["vss"])
+
+    assert dao.search_sets("castle") == ["vss"]
+    assert dao.search_parts("brick") == []  # LIKE
+
+
+def test_capabilities_read_once_per_dao(full_catalog):
+    dao = SearchDAO(make_mock_conn(SET_COLS, []), model=EmbeddingModel(None))
+    dao.get_recent_sets()
+    full_catalog.assert_not_called()
+    assert dao.capabilities is dao.capabilities
+    full_catalog.assert_called_once()
+
+
+def test_build_filters_path_conditions_first():
+    where, params = _build_filters(
+        "p.part_num = ?", color_id=4, category_id=5, theme_id=None
+    )
+    assert where.startswith("WHERE p.part_num = ? AND p.part_id IN")
+    assert where.endswith("AND p.part_cat_id = ?")
+    assert params == [4, 5]
+    assert _build_filters() == ("", [])
+
+
+# ---------------------------------------------------------------------------
+# Recherche hybride (fusion des classements) et numéros exacts
+# ---------------------------------------------------------------------------
+
+
+def test_reciprocal_rank_fusion_favours_rows_in_both_rankings():
+    vss = [{"set_num": "a"}, {"set_num": "b"}, {"set_num": "c"}]
+    text = [{"set_num": "c", "source": "text"}, {"set_num": "d"}]
+
+    fused = reciprocal_rank_fusion([vss, text], "set_num")
+
+    assert [r["set_num"] for r in fused] == ["c", "a", "b", "d"]
+    assert "source" not in fused[0]  # ligne du premier classement
+
+
+def test_hybrid_search_fuses_vector_and_text_rankings():
+    dao = SearchDAO(make_mock_conn(), model=ready_model(MagicMock()))
+    dao._search_sets_vss = MagicMock(
+        return_value=[{"set_num": n} for n in ("1-1", "2-1", "3-1")]
+    )
+    dao._search_sets_text = MagicMock(
+        return_value=[{"set_num": n} for n in ("3-1", "4-1")]
+    )
+
+    rows = dao.search_sets("castle", theme_id=1, limit=2)
+
+    assert [r["set_num"] for r in rows] == ["3-1", "1-1"]
+    depth = search_module.HYBRID_DEPTH
+    dao._search_sets_vss.assert_called_once_with("castle", 1, None, None, depth)
+    dao._search_sets_text.assert_called_once_with("castle", 1, None, None, depth)
+
+
+@patch.object(search_module, "SEARCH_MODE", "text")
+def test_text_mode_never_encodes():
+    dao = SearchDAO(make_mock_conn(PART_COLS, []), model=ready_model(MagicMock()))
+    dao._encode = MagicMock()
+
+    assert dao.search_parts("brick") == []
+    dao._encode.assert_not_called()
+
+
+def test_set_number_is_looked_up_exactly(vector_catalog):
+    conn, _ = vector_catalog
+    dao = SearchDAO(conn, model=ready_model(MagicMock()))
+    dao._encode = MagicMock()
+
+    assert [r["set_num"] for r in dao.search_sets(" 160 ", theme_id=1)] == ["160-1"]
+    assert [r["set_num"] for r in dao.search_sets("120-1")] == ["120-1"]
+    rows = dao.search_sets("150", year_from=2010, year_to=2010)
+    assert [r["set_num"] for r in rows] == ["150-1"]
+    dao._encode.assert_not_called()
+
+
+def test_set_number_outside_filters_falls_back_to_search(vector_catalog):
+    conn, _ = vector_catalog
+    dao = SearchDAO(conn, model=EmbeddingModel(None))
+
+    # 150-1 est du thème 2 et de 2010 : recherche LIKE filtrée, sans résultat
+    assert dao.search_sets("150", theme_id=1) == []
+    assert dao.search_sets("150", year_to=2005) == []
+
+
+def test_unknown_part_number_falls_back_to_search():
+    dao = SearchDAO(make_mock_conn(PART_COLS, []), model=EmbeddingModel(None))
+    dao._search_parts_like = MagicMock(return_value=["like"])
+
+    assert dao.search_parts("3001", category_id=11) == ["like"]
+    assert dao.conn.execute.call_args_list[0].args[1] == ["3001", 11, 20]
+
+
+# ---------------------------------------------------------------------------
+# Index de trigrammes (fautes de frappe, sans index fts)
+# ---------------------------------------------------------------------------
+
+
+class TestTrigramSearch:
+    @pytest.fixture
+    def dao(self, lego_catalog, full_catalog):
+        lego_catalog.executemany(
+            "INSERT INTO sets VALUES (?, ?, ?, 1, 10, NULL)",
+            [
+                ("7965-1", "Millennium Falcon", 2011),
+                ("75030-1", "Millennium Falcon Microfighter", 2015),
+                ("6086-1", "Black Knight's Castle", 1992),
+            ],
+        )
+        init_db_lego.build_trigram_index(lego_catalog)
+        full_catalog.return_value = CatalogCapabilities(
+            None, frozenset(), vss=False, trigram_tables=frozenset(TRIGRAM_TABLES)
+        )
+        return SearchDAO(lego_catalog, model=EmbeddingModel(None))
+
+    def test_index_matches_query_trigrams(self, dao):
+        rows = dao.conn.execute(
+            "SELECT trigram, n FROM set_trigrams WHERE set_num = '6086-1'"
+        ).fetchall()
+        expected = name_trigrams("Black Knight's Castle")
+        assert sorted(r[0] for r in rows) == expected
+        assert {r[1] for r in rows} == {len(expected)}
+
+    def test_tolerates_typos_shortest_name_first(self, dao):
+        rows = dao.search_sets("milenium  falcon")
+        assert [r["set_num"] for r in rows] == ["7965-1", "75030-1"]
+        assert dao.search_sets("knigt castle")[0]["set_num"] == "6086-1"
+
+    def test_filters_apply_before_ranking(self, dao):
+        rows = dao.search_sets("milenium falcon", year_from=2012)
+        assert [r["set_num"] for r in rows] == ["75030-1"]
+
+    def test_parts_with_color_filter(self, dao):
+        rows = dao.search_parts("brik 3003", color_id=1)
+        assert rows[0]["part_num"] == "3003"
+        assert rows[0]["img_url"].endswith("/elements/300.jpg")
+        assert dao.search_parts("brik", color_id=2) == []
+
+    def test_like_fallback_keeps_color_filter(self, dao):
+        assert dao._search_parts_like("brick", 2, None, 10) == []
+        assert "3003" in [
+            r["part_num"] for r in dao._search_parts_like("brick", 1, None, 10)
+        ]
+
+    def test_no_match_falls_back_to_like(self, dao):
+        dao._search_sets_like = MagicMock(return_value=["like"])
+        assert dao.search_sets("zzzz") == ["like"]
+
+
+# ---------------------------------------------------------------------------
+# Recherche vectorielle filtrée (DuckDB en mémoire, sans index HNSW)
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def vector_catalog():
+    """200 sets aux vecteurs aléatoires ; le thème 1 ne garde que 5 sets."""
+    rng = np.random.default_rng(0)
+    conn = duckdb.connect()
+    conn.execute(
+        "CREATE TABLE sets (set_num VARCHAR, name VARCHAR, year INTEGER, "
+        "theme_id INTEGER, num_parts INTEGER, img_url VARCHAR)"
+    )
+    conn.execute("CREATE TABLE set_embeddings (set_num VARCHAR, embedding FLOAT[384])")
+    vectors = rng.random((200, 384), dtype=np.float32)
+    for i, vector in enumerate(vectors):
+        theme = 1 if i % 40 == 0 else 2
+        conn.execute(
+            "INSERT INTO sets VALUES (?, ?, ?, ?, 10, NULL)",
+            [f"{i}-1", f"Set {i}", 2000 + i % 20, theme],
+        )
+        conn.execute(
+            "INSERT INTO set_embeddings VALUES (?, ?)", [f"{i}-1", vector.tolist()]
+        )
+    yield conn, vectors
+    conn.close()
+
+
+def brute_force(vectors, query, keep, limit):
+    distances = np.linalg.norm(vectors - query, axis=1)
+    order = [i for i in np.argsort(distances) if keep(i)]
+    return [f"{i}-1" for i in order[:limit]]
+
+
+class TestFilteredVectorSearch:
+    @pytest.fixture
+    def dao(self, vector_catalog, full_catalog):
+        conn, _ = vector_catalog
+        full_catalog.return_value = CatalogCapabilities(
+            None,
+            frozenset({"set_embeddings"}),
+            vss=True,
+            hnsw_indexes={"set_embeddings": ["hnsw_sets"]},
+            embedding_rows={"set_embeddings": 200},
+        )
+        return SearchDAO(conn, model=EmbeddingModel(None))
+
+    @pytest.mark.parametrize("strategy", ["exact", "hnsw"])
+    def test_strategies_match_brute_force(self, dao, vector_catalog, strategy):
+        _, vectors = vector_catalog
+        query = vectors[7] + 0.01
+        rows = dao.search_sets_by_vector(
+            query.tolist(), theme_id=2, limit=10, strategy=strategy
+        )
+        expected = brute_force(vectors, query, lambda i: i % 40 != 0, 10)
+        assert [r["set_num"] for r in rows] == expected
+        assert rows[0]["distance"] <= rows[-1]["distance"]
+
+    def test_selective_filter_uses_exact_scan(self, dao, vector_catalog):
+        _, vectors = vector_catalog
+        rows = dao.search_sets_by_vector(vectors[0].tolist(), theme_id=1, limit=3)
+        assert dao.last_plan == {"strategy": "exact", "candidates": 5, "k": None}
+        assert [r["set_num"] for r in rows] == brute_force(
+            vectors, vectors[0], lambda i: i % 40 == 0, 3
+        )
+
+    def test_broad_filter_oversamples_hnsw(self, dao, vector_catalog):
+        _, vectors = vector_catalog
+        with patch.object(search_module, "VSS_EXACT_SCAN_MAX", 10):
+            rows = dao.search_sets_by_vector(vectors[3].tolist(), theme_id=2, limit=5)
+        assert dao.last_plan["strategy"] == "hnsw"
+        assert dao.last_plan["candidates"] == 195
+        assert dao.last_plan["k"] == 11  # 5 × 2 × 200/195
+        assert len(rows) == 5
+
+    def test_hnsw_grows_k_until_filter_is_satisfied(self, dao, vector_catalog):
+        _, vectors = vector_catalog
+        with (
+            patch.object(search_module, "VSS_EXACT_SCAN_MAX", 0),
+            patch.object(search_module, "VSS_OVERSAMPLE", 0.1),
+        ):
+            rows = dao.search_sets_by_vector(vectors[0].tolist(), theme_id=1, limit=5)
+        assert dao.last_plan["strategy"] == "hnsw"
+        assert dao.last_plan["k"] == 200  # toute la table
+        assert len(rows) == 5
+
+    def test_falls_back_to_exact_past_max_k(self, dao, vector_catalog):
+        _, vectors = vector_catalog
+        with (
+            patch.object(search_module, "VSS_EXACT_SCAN_MAX", 0),
+            patch.object(search_module, "VSS_MAX_K", 20),
+        ):
+            rows = dao.search_sets_by_vector(vectors[0].tolist(), theme_id=1, limit=5)
+        assert dao.last_plan["strategy"] == "exact"
+        assert dao.last_plan["k"] == 20
+        assert len(rows) == 5
+
+    def test_without_hnsw_index_always_exact(self, dao, vector_catalog, full_catalog):
+        _, vectors = vector_catalog
+        full_catalog.return_value = CatalogCapabilities(
+            None, frozenset({"set_embeddings"}), vss=True
+        )
+        dao.search_sets_by_vector(vectors[0].tolist(), theme_id=2, limit=5)
+        assert dao.last_plan["strategy"] == "exact"
+
+
+class TestNumpyVectorIndex:
+    """Sans VSS, la recherche sémantique passe par l'index NumPy."""
+
+    @pytest.fixture
+    def dao(self, vector_catalog, full_catalog):
+        conn, _ = vector_catalog
+        full_catalog.return_value = CatalogCapabilities(
+            None, frozenset({"set_embeddings"}), vss=False
+        )
+        return SearchDAO(conn, model=ready_model(MagicMock()))
+
+    def test_semantic_search_without_vss(self, dao, vector_catalog):
+        _, vectors = vector_catalog
+        dao._encode = MagicMock(return_value=vectors[7].tolist())
+        rows = dao.search_sets("castle", year_from=2005, year_to=2010, limit=4)
+
+        assert dao.last_plan["strategy"] == "numpy"
+        unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        scores = unit @ unit[7]
+        expected = [f"{i}-1" for i in np.argsort(-scores) if 5 <= i % 20 <= 10][:4]
+        assert [r["set_num"] for r in rows] == expected
+        assert rows[0]["set_num"] == "7-1"
+        assert rows[0]["distance"] == pytest.approx(0, abs=1e-3)
+        assert rows[0]["name"] == "Set 7"
+
+    def test_vector_index_off_keeps_like(self, dao):
+        dao._search_sets_like = MagicMock(return_value=["like"])
+        with patch.object(search_module, "VECTOR_INDEX", "off"):
+            assert dao.search_sets("castle") == ["like"]
+
+    def test_float32_vectors_for_rerank(self, dao, vector_catalog):
+        _, vectors = vector_catalog
+        found = dao._float32_vectors("set_embeddings", "set_num", ["3-1", "5-1"])
+        assert set(found) == {"3-1", "5-1"}
+        np.testing.assert_allclose(found["5-1"], vectors[5])
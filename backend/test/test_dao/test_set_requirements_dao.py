@@ -0,0 +1,50 @@
+"""Tests pour SetRequirementsDAO (pièces manquantes des sets, DuckDB)."""
+
+import pytest
+
+from app.business_object.user_stock import UserStock
+from app.database.dao.part_keys_dao import PartKeysDAO
+from app.database.dao.set_requirements_dao import SetRequirementsDAO
+
+
+@pytest.fixture()
+def stock(lego_catalog):
+    owned = {("3001", 1): 1, ("3002", 1): 1, ("3003", 2): 4, ("3004", 1): 1}
+    pair_ids = PartKeysDAO(lego_catalog).get_pair_ids(list(owned))
+    return UserStock.from_dict({pair_ids[k]: qty for k, qty in owned.items()})
+
+
+class TestGetMissingParts:
+    def test_empty_set_list(self, lego_catalog, stock):
+        assert SetRequirementsDAO(lego_catalog).get_missing_parts(stock, []) == {}
+
+    def test_missing_and_short_quantities(self, lego_catalog, stock):
+        result = SetRequirementsDAO(lego_catalog).get_missing_parts(stock, ["100-1"])
+
+        missing = {(m.part_num, m.color_id): m for m in result["100-1"]}
+        # 3001 : 1 possédé sur 2 ; 3005/3 : aucun
+        assert set(missing) == {("3001", 1), ("3005", 3)}
+        assert (missing[("3001", 1)].owned, missing[("3001", 1)].missing) == (1, 1)
+        assert missing[("3005", 3)].is_completely_missing()
+        assert missing[("3005", 3)].part_name == "Brick 3005"
+        assert missing[("3005", 3)].color_name == "Black"
+        assert missing[("3005", 3)].color_rgb == "05131D"
+
+    def test_several_sets_in_one_call(self, lego_catalog, stock):
+        result = SetRequirementsDAO(lego_catalog).get_missing_parts(
+            stock, ["100-1", "200-1", "300-1"]
+        )
+        assert [m.part_num for m in result["200-1"]] == ["3006"]
+        assert len(result["300-1"]) == 4
+
+    def test_complete_and_unknown_sets(self, lego_catalog, stock):
+        result = SetRequirementsDAO(lego_catalog).get_missing_parts(
+            stock, ["400-1", "999-1"]
+        )
+        assert result == {"400-1": []}
+
+    def test_empty_stock(self, lego_catalog):
+        result = SetRequirementsDAO(lego_catalog).get_missing_parts(
+            UserStock.empty(), ["400-1"]
+        )
+        assert [m.missing for m in result["400-1"]] == [1, 1]
@@ -0,0 +1,50 @@
+"""Tests pour StockDAO (stock utilisateur en pc_id, DuckDB)."""
+
+from app.database.dao.part_keys_dao import PartKeysDAO
+from app.database.dao.stock_dao import StockDAO
+
+
+def columns(*rows):
+    return {
+        "part_num": [r[0] for r in rows],
+        "color_id": [r[1] for r in rows],
+        "quantity": [r[2] for r in rows],
+    }
+
+
+class TestGetUserStock:
+    def test_nothing_to_read_does_not_query(self, lego_catalog):
+        stock = StockDAO(lego_catalog).get_user_stock(columns(), [])
+        assert len(stock) == 0
+
+    def test_owned_parts_are_translated(self, lego_catalog):
+        pair_ids = PartKeysDAO(lego_catalog).get_pair_ids([("3001", 1), ("3003", 2)])
+
+        stock = StockDAO(lego_catalog).get_user_stock(
+            columns(("3003", 2, 4), ("3001", 1, 2), ("nope", 1, 9), ("3001", 3, 1)),
+            [],
+        )
+
+        # Couples hors catalogue ignorés, pc_id triés
+        assert stock.to_dict() == {pair_ids[("3001", 1)]: 2, pair_ids[("3003", 2)]: 4}
+        assert stock.pc_ids.tolist() == sorted(stock.pc_ids.tolist())
+
+    def test_last_row_wins_for_duplicate_pair(self, lego_catalog):
+        pc_3001 = PartKeysDAO(lego_catalog).get_pair_ids([("3001", 1)])[("3001", 1)]
+        stock = StockDAO(lego_catalog).get_user_stock(
+            columns(("3001", 1, 5), ("3001", 1, 2)), []
+        )
+        assert stock.to_dict() == {pc_3001: 2}
+
+    def test_unbuilt_sets_are_added(self, lego_catalog):
+        pair_ids = PartKeysDAO(lego_catalog).get_pair_ids([("3001", 1), ("3002", 1)])
+
+        stock = StockDAO(lego_catalog).get_user_stock(
+            columns(("3001", 1, 2)), ["400-1", "999-1"]
+        )
+
+        assert stock.to_dict() == {pair_ids[("3001", 1)]: 3, pair_ids[("3002", 1)]: 1}
+
+    def test_unbuilt_sets_only(self, lego_catalog):
+        stock = StockDAO(lego_catalog).get_user_stock(None, ["400-1"])
+        assert stock.quantities.tolist() == [1, 1]
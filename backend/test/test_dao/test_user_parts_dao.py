@@ -111,6 +111,54 @@ class TestGetOwnedParts:
         assert isinstance(result[0], dict)
 
 
+# ---------------------------------------------------------------------------
+# Tests — get_owned_quantities
+# ---------------------------------------------------------------------------
+
+
+class TestGetOwnedQuantities:
+    def test_returns_requested_pairs_only(self, dao_user_parts, existing_user):
+        dao_user_parts.add_part(existing_user, "3001", 1, "owned", 2)
+        dao_user_parts.add_part(existing_user, "3002", 1, "owned", 3)
+        dao_user_parts.add_part(existing_user, "3003", 1, "wished", 4)
+
+        result = dao_user_parts.get_owned_quantities(
+            existing_user, [("3001", 1), ("3003", 1), ("9999", 1)]
+        )
+
+        assert result == {("3001", 1): 2}
+
+    def test_used_row_wins(self, dao_user_parts, existing_user):
+        dao_user_parts.add_part(existing_user, "3001", 1, "owned", 5, is_used=False)
+        dao_user_parts.add_part(existing_user, "3001", 1, "owned", 2, is_used=True)
+
+        result = dao_user_parts.get_owned_quantities(existing_user, [("3001", 1)])
+
+        assert result == {("3001", 1): 2}
+
+    def test_empty_pairs(self, dao_user_parts, existing_user):
+        assert dao_user_parts.get_owned_quantities(existing_user, []) == {}
+
+
+class TestGetOwnedColumns:
+    def test_columns_follow_owned_parts_order(self, dao_user_parts, existing_user):
+        dao_user_parts.add_part(existing_user, "3002", 1, "owned", 3)
+        dao_user_parts.add_part(existing_user, "3001", 1, "owned", 2)
+        dao_user_parts.add_part(existing_user, "3003", 1, "wished", 4)
+
+        result = dao_user_parts.get_owned_columns(existing_user)
+
+        assert result == {
+            "part_num": ["3001", "3002"],
+            "color_id": [1, 1],
+            "quantity": [2, 3],
+        }
+
+    def test_no_parts(self, dao_user_parts, existing_user):
+        result = dao_user_parts.get_owned_columns(existing_user)
+        assert result == {"part_num": [], "color_id": [], "quantity": []}
+
+
 # ---------------------------------------------------------------------------
 # Tests — get_wished_parts
 # ---------------------------------------------------------------------------
@@ -1,66 +1,89 @@
-"""Tests pour les dépendances FastAPI (get_pg, get_duck)."""
+"""Tests pour les dépendances FastAPI (get_pg, get_apg, get_duck)."""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
 import duckdb
 from fastapi import HTTPException
 import pytest
 
 import app.api.dependencies as dep_module
-from app.api.dependencies import get_duck, get_pg
+from app.api.dependencies import get_apg, get_duck, get_pg
+from app.database.connexion_duckdb import close_shared_duckdb
+from app.database.pg_pool import PoolError
 
 
 class TestGetPg:
-    def test_creates_new_connection_when_none(self, monkeypatch):
-        monkeypatch.setattr(dep_module, "_pg_conn", None)
-        mock_conn = MagicMock()
-        mock_conn.closed = False
+    @pytest.fixture()
+    def pool(self, monkeypatch):
+        pool = MagicMock()
+        pool.acquire.return_value.closed = 0
+        monkeypatch.setattr(dep_module, "get_pg_pool", lambda: pool)
+        return pool
+
+    def test_yields_pooled_connection_then_commits(self, pool):
+        gen = get_pg()
+        conn = next(gen)
+        assert conn is pool.acquire.return_value
 
-        with patch("app.api.dependencies.psycopg2.connect", return_value=mock_conn):
-            gen = get_pg()
-            conn = next(gen)
+        with pytest.raises(StopIteration):
+            next(gen)
+        conn.commit.assert_called_once()
+        pool.release.assert_called_once_with(conn)
+
+    def test_rolls_back_when_request_fails(self, pool):
+        gen = get_pg()
+        conn = next(gen)
 
-        assert conn is mock_conn
+        with pytest.raises(ValueError):
+            gen.throw(ValueError("boom"))
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+        pool.release.assert_called_once_with(conn)
 
-    def test_creates_new_connection_when_closed(self, monkeypatch):
-        mock_old = MagicMock()
-        mock_old.closed = True
-        monkeypatch.setattr(dep_module, "_pg_conn", mock_old)
+    def test_raises_503_when_pool_unavailable(self, pool):
+        pool.acquire.side_effect = PoolError("PostgreSQL inaccessible")
 
-        mock_new = MagicMock()
-        with patch("app.api.dependencies.psycopg2.connect", return_value=mock_new):
-            gen = get_pg()
-            conn = next(gen)
+        with pytest.raises(HTTPException) as exc_info:
+            next(get_pg())
 
-        assert conn is mock_new
+        assert exc_info.value.status_code == 503
+        pool.release.assert_not_called()
 
-    def test_reuses_existing_open_connection(self, monkeypatch):
-        mock_conn = MagicMock()
-        mock_conn.closed = False
-        monkeypatch.setattr(dep_module, "_pg_conn", mock_conn)
 
-        gen = get_pg()
-        conn = next(gen)
+class TestGetApg:
+    @pytest.fixture()
+    def pool(self, monkeypatch):
+        pool = MagicMock(acquire=AsyncMock(), release=AsyncMock())
+        monkeypatch.setattr(dep_module, "get_async_pool", AsyncMock(return_value=pool))
+        return pool
 
-        assert conn is mock_conn
+    @pytest.mark.anyio
+    async def test_yields_pooled_connection_then_releases(self, pool):
+        gen = get_apg()
+        conn = await anext(gen)
+        assert conn is pool.acquire.return_value
 
-    def test_reconnects_when_ping_fails(self, monkeypatch):
-        mock_old = MagicMock()
-        mock_old.closed = False
-        mock_old.cursor.return_value.__enter__.return_value.execute.side_effect = (
-            Exception("dead")
-        )
-        monkeypatch.setattr(dep_module, "_pg_conn", mock_old)
+        with pytest.raises(StopAsyncIteration):
+            await anext(gen)
+        pool.release.assert_awaited_once_with(conn)
 
-        mock_new = MagicMock()
-        with patch("app.api.dependencies.psycopg2.connect", return_value=mock_new):
-            gen = get_pg()
-            conn = next(gen)
+    @pytest.mark.anyio
+    async def test_raises_503_when_pool_unavailable(self, pool):
+        pool.acquire.side_effect = TimeoutError
 
-        assert conn is mock_new
+        with pytest.raises(HTTPException) as exc_info:
+            await anext(get_apg())
+
+        assert exc_info.value.status_code == 503
+        pool.release.assert_not_awaited()
 
 
 class TestGetDuck:
+    @pytest.fixture(autouse=True)
+    def reset(self):
+        yield
+        close_shared_duckdb()
+
     def test_raises_503_when_db_missing(self, monkeypatch, tmp_path):
         missing = tmp_path / "missing.duckdb"
         monkeypatch.setattr(dep_module, "DB_PATH", missing)
@@ -84,3 +107,22 @@ class TestGetDuck:
 
         with contextlib.suppress(StopIteration):
             next(gen)
+
+    def test_cursors_share_one_database(self, monkeypatch, tmp_path):
+        db_path = tmp_path / "test.duckdb"
+        conn = duckdb.connect(str(db_path))
+        conn.execute("CREATE TABLE items AS SELECT 1 AS id")
+        conn.close()
+        monkeypatch.setattr(dep_module, "DB_PATH", db_path)
+
+        first, second = get_duck(), get_duck()
+        cur_a, cur_b = next(first), next(second)
+
+        assert cur_a is not cur_b
+        assert cur_a.execute("SELECT id FROM items").fetchall() == [(1,)]
+        assert cur_b.execute("SELECT id FROM items").fetchall() == [(1,)]
+
+        first.close()  # fin de la requête : le curseur est fermé
+        with pytest.raises(duckdb.ConnectionException):
+            cur_a.execute("SELECT 1")
+        assert cur_b.execute("SELECT 1").fetchall() == [(1,)]
@@ -0,0 +1,129 @@
+"""Tests pour le pool asyncpg des routes async (sans serveur PostgreSQL)."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.database import pg_async
+from app.database.dao.collection_dao import AsyncCollectionDAO, CollectionDAO
+from app.database.dao.favorite_dao import AsyncFavoriteDAO, FavoriteDAO
+from app.database.dao.user_dao import AsyncUserDAO, UserDAO
+from app.database.dao.user_parts_dao import AsyncUserPartsDAO, UserPartsDAO
+from app.database.dao.whishlist_dao import AsyncWishlistDAO, WishlistDAO
+from app.database.pg_async import (
+    acquire_async,
+    affected_rows,
+    async_pool_stats,
+    close_async_pool,
+    get_async_pool,
+    numbered,
+)
+from app.database.pg_pool import PoolError
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def reset_pool():
+    yield
+    pg_async._pool = None
+
+
+@pytest.mark.parametrize(
+    ("status", "expected"),
+    [("DELETE 1", 1), ("UPDATE 0", 0), ("INSERT 0 3", 3)],
+)
+async def test_affected_rows(status, expected):
+    assert affected_rows(status) == expected
+
+
+async def test_numbered():
+    assert numbered("SELECT 1") == "SELECT 1"
+    assert (
+        numbered("UPDATE t SET a = %s WHERE b = %s AND c = %s")
+        == "UPDATE t SET a = $1 WHERE b = $2 AND c = $3"
+    )
+
+
+@pytest.mark.parametrize(
+    ("dao", "async_dao", "method", "args"),
+    [
+        (CollectionDAO, AsyncCollectionDAO, "get_user_collection", (1,)),
+        (CollectionDAO, AsyncCollectionDAO, "mark_set_as_built", (1, "42115-1")),
+        (CollectionDAO, AsyncCollectionDAO, "remove_set_from_collection", (1, "1-1")),
+        (FavoriteDAO, AsyncFavoriteDAO, "get_user_favorites", (1,)),
+        (FavoriteDAO, AsyncFavoriteDAO, "remove_favorite", (1, "1-1")),
+        (UserDAO, AsyncUserDAO, "get_by_username", ("alice",)),
+        (UserDAO, AsyncUserDAO, "update_user", (True, "bob", 1)),
+        (UserDAO, AsyncUserDAO, "is_username_taken", ("alice",)),
+        (UserPartsDAO, AsyncUserPartsDAO, "get_owned_parts", (1,)),
+        (UserPartsDAO, AsyncUserPartsDAO, "update_quantity", (1, "3001", 4, 2)),
+        (WishlistDAO, AsyncWishlistDAO, "get_parts", (1,)),
+        (WishlistDAO, AsyncWishlistDAO, "remove_set", (1, "1-1")),
+    ],
+)
+async def test_async_dao_runs_sync_query(dao, async_dao, method, args):
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = []
+    cursor.rowcount = 0
+    getattr(dao(conn), method)(*args)
+    (query, params), _ = cursor.execute.call_args
+
+    aconn = MagicMock(
+        fetch=AsyncMock(return_value=[]),
+        fetchrow=AsyncMock(return_value=None),
+        fetchval=AsyncMock(return_value=None),
+        execute=AsyncMock(return_value="UPDATE 0"),
+    )
+    await getattr(async_dao(aconn), method)(*args)
+    (call,) = [c for c in aconn.method_calls if c.args]
+    assert call.args == (numbered(query), *params)
+
+
+async def test_pool_created_once_then_closed():
+    pool = MagicMock(close=AsyncMock())
+    with patch(
+        "app.database.pg_async.asyncpg.create_pool", AsyncMock(return_value=pool)
+    ) as create:
+        assert await get_async_pool() is pool
+        assert await get_async_pool() is pool
+        await close_async_pool()
+
+    create.assert_awaited_once()
+    pool.close.assert_awaited_once()
+    assert async_pool_stats() is None
+
+
+async def test_unreachable_server_raises_pool_error():
+    with (
+        patch(
+            "app.database.pg_async.asyncpg.create_pool",
+            AsyncMock(side_effect=OSError("refused")),
+        ),
+        pytest.raises(PoolError),
+    ):
+        await get_async_pool()
+
+
+async def test_acquire_timeout_raises_pool_error():
+    pool = MagicMock(acquire=AsyncMock(side_effect=TimeoutError))
+    pool.get_max_size.return_value = 10
+    with pytest.raises(PoolError, match="10 en cours"):
+        await acquire_async(pool, timeout=0.01)
+
+
+async def test_stats():
+    pg_async._pool = MagicMock()
+    pg_async._pool.get_size.return_value = 3
+    pg_async._pool.get_idle_size.return_value = 1
+    pg_async._pool.get_min_size.return_value = 1
+    pg_async._pool.get_max_size.return_value = 10
+    assert async_pool_stats() == {
+        "size": 3,
+        "min_size": 1,
+        "max_size": 10,
+        "idle": 1,
+        "in_use": 2,
+    }
@@ -0,0 +1,146 @@
+"""Tests pour le pool de connexions PostgreSQL.
+
+Les connexions sont des mocks : on teste l'emprunt, l'attente, le contrôle
+de santé et les métriques, pas le réseau.
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import psycopg2
+import psycopg2.extensions
+import pytest
+
+from app.database.pg_pool import PgPool, PoolError
+
+
+def fake_conn():
+    conn = MagicMock()
+    conn.closed = 0
+    conn.get_transaction_status.return_value = (
+        psycopg2.extensions.TRANSACTION_STATUS_IDLE
+    )
+    return conn
+
+
+@pytest.fixture()
+def connect():
+    return MagicMock(side_effect=lambda: fake_conn())
+
+
+def make_pool(connect, **kwargs):
+    kwargs = {"min_size": 0, "max_size": 2, "timeout": 0.05, **kwargs}
+    return PgPool(connect, **kwargs)
+
+
+class TestAcquireRelease:
+    def test_connection_reused_after_release(self, connect):
+        pool = make_pool(connect)
+        conn = pool.acquire()
+        pool.release(conn)
+
+        assert pool.acquire() is conn
+        assert connect.call_count == 1
+
+    def test_timeout_when_all_connections_in_use(self, connect):
+        pool = make_pool(connect)
+        pool.acquire()
+        pool.acquire()
+
+        with pytest.raises(PoolError):
+            pool.acquire()
+
+        assert connect.call_count == 2
+        assert pool.stats()["timeouts"] == 1
+
+    def test_waiter_gets_released_connection(self, connect):
+        pool = make_pool(connect, max_size=1, timeout=2)
+        conn = pool.acquire()
+        threading.Timer(0.05, pool.release, args=(conn,)).start()
+
+        assert pool.acquire() is conn
+        assert pool.stats()["wait_ms_max"] >= 40
+
+    def test_closed_connection_is_discarded(self, connect):
+        pool = make_pool(connect)
+        conn = pool.acquire()
+        conn.closed = 2
+        pool.release(conn)
+
+        assert pool.acquire() is not conn
+        assert pool.stats()["size"] == 1
+
+    def test_open_transaction_rolled_back_on_release(self, connect):
+        pool = make_pool(connect)
+        conn = pool.acquire()
+        conn.get_transaction_status.return_value = (
+            psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+        )
+        pool.release(conn)
+        conn.rollback.assert_called_once()
+
+    def test_connect_failure_frees_the_slot(self):
+        connect = MagicMock(side_effect=psycopg2.OperationalError("down"))
+        pool = make_pool(connect, max_size=1)
+
+        for _ in range(2):
+            with pytest.raises(PoolError):
+                pool.acquire()
+        assert pool.stats()["size"] == 0
+
+    def test_invalid_sizes(self, connect):
+        with pytest.raises(ValueError):
+            PgPool(connect, min_size=3, max_size=2)
+
+
+class TestHealthCheck:
+    def test_dead_connections_replaced_up_to_min_size(self, connect):
+        pool = make_pool(connect, min_size=2)
+        pool.check()
+        assert pool.stats()["idle"] == 2
+
+        alive, dead = pool.acquire(), pool.acquire()
+        dead.cursor.return_value.__enter__.return_value.execute.side_effect = (
+            psycopg2.OperationalError("gone")
+        )
+        pool.release(alive)
+        pool.release(dead)
+        pool.check()
+
+        assert pool.stats()["idle"] == 2
+        assert connect.call_count == 3
+        dead.close.assert_called_once()
+
+    def test_background_check_opens_min_connections(self, connect):
+        pool = make_pool(connect, min_size=1, check_interval=60)
+        pool.start()
+        deadline = time.monotonic() + 2
+        while pool.stats()["idle"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        pool.close()
+        assert connect.call_count == 1
+
+
+class TestCloseAndStats:
+    def test_close_closes_idle_and_returned_connections(self, connect):
+        pool = make_pool(connect)
+        idle, borrowed = pool.acquire(), pool.acquire()
+        pool.release(idle)
+
+        pool.close()
+        idle.close.assert_called_once()
+        pool.release(borrowed)
+        borrowed.close.assert_called_once()
+
+    def test_stats(self, connect):
+        pool = make_pool(connect)
+        pool.release(pool.acquire())
+        pool.acquire()
+
+        stats = pool.stats()
+        assert stats["size"] == 1
+        assert stats["in_use"] == 1
+        assert stats["idle"] == 0
+        assert stats["waiting"] == 0
+        assert stats["acquired"] == 2
@@ -0,0 +1,159 @@
+"""Tests pour le cache HTTP des routes du catalogue (ResponseCacheMiddleware)."""
+
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.testclient import TestClient
+import pytest
+
+from app.api.response_cache import (
+    ResponseCacheMiddleware,
+    cache_key,
+    cache_response,
+    etag_matches,
+)
+from app.utils.lru_cache import LRUCache
+
+
+@pytest.fixture()
+def state():
+    return {"version": "lego.duckdb@1", "calls": 0, "ready": False}
+
+
+@pytest.fixture()
+def cache():
+    return LRUCache(2)
+
+
+@pytest.fixture()
+def client(state, cache):
+    api = FastAPI()
+
+    @api.get("/stats")
+    @cache_response(max_age=60)
+    def stats():
+        state["calls"] += 1
+        return {"calls": state["calls"]}
+
+    @api.get("/search")
+    @cache_response(vary=lambda: state["ready"])
+    def search(q: str = "", limit: int = 10):
+        state["calls"] += 1
+        if q == "boom":
+            raise HTTPException(status_code=503)
+        return {
+            "q": q,
+            "limit": limit,
+            "ready": state["ready"],
+            "calls": state["calls"],
+        }
+
+    @api.get("/recent")
+    @cache_response()
+    def recent():
+        state["calls"] += 1
+        return {"sets": ["75192-1"]}
+
+    @api.get("/large")
+    @cache_response()
+    def large(n: int = 0):
+        return Response(b"x" * 400 + str(n).encode(), media_type="text/plain")
+
+    @api.get("/me")
+    def me():
+        state["calls"] += 1
+        return {"calls": state["calls"]}
+
+    api.add_middleware(
+        ResponseCacheMiddleware, cache=cache, version=lambda: state["version"]
+    )
+    return TestClient(api)
+
+
+def test_cache_key_normalizes_path_and_query():
+    def scope(path, query):
+        return {"path": path, "query_string": query}
+
+    assert cache_key(scope("/sets/search/", b"q=a%20b&limit=5"), "v1") == cache_key(
+        scope("/sets/search", b"limit=5&q=a+b"), "v1"
+    )
+    assert cache_key(scope("/stats", b""), "v1") != cache_key(
+        scope("/stats", b""), "v2"
+    )
+
+
+def test_etag_matches():
+    assert etag_matches(b'"a", W/"b"', b'"b"')
+    assert etag_matches(b"*", b'"b"')
+    assert not etag_matches(b'"a"', b'"b"')
+
+
+def test_response_served_from_cache(client, cache):
+    first = client.get("/stats")
+    second = client.get("/stats")
+    assert first.json() == second.json() == {"calls": 1}
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.headers["cache-control"] == "public, max-age=60"
+    assert second.headers["content-type"] == "application/json"
+    assert cache.hits == 1
+
+
+def test_not_modified(client, state):
+    etag = client.get("/stats").headers["etag"]
+    resp = client.get("/stats", headers={"If-None-Match": f'"x", {etag}'})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["etag"] == etag
+    assert state["calls"] == 1
+
+
+def test_new_catalog_version_recomputes(client, state):
+    etag = client.get("/stats").headers["etag"]
+    state["version"] = "lego.duckdb@2"
+    resp = client.get("/stats", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json() == {"calls": 2}
+
+
+def test_query_parameters_and_vary_in_key(client, state):
+    assert client.get("/search?q=falcon&limit=5").json()["calls"] == 1
+    assert client.get("/search?limit=5&q=falcon").json()["calls"] == 1
+    assert client.get("/search?q=falcon").json()["calls"] == 2
+    state["ready"] = True
+    assert client.get("/search?q=falcon&limit=5").json() == {
+        "q": "falcon",
+        "limit": 5,
+        "ready": True,
+        "calls": 3,
+    }
+
+
+def test_lru_eviction(client, cache):
+    for q in ("a", "b", "c"):
+        client.get(f"/search?q={q}")
+    assert len(cache) == 2
+    assert cache.evictions == 1
+
+
+@pytest.mark.parametrize("cache", [LRUCache(100, max_bytes=1000)])
+def test_large_bodies_evicted_by_size(client, cache):
+    for n in range(4):
+        assert client.get(f"/large?n={n}").status_code == 200
+    assert len(cache) == 2  # 401 octets par corps
+    assert cache.nbytes <= 1000
+    assert cache.evictions == 2
+
+
+def test_errors_and_unmarked_routes_not_cached(client, cache):
+    assert client.get("/search?q=boom").status_code == 503
+    assert client.get("/search?q=boom").status_code == 503
+    resp = client.get("/me")
+    assert client.get("/me").json() == {"calls": 4}
+    assert "etag" not in resp.headers
+    assert len(cache) == 0
+
+
+def test_without_catalog_etag_only(client, state, cache):
+    state["version"] = None
+    etag = client.get("/recent").headers["etag"]
+    assert client.get("/recent", headers={"If-None-Match": etag}).status_code == 304
+    assert state["calls"] == 2  # recalculé, mais pas renvoyé
+    assert len(cache) == 0
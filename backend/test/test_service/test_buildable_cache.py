@@ -0,0 +1,170 @@
+import json
+import sqlite3
+import tempfile
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.business_object.buildable_set import BuildableSet
+from app.service import buildable_cache
+from app.service.buildable_cache import (
+    BuildableCache,
+    MemoryCacheBackend,
+    SqliteCacheBackend,
+    bump_stock_version,
+    get_buildable_cache,
+)
+
+
+def result(*set_nums: str) -> dict:
+    """Résultat de get_buildable_sets avec les sets `set_nums` constructibles."""
+    return {
+        "buildable": [
+            BuildableSet(
+                set_num=set_num,
+                name="Set",
+                year=2020,
+                theme_id=1,
+                num_parts=10,
+                total_parts_needed=4,
+                parts_owned=4,
+                completion_percentage=100.0,
+                missing_parts_count=0,
+            )
+            for set_num in set_nums
+        ],
+        "partial": [],
+    }
+
+
+@pytest.fixture(params=["memory", "file"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCacheBackend(max_entries=2)
+    return SqliteCacheBackend(tmp_path / "cache.sqlite", max_entries=2)
+
+
+# -------------------------
+# Backends
+# -------------------------
+
+
+def test_backend_get_put(backend):
+    assert backend.get("a") is None
+    backend.put("a", result("1-1"))
+    assert backend.get("a") == result("1-1")
+    assert len(backend) == 1
+
+
+def test_backend_evicts_least_recently_used(backend):
+    backend.put("a", result("1-1"))
+    backend.put("b", result("2-1"))
+    backend.get("a")  # "b" devient la plus ancienne
+    backend.put("c", result("3-1"))
+    assert backend.get("b") is None
+    assert backend.get("a") == result("1-1")
+    assert backend.get("c") == result("3-1")
+
+
+def test_backend_stock_versions(backend):
+    assert backend.stock_version(1) == 0
+    backend.bump(1)
+    backend.bump(1)
+    assert backend.stock_version(1) == 2
+    assert backend.stock_version(2) == 0
+
+
+def test_backend_clear(backend):
+    backend.put("a", result("1-1"))
+    backend.clear()
+    assert len(backend) == 0
+
+
+def test_sqlite_backend_shared_between_instances(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    writer = SqliteCacheBackend(path, max_entries=4)
+    reader = SqliteCacheBackend(path, max_entries=4)
+    writer.put("a", result("1-1", "2-1"))
+    writer.bump(7)
+    assert reader.get("a") == result("1-1", "2-1")
+    assert reader.stock_version(7) == 1
+
+
+def test_sqlite_backend_stores_json(tmp_path):
+    path = tmp_path / "cache" / "buildable.sqlite"  # dossier créé au besoin
+    SqliteCacheBackend(path).put("a", result("1-1"))
+    with sqlite3.connect(path) as conn:
+        (value,) = conn.execute("SELECT value FROM entries").fetchone()
+    assert json.loads(value)["buildable"][0]["set_num"] == "1-1"
+
+
+def test_default_cache_path_is_not_in_shared_temp_dir():
+    assert not buildable_cache.BUILDABLE_CACHE_PATH.startswith(tempfile.gettempdir())
+
+
+# -------------------------
+# BuildableCache
+# -------------------------
+
+
+def test_get_or_compute_counts_hits_and_misses(backend):
+    cache = BuildableCache(backend)
+    compute = MagicMock(return_value=result("1-1"))
+
+    cache.get_or_compute(1, 50, "v1", compute)
+    cache.get_or_compute(1, 50, "v1", compute)
+
+    compute.assert_called_once()
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["backend"] == backend.name
+
+
+def test_key_depends_on_limit_stock_and_catalog(backend):
+    cache = BuildableCache(backend)
+    compute = MagicMock(return_value={})
+
+    cache.get_or_compute(1, 50, "v1", compute)
+    cache.get_or_compute(1, 10, "v1", compute)  # autre limite
+    cache.get_or_compute(1, 10, "v2", compute)  # autre catalogue
+    cache.bump_stock_version(1)
+    cache.get_or_compute(1, 10, "v2", compute)  # stock modifié
+
+    assert compute.call_count == 4
+    assert cache.stats()["hits"] == 0
+
+
+# -------------------------
+# Cache process-wide
+# -------------------------
+
+
+def test_get_buildable_cache_is_shared():
+    with patch.object(buildable_cache, "_cache", None):
+        assert get_buildable_cache() is get_buildable_cache()
+
+
+def test_get_buildable_cache_off():
+    with patch.object(buildable_cache, "BUILDABLE_CACHE", "off"):
+        assert get_buildable_cache() is None
+        bump_stock_version(1)  # sans effet, sans erreur
+
+
+def test_get_buildable_cache_unknown_backend():
+    with (
+        patch.object(buildable_cache, "BUILDABLE_CACHE", "redis"),
+        pytest.raises(ValueError, match="inconnu"),
+    ):
+        get_buildable_cache()
+
+
+def test_get_buildable_cache_memory_refused_with_several_workers():
+    with (
+        patch.object(buildable_cache, "_cache", None),
+        patch.object(buildable_cache, "BUILDABLE_CACHE", "memory"),
+        patch.object(buildable_cache, "WEB_CONCURRENCY", 4),
+        pytest.raises(ValueError, match="WEB_CONCURRENCY=4"),
+    ):
+        get_buildable_cache()
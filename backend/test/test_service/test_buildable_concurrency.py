@@ -0,0 +1,92 @@
+"""Calcul des sets constructibles en parallèle sur une même connexion DuckDB.
+
+Chaque appel doit travailler dans sa propre portée (curseur) : les résultats
+obtenus depuis plusieurs threads doivent être ceux du calcul séquentiel.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import random
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.business_object.user_owned_set import UserOwnedSet
+from app.service.buildable_service import BuildableService
+
+
+PAIRS = [
+    ("3001", 1),
+    ("3002", 1),
+    ("3003", 2),
+    ("3004", 1),
+    ("3005", 3),
+    ("3006", 1),
+    ("3007", 1),
+    ("3008", 1),
+    ("3009", 1),
+    ("3010", 1),
+    ("9999", 1),  # hors catalogue
+]
+SET_NUMS = ["100-1", "200-1", "300-1", "400-1"]
+USERS = 12
+ROUNDS = 4
+
+
+def make_users(seed: int = 0) -> dict:
+    """Stock et collection aléatoires par utilisateur."""
+    rng = random.Random(seed)
+    users = {}
+    for user_id in range(1, USERS + 1):
+        pairs = rng.sample(PAIRS, rng.randint(0, len(PAIRS)))
+        owned = {pair: rng.randint(1, 4) for pair in pairs}
+        collection = [
+            UserOwnedSet(user_id, set_num, is_built=rng.random() < 0.5)
+            for set_num in rng.sample(SET_NUMS, rng.randint(0, 2))
+        ]
+        users[user_id] = (owned, collection)
+    return users
+
+
+def snapshot(service, user_id: int) -> tuple:
+    """Résultat comparable : paliers, pièces manquantes, détail d'un set."""
+    result = service.with_missing_parts(user_id, service.get_buildable_sets(user_id))
+    buckets = {
+        name: [(s.set_num, s.parts_owned, s.missing_parts) for s in sets]
+        for name, sets in result.items()
+    }
+    missing = service.get_missing_parts(user_id, "300-1")
+    return buckets, [m.to_dict() for m in missing]
+
+
+@pytest.mark.parametrize("engine", ["sql", "matrix"])
+def test_parallel_results_match_sequential(lego_catalog, engine):
+    users = make_users()
+
+    def owned_columns(user_id):
+        owned = users[user_id][0]
+        return {
+            "part_num": [p for p, _ in owned],
+            "color_id": [c for _, c in owned],
+            "quantity": list(owned.values()),
+        }
+
+    with (
+        patch("app.service.buildable_service.UserPartsDAO") as mock_user_parts,
+        patch("app.service.buildable_service.CollectionDAO") as mock_collection,
+    ):
+        mock_user_parts.return_value.get_owned_columns.side_effect = owned_columns
+        mock_collection.return_value.get_user_collection.side_effect = lambda user_id: (
+            users[user_id][1]
+        )
+        # Un seul service, donc une seule connexion, partagé par tous les threads
+        service = BuildableService(MagicMock(), lego_catalog, engine=engine)
+
+        expected = {user_id: snapshot(service, user_id) for user_id in users}
+        jobs = list(users) * ROUNDS
+        random.Random(1).shuffle(jobs)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda u: (u, snapshot(service, u)), jobs))
+
+    assert any(buckets["partial"] for buckets, _ in expected.values())
+    for user_id, result in results:
+        assert result == expected[user_id]
@@ -0,0 +1,216 @@
+"""Tests des moteurs de calcul des sets constructibles (SQL et matriciel)."""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from app.business_object.user_stock import UserStock
+from app.database.dao.part_keys_dao import PartKeysDAO
+from app.service.buildable_engine import (
+    MatrixBuildableEngine,
+    RequirementMatrix,
+    SqlBuildableEngine,
+    get_buildable_engine,
+)
+from app.service.buildable_state import CoverageState
+
+
+# ---------------------------------------------------------------------------
+# Stock de référence sur le catalogue lego_catalog (voir conftest)
+# ---------------------------------------------------------------------------
+
+OWNED = {
+    ("3001", 1): 2,
+    ("3002", 1): 1,
+    ("3003", 2): 4,
+    ("3004", 1): 1,
+    ("3005", 3): 1,
+}
+
+
+@pytest.fixture()
+def stock(lego_catalog):
+    """OWNED traduit en pc_id."""
+    pair_ids = PartKeysDAO(lego_catalog).get_pair_ids(list(OWNED))
+    return UserStock.from_dict({pair_ids[k]: qty for k, qty in OWNED.items()})
+
+
+def summarize(result):
+    return {
+        bucket: [(s.set_num, s.parts_owned, s.completion_percentage) for s in sets]
+        for bucket, sets in result.items()
+    }
+
+
+# ---------------------------------------------------------------------------
+# Moteur SQL
+# ---------------------------------------------------------------------------
+
+
+class TestSqlBuildableEngine:
+    def test_make_exclude_empty(self):
+        sql, params = SqlBuildableEngine(MagicMock())._make_exclude([])
+        assert sql == ""
+        assert params == []
+
+    def test_make_exclude_with_values(self):
+        engine = SqlBuildableEngine(MagicMock())
+        sql, params = engine._make_exclude(["1234-1", "5678-1"])
+        assert sql == "AND c.set_num NOT IN (?, ?)"
+        assert params == ["1234-1", "5678-1"]
+
+    def test_bucket_case_covers_every_bucket(self):
+        case_sql = SqlBuildableEngine(MagicMock())._bucket_case()
+        assert "c.covered = c.total THEN 'buildable'" in case_sql
+        assert ">= 80.0 THEN 'partial'" in case_sql
+
+    def test_query_buckets_groups_rows_by_bucket(self):
+        cur = MagicMock()
+        cur.description = [
+            ("set_num",),
+            ("name",),
+            ("year",),
+            ("theme_id",),
+            ("num_parts",),
+            ("img_url",),
+            ("parts_owned",),
+            ("total_parts_needed",),
+            ("completion_percentage",),
+            ("missing_parts_count",),
+            ("bucket",),
+            ("bucket_rank",),
+        ]
+        cur.execute.return_value.fetchall.return_value = [
+            ("1-1", "A", 2020, 1, 50, None, 10, 10, 100.0, 0, "buildable", 1),
+            ("2-1", "B", 2021, 1, 40, None, 9, 10, 90.0, 1, "partial", 1),
+            ("3-1", "C", 2022, 1, 30, None, 8, 10, 80.0, 2, "partial", 2),
+        ]
+
+        result = SqlBuildableEngine(MagicMock())._query_buckets(cur, [], limit=10)
+
+        assert [s.set_num for s in result["buildable"]] == ["1-1"]
+        assert [s.set_num for s in result["partial"]] == ["2-1", "3-1"]
+        cur.execute.assert_called_once()
+
+    def test_rank_on_catalog(self, lego_catalog, stock):
+        result = summarize(SqlBuildableEngine(lego_catalog).rank(stock, [], 10))
+        assert result == {
+            "buildable": [("100-1", 5, 100.0)],
+            "partial": [("200-1", 4, 80.0)],
+        }
+
+
+# ---------------------------------------------------------------------------
+# Moteur matriciel
+# ---------------------------------------------------------------------------
+
+
+def pair_id(conn, part_num, color_id):
+    return PartKeysDAO(conn).get_pair_ids([(part_num, color_id)])[(part_num, color_id)]
+
+
+class TestRequirementMatrix:
+    def test_load_builds_inverted_index(self, lego_catalog):
+        matrix = RequirementMatrix.load(lego_catalog)
+        assert matrix.set_nums == ["100-1", "200-1", "300-1", "400-1"]
+        # 10 couples requis + 1 pièce de rechange + 2 couples issus des éléments
+        assert matrix.n_pairs == 13
+        assert matrix.col_ptr.tolist()[-1] == 17
+        assert len(matrix.set_rows) == len(matrix.needed) == 17
+
+        # Colonne de 3001/1 : requis par les quatre sets
+        pc = pair_id(lego_catalog, "3001", 1)
+        col = slice(matrix.col_ptr[pc], matrix.col_ptr[pc + 1])
+        assert matrix.set_rows[col].tolist() == [0, 1, 2, 3]
+        assert matrix.needed[col].tolist() == [2, 1, 1, 1]
+
+    def test_coverage_counts_pairs_with_enough_quantity(self, lego_catalog, stock):
+        matrix = RequirementMatrix.load(lego_catalog)
+        pc_3001 = pair_id(lego_catalog, "3001", 1)
+        rows, covered = matrix.coverage(
+            UserStock.from_dict({**stock.to_dict(), pc_3001: 1})
+        )
+        # 100-1 demande 2 × 3001 : ce couple n'est plus couvert
+        assert rows.tolist() == [0, 1, 2, 3]
+        assert covered.tolist() == [4, 4, 1, 2]
+
+    def test_coverage_only_touches_sets_sharing_a_pair(self, lego_catalog):
+        matrix = RequirementMatrix.load(lego_catalog)
+        rows, covered = matrix.coverage(
+            UserStock.from_dict({pair_id(lego_catalog, "3007", 1): 1})
+        )
+        assert rows.tolist() == [2]
+        assert covered.tolist() == [1]
+
+    def test_coverage_bound_drops_unreachable_sets(self, lego_catalog, stock):
+        matrix = RequirementMatrix.load(lego_catalog)
+        # 300-1 ne partage que 3001/1 avec le stock : 20 % au mieux
+        rows, covered = matrix.coverage(stock, min_pct=80.0)
+        assert rows.tolist() == [0, 1, 3]
+        assert covered.tolist() == [5, 4, 2]
+
+    def test_apply_delta_updates_sets_requiring_the_pair(self, lego_catalog, stock):
+        matrix = RequirementMatrix.load(lego_catalog)
+        rows, covered = matrix.coverage(stock)
+        dense = np.zeros(len(matrix.set_nums), dtype=np.int32)
+        dense[rows] = covered
+
+        # 3001/1 passe de 2 à 1 : seul 100-1 (qui en demande 2) perd un couple
+        changed = matrix.apply_delta(dense, pair_id(lego_catalog, "3001", 1), 2, 1)
+
+        assert changed.tolist() == [0]
+        assert dense.tolist() == [4, 4, 1, 2]
+
+    def test_coverage_empty_stock(self, lego_catalog):
+        rows, covered = RequirementMatrix.load(lego_catalog).coverage(UserStock.empty())
+        assert rows.tolist() == covered.tolist() == []
+
+
+class TestMatrixBuildableEngine:
+    def test_rank_matches_sql_engine(self, lego_catalog, stock):
+        for exclude in ([], ["100-1"]):
+            for limit in (1, 10):
+                expected = SqlBuildableEngine(lego_catalog).rank(stock, exclude, limit)
+                got = MatrixBuildableEngine(lego_catalog).rank(stock, exclude, limit)
+                assert summarize(got) == summarize(expected)
+
+    def test_rank_excludes_collection(self, lego_catalog, stock):
+        result = MatrixBuildableEngine(lego_catalog).rank(stock, ["100-1"], 10)
+        assert result["buildable"] == []
+
+    def test_rank_fills_set_details(self, lego_catalog, stock):
+        result = MatrixBuildableEngine(lego_catalog).rank(stock, [], 10)
+        built = result["buildable"][0]
+        assert built.name == "Set 100-1"
+        assert built.num_parts == 100
+        assert built.missing_parts_count == 0
+
+    def test_rank_state_matches_rank(self, lego_catalog, stock):
+        engine = MatrixBuildableEngine(lego_catalog)
+        state = CoverageState.build(
+            engine.matrix, "v1", None, stock, UserStock.empty(), ["300-1"]
+        )
+        expected = engine.rank(stock, ["300-1"], 10)
+        assert summarize(engine.rank_state(state, 10)) == summarize(expected)
+
+    def test_rank_empty_stock(self, lego_catalog):
+        result = MatrixBuildableEngine(lego_catalog).rank(UserStock.empty(), [], 10)
+        assert result == {"buildable": [], "partial": []}
+
+
+# ---------------------------------------------------------------------------
+# Sélection du moteur
+# ---------------------------------------------------------------------------
+
+
+def test_get_buildable_engine_by_name(lego_catalog):
+    assert isinstance(get_buildable_engine(lego_catalog, "sql"), SqlBuildableEngine)
+    assert isinstance(
+        get_buildable_engine(lego_catalog, "matrix"), MatrixBuildableEngine
+    )
+
+
+def test_get_buildable_engine_unknown_name():
+    with pytest.raises(ValueError, match="inconnu"):
+        get_buildable_engine(MagicMock(), "gpu")
@@ -1,8 +1,15 @@
 from unittest.mock import MagicMock, patch
 
+from app.business_object.buildable_set import BuildableSet
+from app.business_object.missing_part import MissingPart
+from app.business_object.user_stock import UserStock
+from app.service.buildable_cache import BuildableCache, MemoryCacheBackend
 from app.service.buildable_service import BuildableService
 
 
+NO_PARTS = {"part_num": [], "color_id": [], "quantity": []}
+
+
 def make_service():
     pg_conn = MagicMock()
     duck = MagicMock()
@@ -23,7 +30,7 @@ def test_get_buildable_sets_returns_two_keys():
         patch("app.service.buildable_service.UserPartsDAO") as mock_user_parts_dao,
         patch("app.service.buildable_service.CollectionDAO") as mock_collection_dao,
     ):
-        mock_user_parts_dao.return_value.get_owned_parts.return_value = []
+        mock_user_parts_dao.return_value.get_owned_columns.return_value = NO_PARTS
         mock_collection_dao.return_value.get_user_collection.return_value = []
 
         service = BuildableService(pg_conn=pg_conn, duckdb_conn=duck)
@@ -40,7 +47,7 @@ def test_get_buildable_sets_empty_collection():
         patch("app.service.buildable_service.UserPartsDAO") as mock_user_parts_dao,
         patch("app.service.buildable_service.CollectionDAO") as mock_collection_dao,
     ):
-        mock_user_parts_dao.return_value.get_owned_parts.return_value = []
+        mock_user_parts_dao.return_value.get_owned_columns.return_value = NO_PARTS
         mock_collection_dao.return_value.get_user_collection.return_value = []
 
         service = BuildableService(pg_conn=pg_conn, duckdb_conn=duck)
@@ -51,91 +58,190 @@ def test_get_buildable_sets_empty_collection():
 
 
 def test_load_user_stock_with_unbuilt_sets():
-    """Couvre les lignes 126-141 : sets non construits dans la collection."""
-    pg_conn = MagicMock()
-    duck = MagicMock()
+    """Les sets non construits de la collection sont passés à StockDAO."""
+    pg_conn, duck = make_service()
 
-    fake_set = MagicMock()
-    fake_set.set_num = "1234-1"
-    fake_set.is_built = False
-
-    # Séquence des appels duck.execute() dans _load_user_stock puis les 3 requêtes
-    unbuilt_result = MagicMock()
-    unbuilt_result.fetchall.return_value = [("3001", 4, 2)]
-    empty_result = MagicMock()
-    empty_result.fetchall.return_value = []
-
-    duck.execute.side_effect = [
-        unbuilt_result,  # requête pièces des sets non construits
-        MagicMock(),  # CREATE TEMP TABLE
-        MagicMock(),  # DELETE FROM _user_parts
-        empty_result,  # _query_buildable
-        empty_result,  # _query_partial
-        empty_result,  # _query_color_flexible
-    ]
-    duck.description = [("part_num",), ("color_id",), ("qty",)]
+    fake_set = MagicMock(set_num="1234-1", is_built=False)
+    built_set = MagicMock(set_num="5678-1", is_built=True)
 
     with (
         patch("app.service.buildable_service.UserPartsDAO") as mock_user_parts_dao,
         patch("app.service.buildable_service.CollectionDAO") as mock_collection_dao,
+        patch("app.service.buildable_service.StockDAO") as mock_stock_dao,
     ):
-        mock_user_parts_dao.return_value.get_owned_parts.return_value = []
-        mock_collection_dao.return_value.get_user_collection.return_value = [fake_set]
+        mock_user_parts_dao.return_value.get_owned_columns.return_value = NO_PARTS
+        mock_collection_dao.return_value.get_user_collection.return_value = [
+            fake_set,
+            built_set,
+        ]
+        mock_stock_dao.return_value.get_user_stock.return_value = UserStock.empty()
 
         service = BuildableService(pg_conn=pg_conn, duckdb_conn=duck)
         service.get_buildable_sets(user_id=1)
 
-        duck.executemany.assert_called_once()  # owned_parts non vide → executemany appelé
+        mock_stock_dao.return_value.get_user_stock.assert_called_once_with(
+            NO_PARTS, ["1234-1"]
+        )
 
 
 def test_load_user_stock_with_owned_parts():
-    """Couvre la ligne 150 : executemany quand l'utilisateur possède des pièces."""
-    pg_conn = MagicMock()
-    duck = MagicMock()
-    duck.execute.return_value.fetchall.return_value = []
-    duck.description = []
+    """Le stock est enregistré dans DuckDB comme vue, sans INSERT ligne à ligne."""
+    pg_conn, duck = make_service()
+    stock = UserStock.from_dict({17: 2})
 
     with (
-        patch("app.service.buildable_service.UserPartsDAO") as mock_user_parts_dao,
+        patch("app.service.buildable_service.UserPartsDAO"),
         patch("app.service.buildable_service.CollectionDAO") as mock_collection_dao,
+        patch("app.service.buildable_service.StockDAO") as mock_stock_dao,
     ):
-        mock_user_parts_dao.return_value.get_owned_parts.return_value = [
-            {"part_num": "3001", "color_id": 4, "quantity": 2}
-        ]
         mock_collection_dao.return_value.get_user_collection.return_value = []
+        mock_stock_dao.return_value.get_user_stock.return_value = stock
 
         service = BuildableService(pg_conn=pg_conn, duckdb_conn=duck)
         service.get_buildable_sets(user_id=1)
 
-        duck.executemany.assert_called_once()
+    # Vue enregistrée sur un curseur propre à l'appel, pas sur la connexion
+    cur = duck.cursor.return_value.__enter__.return_value
+    name, frame = cur.register.call_args.args
+    assert name == "_user_parts"
+    assert frame.to_dict("list") == {"pc_id": [17], "qty": [2]}
+    duck.register.assert_not_called()
+    cur.executemany.assert_not_called()
+
+
+def test_get_buildable_sets_uses_requested_engine():
+    pg_conn, duck = make_service()
+    stock = UserStock.from_dict({17: 2})
+
+    with (
+        patch("app.service.buildable_service.UserPartsDAO"),
+        patch("app.service.buildable_service.CollectionDAO") as mock_collection_dao,
+        patch("app.service.buildable_service.StockDAO") as mock_stock_dao,
+        patch("app.service.buildable_service.get_buildable_engine") as mock_engine,
+    ):
+        owned_set = MagicMock(set_num="1234-1", is_built=True)
+        mock_collection_dao.return_value.get_user_collection.return_value = [owned_set]
+        mock_stock_dao.return_value.get_user_stock.return_value = stock
+        mock_engine.return_value.rank.return_value = {"buildable": [], "partial": []}
+
+        service = BuildableService(pg_conn=pg_conn, duckdb_conn=duck, engine="matrix")
+        service.get_buildable_sets(user_id=1, limit=7)
+
+    mock_engine.assert_called_once_with(duck, "matrix")
+    mock_engine.return_value.rank.assert_called_once_with(stock, ["1234-1"], 7)
+
+
+# -------------------------
+# Cache des résultats
+# -------------------------
+
+
+def test_get_buildable_sets_reuses_cached_result():
+    pg_conn, duck = make_service()
+    cache = BuildableCache(MemoryCacheBackend(max_entries=8))
+
+    with (
+        patch("app.service.buildable_service.UserPartsDAO"),
+        patch("app.service.buildable_service.CollectionDAO"),
+        patch("app.service.buildable_service.StockDAO"),
+        patch("app.service.buildable_service.get_buildable_engine") as mock_engine,
+        patch("app.service.buildable_service.catalog_version", return_value="v1"),
+    ):
+        mock_engine.return_value.rank.return_value = {"buildable": [], "partial": []}
+        service = BuildableService(pg_conn=pg_conn, duckdb_conn=duck, cache=cache)
+
+        first = service.get_buildable_sets(user_id=1, limit=5)
+        second = service.get_buildable_sets(user_id=1, limit=5)
+        cache.bump_stock_version(1)
+        service.get_buildable_sets(user_id=1, limit=5)
+
+    assert second is first
+    assert mock_engine.return_value.rank.call_count == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_get_buildable_sets_skips_cache_without_catalog_version():
+    pg_conn, duck = make_service()
+    cache = BuildableCache(MemoryCacheBackend(max_entries=8))
+
+    with (
+        patch("app.service.buildable_service.UserPartsDAO"),
+        patch("app.service.buildable_service.CollectionDAO"),
+        patch("app.service.buildable_service.StockDAO"),
+        patch("app.service.buildable_service.get_buildable_engine") as mock_engine,
+        patch("app.service.buildable_service.catalog_version", return_value=None),
+    ):
+        mock_engine.return_value.rank.return_value = {"buildable": [], "partial": []}
+        service = BuildableService(pg_conn=pg_conn, duckdb_conn=duck, cache=cache)
+        service.get_buildable_sets(user_id=1)
+        service.get_buildable_sets(user_id=1)
+
+    assert mock_engine.return_value.rank.call_count == 2
+    assert len(cache.backend) == 0
 
 
 # -------------------------
-# Test _make_exclude
+# Pièces manquantes
 # -------------------------
 
 
-def test_make_exclude_empty():
+def make_buildable_set(set_num):
+    return BuildableSet(
+        set_num=set_num,
+        name=set_num,
+        year=2020,
+        theme_id=1,
+        num_parts=10,
+        total_parts_needed=5,
+        parts_owned=4,
+        completion_percentage=80.0,
+        missing_parts_count=1,
+    )
+
+
+def test_with_missing_parts_batches_partial_sets():
     pg_conn, duck = make_service()
+    missing = MissingPart(part_num="3001", color_id=1, needed=2, owned=1, missing=1)
 
     with (
         patch("app.service.buildable_service.UserPartsDAO"),
         patch("app.service.buildable_service.CollectionDAO"),
+        patch("app.service.buildable_service.StockDAO") as mock_stock_dao,
+        patch("app.service.buildable_service.SetRequirementsDAO") as mock_req_dao,
     ):
+        mock_req_dao.return_value.get_missing_parts.return_value = {"2-1": [missing]}
         service = BuildableService(pg_conn=pg_conn, duckdb_conn=duck)
-        sql, params = service._make_exclude([])
-        assert sql == "NULL"
-        assert params == []
+        built, partial = make_buildable_set("1-1"), make_buildable_set("2-1")
+        cached = {"buildable": [built], "partial": [partial, make_buildable_set("3-1")]}
+
+        result = service.with_missing_parts(1, cached)
+
+    mock_req_dao.return_value.get_missing_parts.assert_called_once_with(
+        mock_stock_dao.return_value.get_user_stock.return_value, ["2-1", "3-1"]
+    )
+    assert result["buildable"][0] is built
+    assert result["partial"][0].missing_parts == [missing.to_dict()]
+    assert result["partial"][1].missing_parts == []
+    assert partial.missing_parts is None  # le résultat d'origine est intact
 
 
-def test_make_exclude_with_values():
+def test_with_missing_parts_without_partial_sets():
     pg_conn, duck = make_service()
+    with patch("app.service.buildable_service.SetRequirementsDAO") as mock_req_dao:
+        service = BuildableService(pg_conn=pg_conn, duckdb_conn=duck)
+        result = service.with_missing_parts(1, {"buildable": [], "partial": []})
+    assert result == {"buildable": [], "partial": []}
+    mock_req_dao.return_value.get_missing_parts.assert_not_called()
+
 
+def test_get_missing_parts_unknown_set():
+    pg_conn, duck = make_service()
     with (
         patch("app.service.buildable_service.UserPartsDAO"),
         patch("app.service.buildable_service.CollectionDAO"),
+        patch("app.service.buildable_service.StockDAO"),
+        patch("app.service.buildable_service.SetRequirementsDAO") as mock_req_dao,
     ):
+        mock_req_dao.return_value.get_missing_parts.return_value = {}
         service = BuildableService(pg_conn=pg_conn, duckdb_conn=duck)
-        sql, params = service._make_exclude(["1234-1", "5678-1"])
-        assert sql == "?, ?"
-        assert params == ["1234-1", "5678-1"]
+        assert service.get_missing_parts(1, "999-1") is None
@@ -0,0 +1,207 @@
+"""Tests des états de couverture maintenus (calcul incrémental)."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.business_object.user_stock import UserStock
+from app.database.dao.part_keys_dao import PartKeysDAO
+from app.service import buildable_state
+from app.service.buildable_cache import BuildableCache, MemoryCacheBackend
+from app.service.buildable_engine import RequirementMatrix
+from app.service.buildable_service import BuildableService
+from app.service.buildable_state import (
+    MAX_PENDING,
+    CoverageState,
+    CoverageStateStore,
+    get_coverage_store,
+)
+
+
+# Même stock que test_buildable_engine : 100-1 constructible, 200-1 à 80 %
+OWNED = {
+    ("3001", 1): 2,
+    ("3002", 1): 1,
+    ("3003", 2): 4,
+    ("3004", 1): 1,
+    ("3005", 3): 1,
+}
+
+
+@pytest.fixture()
+def pair_ids(lego_catalog):
+    return PartKeysDAO(lego_catalog).get_pair_ids(list(OWNED) + [("3006", 1)])
+
+
+@pytest.fixture()
+def state(lego_catalog, pair_ids):
+    matrix = RequirementMatrix.load(lego_catalog)
+    owned = UserStock.from_dict({pair_ids[k]: qty for k, qty in OWNED.items()})
+    return CoverageState.build(matrix, "v1", 0, owned, UserStock.empty(), [])
+
+
+# ---------------------------------------------------------------------------
+# CoverageState
+# ---------------------------------------------------------------------------
+
+
+class TestCoverageState:
+    def test_build(self, state):
+        assert state.covered.tolist() == [5, 4, 1, 2]
+        # 300-1 (20 %) n'atteint aucun palier, 400-1 a moins de MIN_TOTAL couples
+        assert state.candidates == {0, 1}
+
+    def test_set_owned_updates_covered_and_candidates(self, state, pair_ids):
+        state.set_owned(pair_ids[("3006", 1)], 1)
+        assert state.covered.tolist() == [5, 5, 1, 2]
+
+        state.set_owned(pair_ids[("3001", 1)], 0)
+        assert state.covered.tolist() == [4, 4, 0, 1]
+        assert state.candidates == {0, 1}
+
+        # 100-1 et 200-1 tombent à 60 %
+        state.set_owned(pair_ids[("3002", 1)], 0)
+        assert state.covered.tolist() == [3, 3, 0, 0]
+        assert state.candidates == set()
+
+    def test_set_owned_keeps_unbuilt_parts(self, lego_catalog, pair_ids):
+        matrix = RequirementMatrix.load(lego_catalog)
+        pc_3001 = pair_ids[("3001", 1)]
+        state = CoverageState.build(
+            matrix,
+            "v1",
+            0,
+            UserStock.from_dict({pc_3001: 2}),
+            UserStock.from_dict({pc_3001: 1}),
+            [],
+        )
+
+        # 1 (en propre) + 1 (set non construit) : toujours 2 pour 100-1
+        state.set_owned(pc_3001, 1)
+        assert state.covered[0] == 1
+        assert state.owned == {pc_3001: 1}
+
+
+# ---------------------------------------------------------------------------
+# CoverageStateStore
+# ---------------------------------------------------------------------------
+
+
+class TestCoverageStateStore:
+    def test_changes_recorded_after_start(self):
+        store = CoverageStateStore(4)
+        store.record_part_change(1, ("3001", 1))  # utilisateur non suivi
+        assert store.take_pending(1) is None
+
+        store.start(1)
+        store.record_part_change(1, ("3001", 1))
+        assert store.take_pending(1) == [("3001", 1)]
+        assert store.take_pending(1) == []
+
+    def test_too_many_changes_forces_rebuild(self):
+        store = CoverageStateStore(4)
+        store.start(1)
+        for i in range(MAX_PENDING + 1):
+            store.record_part_change(1, (str(i), 1))
+        assert store.take_pending(1) is None
+
+    def test_discard(self, state):
+        store = CoverageStateStore(4)
+        store.start(1)
+        store.put(1, state)
+        store.discard(1)
+        assert store.get(1) is None
+        assert store.take_pending(1) is None
+
+    def test_get_coverage_store_disabled(self):
+        with patch.object(buildable_state, "BUILDABLE_STATE_SIZE", 0):
+            assert get_coverage_store() is None
+
+
+# ---------------------------------------------------------------------------
+# BuildableService avec états maintenus
+# ---------------------------------------------------------------------------
+
+
+class TestIncrementalService:
+    @pytest.fixture()
+    def setup(self, lego_catalog):
+        owned = dict(OWNED)
+        cache = BuildableCache(MemoryCacheBackend(8))
+        store = CoverageStateStore(4)
+        with (
+            patch("app.service.buildable_service.UserPartsDAO") as mock_user_parts,
+            patch("app.service.buildable_service.CollectionDAO") as mock_collection,
+            patch("app.service.buildable_service.catalog_version", return_value="v1"),
+        ):
+            dao = mock_user_parts.return_value
+            dao.get_owned_columns.side_effect = lambda _: {
+                "part_num": [p for p, _ in owned],
+                "color_id": [c for _, c in owned],
+                "quantity": list(owned.values()),
+            }
+            dao.get_owned_quantities.side_effect = lambda _, pairs: {
+                k: owned[k] for k in pairs if k in owned
+            }
+            mock_collection.return_value.get_user_collection.return_value = []
+            service = BuildableService(
+                MagicMock(), lego_catalog, engine="matrix", cache=cache, states=store
+            )
+            yield service, owned, dao, cache, store
+
+    @staticmethod
+    def write(cache, store, pair):
+        """Ce que fait UserPartsService après une écriture."""
+        cache.bump_stock_version(1)
+        store.record_part_change(1, pair)
+
+    def test_part_change_applied_as_delta(self, setup):
+        service, owned, dao, cache, store = setup
+        first = service.get_buildable_sets(1, 10)
+        assert [s.set_num for s in first["buildable"]] == ["100-1"]
+
+        owned[("3001", 1)] = 1
+        self.write(cache, store, ("3001", 1))
+        result = service.get_buildable_sets(1, 10)
+
+        assert result["buildable"] == []
+        assert [s.set_num for s in result["partial"]] == ["100-1", "200-1"]
+        dao.get_owned_columns.assert_called_once()  # pas de reconstruction
+        dao.get_owned_quantities.assert_called_once_with(1, [("3001", 1)])
+
+    def test_unknown_write_forces_rebuild(self, setup):
+        service, owned, dao, cache, _ = setup
+        service.get_buildable_sets(1, 10)
+
+        owned[("3001", 1)] = 1
+        cache.bump_stock_version(1)  # écriture faite par un autre worker
+        result = service.get_buildable_sets(1, 10)
+
+        assert result["buildable"] == []
+        assert dao.get_owned_columns.call_count == 2
+
+    def test_catalog_change_forces_rebuild(self, setup):
+        service, _, dao, _, _ = setup
+        service.get_buildable_sets(1, 10)
+        with patch("app.service.buildable_service.catalog_version", return_value="v2"):
+            service.get_buildable_sets(1, 10)
+        assert dao.get_owned_columns.call_count == 2
+
+    def test_states_ignored_without_cache(self, lego_catalog):
+        service = BuildableService(
+            MagicMock(), lego_catalog, engine="matrix", states=CoverageStateStore(4)
+        )
+        assert service.states is None
+
+    def test_state_without_stock_version_not_in_sync(self, setup):
+        service, _, _, _, _ = setup
+        service.get_buildable_sets(1, 10)
+        state = service.states.get(1)
+        assert service._in_sync(state, "v1", 0, [])
+        assert not service._in_sync(state, "v1", None, [])
+
+    def test_states_ignored_with_sql_engine(self, lego_catalog):
+        service = BuildableService(
+            MagicMock(), lego_catalog, engine="sql", states=CoverageStateStore(4)
+        )
+        assert service.states is None
@@ -1,6 +1,8 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from app.service.collection_service import CollectionService
+import pytest
+
+from app.service.collection_service import AsyncCollectionService, CollectionService
 
 
 def make_service():
@@ -87,3 +89,71 @@ def test_mark_built_not_updated():
     result = service.mark_built(user_id=1, set_num="1234-1", is_built=True)
     conn.commit.assert_not_called()
     assert result is False
+
+
+# -------------------------
+# Invalidation du cache des sets constructibles
+# -------------------------
+
+
+def test_writes_bump_stock_version():
+    service, dao, _ = make_service()
+    with (
+        patch("app.service.collection_service.bump_stock_version") as bump,
+        patch("app.service.collection_service.discard_coverage_state") as discard,
+    ):
+        service.add_set(user_id=1, set_num="1234-1")
+        service.remove_set(user_id=1, set_num="1234-1")
+        service.mark_built(user_id=1, set_num="1234-1", is_built=True)
+    assert bump.call_count == 3
+    bump.assert_called_with(1)
+    assert discard.call_count == 3
+
+
+def test_add_set_doublon_keeps_stock_version():
+    service, dao, _ = make_service()
+    dao.add_set_to_collection.return_value = None
+    with patch("app.service.collection_service.bump_stock_version") as bump:
+        service.add_set(user_id=1, set_num="1234-1")
+    bump.assert_not_called()
+
+
+# -------------------------
+# AsyncCollectionService
+# -------------------------
+
+
+@pytest.mark.anyio
+async def test_async_write_invalidates_cache_after_commit():
+    events = []
+    dao = AsyncMock()
+    conn = MagicMock()
+    conn.transaction.return_value.__aexit__.side_effect = lambda *_: events.append(
+        "commit"
+    )
+    service = AsyncCollectionService(dao=dao, pg_conn=conn)
+    with (
+        patch(
+            "app.service.collection_service.bump_stock_version",
+            side_effect=lambda _: events.append("bump"),
+        ),
+        patch("app.service.collection_service.discard_coverage_state") as discard,
+    ):
+        result = await service.add_set(user_id=1, set_num="1234-1", is_built=True)
+
+    dao.add_set_to_collection.assert_awaited_once_with(1, "1234-1", True)
+    assert result is dao.add_set_to_collection.return_value
+    assert events == ["commit", "bump"]
+    discard.assert_called_once_with(1)
+
+
+@pytest.mark.anyio
+async def test_async_mark_unbuilt_not_found_keeps_stock_version():
+    dao = AsyncMock()
+    dao.mark_set_as_unbuilt.return_value = False
+    service = AsyncCollectionService(dao=dao, pg_conn=MagicMock())
+    with patch("app.service.collection_service.bump_stock_version") as bump:
+        result = await service.mark_built(user_id=1, set_num="1234-1", is_built=False)
+    assert result is False
+    dao.mark_set_as_built.assert_not_awaited()
+    bump.assert_not_called()
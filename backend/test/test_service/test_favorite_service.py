@@ -1,6 +1,8 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
-from app.service.favorite_service import FavoriteService
+import pytest
+
+from app.service.favorite_service import AsyncFavoriteService, FavoriteService
 
 
 def make_service():
@@ -56,3 +58,19 @@ def test_remove_favorite():
     dao.remove_favorite.assert_called_once_with(1, "1234-1")
     conn.commit.assert_called_once()
     assert result is True
+
+
+# -------------------------
+# AsyncFavoriteService
+# -------------------------
+
+
+@pytest.mark.anyio
+async def test_async_add_favorite_in_transaction():
+    dao = AsyncMock()
+    conn = MagicMock()
+    service = AsyncFavoriteService(dao=dao, pg_conn=conn)
+    result = await service.add_favorite(user_id=1, set_num="1234-1")
+    dao.add_favorite.assert_awaited_once_with(1, "1234-1")
+    conn.transaction.assert_called_once()
+    assert result is dao.add_favorite.return_value
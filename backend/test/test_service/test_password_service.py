@@ -1,9 +1,9 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from app.business_object.user import User
-from app.service.password_service import PasswordService
+from app.service.password_service import AsyncPasswordService, PasswordService
 
 
 # -------------------------
@@ -54,3 +54,39 @@ def test_validate_username_password_wrong_password():
         service = PasswordService(user_dao=dao)
         with pytest.raises(Exception, match="Mot de passe incorrect"):
             service.validate_username_password("john", "wrongpass")
+
+
+# -------------------------
+# AsyncPasswordService
+# -------------------------
+
+
+@pytest.mark.anyio
+async def test_async_validate_username_password():
+    dao = AsyncMock()
+    fake_user = User(username="john", hashed_password="correcthash", salt="somesalt")
+    dao.get_by_username.return_value = fake_user
+
+    with patch(
+        "app.service.password_service.hash_password", return_value="correcthash"
+    ) as mock_hash:
+        service = AsyncPasswordService(user_dao=dao)
+        assert await service.validate_username_password("john", "plain") == fake_user
+        with pytest.raises(Exception, match="introuvable"):
+            dao.get_by_username.return_value = None
+            await service.validate_username_password("ghost", "plain")
+
+    mock_hash.assert_called_once_with("plain", "somesalt")
+
+
+@pytest.mark.anyio
+async def test_async_validate_username_password_wrong_password():
+    dao = AsyncMock()
+    dao.get_by_username.return_value = User(
+        username="john", hashed_password="correcthash", salt="somesalt"
+    )
+
+    with patch("app.service.password_service.hash_password", return_value="wronghash"):
+        service = AsyncPasswordService(user_dao=dao)
+        with pytest.raises(Exception, match="Mot de passe incorrect"):
+            await service.validate_username_password("john", "wrongpass")
@@ -1,4 +1,4 @@
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from app.service.search_service import SearchService
 
@@ -57,6 +57,21 @@ def test_get_recent_sets():
 def test_get_stats():
     service, dao = make_service()
     dao.get_stats.return_value = {"total_sets": 1000, "total_parts": 50000}
-    result = service.get_stats()
-    dao.get_stats.assert_called_once()
+    result = service.get_stats(version="lego.duckdb@1")
+    dao.get_stats.assert_called_once_with("lego.duckdb@1")
     assert result["total_sets"] == 1000
+
+
+# -------------------------
+# Test autocomplete
+# -------------------------
+
+
+def test_autocomplete_uses_index_of_kind():
+    service, dao = make_service()
+    with patch("app.service.search_service.get_autocomplete_index") as get_index:
+        get_index.return_value.complete.return_value = [{"id": 1}]
+        result = service.autocomplete("to", kind="themes", limit=3)
+    get_index.assert_called_once_with(dao.conn, "themes", None)
+    get_index.return_value.complete.assert_called_once_with("to", 3)
+    assert result == [{"id": 1}]
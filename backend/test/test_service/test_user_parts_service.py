@@ -1,6 +1,8 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from app.service.user_parts_service import UserPartsService
+import pytest
+
+from app.service.user_parts_service import AsyncUserPartsService, UserPartsService
 
 
 def make_service():
@@ -75,3 +77,47 @@ def test_get_wished_parts():
     result = service.get_wished_parts(user_id=1)
     dao.get_wished_parts.assert_called_once_with(1)
     assert result == [{"part_num": "3002", "quantity": 1}]
+
+
+# -------------------------
+# Invalidation du cache des sets constructibles
+# -------------------------
+
+
+def test_writes_bump_stock_version():
+    service, _, _ = make_service()
+    with (
+        patch("app.service.user_parts_service.bump_stock_version") as bump,
+        patch("app.service.user_parts_service.record_part_change") as record,
+    ):
+        service.add_part(user_id=1, part_num="3001", color_id=4, quantity=2)
+        service.update_quantity(user_id=1, part_num="3001", color_id=4, quantity=5)
+        service.remove_part(user_id=1, part_num="3001", color_id=4)
+    assert bump.call_count == 3
+    bump.assert_called_with(1)
+    assert record.call_count == 3
+    record.assert_called_with(1, "3001", 4)
+
+
+# -------------------------
+# AsyncUserPartsService
+# -------------------------
+
+
+@pytest.mark.anyio
+async def test_async_update_quantity_in_transaction_then_records_change():
+    dao = AsyncMock()
+    dao.update_quantity.return_value = True
+    conn = MagicMock()
+    service = AsyncUserPartsService(dao=dao, pg_conn=conn)
+    with (
+        patch("app.service.user_parts_service.bump_stock_version") as bump,
+        patch("app.service.user_parts_service.record_part_change") as record,
+    ):
+        result = await service.update_quantity(1, "3001", 4, 3, is_used=True)
+
+    assert result is True
+    dao.update_quantity.assert_awaited_once_with(1, "3001", 4, 3, True)
+    conn.transaction.return_value.__aexit__.assert_awaited_once()
+    bump.assert_called_once_with(1)
+    record.assert_called_once_with(1, "3001", 4)
@@ -1,8 +1,10 @@
 import os
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
 
 from app.business_object.user import User
-from app.service.user_service import UserService
+from app.service.user_service import AsyncUserService, UserService
 
 
 # ---------------------------------------------------------------------------
@@ -149,3 +151,43 @@ def test_change_username_already_taken():
 
     assert result is False
     mock_dao.update_user.assert_not_called()
+
+
+# -------------------------
+# AsyncUserService
+# -------------------------
+
+
+@pytest.mark.anyio
+async def test_async_create_user():
+    mock_dao = AsyncMock()
+    service = AsyncUserService(user_dao=mock_dao)
+
+    with patch(
+        "app.service.user_service.hash_password", return_value=TEST_HASHED_PASSWORD
+    ):
+        result = await service.create_user(TEST_USERNAME, TEST_PASSWORD)
+
+    created = mock_dao.create_user.await_args.args[0]
+    assert created.username == TEST_USERNAME
+    assert created.hashed_password == TEST_HASHED_PASSWORD
+    assert len(created.salt) == 256
+    assert result is mock_dao.create_user.return_value
+
+
+@pytest.mark.anyio
+async def test_async_change_password_wrong_old_password():
+    mock_dao = AsyncMock()
+    mock_dao.get_by_username.return_value = User(
+        username=TEST_USERNAME,
+        hashed_password=TEST_OLD_HASHED_PASSWORD,
+        salt=TEST_SALT,
+    )
+    service = AsyncUserService(user_dao=mock_dao)
+
+    result = await service.change_password(
+        TEST_USERNAME, TEST_WRONG_PASSWORD, TEST_NEW_PASSWORD
+    )
+
+    assert result is False
+    mock_dao.update_user.assert_not_awaited()
@@ -1,6 +1,8 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
-from app.service.wishlist_service import WishlistService
+import pytest
+
+from app.service.wishlist_service import AsyncWishlistService, WishlistService
 
 
 def make_service():
@@ -86,3 +88,28 @@ def test_update_part_quantity_not_found():
     result = service.update_part_quantity(1, "9999", 4, 3)
     conn.commit.assert_called_once()
     assert result is False
+
+
+# -------------------------
+# AsyncWishlistService
+# -------------------------
+
+
+@pytest.mark.anyio
+async def test_async_add_part_in_transaction():
+    dao = AsyncMock()
+    conn = MagicMock()
+    service = AsyncWishlistService(dao=dao, pg_conn=conn)
+    await service.add_part(user_id=1, part_num="3001", color_id=4, quantity=2)
+    dao.add_part.assert_awaited_once_with(1, "3001", 4, 2)
+    conn.transaction.assert_called_once()
+
+
+@pytest.mark.anyio
+async def test_async_reads_without_transaction():
+    dao = AsyncMock()
+    dao.get_sets.return_value = [{"set_num": "1234-1"}]
+    conn = MagicMock()
+    service = AsyncWishlistService(dao=dao, pg_conn=conn)
+    assert await service.get_sets(user_id=1) == [{"set_num": "1234-1"}]
+    conn.transaction.assert_not_called()
@@ -0,0 +1,67 @@
+from unittest.mock import MagicMock, patch
+
+import app.utils.embedding_cache as cache_module
+from app.utils.embedding_cache import EmbeddingCache, normalize_query
+
+
+def fake_compute():
+    return MagicMock(side_effect=lambda text: [float(len(text)), 0.5])
+
+
+def test_normalize_query():
+    assert normalize_query("  Star   WARS ") == "star wars"
+
+
+def test_normalized_queries_share_one_entry():
+    compute = fake_compute()
+    cache = EmbeddingCache(8)
+    first = cache.get_or_compute("Star Wars", compute)
+    second = cache.get_or_compute("  star   wars", compute)
+    assert first == second == [9.0, 0.5]
+    compute.assert_called_once_with("star wars")
+    assert cache.stats()["hits"] == 1
+
+
+def test_memory_cache_is_bounded():
+    compute = fake_compute()
+    cache = EmbeddingCache(2)
+    for query in ["a", "bb", "ccc", "a"]:
+        cache.get_or_compute(query, compute)
+    assert compute.call_count == 4  # "a" a été évincé
+    assert cache.stats()["size"] == 2
+
+
+def test_disk_copy_survives_a_new_instance(tmp_path):
+    path = tmp_path / "embeddings.sqlite"
+    compute = fake_compute()
+    EmbeddingCache(8, path).get_or_compute("technic", compute)
+
+    restarted = EmbeddingCache(8, path)
+    assert restarted.get_or_compute("Technic", compute) == [7.0, 0.5]
+    compute.assert_called_once()
+    stats = restarted.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["hit_rate_with_disk"] == 1.0
+    assert stats["persistent"] is True
+
+
+def test_disk_copy_is_per_model(tmp_path):
+    path = tmp_path / "embeddings.sqlite"
+    compute = fake_compute()
+    EmbeddingCache(8, path, model_name="a").get_or_compute("city", compute)
+    EmbeddingCache(8, path, model_name="b").get_or_compute("city", compute)
+    assert compute.call_count == 2
+
+
+def test_disk_copy_is_bounded(tmp_path):
+    path = tmp_path / "embeddings.sqlite"
+    cache = EmbeddingCache(2, path)
+    for query in ["a", "bb", "ccc"]:
+        cache.get_or_compute(query, fake_compute())
+    count = cache._conn().execute("SELECT COUNT(*) FROM query_embeddings").fetchone()
+    assert count == (2,)
+
+
+def test_cache_disabled():
+    with patch.object(cache_module, "EMBEDDING_CACHE_SIZE", 0):
+        assert cache_module.get_embedding_cache() is None
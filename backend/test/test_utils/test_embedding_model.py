@@ -0,0 +1,65 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from app.utils import embedding_model
+from app.utils.embedding_model import EmbeddingModel, get_embedding_model
+
+
+def make_model():
+    model = MagicMock()
+    model.embed.side_effect = lambda _texts: iter([np.ones(3, dtype=np.float32)])
+    return model
+
+
+def test_unavailable_without_fastembed():
+    model = EmbeddingModel(None)
+    assert model.available is False
+    assert model.ensure_loading() is False
+    assert model.state == "unavailable"
+    with pytest.raises(RuntimeError, match="fastembed"):
+        model.embed("castle")
+
+
+def test_loaded_once_in_background():
+    loader = MagicMock(side_effect=make_model)
+    model = EmbeddingModel(loader)
+    assert model.state == "idle"
+
+    assert model.ensure_loading() is False
+    assert model.wait(5) is True
+    assert model.ensure_loading() is True
+    assert model.embed("castle") == [1.0, 1.0, 1.0]
+    assert model.status()["load_ms"] is not None
+    loader.assert_called_once()
+
+
+def test_embed_before_load_raises():
+    model = EmbeddingModel(make_model)
+    with pytest.raises(RuntimeError, match="non chargé"):
+        model.embed("castle")
+
+
+def test_failed_load_retried_after_delay():
+    loader = MagicMock(side_effect=[OSError("download failed"), make_model()])
+    model = EmbeddingModel(loader, retry_after=60)
+    model.ensure_loading()
+    model.wait(5)
+    assert model.status()["state"] == "failed"
+    assert "download failed" in model.status()["error"]
+
+    model.ensure_loading()  # trop tôt : pas de nouvel essai
+    assert loader.call_count == 1
+
+    model.retry_after = 0
+    model.ensure_loading()
+    assert model.wait(5) is True
+    assert loader.call_count == 2
+
+
+def test_process_model_created_without_loading(monkeypatch):
+    monkeypatch.setattr(embedding_model, "_model", None)
+    model = get_embedding_model()
+    assert get_embedding_model() is model
+    assert model.state in ("idle", "unavailable")
@@ -0,0 +1,64 @@
+import pytest
+
+from app.utils.lru_cache import LRUCache
+
+
+def test_get_missing_returns_default():
+    cache = LRUCache(2)
+    assert cache.get("a") is None
+    assert cache.get("a", 0) == 0
+    assert cache.misses == 2
+
+
+def test_put_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.evictions == 1
+
+
+def test_put_evicts_past_max_bytes():
+    cache = LRUCache(10, max_bytes=100)
+    cache.put("a", 1, 40)
+    cache.put("b", 2, 40)
+    cache.put("a", 3, 30)  # remplacement : 70 octets
+    cache.put("c", 4, 50)
+    assert "b" not in cache
+    assert cache.nbytes == 80
+    cache.put("d", 5, 101)  # plus gros que le cache : pas gardé
+    assert "d" not in cache
+    assert cache.pop("a") == 3
+    assert cache.stats()["bytes"] == 50
+
+
+def test_stats():
+    cache = LRUCache(4)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("b")
+    assert cache.stats() == {
+        "size": 1,
+        "max_size": 4,
+        "hits": 1,
+        "misses": 1,
+        "hit_rate": 0.5,
+        "evictions": 0,
+    }
+
+
+def test_clear_resets_counters():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == 0
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        LRUCache(0)
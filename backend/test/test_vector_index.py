@@ -0,0 +1,155 @@
+"""Tests pour l'index vectoriel NumPy."""
+
+import duckdb
+import numpy as np
+import pytest
+
+import app.database.vector_index as index_module
+from app.database.vector_index import (
+    VectorIndex,
+    dequantize,
+    get_vector_index,
+    normalize,
+    quantize,
+    stored_format,
+    vector_index_stats,
+)
+
+
+@pytest.fixture
+def index():
+    keys = np.array(["a", "b", "c", "d"])
+    matrix = np.array(
+        [[1, 0], [0.8, 0.6], [0, 1], [-1, 0]],
+        dtype=np.float32,
+    )
+    attrs = {
+        "theme_id": np.array([1, 2, 1, 2]),
+        "year": np.array([2000, 2010, 2020, 2021]),
+    }
+    return VectorIndex(keys, matrix, attrs)
+
+
+def test_search_orders_by_distance(index):
+    hits = index.search([2, 0], 3)
+    assert [key for key, _ in hits] == ["a", "b", "c"]
+    assert hits[0][1] == pytest.approx(0)
+    assert hits[2][1] == pytest.approx(np.sqrt(2))
+
+
+def test_search_with_mask(index):
+    mask = index.mask(theme_id=2, year__ge=2011)
+    assert [key for key, _ in index.search([1, 0], 5, mask)] == ["d"]
+    assert index.search([1, 0], 5, index.mask(key__in=[])) == []
+
+
+def test_mask_without_conditions(index):
+    assert index.mask(theme_id=None, year__le=None) is None
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / "lego.duckdb"
+    conn = duckdb.connect(str(path))
+    conn.execute("CREATE TABLE sets (set_num VARCHAR, theme_id INTEGER, year INTEGER)")
+    conn.execute("CREATE TABLE set_embeddings (set_num VARCHAR, embedding FLOAT[3])")
+    conn.execute("INSERT INTO sets VALUES ('1-1', 5, 2001), ('2-1', 6, 2002)")
+    conn.execute(
+        "INSERT INTO set_embeddings VALUES ('1-1', [3, 0, 4]), ('2-1', [0, 2, 0])"
+    )
+    conn.close()
+    index_module._index_cache.clear()
+    yield path
+    index_module._index_cache.clear()
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_load_normalizes_vectors(catalog, dtype):
+    with duckdb.connect(str(catalog), read_only=True) as conn:
+        index = VectorIndex.load(conn, "set_embeddings", dtype=dtype)
+    assert index.matrix.dtype == dtype
+    assert index.matrix.flags["C_CONTIGUOUS"]
+    np.testing.assert_allclose(index.matrix[0], [0.6, 0, 0.8], atol=1e-3)
+    assert list(index.keys) == ["1-1", "2-1"]
+    assert list(index.attrs["theme_id"]) == [5, 6]
+    assert index.search([0, 1, 0], 1)[0][0] == "2-1"
+
+
+def test_index_loaded_once_per_version(catalog):
+    with duckdb.connect(str(catalog), read_only=True) as conn:
+        first = get_vector_index(conn, "set_embeddings")
+        assert get_vector_index(conn, "set_embeddings") is first
+    assert vector_index_stats() == [
+        {"table": "set_embeddings", "rows": 2, "dtype": "float32", "mb": 0.0}
+    ]
+
+
+def test_quantize_int8_roundtrip():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((50, 384)).astype(np.float32)
+    codes, scales = quantize(vectors, "int8")
+    assert codes.dtype == np.int8
+    assert np.abs(codes).max() == 127
+    np.testing.assert_allclose(dequantize(codes, scales), normalize(vectors), atol=0.01)
+
+
+def test_quantize_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        quantize(np.ones((1, 2)), "int4")
+
+
+@pytest.fixture
+def quantized_catalog(tmp_path):
+    """200 sets stockés en int8 seulement (embedding à NULL)."""
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((200, 384)).astype(np.float32)
+    codes, scales = quantize(vectors, "int8")
+    path = tmp_path / "lego.duckdb"
+    with duckdb.connect(str(path)) as conn:
+        conn.execute(
+            "CREATE TABLE sets (set_num VARCHAR, theme_id INTEGER, year INTEGER)"
+        )
+        conn.execute(
+            "CREATE TABLE set_embeddings (set_num VARCHAR, embedding FLOAT[384], "
+            "embedding_q BLOB, scale FLOAT)"
+        )
+        for i in range(200):
+            conn.execute("INSERT INTO sets VALUES (?, 1, 2000)", [f"{i}-1"])
+            conn.execute(
+                "INSERT INTO set_embeddings VALUES (?, NULL, ?, ?)",
+                [f"{i}-1", codes[i].tobytes(), float(scales[i])],
+            )
+    return path, vectors
+
+
+def test_load_quantized_storage(quantized_catalog):
+    path, vectors = quantized_catalog
+    with duckdb.connect(str(path), read_only=True) as conn:
+        assert stored_format(conn, "set_embeddings") == "int8"
+        index = VectorIndex.load(conn, "set_embeddings")
+    assert index.matrix.dtype == np.int8
+    assert index.nbytes == 200 * 384 + 200 * 4
+    assert index.search(vectors[42], 1)[0][0] == "42-1"
+
+
+def test_rerank_restores_exact_order(quantized_catalog):
+    path, vectors = quantized_catalog
+    with duckdb.connect(str(path), read_only=True) as conn:
+        index = VectorIndex.load(conn, "set_embeddings")
+    exact = VectorIndex(index.keys, normalize(vectors), {})
+    query = vectors[3] + vectors[4]
+
+    def float32_vectors(keys):
+        return {key: vectors[int(key.split("-")[0])] for key in keys}
+
+    reranked = index.search(query, 10, exact_vectors=float32_vectors)
+    expected = exact.search(query, 10)
+    assert [key for key, _ in reranked] == [key for key, _ in expected]
+    np.testing.assert_allclose(
+        [d for _, d in reranked], [d for _, d in expected], rtol=1e-5
+    )
+
+
+def test_float32_storage_has_no_quantized_format(catalog):
+    with duckdb.connect(str(catalog), read_only=True) as conn:
+        assert stored_format(conn, "set_embeddings") is None